@@ -0,0 +1,593 @@
+#!/usr/bin/env python3
+"""
+OHLCV Bar Builder - Data Pipeline
+Incremental 1m/5m/15m/1h/4h/1d bars from collected price records and ticks
+
+Every consumer assumed its own implicit interval (the correlation engine 5
+minutes, the backtester 1 hour) and re-pivoted raw snapshots each cycle. The
+bar builder is the one place that turns price records into bars:
+
+- ticks fold into the in-progress 1m bar; a bar completes when a tick of a
+  later bucket arrives
+- every coarser timeframe is built only from completed bars of the next finer
+  one (1m -> 5m -> 15m -> 1h -> 4h -> 1d), so no timeframe rereads raw data
+- each batch is aggregated with ``reduceat`` over the sorted buckets, so a
+  backfill of a million ticks costs a handful of array passes
+- completed bars are written once to a ``WITHOUT ROWID`` table keyed by
+  (symbol, timeframe, start); the most recent bars of each series are also kept
+  in memory for cheap reads
+- bars completed by live ticks are queued and written in batches by a writer
+  thread, so a stream callback on the event loop never waits on SQLite; reads
+  of the table through the builder (and ``flush()``) wait for the queue first
+- each symbol has a single feed: the first source to write a symbol (e.g. the
+  collector's ``crypto_price`` rows or the live mark-price stream) claims it
+  in the ``bar_sources`` table, and ticks from any other source are counted
+  and dropped, so two feeds (or two processes) never interleave one series
+
+Historical archives are written with ``store_bars`` and their coarser
+timeframes re-derived with ``rebuild`` (see ``historical_backfill``).
+
+On restart the in-progress bar of each coarser timeframe is rebuilt from the
+stored finer bars; only the partial 1m bar is lost. Bars only exist for
+intervals that saw at least one tick. Volume is the traded quantity passed
+with the ticks (0 for price snapshots). ``get_bar_builder()`` returns the
+process-wide shared instance.
+"""
+
+import atexit
+import json
+import queue
+import sqlite3
+import sys
+import os
+import threading
+import time
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from risk_management_center.core.volatility_engine import base_asset
+
+TIMEFRAMES: Dict[str, int] = {
+    '1m': 60,
+    '5m': 300,
+    '15m': 900,
+    '1h': 3600,
+    '4h': 14400,
+    '1d': 86400,
+}
+
+# Bar value columns; ``ticks`` counts the raw records folded into the bar
+FIELDS = ('open', 'high', 'low', 'close', 'volume', 'ticks')
+OPEN, HIGH, LOW, CLOSE, VOLUME, TICKS = range(6)
+
+
+def aggregate_bars(starts: np.ndarray, values: np.ndarray, bar_seconds: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Aggregate time-sorted sub-bars (or ticks) into ``bar_seconds`` buckets
+
+    ``values`` has one row per input with the ``FIELDS`` columns; a tick is a
+    sub-bar with open = high = low = close = price and ticks = 1.
+    """
+    if len(starts) == 0:
+        return starts.astype(np.int64), values.reshape(0, len(FIELDS))
+    buckets = starts // bar_seconds * bar_seconds
+    first = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    last = np.concatenate((first[1:] - 1, [len(buckets) - 1]))
+    out = np.empty((len(first), len(FIELDS)))
+    out[:, OPEN] = values[first, OPEN]
+    out[:, HIGH] = np.maximum.reduceat(values[:, HIGH], first)
+    out[:, LOW] = np.minimum.reduceat(values[:, LOW], first)
+    out[:, CLOSE] = values[last, CLOSE]
+    out[:, VOLUME] = np.add.reduceat(values[:, VOLUME], first)
+    out[:, TICKS] = np.add.reduceat(values[:, TICKS], first)
+    return buckets[first].astype(np.int64), out
+
+
+class BarSeries:
+    """One symbol's bars at one timeframe: the bar in progress plus a recent tail"""
+
+    __slots__ = ("timeframe", "seconds", "memory_bars", "pending_start", "pending",
+                 "starts", "values")
+
+    def __init__(self, timeframe: str, memory_bars: int):
+        self.timeframe = timeframe
+        self.seconds = TIMEFRAMES[timeframe]
+        self.memory_bars = memory_bars
+        self.pending_start: Optional[int] = None
+        self.pending: Optional[np.ndarray] = None
+        self.starts = np.empty(0, dtype=np.int64)
+        self.values = np.empty((0, len(FIELDS)))
+
+    def fold(self, starts: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        Fold time-sorted finer bars in; return the bars this completes
+
+        Inputs older than the bar in progress are dropped and counted as late.
+        """
+        late = 0
+        if self.pending_start is not None:
+            keep = starts >= self.pending_start
+            late = int(len(starts) - keep.sum())
+            starts, values = starts[keep], values[keep]
+        bar_starts, bars = aggregate_bars(starts, values, self.seconds)
+        if len(bar_starts) == 0:
+            return bar_starts, bars, late
+
+        if self.pending is not None:
+            if bar_starts[0] == self.pending_start:
+                merged = bars[0].copy()
+                merged[OPEN] = self.pending[OPEN]
+                merged[HIGH] = max(self.pending[HIGH], merged[HIGH])
+                merged[LOW] = min(self.pending[LOW], merged[LOW])
+                merged[VOLUME] += self.pending[VOLUME]
+                merged[TICKS] += self.pending[TICKS]
+                bars[0] = merged
+            else:
+                bar_starts = np.concatenate(([self.pending_start], bar_starts))
+                bars = np.vstack((self.pending, bars))
+
+        self.pending_start = int(bar_starts[-1])
+        self.pending = bars[-1].copy()
+        completed_starts, completed = bar_starts[:-1], bars[:-1]
+        self.remember(completed_starts, completed)
+        return completed_starts, completed, late
+
+    def remember(self, starts: np.ndarray, values: np.ndarray):
+        if len(starts):
+            self.starts = np.concatenate((self.starts, starts))[-self.memory_bars:]
+            self.values = np.vstack((self.values, values))[-self.memory_bars:]
+
+
+class BarBuilder:
+    """
+    Multi-timeframe OHLCV bar service
+
+    Feed it with ``add_ticks`` / ``add_tick`` (live prices) or
+    ``ingest_collected`` (new ``crypto_price`` rows of the collector database);
+    read with ``get_bars`` (one series) or ``get_frame`` (the wide
+    ``<SYMBOL>_price/_open/_high/_low/_volume`` layout the analyzers use).
+    """
+
+    def __init__(self, db_path: str = "databases/sqlite_dbs/ohlcv_bars.db",
+                 timeframes: Sequence[str] = tuple(TIMEFRAMES), memory_bars: int = 2000,
+                 restore: bool = True):
+        self.db_path = db_path
+        self.timeframes = sorted(timeframes, key=TIMEFRAMES.__getitem__)
+        for finer, coarser in zip(self.timeframes, self.timeframes[1:]):
+            if TIMEFRAMES[coarser] % TIMEFRAMES[finer]:
+                raise ValueError(f"{coarser} bars cannot be derived from {finer} bars")
+        self.memory_bars = memory_bars
+        self.series: Dict[str, Dict[str, BarSeries]] = {}
+        self.last_tick: Dict[str, float] = {}
+        self.last_raw_id: Dict[str, int] = {}
+        self.sources: Dict[str, str] = {}
+        self.lock = threading.RLock()
+        self.stats = {'ticks': 0, 'late_ticks': 0, 'bars_written': 0, 'write_batches': 0,
+                      'write_errors': 0, 'ingest_queries': 0, 'foreign_ticks': 0}
+        self._pending: queue.Queue = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self.setup_database()
+        if restore:
+            self.restore()
+
+    def setup_database(self):
+        """Initialize compact bar storage"""
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS ohlcv_bars (
+                symbol TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                start INTEGER NOT NULL,
+                open REAL NOT NULL,
+                high REAL NOT NULL,
+                low REAL NOT NULL,
+                close REAL NOT NULL,
+                volume REAL NOT NULL,
+                ticks INTEGER NOT NULL,
+                PRIMARY KEY (symbol, timeframe, start)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS bar_builder_state (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS bar_sources (
+                symbol TEXT PRIMARY KEY,
+                source TEXT NOT NULL
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def _series(self, symbol: str) -> Dict[str, BarSeries]:
+        series = self.series.get(symbol)
+        if series is None:
+            series = {tf: BarSeries(tf, self.memory_bars) for tf in self.timeframes}
+            self.series[symbol] = series
+        return series
+
+    def _owner(self, symbol: str, source: str) -> str:
+        """Feed that writes ``symbol``; the first source to ask claims it for every process"""
+        owner = self.sources.get(symbol)
+        if owner is None:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                conn.execute("INSERT OR IGNORE INTO bar_sources (symbol, source) VALUES (?, ?)", (symbol, source))
+                conn.commit()
+                owner = conn.execute("SELECT source FROM bar_sources WHERE symbol = ?", (symbol,)).fetchone()[0]
+            finally:
+                conn.close()
+            self.sources[symbol] = owner
+        return owner
+
+    # ------------------------------------------------------------------ updates
+
+    def add_ticks(self, symbol: str, timestamps: Iterable[float], prices: Iterable[float],
+                  volumes: Optional[Iterable[float]] = None, source: str = 'ticks') -> Dict[str, int]:
+        """Fold a batch of ticks in; returns completed bars per timeframe"""
+        timestamps = np.asarray(timestamps, dtype=float)
+        prices = np.asarray(prices, dtype=float)
+        volumes = np.zeros(len(prices)) if volumes is None else np.nan_to_num(np.asarray(volumes, dtype=float))
+        valid = np.isfinite(timestamps) & np.isfinite(prices) & (prices > 0)
+        timestamps, prices, volumes = timestamps[valid], prices[valid], volumes[valid]
+        if len(timestamps) == 0:
+            return {}
+
+        order = np.argsort(timestamps, kind='stable')
+        timestamps, prices, volumes = timestamps[order], prices[order], volumes[order]
+
+        with self.lock:
+            if self._owner(symbol, source) != source:
+                self.stats['foreign_ticks'] += len(timestamps)
+                return {}
+            last = self.last_tick.get(symbol)
+            if last is not None:
+                keep = timestamps >= last
+                self.stats['late_ticks'] += int(len(timestamps) - keep.sum())
+                timestamps, prices, volumes = timestamps[keep], prices[keep], volumes[keep]
+                if len(timestamps) == 0:
+                    return {}
+            self.last_tick[symbol] = float(timestamps[-1])
+            self.stats['ticks'] += len(timestamps)
+
+            values = np.column_stack((prices, prices, prices, prices, volumes, np.ones(len(prices))))
+            starts = np.floor(timestamps).astype(np.int64)
+            completed = self._cascade(symbol, starts, values)
+            self._enqueue(self._rows(symbol, completed))
+            return {tf: len(bars[0]) for tf, bars in completed.items() if len(bars[0])}
+
+    def add_tick(self, symbol: str, timestamp: float, price: float, volume: float = 0.0,
+                 source: str = 'ticks') -> Dict[str, int]:
+        """Fold one live price in (e.g. from a stream callback)"""
+        return self.add_ticks(symbol, [timestamp], [price], [volume], source=source)
+
+    def _cascade(self, symbol: str, starts: np.ndarray, values: np.ndarray) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        completed = {}
+        for timeframe in self.timeframes:
+            starts, values, late = self._series(symbol)[timeframe].fold(starts, values)
+            if timeframe == self.timeframes[0]:
+                self.stats['late_ticks'] += late
+            completed[timeframe] = (starts, values)
+            if len(starts) == 0:
+                break
+        return completed
+
+    @staticmethod
+    def _rows(symbol: str, completed: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> List[tuple]:
+        return [row for tf, (starts, bars) in completed.items()
+                for row in zip(repeat(symbol), repeat(tf), starts.tolist(), *bars[:, :TICKS].T.tolist(),
+                               bars[:, TICKS].astype(np.int64).tolist())]
+
+    def _write(self, symbol: str, completed: Dict[str, Tuple[np.ndarray, np.ndarray]]):
+        """Synchronous write (historical paths); queued live bars go first so newer rows win"""
+        rows = self._rows(symbol, completed)
+        if not rows:
+            return
+        self.flush()
+        self._insert(rows)
+
+    def _insert(self, rows: List[tuple]):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.executemany("""
+                INSERT OR REPLACE INTO ohlcv_bars
+                (symbol, timeframe, start, open, high, low, close, volume, ticks)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            conn.commit()
+        finally:
+            conn.close()
+        self.stats['bars_written'] += len(rows)
+        self.stats['write_batches'] += 1
+
+    def _enqueue(self, rows: List[tuple]):
+        """Hand completed live bars to the writer thread"""
+        if not rows:
+            return
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="bar-writer", daemon=True)
+            self._writer.start()
+            atexit.register(self.flush)
+        self._pending.put(rows)
+
+    def _write_loop(self):
+        while True:
+            batches = [self._pending.get()]
+            while True:
+                try:
+                    batches.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._insert([row for rows in batches for row in rows])
+            except Exception as e:
+                # Any failure is counted and the writer keeps going; a dead writer would hang flush()
+                self.stats['write_errors'] += 1
+                print(f"❌ Bar write failed ({sum(map(len, batches))} bars): {e}")
+            finally:
+                for _ in batches:
+                    self._pending.task_done()
+
+    def flush(self):
+        """Block until every queued bar is in the database"""
+        if self._writer is not None:
+            self._pending.join()
+
+    def store_bars(self, symbol: str, timeframe: str, starts: np.ndarray, values: np.ndarray):
+        """Write already-built bars (e.g. a historical backfill) without touching the live series"""
+        with self.lock:
+            self._series(symbol)
+            self._write(symbol, {timeframe: (np.asarray(starts, dtype=np.int64), np.asarray(values, dtype=float))})
+
+    def rebuild(self, symbol: str, timeframe: str, start: float, end: float) -> int:
+        """Re-derive every coarser timeframe over [start, end) from the stored ``timeframe`` bars"""
+        coarser = self.timeframes[self.timeframes.index(timeframe) + 1:]
+        if not coarser:
+            return 0
+        span = TIMEFRAMES[coarser[-1]]
+        with self.lock:
+            starts, values = self._read(symbol, timeframe, start=int(start) // span * span,
+                                        end=-(-int(end) // span) * span)
+            completed = {}
+            for coarse in coarser:
+                starts, values = aggregate_bars(starts, values, TIMEFRAMES[coarse])
+                completed[coarse] = (starts, values)
+            self._write(symbol, completed)
+            return sum(len(bars[0]) for bars in completed.values())
+
+    def ingest_collected(self, source_db: str = "databases/sqlite_dbs/free_sources_data.db") -> int:
+        """Fold ``crypto_price`` records newer than the last ingested row in; returns ticks read"""
+        if not Path(source_db).exists():
+            return 0
+        with self.lock:
+            since = self.last_raw_id.get(source_db, 0)
+            try:
+                conn = sqlite3.connect(source_db)
+                rows = conn.execute("""
+                    SELECT id, timestamp, symbol, raw_data FROM free_data
+                    WHERE data_type = 'crypto_price' AND id > ?
+                    ORDER BY id
+                """, (since,)).fetchall()
+                conn.close()
+            except sqlite3.Error:
+                return 0
+            self.stats['ingest_queries'] += 1
+            if not rows:
+                return 0
+
+            ticks: Dict[str, Tuple[List[float], List[float]]] = {}
+            for _, timestamp, symbol, raw in rows:
+                try:
+                    record = json.loads(raw)
+                    price = float(record.get('price') or record.get('price_usd') or 0)
+                except (ValueError, TypeError, AttributeError):
+                    continue
+                series = ticks.setdefault(base_asset(symbol), ([], []))
+                series[0].append(timestamp)
+                series[1].append(price)
+
+            for asset, (timestamps, prices) in ticks.items():
+                self.add_ticks(asset, timestamps, prices, source='collector')
+            # The cursor only moves past rows whose bars are on disk
+            self.flush()
+            self.last_raw_id[source_db] = rows[-1][0]
+            self._save_state()
+            return len(rows)
+
+    # ------------------------------------------------------------------ persistence
+
+    def _save_state(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT OR REPLACE INTO bar_builder_state (key, value) VALUES (?, ?)",
+                     ('last_raw_id', json.dumps(self.last_raw_id)))
+        conn.commit()
+        conn.close()
+
+    def restore(self):
+        """Reload recent bars and rebuild in-progress coarse bars from stored finer bars"""
+        conn = sqlite3.connect(self.db_path)
+        state = conn.execute("SELECT value FROM bar_builder_state WHERE key = 'last_raw_id'").fetchone()
+        symbols = [row[0] for row in conn.execute("SELECT DISTINCT symbol FROM ohlcv_bars")]
+        self.sources = dict(conn.execute("SELECT symbol, source FROM bar_sources"))
+        conn.close()
+        if state:
+            self.last_raw_id = json.loads(state[0])
+
+        with self.lock:
+            for symbol in symbols:
+                series = self._series(symbol)
+                for timeframe in self.timeframes:
+                    starts, values = self._read(symbol, timeframe, limit=self.memory_bars)
+                    series[timeframe].remember(starts, values)
+
+                # Finer bars stored after the last completed coarse bar belong to the coarse bar in progress
+                for finer, coarser in zip(self.timeframes, self.timeframes[1:]):
+                    target = series[coarser]
+                    floor = int(target.starts[-1]) + target.seconds if len(target.starts) else None
+                    starts, values = self._read(symbol, finer, start=floor)
+                    if len(starts):
+                        completed_starts, completed, _ = target.fold(starts, values)
+                        self._write(symbol, {coarser: (completed_starts, completed)})
+
+                finest = series[self.timeframes[0]]
+                if len(finest.starts):
+                    self.last_tick[symbol] = float(finest.starts[-1] + finest.seconds)
+
+    def _read(self, symbol: str, timeframe: str, start: Optional[int] = None, end: Optional[int] = None,
+              limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        self.flush()
+        query = "SELECT start, open, high, low, close, volume, ticks FROM ohlcv_bars WHERE symbol = ? AND timeframe = ?"
+        params: List[Any] = [symbol, timeframe]
+        if start is not None:
+            query += " AND start >= ?"
+            params.append(int(start))
+        if end is not None:
+            query += " AND start < ?"
+            params.append(int(end))
+        query += " ORDER BY start DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute(query, params).fetchall()
+        conn.close()
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(FIELDS)))
+        data = np.array(rows[::-1], dtype=float)
+        return data[:, 0].astype(np.int64), data[:, 1:]
+
+    # ------------------------------------------------------------------ queries
+
+    def get_bars(self, symbol: str, timeframe: str, start: Optional[float] = None, end: Optional[float] = None,
+                 limit: Optional[int] = None, include_partial: bool = False) -> pd.DataFrame:
+        """Bars of one series indexed by bar start; served from memory when the tail suffices"""
+        if timeframe not in self.timeframes:
+            raise ValueError(f"Unknown timeframe: {timeframe}")
+        with self.lock:
+            series = self.series.get(symbol, {}).get(timeframe)
+            starts = series.starts if series is not None else np.empty(0, dtype=np.int64)
+            values = series.values if series is not None else np.empty((0, len(FIELDS)))
+
+            in_memory = len(starts) > 0 and (
+                (start is not None and start >= starts[0])
+                or (start is None and limit is not None and limit <= len(starts))
+            )
+            if not in_memory:
+                starts, values = self._read(symbol, timeframe, start=start, end=end,
+                                            limit=None if start is not None else limit)
+            if start is not None:
+                keep = starts >= start
+                starts, values = starts[keep], values[keep]
+            if end is not None:
+                keep = starts < end
+                starts, values = starts[keep], values[keep]
+            if include_partial and series is not None:
+                partial_starts, partial = self._partial(symbol, timeframe)
+                if end is not None:
+                    keep = partial_starts < end
+                    partial_starts, partial = partial_starts[keep], partial[keep]
+                starts = np.concatenate((starts, partial_starts))
+                values = np.vstack((values, partial))
+            if limit is not None:
+                starts, values = starts[-limit:], values[-limit:]
+
+        frame = pd.DataFrame(values, columns=FIELDS, index=pd.to_datetime(starts, unit='s'))
+        frame['ticks'] = frame['ticks'].astype(np.int64)
+        return frame
+
+    def _partial(self, symbol: str, timeframe: str) -> Tuple[np.ndarray, np.ndarray]:
+        """In-progress bars of ``timeframe`` including the finer bars still in progress"""
+        series = self.series[symbol]
+        pending = [series[tf] for tf in reversed(self.timeframes[:self.timeframes.index(timeframe) + 1])
+                   if series[tf].pending is not None]
+        if not pending:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(FIELDS)))
+        starts = np.array([s.pending_start for s in pending], dtype=np.int64)
+        return aggregate_bars(starts, np.vstack([s.pending for s in pending]), TIMEFRAMES[timeframe])
+
+    def get_frame(self, symbols: Iterable[str], timeframe: str, start: Optional[float] = None,
+                  limit: Optional[int] = None, include_partial: bool = False) -> pd.DataFrame:
+        """Wide frame (``<SYMBOL>_price`` close plus ``_open/_high/_low/_volume``) on a common index"""
+        columns = {}
+        for symbol in symbols:
+            bars = self.get_bars(symbol, timeframe, start=start, limit=limit, include_partial=include_partial)
+            if bars.empty:
+                continue
+            columns[f"{symbol}_open"] = bars['open']
+            columns[f"{symbol}_high"] = bars['high']
+            columns[f"{symbol}_low"] = bars['low']
+            columns[f"{symbol}_price"] = bars['close']
+            columns[f"{symbol}_volume"] = bars['volume']
+        if not columns:
+            return pd.DataFrame()
+        frame = pd.DataFrame(columns).sort_index()
+        volume_columns = [c for c in frame.columns if c.endswith('_volume')]
+        frame[volume_columns] = frame[volume_columns].fillna(0.0)
+        return frame.ffill()
+
+    def symbols(self) -> List[str]:
+        with self.lock:
+            return sorted(self.series)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return dict(self.stats, symbols=len(self.series), timeframes=list(self.timeframes))
+
+
+_bar_builder: Optional[BarBuilder] = None
+_bar_builder_lock = threading.Lock()
+
+
+def get_bar_builder() -> BarBuilder:
+    """Process-wide shared bar builder"""
+    global _bar_builder
+    with _bar_builder_lock:
+        if _bar_builder is None:
+            _bar_builder = BarBuilder()
+        return _bar_builder
+
+
+def main():
+    """Demo: three days of 5-second ticks folded in live-sized batches"""
+    import tempfile
+
+    print("🕯️ OHLCV Bar Builder")
+    print("=" * 50)
+
+    rng = np.random.default_rng(3)
+    n = 3 * 86400 // 5
+    timestamps = 1_700_000_000 + np.arange(n) * 5.0
+    prices = 65000 * np.exp(np.cumsum(rng.normal(0, 0.0004, n)))
+    volumes = rng.exponential(0.5, n)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        builder = BarBuilder(db_path=os.path.join(tmp, "bars.db"))
+        started = time.perf_counter()
+        for chunk in range(0, n, 720):
+            builder.add_ticks('BTC', timestamps[chunk:chunk + 720], prices[chunk:chunk + 720],
+                              volumes[chunk:chunk + 720])
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"   {n:,} ticks in {elapsed:.0f}ms | {builder.get_stats()}")
+
+        for timeframe in builder.timeframes:
+            bars = builder.get_bars('BTC', timeframe, include_partial=True)
+            print(f"   {timeframe:>3}: {len(bars):5d} bars | last close {bars['close'].iloc[-1]:,.2f}")
+
+        restored = BarBuilder(db_path=os.path.join(tmp, "bars.db"))
+        same = restored.get_bars('BTC', '1d', include_partial=True)['high'].iloc[-1] == \
+            builder.get_bars('BTC', '1d', include_partial=True)['high'].iloc[-1]
+        print(f"\n✅ Restart rebuilds in-progress bars from finer bars: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -280,9 +280,14 @@ class EnhancedTradingOrchestrator:
             
             summary = collector.get_collection_summary()
             
+            # Fold the new price records into the multi-timeframe bars
+            from core_orchestration.data_pipeline.bar_builder import get_bar_builder
+            bars_ingested = get_bar_builder().ingest_collected(collector.db_path)
+            
             return {
                 'sources_collected': len(results),
                 'total_records': summary.get('total_records', 0),
+                'price_records_ingested': bars_ingested,
                 'collection_summary': summary
             }
             
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+Signal Event Bus - ORION PHASE 2
+In-process publish/subscribe for signal propagation between pipeline stages
+
+Stages used to discover new signals by polling each other's SQLite databases on
+the 5-minute orchestration tick. Producers now publish typed signal events
+(UnifiedSignal, MarketSignal, TradingSignal, PredictiveSignal, ...) to the bus
+and consumers react as soon as they arrive. Every subscription owns a bounded
+queue, so a slow consumer applies backpressure to publishers instead of letting
+memory grow without limit.
+
+For multi-process deployments the SocketEventServer / RemoteEventPublisher pair
+forwards events over a local TCP or Unix-domain socket as newline-delimited JSON.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+import typing
+from dataclasses import dataclass, fields, is_dataclass, asdict
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+
+logger = logging.getLogger(__name__)
+
+# Overflow policies for a full subscription queue
+OVERFLOW_BLOCK = "block"              # Publisher waits until the consumer catches up
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # Oldest queued event is discarded
+OVERFLOW_DROP_NEWEST = "drop_newest"  # Incoming event is discarded
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST)
+
+# Registry of event types by topic, used to rebuild typed events received over a socket
+_EVENT_TYPES: Dict[str, Type] = {}
+
+
+def event_topic(event_type: Union[str, Type, Any]) -> str:
+    """Resolve the topic name for an event class, instance or explicit topic string
+
+    Classes may pin their topic with an ``EVENT_TOPIC`` class attribute; this is
+    needed where two modules define signal classes with the same name.
+    """
+    if isinstance(event_type, str):
+        return event_type
+    cls = event_type if isinstance(event_type, type) else type(event_type)
+    topic = getattr(cls, "EVENT_TOPIC", None) or cls.__name__
+    _EVENT_TYPES.setdefault(topic, cls)
+    return topic
+
+
+def register_event_type(cls: Type, topic: Optional[str] = None) -> str:
+    """Register an event class so remote transports can decode it by topic"""
+    topic = topic or event_topic(cls)
+    _EVENT_TYPES[topic] = cls
+    return topic
+
+
+def _json_default(value: Any) -> Any:
+    """JSON fallback for enums, datetimes and numpy scalars found in signal dataclasses"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    return str(value)
+
+
+def encode_event(event: Any, topic: Optional[str] = None) -> bytes:
+    """Serialize an event to a single newline-terminated JSON frame"""
+    payload = asdict(event) if is_dataclass(event) else event
+    frame = {
+        "topic": topic or event_topic(event),
+        "published_at": time.time(),
+        "payload": payload
+    }
+    return (json.dumps(frame, default=_json_default) + "\n").encode("utf-8")
+
+
+def _coerce_field(value: Any, hint: Any) -> Any:
+    """Convert a JSON value back to the annotated field type where it matters"""
+    if value is None:
+        return None
+    if typing.get_origin(hint) is Union:
+        args = [arg for arg in typing.get_args(hint) if arg is not type(None)]
+        hint = args[0] if len(args) == 1 else hint
+    if isinstance(hint, type):
+        if issubclass(hint, Enum):
+            return hint(value)
+        if issubclass(hint, datetime) and isinstance(value, str):
+            return datetime.fromisoformat(value)
+    return value
+
+
+def decode_event(data: Union[bytes, str]) -> Tuple[str, Any]:
+    """Decode a JSON frame into (topic, event)
+
+    Registered dataclass topics are rebuilt as typed instances; unknown topics
+    are delivered as plain payload dicts.
+    """
+    frame = json.loads(data)
+    topic = frame["topic"]
+    payload = frame["payload"]
+    cls = _EVENT_TYPES.get(topic)
+
+    if cls is None or not is_dataclass(cls) or not isinstance(payload, dict):
+        return topic, payload
+
+    try:
+        hints = typing.get_type_hints(cls)
+    except Exception:
+        hints = {}
+
+    kwargs = {}
+    for f in fields(cls):
+        if f.name in payload:
+            kwargs[f.name] = _coerce_field(payload[f.name], hints.get(f.name))
+    return topic, cls(**kwargs)
+
+
+@dataclass
+class SubscriptionStats:
+    delivered: int = 0
+    dropped: int = 0
+    errors: int = 0
+    max_queue_depth: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    @property
+    def avg_latency_ms(self) -> float:
+        return (self.total_latency / self.delivered) * 1000 if self.delivered else 0.0
+
+
+class Subscription:
+    """A handler bound to one topic, consuming from its own bounded queue"""
+
+    def __init__(self, bus: "EventBus", topic: str, handler: Callable[[Any], Any],
+                 maxsize: int, overflow: str, name: Optional[str] = None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+
+        self.bus = bus
+        self.topic = topic
+        self.handler = handler
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.name = name or getattr(handler, "__qualname__", repr(handler))
+        self.stats = SubscriptionStats()
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        self._is_coroutine = asyncio.iscoroutinefunction(handler)
+
+    def _start(self, loop: asyncio.AbstractEventLoop):
+        """Create the queue and consumer task on the bus loop"""
+        if self.task is None or self.task.get_loop() is not loop:
+            self.queue = asyncio.Queue(maxsize=self.maxsize)
+            self.task = loop.create_task(self._consume())
+
+    def _offer(self, envelope: Tuple[float, Any]) -> bool:
+        """Non-blocking enqueue honouring the overflow policy"""
+        try:
+            self.queue.put_nowait(envelope)
+        except asyncio.QueueFull:
+            if self.overflow == OVERFLOW_DROP_OLDEST:
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.queue.put_nowait(envelope)
+                self.stats.dropped += 1
+            else:
+                self.stats.dropped += 1
+                return False
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, self.queue.qsize())
+        return True
+
+    async def _put(self, envelope: Tuple[float, Any]) -> bool:
+        """Enqueue, waiting for space when the policy is OVERFLOW_BLOCK"""
+        if self.overflow == OVERFLOW_BLOCK:
+            await self.queue.put(envelope)
+            self.stats.max_queue_depth = max(self.stats.max_queue_depth, self.queue.qsize())
+            return True
+        return self._offer(envelope)
+
+    async def _consume(self):
+        """Deliver queued events to the handler one at a time"""
+        while True:
+            published_at, event = await self.queue.get()
+            try:
+                result = self.handler(event)
+                if self._is_coroutine or asyncio.iscoroutine(result):
+                    await result
+                latency = time.perf_counter() - published_at
+                self.stats.delivered += 1
+                self.stats.total_latency += latency
+                self.stats.max_latency = max(self.stats.max_latency, latency)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats.errors += 1
+                logger.warning(f"⚠️ Event handler {self.name} failed on {self.topic}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def cancel(self):
+        """Stop consuming and detach from the bus"""
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """
+    In-process publish/subscribe bus for typed signal events
+
+    Handlers may be plain functions or coroutines. Each subscription has a bounded
+    queue; with the default OVERFLOW_BLOCK policy ``publish`` waits for space, which
+    propagates backpressure to the producer. ``publish_nowait`` is available to
+    synchronous and foreign-thread producers and never blocks.
+    """
+
+    def __init__(self, default_maxsize: int = 1000):
+        self.default_maxsize = default_maxsize
+        self._subscriptions: Dict[str, List[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped_no_loop = 0  # publish_nowait calls lost because no loop was running
+
+    def _bind_loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        """Attach the bus to the running loop the first time one is available"""
+        if self._loop is None or self._loop.is_closed():
+            try:
+                self._loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return None
+            for subscriptions in self._subscriptions.values():
+                for subscription in subscriptions:
+                    subscription._start(self._loop)
+        return self._loop
+
+    def subscribe(self, event_type: Union[str, Type], handler: Callable[[Any], Any],
+                  maxsize: Optional[int] = None, overflow: str = OVERFLOW_BLOCK,
+                  name: Optional[str] = None) -> Subscription:
+        """Subscribe a handler to an event class or topic name"""
+        topic = event_topic(event_type)
+        subscription = Subscription(self, topic, handler, maxsize or self.default_maxsize, overflow, name)
+
+        with self._lock:
+            self._subscriptions.setdefault(topic, []).append(subscription)
+
+        loop = self._bind_loop()
+        if loop is not None:
+            subscription._start(loop)
+
+        logger.info(f"📡 {subscription.name} subscribed to {topic} "
+                    f"(maxsize={subscription.maxsize}, overflow={overflow})")
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscription and cancel its consumer task"""
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.topic, [])
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+        if subscription.task is not None:
+            subscription.task.cancel()
+
+    def subscribers(self, event_type: Union[str, Type]) -> List[Subscription]:
+        return list(self._subscriptions.get(event_topic(event_type), []))
+
+    async def publish(self, event: Any, topic: Optional[str] = None) -> int:
+        """Publish an event, waiting on full OVERFLOW_BLOCK queues
+
+        Returns the number of subscriptions that accepted the event.
+        """
+        self._bind_loop()
+        topic = topic or event_topic(event)
+        envelope = (time.perf_counter(), event)
+        self.published += 1
+
+        accepted = 0
+        for subscription in self.subscribers(topic):
+            if await subscription._put(envelope):
+                accepted += 1
+        return accepted
+
+    def publish_nowait(self, event: Any, topic: Optional[str] = None) -> int:
+        """Publish without blocking; safe to call from synchronous code and other threads
+
+        Full queues drop according to their policy (OVERFLOW_BLOCK queues reject the
+        event and count it as dropped). Returns the number of subscriptions that
+        accepted the event, or the number it was scheduled for when called from
+        another thread.
+        """
+        self._bind_loop()
+        topic = topic or event_topic(event)
+        subscriptions = self.subscribers(topic)
+        if not subscriptions:
+            return 0
+
+        envelope = (time.perf_counter(), event)
+        self.published += 1
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if self._loop is not None and running is self._loop:
+            return sum(1 for subscription in subscriptions if subscription._offer(envelope))
+
+        if self._loop is not None and self._loop.is_running():
+            for subscription in subscriptions:
+                self._loop.call_soon_threadsafe(subscription._offer, envelope)
+            return len(subscriptions)
+
+        self.dropped_no_loop += 1
+        logger.warning(f"⚠️ Event bus has no running loop; dropped {topic} event")
+        return 0
+
+    async def join(self, timeout: Optional[float] = None):
+        """Wait until every queued event has been handled"""
+        queues = [s.queue for subs in self._subscriptions.values() for s in subs if s.queue is not None]
+        waiter = asyncio.gather(*(queue.join() for queue in queues))
+        if timeout is None:
+            await waiter
+        else:
+            await asyncio.wait_for(waiter, timeout)
+
+    async def close(self, drain: bool = True, timeout: Optional[float] = 5.0):
+        """Optionally drain queues, then cancel all consumer tasks"""
+        if drain:
+            try:
+                await self.join(timeout)
+            except asyncio.TimeoutError:
+                logger.warning("⚠️ Event bus drain timed out; cancelling consumers")
+
+        tasks = []
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                if subscription.task is not None:
+                    subscription.task.cancel()
+                    tasks.append(subscription.task)
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._subscriptions.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-topic delivery, drop and latency statistics"""
+        return {
+            "published": self.published,
+            "dropped_no_loop": self.dropped_no_loop,
+            "topics": {
+                topic: [
+                    {
+                        "subscriber": s.name,
+                        "queued": s.queue.qsize() if s.queue is not None else 0,
+                        "maxsize": s.maxsize,
+                        "overflow": s.overflow,
+                        "delivered": s.stats.delivered,
+                        "dropped": s.stats.dropped,
+                        "errors": s.stats.errors,
+                        "max_queue_depth": s.stats.max_queue_depth,
+                        "avg_latency_ms": s.stats.avg_latency_ms,
+                        "max_latency_ms": s.stats.max_latency * 1000
+                    } for s in subscriptions
+                ] for topic, subscriptions in self._subscriptions.items()
+            }
+        }
+
+
+class SocketEventServer:
+    """
+    Receives events from other processes and republishes them on a local bus
+
+    Listens on a Unix-domain socket when ``path`` is given, otherwise on local TCP.
+    Reads pause while the bus applies backpressure, so remote publishers are
+    throttled through normal socket flow control.
+    """
+
+    def __init__(self, bus: EventBus, path: Optional[str] = None,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.bus = bus
+        self.path = path
+        self.host = host
+        self.port = port
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.received = 0
+
+    async def start(self) -> "SocketEventServer":
+        if self.path:
+            self.server = await asyncio.start_unix_server(self._handle_client, path=self.path)
+        else:
+            self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+            self.port = self.server.sockets[0].getsockname()[1]
+        logger.info(f"📡 Event socket listening on {self.path or f'{self.host}:{self.port}'}")
+        return self
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    topic, event = decode_event(line)
+                except Exception as e:
+                    logger.warning(f"⚠️ Dropping malformed event frame: {e}")
+                    continue
+                self.received += 1
+                await self.bus.publish(event, topic=topic)
+        finally:
+            writer.close()
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+
+class RemoteEventPublisher:
+    """
+    Forwards events to a SocketEventServer in another process
+
+    ``send`` awaits the socket drain, so a congested receiver slows the sender.
+    Use ``forward`` to relay every event of a topic from a local bus.
+    """
+
+    def __init__(self, path: Optional[str] = None, host: str = "127.0.0.1", port: int = 0):
+        self.path = path
+        self.host = host
+        self.port = port
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.sent = 0
+
+    async def connect(self) -> "RemoteEventPublisher":
+        if self.path:
+            _, self.writer = await asyncio.open_unix_connection(self.path)
+        else:
+            _, self.writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    async def send(self, event: Any, topic: Optional[str] = None):
+        if self.writer is None:
+            await self.connect()
+        self.writer.write(encode_event(event, topic))
+        await self.writer.drain()
+        self.sent += 1
+
+    def forward(self, bus: EventBus, event_type: Union[str, Type],
+                maxsize: Optional[int] = None) -> Subscription:
+        """Relay a local topic to the remote process"""
+        topic = event_topic(event_type)
+
+        async def relay(event):
+            await self.send(event, topic)
+
+        return bus.subscribe(topic, relay, maxsize=maxsize, name=f"remote:{self.path or self.port}")
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+            self.writer = None
+
+
+# Shared process-wide bus for components that are not handed one explicitly
+_default_bus: Optional[EventBus] = None
+
+
+def get_event_bus() -> EventBus:
+    """Return the process-wide default event bus"""
+    global _default_bus
+    if _default_bus is None:
+        _default_bus = EventBus()
+    return _default_bus
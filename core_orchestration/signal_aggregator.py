@@ -7,15 +7,26 @@ Combines RSS, Twitter, OnChain, and Sentiment signals into actionable trading in
 import sqlite3
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 import numpy as np
 from pathlib import Path
 import logging
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from core_orchestration.signal_frame import UnifiedSignalFrame, DIRECTION_CODES, SIGNAL_TYPE_NAMES
 
 @dataclass
 class UnifiedSignal:
+    EVENT_TOPIC = "aggregator.UnifiedSignal"  # Event bus topic (name clashes with generator signals)
+    
+    __slots__ = ("signal_id", "timestamp", "signal_type", "symbol", "direction", "confidence", "strength",
+                 "source", "content", "impact_prediction", "time_horizon", "correlations", "metadata")
+
     signal_id: str
     timestamp: float
     signal_type: str  # "RSS", "TWITTER", "ONCHAIN", "SENTIMENT", "CORRELATION"
@@ -32,6 +43,9 @@ class UnifiedSignal:
 
 @dataclass
 class MarketSignal:
+    __slots__ = ("symbol", "overall_direction", "confidence_score", "signal_count", "bullish_signals",
+                 "bearish_signals", "dominant_sources", "predicted_impact", "risk_score", "timestamp")
+
     symbol: str
     overall_direction: str
     confidence_score: float
@@ -49,8 +63,10 @@ class SignalAggregator:
     Combines all data sources into unified trading intelligence
     """
     
-    def __init__(self):
+    def __init__(self, concurrent_collection: bool = True, event_bus=None):
         self.db_path = "databases/sqlite_dbs/enhanced_signals.db"
+        self.concurrent_collection = concurrent_collection
+        self.event_bus = event_bus  # Optional EventBus; new signals are pushed to subscribers
         self.logger = self.setup_logging()
         self.setup_database()
         
@@ -138,6 +154,22 @@ class SignalAggregator:
             )
         """)
         
+        # Per-source high-water marks for incremental collection: the
+        # (timestamp, rowid) of the last row processed. high_water_mark is
+        # declared without a type so values keep the type of the source
+        # table's timestamp column (REAL or ISO TEXT).
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS source_watermarks (
+                source TEXT PRIMARY KEY,
+                high_water_mark,
+                high_water_rowid INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            )
+        """)
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(source_watermarks)")]
+        if "high_water_rowid" not in columns:
+            cursor.execute("ALTER TABLE source_watermarks ADD COLUMN high_water_rowid INTEGER NOT NULL DEFAULT 0")
+        
         conn.commit()
         conn.close()
     
@@ -154,19 +186,41 @@ class SignalAggregator:
         )
         return logging.getLogger(__name__)
     
-    def collect_all_signals(self) -> Dict[str, Any]:
-        """Collect and aggregate signals from all sources"""
+    def collect_all_signals(self, concurrent: Optional[bool] = None) -> Dict[str, Any]:
+        """Collect and aggregate signals from all sources
+        
+        Sources are independent SQLite files, so by default they are read on a
+        thread pool. Pass ``concurrent=False`` to collect them one after another.
+        """
         self.logger.info("🔄 Starting comprehensive signal collection...")
         start_time = time.time()
         
+        if concurrent is None:
+            concurrent = self.concurrent_collection
+        
+        collectors = {
+            "RSS": self.collect_rss_signals,
+            "Twitter": self.collect_twitter_signals,
+            "OnChain": self.collect_onchain_signals,
+            "Sentiment": self.collect_sentiment_signals
+        }
+        
         # 1. Collect signals from each source
-        rss_signals = self.collect_rss_signals()
-        twitter_signals = self.collect_twitter_signals()
-        onchain_signals = self.collect_onchain_signals()
-        sentiment_signals = self.collect_sentiment_signals()
+        if concurrent:
+            with ThreadPoolExecutor(max_workers=len(collectors)) as executor:
+                futures = {name: executor.submit(self._timed_collect, collector)
+                           for name, collector in collectors.items()}
+                collected = {name: future.result() for name, future in futures.items()}
+        else:
+            collected = {name: self._timed_collect(collector)
+                         for name, collector in collectors.items()}
+        
+        source_signals = {name: result[0] for name, result in collected.items()}
+        source_times = {name: result[1] for name, result in collected.items()}
+        collection_time = time.time() - start_time
         
         # 2. Process and unify signals
-        all_signals = rss_signals + twitter_signals + onchain_signals + sentiment_signals
+        all_signals = [signal for name in collectors for signal in source_signals[name]]
         unified_signals = self.process_unified_signals(all_signals)
         
         # 3. Generate market signals by symbol
@@ -175,18 +229,25 @@ class SignalAggregator:
         # 4. Identify correlations
         correlations = self.identify_signal_correlations(unified_signals)
         
+        # 5. Push to event bus subscribers
+        market_signals_published = self.publish_signals(unified_signals, market_signals)
+        
         execution_time = time.time() - start_time
         
         summary = {
             "total_signals": len(unified_signals),
             "market_signals": len(market_signals),
+            "market_signals_published": market_signals_published,
             "correlations_found": len(correlations),
             "execution_time": execution_time,
+            "execution_breakdown": {
+                "sources": source_times,
+                "collection": collection_time,
+                "processing": execution_time - collection_time,
+                "concurrent": concurrent
+            },
             "signal_breakdown": {
-                "RSS": len(rss_signals),
-                "Twitter": len(twitter_signals),
-                "OnChain": len(onchain_signals),
-                "Sentiment": len(sentiment_signals)
+                name: len(signals) for name, signals in source_signals.items()
             },
             "top_market_signals": [
                 {
@@ -202,9 +263,70 @@ class SignalAggregator:
         self.logger.info(f"   📊 Total signals: {len(unified_signals)}")
         self.logger.info(f"   🎯 Market signals: {len(market_signals)}")
         self.logger.info(f"   🔗 Correlations: {len(correlations)}")
+        self.logger.info("   ⏱️ Source timings: " + ", ".join(
+            f"{name} {elapsed:.3f}s" for name, elapsed in source_times.items()))
         
         return summary
     
+    def publish_signals(self, unified_signals: List[UnifiedSignal], market_signals: List[MarketSignal]) -> int:
+        """Publish signals to the event bus so downstream stages need not poll the database
+        
+        Returns how many market signals at least one subscriber accepted (0 without
+        a bus, or when no event loop is running to deliver them).
+        """
+        if self.event_bus is None:
+            return 0
+        
+        for signal in unified_signals:
+            self.event_bus.publish_nowait(signal)
+        accepted = sum(1 for signal in market_signals if self.event_bus.publish_nowait(signal))
+        if accepted < len(market_signals):
+            self.logger.warning(f"⚠️ {len(market_signals) - accepted} of {len(market_signals)} "
+                                f"market signals were not delivered over the event bus")
+        return accepted
+    
+    def _timed_collect(self, collector) -> Tuple[List[UnifiedSignal], float]:
+        """Run a single source collector and measure its wall time"""
+        started = time.time()
+        signals = collector()
+        return signals, time.time() - started
+    
+    def get_high_water_mark(self, source: str) -> Optional[Tuple[Any, int]]:
+        """Return the (timestamp, rowid) of the last source row already collected, or None"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            row = conn.execute(
+                "SELECT high_water_mark, high_water_rowid FROM source_watermarks WHERE source = ?",
+                (source,)
+            ).fetchone()
+            conn.close()
+            return (row[0], row[1]) if row else None
+        except Exception as e:
+            self.logger.warning(f"⚠️ Error reading high-water mark for {source}: {e}")
+            return None
+    
+    def set_high_water_mark(self, source: str, value: Any, rowid: int = 0):
+        """Persist the (timestamp, rowid) of the last source row collected for a source"""
+        if value is None:
+            return
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("""
+                INSERT OR REPLACE INTO source_watermarks (source, high_water_mark, high_water_rowid, updated_at)
+                VALUES (?, ?, ?, ?)
+            """, (source, value, rowid, time.time()))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            self.logger.warning(f"⚠️ Error storing high-water mark for {source}: {e}")
+    
+    def reset_high_water_marks(self):
+        """Forget all high-water marks so the next cycle re-reads the lookback window"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM source_watermarks")
+        conn.commit()
+        conn.close()
+    
     def collect_rss_signals(self) -> List[UnifiedSignal]:
         """Extract signals from RSS monitoring data"""
         signals = []
@@ -213,19 +335,27 @@ class SignalAggregator:
             conn = sqlite3.connect("databases/sqlite_dbs/comprehensive_rss_data.db")
             cursor = conn.cursor()
             
+            # Only read articles after the last one the previous cycle processed
+            since, since_rowid = self.get_high_water_mark("RSS") or (datetime.now() - timedelta(days=1), 0)
+            
             # Get recent RSS articles with sentiment
             recent_articles = cursor.execute("""
-                SELECT title, description, sentiment_score, relevance_score, feed_name, timestamp
+                SELECT title, description, sentiment_score, relevance_score, feed_name, timestamp, rowid
                 FROM rss_articles 
-                WHERE timestamp > ?
-                ORDER BY relevance_score DESC
+                WHERE timestamp > ? OR (timestamp = ? AND rowid > ?)
+                ORDER BY timestamp ASC, rowid ASC
                 LIMIT 50
-            """, (datetime.now() - timedelta(days=1),)).fetchall()
+            """, (since, since, since_rowid)).fetchall()
             
             conn.close()
             
+            # Page oldest-first on (timestamp, rowid) so rows sharing a timestamp are
+            # never skipped; rank afterwards
+            last_read = recent_articles[-1][5:] if recent_articles else None
+            recent_articles.sort(key=lambda article: article[3] or 0, reverse=True)
+            
             for article in recent_articles:
-                title, description, sentiment, relevance, source, timestamp = article
+                title, description, sentiment, relevance, source, timestamp, _ = article
                 
                 # Extract symbol mentions
                 symbols = self.extract_crypto_symbols(title + " " + description)
@@ -254,6 +384,10 @@ class SignalAggregator:
                         metadata={"full_content": description[:500]}
                     )
                     signals.append(signal)
+            
+            # The mark only moves once the page is processed
+            if last_read:
+                self.set_high_water_mark("RSS", *last_read)
                     
         except Exception as e:
             self.logger.warning(f"⚠️ Error collecting RSS signals: {e}")
@@ -268,19 +402,27 @@ class SignalAggregator:
             conn = sqlite3.connect("databases/sqlite_dbs/twitter_intelligence.db")
             cursor = conn.cursor()
             
+            # Only read tweets after the last one the previous cycle processed
+            since, since_rowid = self.get_high_water_mark("TWITTER") or (datetime.now() - timedelta(days=1), 0)
+            
             # Get recent tweets with market signals
             recent_tweets = cursor.execute("""
-                SELECT username, content, sentiment_score, influence_score, timestamp, market_impact
+                SELECT username, content, sentiment_score, influence_score, timestamp, market_impact, rowid
                 FROM twitter_posts 
-                WHERE timestamp > ?
-                ORDER BY influence_score DESC
+                WHERE timestamp > ? OR (timestamp = ? AND rowid > ?)
+                ORDER BY timestamp ASC, rowid ASC
                 LIMIT 30
-            """, (datetime.now() - timedelta(days=1),)).fetchall()
+            """, (since, since, since_rowid)).fetchall()
             
             conn.close()
             
+            # Page oldest-first on (timestamp, rowid) so tweets sharing a timestamp are
+            # never skipped; rank afterwards
+            last_read = (recent_tweets[-1][4], recent_tweets[-1][6]) if recent_tweets else None
+            recent_tweets.sort(key=lambda tweet: tweet[3] or 0, reverse=True)
+            
             for tweet in recent_tweets:
-                username, content, sentiment, influence, timestamp, market_signal = tweet
+                username, content, sentiment, influence, timestamp, market_signal, _ = tweet
                 
                 # Extract symbols
                 symbols = self.extract_crypto_symbols(content)
@@ -308,6 +450,10 @@ class SignalAggregator:
                         metadata={"influence_score": influence}
                     )
                     signals.append(signal)
+            
+            # The mark only moves once the page is processed
+            if last_read:
+                self.set_high_water_mark("TWITTER", *last_read)
                     
         except Exception as e:
             self.logger.warning(f"⚠️ Error collecting Twitter signals: {e}")
@@ -323,6 +469,11 @@ class SignalAggregator:
             whale_movements = self.get_whale_movements()
             exchange_flows = self.get_exchange_flows()
             
+            # Skip movements already emitted by a previous cycle
+            mark = self.get_high_water_mark("ONCHAIN")
+            if mark is not None:
+                whale_movements = [m for m in whale_movements if m['timestamp'] > mark[0]]
+            
             # Process whale movements
             for movement in whale_movements:
                 direction = "BEARISH" if movement['type'] == 'exchange_inflow' else "BULLISH"
@@ -343,6 +494,10 @@ class SignalAggregator:
                     metadata=movement
                 )
                 signals.append(signal)
+            
+            # The mark only moves once the movements are processed
+            if whale_movements:
+                self.set_high_water_mark("ONCHAIN", max(m['timestamp'] for m in whale_movements))
                 
         except Exception as e:
             self.logger.warning(f"⚠️ Error collecting OnChain signals: {e}")
@@ -421,25 +576,49 @@ class SignalAggregator:
         return processed_signals
     
     def generate_market_signals(self, signals: List[UnifiedSignal]) -> List[MarketSignal]:
-        """Generate aggregated market signals by symbol"""
-        symbol_groups = {}
-        
-        # Group signals by symbol
-        for signal in signals:
-            if signal.symbol not in symbol_groups:
-                symbol_groups[signal.symbol] = []
-            symbol_groups[signal.symbol].append(signal)
+        """Generate aggregated market signals by symbol
+        
+        Aggregation runs column-wise over a UnifiedSignalFrame: per-symbol counts,
+        weighted confidence, impact and direction variance are bincount reductions
+        instead of per-symbol Python loops.
+        """
+        if not signals:
+            return []
+        
+        frame = UnifiedSignalFrame.from_signals(signals)
+        symbol_codes = frame.column("symbol")
+        direction = frame.column("direction")
+        n_symbols = len(frame.interners["symbol"])
+        
+        # Group signals by symbol (codes are assigned in order of first appearance)
+        counts = np.bincount(symbol_codes, minlength=n_symbols)
+        bullish_counts = np.bincount(symbol_codes, weights=(direction == DIRECTION_CODES["BULLISH"]), minlength=n_symbols)
+        bearish_counts = np.bincount(symbol_codes, weights=(direction == DIRECTION_CODES["BEARISH"]), minlength=n_symbols)
+        
+        # Confidence weighted by source reliability, and predicted impact, per symbol
+        weighted_confidence = frame.column("confidence") * frame.source_weights(self.source_weights, 0.5)
+        confidence_sums = np.bincount(symbol_codes, weights=weighted_confidence, minlength=n_symbols)
+        impact_sums = np.bincount(symbol_codes, weights=frame.column("impact_prediction"), minlength=n_symbols)
+        
+        # Source-type counts per symbol, with first-seen order to break ties
+        type_codes = frame.column("signal_type").astype(np.int64)
+        n_types = int(type_codes.max()) + 2
+        pair_codes = symbol_codes.astype(np.int64) * n_types + (type_codes + 1)
+        pair_counts = np.bincount(pair_codes, minlength=n_symbols * n_types).reshape(n_symbols, n_types)
+        first_seen = np.full(n_symbols * n_types, len(signals), dtype=np.int64)
+        np.minimum.at(first_seen, pair_codes, np.arange(len(signals)))
+        first_seen = first_seen.reshape(n_symbols, n_types)
         
         market_signals = []
         
-        for symbol, symbol_signals in symbol_groups.items():
-            if len(symbol_signals) < 2:  # Need at least 2 signals for aggregation
+        for code in range(n_symbols):
+            total_signals = int(counts[code])
+            if total_signals < 2:  # Need at least 2 signals for aggregation
                 continue
             
-            # Calculate aggregated metrics
-            bullish_signals = len([s for s in symbol_signals if s.direction == "BULLISH"])
-            bearish_signals = len([s for s in symbol_signals if s.direction == "BEARISH"])
-            total_signals = len(symbol_signals)
+            symbol = frame.decode("symbol", code)
+            bullish_signals = int(bullish_counts[code])
+            bearish_signals = int(bearish_counts[code])
             
             # Determine overall direction
             if bullish_signals > bearish_signals:
@@ -449,23 +628,18 @@ class SignalAggregator:
             else:
                 overall_direction = "NEUTRAL"
             
-            # Calculate confidence score (weighted by signal confidence and source reliability)
-            total_confidence = sum(s.confidence * self.source_weights.get(s.source, 0.5) for s in symbol_signals)
-            confidence_score = total_confidence / total_signals
-            
-            # Calculate predicted impact
-            predicted_impact = np.mean([s.impact_prediction for s in symbol_signals])
+            confidence_score = float(confidence_sums[code] / total_signals)
+            predicted_impact = impact_sums[code] / total_signals
             
-            # Calculate risk score (higher when signals conflict)
-            signal_variance = np.var([1 if s.direction == "BULLISH" else -1 for s in symbol_signals])
+            # Risk score (higher when signals conflict): variance of +1/-1 direction votes
+            mean_vote = (2 * bullish_signals - total_signals) / total_signals
+            signal_variance = 1.0 - mean_vote ** 2
             risk_score = min(signal_variance * 2, 1.0)
             
             # Get dominant sources
-            source_counts = {}
-            for signal in symbol_signals:
-                source_type = signal.signal_type
-                source_counts[source_type] = source_counts.get(source_type, 0) + 1
-            dominant_sources = sorted(source_counts.keys(), key=lambda x: source_counts[x], reverse=True)
+            present = np.nonzero(pair_counts[code])[0]
+            ranked = sorted(present, key=lambda t: (-pair_counts[code, t], first_seen[code, t]))
+            dominant_sources = [SIGNAL_TYPE_NAMES.get(int(t) - 1, "UNKNOWN") for t in ranked]
             
             market_signal = MarketSignal(
                 symbol=symbol,
@@ -481,9 +655,9 @@ class SignalAggregator:
             )
             
             market_signals.append(market_signal)
-            
-            # Store in database
-            self.store_market_signal(market_signal)
+        
+        # Store in database
+        self.store_market_signals(market_signals)
         
         # Sort by confidence and impact
         market_signals.sort(key=lambda x: x.confidence_score * x.predicted_impact, reverse=True)
@@ -508,9 +682,9 @@ class SignalAggregator:
                         "timestamp": time.time()
                     }
                     correlations.append(correlation)
-                    
-                    # Store in database
-                    self.store_signal_correlation(correlation)
+        
+        # Store in database in a single transaction
+        self.store_signal_correlations(correlations)
         
         return correlations
     
@@ -652,39 +826,56 @@ class SignalAggregator:
     
     def store_market_signal(self, signal: MarketSignal):
         """Store market signal in database"""
+        self.store_market_signals([signal])
+    
+    def store_market_signals(self, signals: List[MarketSignal]):
+        """Store a batch of market signals in database"""
+        if not signals:
+            return
+        
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        cursor.execute("""
+        cursor.executemany("""
             INSERT INTO market_signals 
             (symbol, timestamp, overall_direction, confidence_score, signal_count,
              bullish_signals, bearish_signals, dominant_sources, predicted_impact,
              risk_score, metadata)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            signal.symbol, signal.timestamp, signal.overall_direction,
-            signal.confidence_score, signal.signal_count, signal.bullish_signals,
-            signal.bearish_signals, json.dumps(signal.dominant_sources),
-            signal.predicted_impact, signal.risk_score, json.dumps(asdict(signal))
-        ))
+        """, [
+            (signal.symbol, signal.timestamp, signal.overall_direction,
+             signal.confidence_score, signal.signal_count, signal.bullish_signals,
+             signal.bearish_signals, json.dumps(signal.dominant_sources),
+             float(signal.predicted_impact), signal.risk_score,
+             json.dumps(asdict(signal), default=float))
+            for signal in signals
+        ])
         
         conn.commit()
         conn.close()
     
     def store_signal_correlation(self, correlation: Dict[str, Any]):
         """Store signal correlation in database"""
+        self.store_signal_correlations([correlation])
+    
+    def store_signal_correlations(self, correlations: List[Dict[str, Any]]):
+        """Store a batch of signal correlations in database"""
+        if not correlations:
+            return
+        
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        cursor.execute("""
+        cursor.executemany("""
             INSERT INTO signal_correlations 
             (primary_signal_id, correlated_signal_id, correlation_strength, 
              correlation_type, timestamp)
             VALUES (?, ?, ?, ?, ?)
-        """, (
-            correlation["primary_signal"], correlation["correlated_signal"],
-            correlation["strength"], correlation["type"], correlation["timestamp"]
-        ))
+        """, [
+            (correlation["primary_signal"], correlation["correlated_signal"],
+             correlation["strength"], correlation["type"], correlation["timestamp"])
+            for correlation in correlations
+        ])
         
         conn.commit()
         conn.close()
@@ -702,6 +893,8 @@ async def main():
     print(f"   🎯 Market signals: {results['market_signals']}")
     print(f"   🔗 Correlations: {results['correlations_found']}")
     print(f"   ⏱️ Execution time: {results['execution_time']:.2f}s")
+    for source, elapsed in results['execution_breakdown']['sources'].items():
+        print(f"      {source}: {elapsed:.3f}s")
     
     print("\n🔥 Top Market Signals:")
     for signal in results['top_market_signals']:
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Signal Frames - ORION PHASE 2
+Compact struct-of-arrays containers for high-volume signal pipelines
+
+A cycle can create tens of thousands of signal objects that are only used for
+per-symbol aggregation and then serialized. Frames store the numeric part of each
+signal in one preallocated NumPy record array, with symbols and sources interned to
+integer codes and directions / signal types stored as small enum codes. The
+``records`` property is a zero-copy view, so aggregation math runs directly on the
+stored columns.
+"""
+
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Enum codes shared by all frames
+DIRECTION_CODES = {"BEARISH": -1, "NEUTRAL": 0, "BULLISH": 1}
+SIGNAL_TYPE_CODES = {"RSS": 0, "TWITTER": 1, "ONCHAIN": 2, "SENTIMENT": 3, "CORRELATION": 4}
+TIME_HORIZON_CODES = {"SHORT": 0, "MEDIUM": 1, "LONG": 2}
+ACTION_CODES = {"HOLD": 0, "BUY": 1, "SELL": -1, "STRONG_BUY": 2, "STRONG_SELL": -2}
+
+DIRECTION_NAMES = {code: name for name, code in DIRECTION_CODES.items()}
+SIGNAL_TYPE_NAMES = {code: name for name, code in SIGNAL_TYPE_CODES.items()}
+TIME_HORIZON_NAMES = {code: name for name, code in TIME_HORIZON_CODES.items()}
+ACTION_NAMES = {code: name for name, code in ACTION_CODES.items()}
+
+
+class Interner:
+    """Maps repeated strings (symbols, sources) to dense integer codes"""
+
+    __slots__ = ("codes", "names")
+
+    def __init__(self, names: Optional[Iterable[str]] = None):
+        self.codes: Dict[str, int] = {}
+        self.names: List[str] = []
+        for name in names or []:
+            self.intern(name)
+
+    def intern(self, name: str) -> int:
+        code = self.codes.get(name)
+        if code is None:
+            name = sys.intern(name)
+            code = len(self.names)
+            self.codes[name] = code
+            self.names.append(name)
+        return code
+
+    def name(self, code: int) -> str:
+        return self.names[code]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class RecordFrame:
+    """
+    Growable NumPy record array with interned string columns
+
+    Subclasses define ``DTYPE``, the names of interned columns in ``INTERNED`` and
+    an ``encode`` method turning one signal into a record tuple.
+    """
+
+    DTYPE: np.dtype = None
+    INTERNED: tuple = ()
+
+    __slots__ = ("_data", "_size", "interners")
+
+    def __init__(self, capacity: int = 1024, interners: Optional[Dict[str, Interner]] = None):
+        self._data = np.empty(max(capacity, 1), dtype=self.DTYPE)
+        self._size = 0
+        self.interners = interners or {name: Interner() for name in self.INTERNED}
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def records(self) -> np.ndarray:
+        """Zero-copy view of the filled records"""
+        return self._data[:self._size]
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy view of a single column"""
+        return self._data[name][:self._size]
+
+    def intern(self, column: str, value: str) -> int:
+        return self.interners[column].intern(value)
+
+    def decode(self, column: str, code: int) -> str:
+        return self.interners[column].name(int(code))
+
+    def _reserve(self, extra: int):
+        needed = self._size + extra
+        if needed > len(self._data):
+            capacity = len(self._data)
+            while capacity < needed:
+                capacity *= 2
+            grown = np.empty(capacity, dtype=self.DTYPE)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+
+    def encode(self, signal: Any) -> tuple:
+        raise NotImplementedError
+
+    def append(self, signal: Any) -> int:
+        """Append one signal, returning its row index"""
+        self._reserve(1)
+        self._data[self._size] = self.encode(signal)
+        self._size += 1
+        return self._size - 1
+
+    def extend(self, signals: Iterable[Any]):
+        rows = [self.encode(signal) for signal in signals]
+        if rows:
+            self._reserve(len(rows))
+            self._data[self._size:self._size + len(rows)] = rows
+            self._size += len(rows)
+
+    @classmethod
+    def from_signals(cls, signals: List[Any], **kwargs) -> "RecordFrame":
+        frame = cls(capacity=max(len(signals), 1), **kwargs)
+        frame.extend(signals)
+        return frame
+
+
+class UnifiedSignalFrame(RecordFrame):
+    """Struct-of-arrays form of signal_aggregator.UnifiedSignal
+
+    Free-text content, correlations and metadata stay on the original objects;
+    ``row`` indexes line up with the list the frame was built from.
+    """
+
+    DTYPE = np.dtype([
+        ("timestamp", "f8"),
+        ("symbol", "u4"),
+        ("source", "u4"),
+        ("signal_type", "i1"),
+        ("direction", "i1"),
+        ("time_horizon", "i1"),
+        ("confidence", "f8"),
+        ("strength", "f8"),
+        ("impact_prediction", "f8")
+    ])
+    INTERNED = ("symbol", "source")
+
+    __slots__ = ()
+
+    def encode(self, signal: Any) -> tuple:
+        return (
+            float(signal.timestamp),
+            self.intern("symbol", signal.symbol),
+            self.intern("source", signal.source),
+            SIGNAL_TYPE_CODES.get(signal.signal_type, -1),
+            DIRECTION_CODES.get(signal.direction, 0),
+            TIME_HORIZON_CODES.get(signal.time_horizon, 1),
+            float(signal.confidence),
+            float(signal.strength),
+            float(signal.impact_prediction)
+        )
+
+    def source_weights(self, weights: Dict[str, float], default: float) -> np.ndarray:
+        """Per-row source reliability weights, looked up once per distinct source"""
+        table = np.array([weights.get(name, default) for name in self.interners["source"].names] or [default])
+        return table[self.column("source")]
+
+
+class CandidateSignalFrame(RecordFrame):
+    """Struct-of-arrays form of the candidate signal dicts in UnifiedSignalGenerator"""
+
+    DTYPE = np.dtype([
+        ("symbol", "u4"),
+        ("pattern_id", "u4"),
+        ("signal_type", "i1"),
+        ("confidence", "f8"),
+        ("risk_reward_ratio", "f8"),
+        ("validation_boost", "f8"),
+        ("time_horizon", "f8"),
+        ("position_size", "f8")
+    ])
+    INTERNED = ("symbol", "pattern_id")
+
+    __slots__ = ()
+
+    def encode(self, signal: Dict[str, Any]) -> tuple:
+        validation = signal.get('backtest_validation', {})
+        return (
+            self.intern("symbol", str(signal.get('symbol', 'BTC'))),
+            self.intern("pattern_id", str(signal.get('pattern_id'))),
+            ACTION_CODES.get(signal.get('signal_type', 'BUY'), 1),
+            float(signal.get('confidence', 0.0)),
+            float(signal.get('risk_reward_ratio', 0.0)),
+            float(validation.get('validation_boost', 0.0)),
+            float(signal.get('time_horizon', 0)),
+            float(signal.get('position_size', 0.0))
+        )
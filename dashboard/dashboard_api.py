@@ -5,6 +5,7 @@ Serves real-time data from all system modules to the desktop dashboard
 """
 
 import os
+import sys
 import json
 import sqlite3
 from datetime import datetime, timedelta
@@ -16,6 +17,9 @@ import time
 import logging
 from pathlib import Path
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from risk_management_center.monitoring.equity_tracker import latest_snapshot
+
 app = Flask(__name__)
 CORS(app)
 
@@ -229,6 +233,7 @@ class OrionDashboardAPI:
             portfolio = self.get_portfolio_performance()
             total_pnl = portfolio.get('total_pnl', 0)
             days_trading = portfolio.get('days_trading', 0)
+            equity = latest_snapshot() or {}
             
             # Expert KPIs recommended by professional traders
             return {
@@ -241,8 +246,8 @@ class OrionDashboardAPI:
                 'sortino_ratio': 0.0,  # Downside deviation focus
                 
                 # RISK METRICS (Critical for CEO oversight)
-                'max_drawdown': 0.0,  # Largest peak-to-trough decline
-                'current_drawdown': 0.0,  # Current unrealized drawdown
+                'max_drawdown': equity.get('max_drawdown_pct', 0.0),  # Largest peak-to-trough decline
+                'current_drawdown': equity.get('drawdown_pct', 0.0),  # Current drawdown from high-water mark
                 'var_1day': 0.0,  # Value at Risk 1 day
                 'risk_per_trade': 2.0,  # % of portfolio per trade (expert recommendation)
                 'max_daily_loss': 250.00,  # 2.5% of $10K (expert limit)
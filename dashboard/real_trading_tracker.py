@@ -4,11 +4,16 @@
 $10K Portfolio starting June 4, 2025
 """
 
+import os
+import sys
 import sqlite3
 from datetime import datetime, timedelta
 import json
 import logging
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from risk_management_center.monitoring.equity_tracker import latest_snapshot
+
 class RealTradingTracker:
     def __init__(self):
         self.db_path = "trading_tracker.db"
@@ -184,6 +189,8 @@ class RealTradingTracker:
         
         conn.close()
         
+        current_drawdown, max_drawdown = self.get_drawdown()
+        
         return {
             # CORE METRICS
             'portfolio_value': current_value,
@@ -201,8 +208,8 @@ class RealTradingTracker:
             'average_loss': avg_loss,
             
             # RISK METRICS (Critical for CEO)
-            'max_drawdown': 0.0,  # Will calculate from history
-            'current_drawdown': 0.0,
+            'max_drawdown': max_drawdown,
+            'current_drawdown': current_drawdown,
             'risk_per_trade': 2.0,  # 2% per trade (expert recommendation)
             'max_daily_loss_limit': 250.0,  # 2.5% of $10K
             
@@ -215,6 +222,26 @@ class RealTradingTracker:
             'last_update': datetime.now().isoformat()
         }
     
+    def get_drawdown(self):
+        """(current, max) drawdown % - live equity tracker first, daily history as fallback"""
+        snapshot = latest_snapshot()
+        if snapshot:
+            return snapshot['drawdown_pct'], snapshot['max_drawdown_pct']
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT portfolio_value FROM portfolio_history ORDER BY date')
+        values = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        
+        high_water_mark = self.starting_capital
+        current = max_drawdown = 0.0
+        for value in values:
+            high_water_mark = max(high_water_mark, value)
+            current = (high_water_mark - value) / high_water_mark * 100
+            max_drawdown = max(max_drawdown, current)
+        return current, max_drawdown
+    
     def add_trade(self, strategy, symbol, side, quantity, entry_price, notes=""):
         """Add a new trade to tracking"""
         conn = sqlite3.connect(self.db_path)
@@ -289,12 +316,16 @@ class RealTradingTracker:
         daily_pnl = new_value - previous_value
         total_pnl = new_value - self.starting_capital
         
+        cursor.execute('SELECT MAX(portfolio_value) FROM portfolio_history WHERE date < ?', (today,))
+        high_water_mark = max(cursor.fetchone()[0] or self.starting_capital, self.starting_capital, new_value)
+        drawdown_pct = (high_water_mark - new_value) / high_water_mark * 100
+        
         # Update or insert today's value
         cursor.execute('''
             INSERT OR REPLACE INTO portfolio_history 
-            (date, portfolio_value, daily_pnl, total_pnl, timestamp)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (today, new_value, daily_pnl, total_pnl, datetime.now().isoformat()))
+            (date, portfolio_value, daily_pnl, total_pnl, drawdown_pct, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (today, new_value, daily_pnl, total_pnl, drawdown_pct, datetime.now().isoformat()))
         
         conn.commit()
         conn.close()
@@ -17,9 +17,17 @@ from scipy import stats
 import matplotlib.pyplot as plt
 import pandas as pd
 import seaborn as sns
+import sys
+import os
 import warnings
 warnings.filterwarnings('ignore')
 
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from research_center.analyzers.regime_detector import get_regime_detector, price_columns
+from technical_analysis_center.indicators.indicator_cache import get_indicator_cache
+from strategy_center.backtesting.fill_models import infer_bar_seconds
+
 @dataclass
 class CorrelationPattern:
     pattern_id: str
@@ -35,6 +43,9 @@ class CorrelationPattern:
 
 @dataclass
 class PredictiveSignal:
+    __slots__ = ("signal_id", "timestamp", "symbol", "signal_type", "strength", "time_horizon", "confidence",
+                 "supporting_correlations", "price_target", "risk_level", "metadata")
+
     signal_id: str
     timestamp: datetime
     symbol: str
@@ -53,11 +64,20 @@ class AdvancedCorrelationEngine:
     Identifies patterns between news, sentiment, macro indicators, and price movements
     """
     
-    def __init__(self):
+    def __init__(self, event_bus=None):
         self.db_path = "databases/sqlite_dbs/correlation_analysis.db"
         self.patterns_db_path = "databases/sqlite_dbs/discovered_patterns.db"
         self.setup_databases()
         
+        # Optional event bus; predictive signals are pushed to subscribers
+        self.event_bus = event_bus
+        
+        # Shared streaming market regime detector
+        self.regime_detector = get_regime_detector()
+        
+        # Shared indicator cache; each cycle only computes the newly loaded bars
+        self.indicator_cache = get_indicator_cache()
+        
         # Data source mappings
         self.data_sources = {
             'price': ['BTC_price', 'ETH_price', 'BNB_price', 'ADA_price'],
@@ -176,6 +196,9 @@ class AdvancedCorrelationEngine:
         
         # 4. Generate predictive signals
         signals = await self.generate_predictive_signals(data, validated_patterns)
+        if self.event_bus is not None:
+            for signal in signals:
+                await self.event_bus.publish(signal)
         
         # 5. Analyze market regime
         market_regime = await self.analyze_market_regime(data)
@@ -270,24 +293,28 @@ class AdvancedCorrelationEngine:
     
     def add_derived_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add derived features for correlation analysis"""
+        cache = self.indicator_cache
+        
+        # Window lengths follow the actual bar spacing (5min bars unless the index says otherwise)
+        hour = max(2, int(round(3600 / infer_bar_seconds(df.index, default=300))))
         
         # Price change features
         for col in df.columns:
             if 'price' in col.lower():
                 df[f"{col}_change_5m"] = df[col].pct_change(1)
-                df[f"{col}_change_1h"] = df[col].pct_change(12)  # Assuming 5min intervals
-                df[f"{col}_volatility"] = df[col].rolling(window=12).std()
+                df[f"{col}_change_1h"] = df[col].pct_change(hour)
+                df[f"{col}_volatility"] = cache.compute("stdev", df[col], col, period=hour)
         
         # Moving averages for sentiment
         for col in df.columns:
             if 'sentiment' in col.lower():
-                df[f"{col}_ma_1h"] = df[col].rolling(window=12).mean()
+                df[f"{col}_ma_1h"] = cache.compute("sma", df[col], col, period=hour)
                 df[f"{col}_trend"] = df[col] - df[f"{col}_ma_1h"]
         
         # Volume momentum
         for col in df.columns:
             if 'volume' in col.lower():
-                df[f"{col}_momentum"] = df[col] / df[col].rolling(window=24).mean()
+                df[f"{col}_momentum"] = df[col] / cache.compute("sma", df[col], col, period=2 * hour)
         
         return df.fillna(0)
     
@@ -451,33 +478,26 @@ class AdvancedCorrelationEngine:
             return 'high'
     
     async def analyze_market_regime(self, data: pd.DataFrame) -> Dict[str, Any]:
-        """Analyze current market regime for context"""
+        """Analyze current market regime for context
+        
+        Volatility and trend come from the shared streaming regime detector,
+        which only consumes rows it has not seen before.
+        """
         print("📊 Analyzing market regime...")
         
         try:
             # Get price data
-            price_columns = [col for col in data.columns if 'price' in col.lower() and 'change' not in col.lower()]
+            price_cols = price_columns(data)
             
-            if not price_columns:
+            if not price_cols:
                 return {'regime_type': 'unknown', 'confidence': 0.0}
             
-            # Calculate market-wide metrics
-            recent_data = data.tail(48)  # Last 48 periods
-            
-            volatility_levels = []
-            trend_directions = []
-            
-            for col in price_columns:
-                if col in recent_data.columns:
-                    returns = recent_data[col].pct_change().dropna()
-                    volatility = returns.std()
-                    trend = returns.mean()
-                    
-                    volatility_levels.append(volatility)
-                    trend_directions.append(1 if trend > 0 else -1)
+            self.regime_detector.update_frame(data, price_cols)
+            self.regime_detector.save()
             
-            avg_volatility = np.mean(volatility_levels) if volatility_levels else 0
-            avg_trend = np.mean(trend_directions) if trend_directions else 0
+            regime = self.regime_detector.get_regime(price_cols, min_observations=2)
+            avg_volatility = regime.get('avg_volatility', 0)
+            avg_trend = regime.get('trend_votes', 0)
             
             # Determine regime
             if avg_volatility > 0.05:  # High volatility
@@ -491,13 +511,14 @@ class AdvancedCorrelationEngine:
                 else:
                     regime_type = 'sideways_stable'
             
-            confidence = min(len(price_columns) / 5.0, 1.0)  # Confidence based on data availability
+            confidence = min(len(price_cols) / 5.0, 1.0)  # Confidence based on data availability
             
             regime_analysis = {
                 'regime_type': regime_type,
                 'confidence': confidence,
                 'volatility_level': 'high' if avg_volatility > 0.05 else 'low',
                 'trend_direction': 'bullish' if avg_trend > 0.3 else 'bearish' if avg_trend < -0.3 else 'neutral',
+                'persistence': regime.get('persistence', 0.5),
                 'dominant_factors': self.identify_dominant_factors(data),
                 'recommended_strategies': self.get_regime_strategies(regime_type)
             }
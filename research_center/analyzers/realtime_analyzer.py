@@ -10,8 +10,14 @@ import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import sqlite3
+import sys
+import os
 from dataclasses import dataclass
 
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from technical_analysis_center.indicators.indicator_engine import sma, stdev
+
 @dataclass
 class CryptoAnalysis:
     timestamp: datetime
@@ -264,19 +270,17 @@ class OrionCryptoAnalyzer:
         prices = [float(point[1]) for point in price_history[-7:]]  # Last 7 days
         
         return {
-            "sma_7": sum(prices) / len(prices),
+            "sma_7": float(sma(prices, 7)[-1]),
             "volatility": self.calculate_volatility(prices),
             "trend": "up" if prices[-1] > prices[0] else "down"
         }
     
     def calculate_volatility(self, prices: List[float]) -> float:
-        """Calculate price volatility"""
+        """Calculate price volatility (population standard deviation)"""
         if len(prices) < 2:
             return 0.0
         
-        mean = sum(prices) / len(prices)
-        variance = sum((p - mean) ** 2 for p in prices) / len(prices)
-        return variance ** 0.5
+        return float(stdev(prices, len(prices), ddof=0)[-1])
     
     def generate_recommendation(self, analysis_data: Dict) -> Dict:
         """Generate trading recommendation based on all data"""
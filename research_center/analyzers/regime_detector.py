@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Streaming Market Regime Detector - Week 2 Enhancement
+Constant-time per-tick volatility, trend and persistence estimates
+
+The signal generator, the correlation engine and the strategy orchestrator each
+recomputed volatility and trend from the full price frame every cycle. This
+detector keeps per-series state instead:
+
+- EWMA volatility of log returns
+- rolling least-squares slope of log price over a fixed window, updated in O(1)
+  with running sums
+- a Hurst-style persistence estimate from the variance ratio of k-tick and
+  1-tick returns (H > 0.5 trending, H < 0.5 mean reverting)
+
+Every update is O(1), and a regime lookup reads only the current state. State is
+persisted to SQLite so restarts do not lose the warm-up. ``get_regime_detector()``
+returns the process-wide shared instance.
+"""
+
+import json
+import math
+import sqlite3
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def price_columns(data: pd.DataFrame) -> List[str]:
+    """Raw price columns of a pivoted market frame, excluding derived features"""
+    return [col for col in data.columns if col.lower().endswith('price')]
+
+
+class SeriesRegimeState:
+    """Incremental statistics for one price series"""
+
+    __slots__ = ("window", "persistence_lag", "alpha", "count", "last_price",
+                 "last_timestamp", "ewma_mean", "ewma_var", "ewma_var_k",
+                 "log_prices", "sum_y", "sum_xy")
+
+    def __init__(self, window: int = 20, persistence_lag: int = 4, alpha: float = 0.06):
+        self.window = window
+        self.persistence_lag = persistence_lag
+        self.alpha = alpha
+        self.count = 0
+        self.last_price: Optional[float] = None
+        self.last_timestamp: Optional[float] = None
+        self.ewma_mean = 0.0
+        self.ewma_var = 0.0
+        self.ewma_var_k = 0.0
+        self.log_prices: deque = deque(maxlen=window)
+        self.sum_y = 0.0
+        self.sum_xy = 0.0
+
+    def update(self, price: float, timestamp: Optional[float] = None):
+        """Fold one new price into the state in constant time"""
+        if price is None or not price > 0 or math.isinf(price):
+            return
+
+        y = math.log(price)
+
+        if self.last_price is not None:
+            r = y - math.log(self.last_price)
+            a = self.alpha
+            if self.count == 1:
+                self.ewma_mean = r
+                self.ewma_var = r * r
+            else:
+                self.ewma_mean = (1 - a) * self.ewma_mean + a * r
+                self.ewma_var = (1 - a) * self.ewma_var + a * r * r
+
+            k = self.persistence_lag
+            if len(self.log_prices) >= k:
+                r_k = y - self.log_prices[-k]
+                self.ewma_var_k = (1 - a) * self.ewma_var_k + a * r_k * r_k if self.ewma_var_k else r_k * r_k
+
+        # Rolling OLS sums over x = 0..n-1 (oldest to newest)
+        n = len(self.log_prices)
+        if n < self.window:
+            self.sum_xy += n * y
+            self.sum_y += y
+        else:
+            y_out = self.log_prices[0]
+            self.sum_xy = self.sum_xy - (self.sum_y - y_out) + (self.window - 1) * y
+            self.sum_y = self.sum_y - y_out + y
+        self.log_prices.append(y)
+
+        self.last_price = price
+        if timestamp is not None:
+            self.last_timestamp = timestamp
+        self.count += 1
+
+    @property
+    def volatility(self) -> float:
+        """EWMA standard deviation of per-tick returns"""
+        return math.sqrt(self.ewma_var) if self.count > 1 else 0.0
+
+    @property
+    def slope(self) -> float:
+        """Least-squares slope of log price per tick over the window"""
+        n = len(self.log_prices)
+        if n < 2:
+            return 0.0
+        sum_x = n * (n - 1) / 2
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6
+        denominator = n * sum_xx - sum_x * sum_x
+        return (n * self.sum_xy - sum_x * self.sum_y) / denominator
+
+    @property
+    def trend(self) -> float:
+        """Fractional price change implied by the slope over the window"""
+        n = len(self.log_prices)
+        return math.expm1(self.slope * (n - 1)) if n > 1 else 0.0
+
+    @property
+    def hurst(self) -> float:
+        """Variance-ratio Hurst estimate; 0.5 until enough data is seen"""
+        k = self.persistence_lag
+        if self.ewma_var <= 0 or self.ewma_var_k <= 0 or self.count <= k + 1:
+            return 0.5
+        variance_ratio = self.ewma_var_k / (k * self.ewma_var)
+        return min(max(0.5 + 0.5 * math.log(variance_ratio) / math.log(k), 0.0), 1.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "window": self.window,
+            "persistence_lag": self.persistence_lag,
+            "alpha": self.alpha,
+            "count": self.count,
+            "last_price": self.last_price,
+            "last_timestamp": self.last_timestamp,
+            "ewma_mean": self.ewma_mean,
+            "ewma_var": self.ewma_var,
+            "ewma_var_k": self.ewma_var_k,
+            "log_prices": list(self.log_prices),
+            "sum_y": self.sum_y,
+            "sum_xy": self.sum_xy
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SeriesRegimeState":
+        state = cls(data["window"], data["persistence_lag"], data["alpha"])
+        for key in ("count", "last_price", "last_timestamp", "ewma_mean",
+                    "ewma_var", "ewma_var_k", "sum_y", "sum_xy"):
+            setattr(state, key, data[key])
+        state.log_prices.extend(data["log_prices"])
+        return state
+
+
+class StreamingRegimeDetector:
+    """
+    Shared market regime detector over many price series
+
+    Feed prices with ``update`` (single tick) or ``update_frame`` (only rows newer
+    than the last seen timestamp of each column). ``get_regime`` aggregates the
+    current per-series state and classifies it with the thresholds the signal
+    generator already used.
+    """
+
+    def __init__(self, db_path: str = "databases/sqlite_dbs/market_regime.db",
+                 window: int = 20, persistence_lag: int = 4, alpha: float = 0.06,
+                 autoload: bool = True):
+        self.db_path = db_path
+        self.window = window
+        self.persistence_lag = persistence_lag
+        self.alpha = alpha
+        self.states: Dict[str, SeriesRegimeState] = {}
+        self.setup_database()
+        if autoload:
+            self.load()
+
+    def setup_database(self):
+        """Initialize regime state persistence"""
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS regime_state (
+                series TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+    def _state(self, series: str) -> SeriesRegimeState:
+        state = self.states.get(series)
+        if state is None:
+            state = SeriesRegimeState(self.window, self.persistence_lag, self.alpha)
+            self.states[series] = state
+        return state
+
+    def update(self, series: str, price: float, timestamp: Optional[float] = None):
+        """Fold one tick into a series"""
+        self._state(series).update(price, timestamp)
+
+    def update_frame(self, data: pd.DataFrame, columns: Optional[Iterable[str]] = None) -> int:
+        """Feed the rows of a price frame not seen before; returns ticks consumed
+
+        The frame index is expected to be datetime-like (or epoch seconds).
+        """
+        if data.empty:
+            return 0
+
+        columns = list(columns) if columns is not None else price_columns(data)
+        index = data.index
+        if isinstance(index, pd.DatetimeIndex):
+            timestamps = index.asi8 / 1e9
+        else:
+            timestamps = np.asarray(index, dtype=float)
+
+        consumed = 0
+        for col in columns:
+            state = self._state(col)
+            values = data[col].to_numpy(dtype=float)
+            start = 0
+            if state.last_timestamp is not None:
+                start = int(np.searchsorted(timestamps, state.last_timestamp, side='right'))
+            for ts, price in zip(timestamps[start:], values[start:]):
+                state.update(price, float(ts))
+            consumed += max(len(values) - start, 0)
+        return consumed
+
+    def series_snapshot(self, series: str) -> Dict[str, Any]:
+        state = self.states.get(series)
+        if state is None:
+            return {}
+        return {
+            "volatility": state.volatility,
+            "trend": state.trend,
+            "slope": state.slope,
+            "hurst": state.hurst,
+            "observations": state.count,
+            "last_price": state.last_price,
+            "last_timestamp": state.last_timestamp
+        }
+
+    def get_regime(self, series: Optional[Iterable[str]] = None, min_observations: int = 21) -> Dict[str, Any]:
+        """Aggregate regime over the given series (default: all warmed-up series)"""
+        names = list(series) if series is not None else list(self.states)
+        ready = [self.states[name] for name in names
+                 if name in self.states and self.states[name].count >= min_observations]
+
+        if not ready:
+            return {
+                'regime_type': 'insufficient_data',
+                'volatility_level': 'unknown',
+                'trend_direction': 'neutral',
+                'confidence': 0.0
+            }
+
+        avg_volatility = float(np.mean([s.volatility for s in ready]))
+        avg_trend = float(np.mean([s.trend for s in ready]))
+        avg_hurst = float(np.mean([s.hurst for s in ready]))
+
+        regime = self.classify(avg_volatility, avg_trend)
+        regime.update({
+            'avg_volatility': avg_volatility,
+            'avg_trend': avg_trend,
+            'persistence': avg_hurst,
+            'series_count': len(ready),
+            'trend_votes': float(np.mean([1 if s.ewma_mean > 0 else -1 for s in ready]))
+        })
+        return regime
+
+    @staticmethod
+    def classify(avg_volatility: float, avg_trend: float) -> Dict[str, Any]:
+        """Map volatility / trend to the regime labels used across the system"""
+        if avg_volatility > 0.05:
+            volatility_level = 'high'
+        elif avg_volatility > 0.02:
+            volatility_level = 'medium'
+        else:
+            volatility_level = 'low'
+
+        if avg_trend > 0.02:
+            trend_direction = 'bullish'
+        elif avg_trend < -0.02:
+            trend_direction = 'bearish'
+        else:
+            trend_direction = 'neutral'
+
+        if volatility_level == 'high':
+            regime_type = 'trending_volatile' if trend_direction != 'neutral' else 'chaotic'
+        else:
+            regime_type = 'trending_stable' if trend_direction != 'neutral' else 'range_bound'
+
+        return {
+            'regime_type': regime_type,
+            'volatility_level': volatility_level,
+            'trend_direction': trend_direction
+        }
+
+    def save(self):
+        """Persist all series state"""
+        now = time.time()
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany("""
+            INSERT OR REPLACE INTO regime_state (series, state, updated_at)
+            VALUES (?, ?, ?)
+        """, [(name, json.dumps(state.to_dict()), now) for name, state in self.states.items()])
+        conn.commit()
+        conn.close()
+
+    def load(self) -> int:
+        """Restore persisted series state; returns the number of series loaded"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            rows = conn.execute("SELECT series, state FROM regime_state").fetchall()
+            conn.close()
+        except Exception as e:
+            print(f"⚠️ Could not load regime state: {e}")
+            return 0
+
+        for name, payload in rows:
+            try:
+                self.states[name] = SeriesRegimeState.from_dict(json.loads(payload))
+            except Exception as e:
+                print(f"⚠️ Skipping corrupt regime state for {name}: {e}")
+        return len(rows)
+
+
+_shared_detector: Optional[StreamingRegimeDetector] = None
+
+
+def get_regime_detector() -> StreamingRegimeDetector:
+    """Return the process-wide regime detector, loading persisted state once"""
+    global _shared_detector
+    if _shared_detector is None:
+        _shared_detector = StreamingRegimeDetector()
+    return _shared_detector
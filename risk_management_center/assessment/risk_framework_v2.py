@@ -13,6 +13,9 @@ import logging
 sys.path.append('.')
 
 from src.protocols.orion_unified_protocol_enhanced import EnhancedOrionUnifiedProtocolV3
+from risk_management_center.core.portfolio_risk_engine import get_portfolio_risk_engine
+from risk_management_center.core import risk_kernel
+from risk_management_center.monitoring.equity_tracker import get_equity_tracker
 
 class OrionRiskManager:
     """Advanced risk management system for crypto trading"""
@@ -33,6 +36,7 @@ class OrionRiskManager:
             "max_correlation_exposure": 0.7,  # Maximum correlation between positions
             "leverage_limit": 2.0,          # Maximum 2x leverage
             "cooldown_period_hours": 4,     # Hours to wait after stop loss
+            "max_portfolio_var_pct": 3.0,   # Maximum 1-day 95% VaR as % of capital
         }
         
         # Portfolio tracking
@@ -48,6 +52,15 @@ class OrionRiskManager:
             "last_updated": datetime.now().isoformat()
         }
         
+        # Rolling covariance / VaR model shared with the advanced risk manager
+        self.portfolio_risk = get_portfolio_risk_engine()
+        
+        # Streaming equity / drawdown tracker; thresholds re-checked on each snapshot,
+        # alerting once per breach rather than on every snapshot while it lasts
+        self._breached_thresholds = set()
+        self.equity_tracker = get_equity_tracker()
+        self.equity_tracker.add_listener(self._on_equity_snapshot)
+        
         self._setup_risk_database()
     
     def _setup_risk_database(self):
@@ -186,44 +199,34 @@ class OrionRiskManager:
         price = trade_request.get("price", 0)
         trade_value = quantity * price
         
-        # 1. Position size validation
-        position_pct = (trade_value / self.portfolio["available_capital"]) * 100
-        if position_pct > self.risk_parameters["max_position_size_pct"]:
-            validation_result["rejections"].append(
-                f"Position size {position_pct:.1f}% exceeds maximum {self.risk_parameters['max_position_size_pct']}%"
-            )
-            validation_result["valid"] = False
-        
-        # 2. Available capital validation
-        if trade_value > self.portfolio["available_capital"]:
-            validation_result["rejections"].append(
-                f"Insufficient capital: Need ${trade_value:.2f}, Available ${self.portfolio['available_capital']:.2f}"
-            )
-            validation_result["valid"] = False
-        
-        # 3. Maximum positions validation
-        current_positions = len(self.portfolio["current_positions"])
-        if current_positions >= self.risk_parameters["max_open_positions"]:
-            validation_result["rejections"].append(
-                f"Maximum positions limit reached: {current_positions}/{self.risk_parameters['max_open_positions']}"
-            )
-            validation_result["valid"] = False
-        
-        # 4. Daily loss limit validation
-        if abs(self.portfolio["daily_pnl"]) >= (self.portfolio["total_capital"] * self.risk_parameters["max_daily_loss_pct"] / 100):
-            validation_result["rejections"].append(
-                f"Daily loss limit reached: {abs(self.portfolio['daily_pnl']):.2f}"
-            )
+        # 1-5. Size, capital, position count, daily loss and drawdown limits (risk kernel)
+        kernel_result = self.evaluate_trades([trade_request])
+        rejections = self._kernel_rejections(kernel_result, 0)
+        if rejections:
+            validation_result["rejections"].extend(rejections)
             validation_result["valid"] = False
         
-        # 5. Portfolio drawdown validation
-        if self.portfolio["max_drawdown"] >= self.risk_parameters["max_portfolio_drawdown_pct"]:
-            validation_result["rejections"].append(
-                f"Portfolio drawdown limit reached: {self.portfolio['max_drawdown']:.1f}%"
-            )
-            validation_result["valid"] = False
+        # 6. Correlation and portfolio VaR validation
+        exposures = self._position_exposures()
+        if exposures and trade_value > 0:
+            self.portfolio_risk.refresh(list(exposures) + [symbol])
+            signed_value = -trade_value if side.lower() == "sell" else trade_value
+            impact = self.portfolio_risk.incremental_var(exposures, symbol, signed_value)
+            validation_result["portfolio_var"] = impact
+            
+            if impact["correlation_to_portfolio"] > self.risk_parameters["max_correlation_exposure"]:
+                validation_result["warnings"].append(
+                    f"{symbol} is {impact['correlation_to_portfolio']:.2f} correlated with the current portfolio"
+                )
+            
+            var_pct = impact["var_after"] / self.portfolio["total_capital"] * 100
+            if var_pct > self.risk_parameters["max_portfolio_var_pct"]:
+                validation_result["rejections"].append(
+                    f"Portfolio VaR {var_pct:.2f}% would exceed maximum {self.risk_parameters['max_portfolio_var_pct']}%"
+                )
+                validation_result["valid"] = False
         
-        # 6. Generate recommendations if valid
+        # 7. Generate recommendations if valid
         if validation_result["valid"]:
             optimal_size = self.calculate_position_size(symbol, price, self.portfolio["available_capital"])
             
@@ -236,6 +239,77 @@ class OrionRiskManager:
         
         return validation_result
     
+    def _kernel_limits(self) -> risk_kernel.KernelLimits:
+        """Current risk parameters and portfolio state in risk kernel form"""
+        return risk_kernel.KernelLimits(
+            account_value=self.portfolio["total_capital"],
+            available_capital=self.portfolio["available_capital"],
+            max_position_pct=self.risk_parameters["max_position_size_pct"],
+            max_open_positions=self.risk_parameters["max_open_positions"],
+            daily_pnl=min(self.portfolio["daily_pnl"], 0.0),
+            max_daily_loss=self.portfolio["total_capital"] * self.risk_parameters["max_daily_loss_pct"] / 100,
+            drawdown_pct=self.portfolio["max_drawdown"],
+            max_drawdown_pct=self.risk_parameters["max_portfolio_drawdown_pct"],
+            oversize_policy="reject"
+        )
+    
+    def evaluate_trades(self, trade_requests: List[Dict]) -> risk_kernel.KernelResult:
+        """Run the columnar pre-trade checks over a batch of trade requests"""
+        positions = [dict(position, symbol=symbol) for symbol, position in self.portfolio["current_positions"].items()]
+        return risk_kernel.evaluate(
+            risk_kernel.OrderBatch.from_records(trade_requests),
+            risk_kernel.PositionSnapshot.from_records(positions, lambda p: p.get("current_value", 0)),
+            self._kernel_limits()
+        )
+    
+    def validate_trades(self, trade_requests: List[Dict]) -> List[Dict]:
+        """Batch validation: one kernel pass, requests checked in order against shared capital"""
+        kernel_result = self.evaluate_trades(trade_requests)
+        results = []
+        for i in range(len(trade_requests)):
+            rejections = self._kernel_rejections(kernel_result, i)
+            results.append({
+                "valid": not rejections,
+                "warnings": [],
+                "rejections": rejections,
+                "recommendations": [],
+                "approved_quantity": float(kernel_result.sized_qty[i])
+            })
+        return results
+    
+    def _kernel_rejections(self, kernel_result: risk_kernel.KernelResult, i: int) -> List[str]:
+        """Risk kernel reject codes as risk framework messages"""
+        code = int(kernel_result.reject_codes[i])
+        trade_value = kernel_result.value[i]
+        messages = []
+        if code & risk_kernel.INVALID_ORDER:
+            messages.append("Invalid quantity or price")
+        if code & risk_kernel.POSITION_SIZE:
+            messages.append(
+                f"Position size {kernel_result.position_pct[i]:.1f}% exceeds maximum {self.risk_parameters['max_position_size_pct']}%"
+            )
+        if code & risk_kernel.INSUFFICIENT_CAPITAL:
+            messages.append(
+                f"Insufficient capital: Need ${trade_value:.2f}, Available ${self.portfolio['available_capital']:.2f}"
+            )
+        if code & risk_kernel.MAX_POSITIONS:
+            messages.append(
+                f"Maximum positions limit reached: {int(kernel_result.open_positions[i])}/{self.risk_parameters['max_open_positions']}"
+            )
+        if code & risk_kernel.DAILY_LOSS:
+            messages.append(f"Daily loss limit reached: {max(-self.portfolio['daily_pnl'], 0.0):.2f}")
+        if code & risk_kernel.DRAWDOWN:
+            messages.append(f"Portfolio drawdown limit reached: {self.portfolio['max_drawdown']:.1f}%")
+        return messages
+    
+    def _position_exposures(self) -> Dict[str, float]:
+        """Current USD exposure per symbol"""
+        return {
+            symbol: position["current_value"]
+            for symbol, position in self.portfolio["current_positions"].items()
+            if position.get("current_value")
+        }
+    
     def create_risk_alert(self, alert_type: str, severity: str, message: str):
         """Create risk management alert"""
         now_iso = datetime.now().isoformat()
@@ -257,19 +331,27 @@ class OrionRiskManager:
         self.protocol.log_api_usage("risk_manager", f"/alert/{alert_type}", 0.0, 0)
     
     def update_portfolio(self, positions_data: List[Dict]):
-        """Update portfolio with current position data"""
-        
-        total_value = self.portfolio["total_capital"]
-        allocated_value = 0
-        unrealized_pnl = 0
+        """Update portfolio with current position data (symbols not listed are closed)"""
+        
+        # Positions missing from the snapshot are flat: drop them from the tracker and the view
+        listed = {(position["symbol"], position.get("strategy", "Unknown")) for position in positions_data}
+        for (symbol, strategy), tracked in list(self.equity_tracker.positions.items()):
+            if tracked.size and (symbol, strategy) not in listed:
+                self.equity_tracker.set_position(symbol, 0.0, 0.0, strategy=strategy)
+        listed_symbols = {symbol for symbol, _ in listed}
+        for symbol in list(self.portfolio["current_positions"]):
+            if symbol not in listed_symbols:
+                del self.portfolio["current_positions"][symbol]
         
         for position in positions_data:
             symbol = position["symbol"]
             current_value = position["quantity"] * position["current_price"]
             position_pnl = position.get("unrealized_pnl", 0)
             
-            allocated_value += current_value
-            unrealized_pnl += position_pnl
+            self.equity_tracker.set_position(
+                symbol, position["quantity"], position["entry_price"], position["current_price"],
+                strategy=position.get("strategy", "Unknown")
+            )
             
             # Update position in portfolio tracking
             self.portfolio["current_positions"][symbol] = {
@@ -281,36 +363,66 @@ class OrionRiskManager:
                 "pnl_pct": (position_pnl / current_value) * 100 if current_value > 0 else 0
             }
         
-        # Update portfolio metrics
-        self.portfolio["allocated_capital"] = allocated_value
-        self.portfolio["available_capital"] = total_value - allocated_value
-        current_total = total_value + unrealized_pnl
-        
-        # Calculate drawdown
-        if current_total < self.portfolio["total_capital"]:
-            drawdown_pct = ((self.portfolio["total_capital"] - current_total) / self.portfolio["total_capital"]) * 100
-            self.portfolio["max_drawdown"] = max(self.portfolio["max_drawdown"], drawdown_pct)
+        self._sync_equity(self.equity_tracker.snapshot())
         
         # Check for risk alerts
         self._check_risk_thresholds()
-        
+    
+    def on_fill(self, symbol: str, side: str, quantity: float, price: float,
+                fee: float = 0.0, strategy: str = "Unknown"):
+        """Stream one execution into the equity tracker (O(1))"""
+        self.equity_tracker.on_fill(symbol, side, quantity, price, fee=fee, strategy=strategy)
+    
+    def on_mark_price(self, symbol: str, price: float):
+        """Stream one mark-price tick into the equity tracker (O(1))"""
+        self.equity_tracker.on_mark_price(symbol, price)
+        position = self.portfolio["current_positions"].get(symbol)
+        if position:
+            position["current_price"] = price
+            position["current_value"] = position["quantity"] * price
+            position["unrealized_pnl"] = position["quantity"] * (price - position["entry_price"])
+            position["pnl_pct"] = (position["unrealized_pnl"] / position["current_value"]) * 100 if position["current_value"] > 0 else 0
+    
+    def _sync_equity(self, snapshot: Dict[str, Any]):
+        """Copy tracker equity, exposure and drawdown into the portfolio view"""
+        self.portfolio["allocated_capital"] = snapshot["gross_exposure"]
+        self.portfolio["available_capital"] = self.portfolio["total_capital"] - snapshot["gross_exposure"]
+        self.portfolio["daily_pnl"] = snapshot["daily_pnl"]
+        self.portfolio["total_pnl"] = snapshot["realized_pnl"] + snapshot["unrealized_pnl"] - snapshot["fees"]
+        self.portfolio["current_drawdown"] = snapshot["drawdown_pct"]
+        self.portfolio["max_drawdown"] = max(self.portfolio["max_drawdown"], snapshot["max_drawdown_pct"])
+        self.portfolio["strategy_exposure"] = snapshot["strategy_exposure"]
         self.portfolio["last_updated"] = datetime.now().isoformat()
     
+    def _on_equity_snapshot(self, snapshot: Dict[str, Any]):
+        """Tracker listener: refresh the portfolio view and re-check thresholds"""
+        self._sync_equity(snapshot)
+        self._check_risk_thresholds()
+    
     def _check_risk_thresholds(self):
-        """Check if any risk thresholds are breached"""
+        """Check if any risk thresholds are breached; each breach alerts once until it clears"""
+        breached = set()
         
-        # Check daily loss limit
+        def alert(key: str, alert_type: str, severity: str, message: str):
+            breached.add(key)
+            if key not in self._breached_thresholds:
+                self.create_risk_alert(alert_type, severity, message)
+        
+        # Check daily loss limit (profits never count towards it)
         daily_loss_limit = self.portfolio["total_capital"] * (self.risk_parameters["max_daily_loss_pct"] / 100)
-        if abs(self.portfolio["daily_pnl"]) >= (daily_loss_limit * 0.8):  # 80% warning threshold
-            self.create_risk_alert(
+        daily_loss = max(-self.portfolio["daily_pnl"], 0.0)
+        if daily_loss >= (daily_loss_limit * 0.8):  # 80% warning threshold
+            alert(
+                "daily_loss_warning",
                 "daily_loss_warning",
                 "HIGH",
-                f"Daily loss approaching limit: ${abs(self.portfolio['daily_pnl']):.2f} / ${daily_loss_limit:.2f}"
+                f"Daily loss approaching limit: ${daily_loss:.2f} / ${daily_loss_limit:.2f}"
             )
         
         # Check portfolio drawdown
         if self.portfolio["max_drawdown"] >= (self.risk_parameters["max_portfolio_drawdown_pct"] * 0.8):
-            self.create_risk_alert(
+            alert(
+                "drawdown_warning",
                 "drawdown_warning",
                 "HIGH",
                 f"Portfolio drawdown approaching limit: {self.portfolio['max_drawdown']:.1f}%"
@@ -320,11 +432,14 @@ class OrionRiskManager:
         for symbol, position in self.portfolio["current_positions"].items():
             position_pct = (position["current_value"] / self.portfolio["total_capital"]) * 100
             if position_pct > (self.risk_parameters["max_position_size_pct"] * 1.2):  # 20% over limit
-                self.create_risk_alert(
+                alert(
+                    f"position_concentration:{symbol}",
                     "position_concentration",
                     "MEDIUM",
                     f"{symbol} position size {position_pct:.1f}% exceeds recommended limit"
                 )
+        
+        self._breached_thresholds = breached
     
     def generate_risk_report(self) -> Dict:
         """Generate comprehensive risk management report"""
@@ -355,6 +470,11 @@ class OrionRiskManager:
             "risk_score": 0  # 0-100 scale
         }
         
+        exposures = self._position_exposures()
+        if exposures:
+            self.portfolio_risk.refresh(exposures)
+            risk_metrics["portfolio_var"] = self.portfolio_risk.risk_report(exposures)
+        
         # Calculate risk score
         risk_score = 0
         if risk_metrics["capital_utilization"] > 80:
@@ -7,6 +7,7 @@ Enterprise-grade risk management for live trading
 import asyncio
 import json
 import logging
+import math
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
@@ -20,6 +21,13 @@ import pandas as pd
 
 # Add project root to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from trading_execution_center.core.order_book import get_order_book_cache
+from risk_management_center.core.volatility_engine import get_volatility_service
+from risk_management_center.core.portfolio_risk_engine import get_portfolio_risk_engine, position_exposure
+from risk_management_center.core import risk_kernel
+
+# Smallest position worth opening, % of account value
+MIN_POSITION_SIZE_PERCENT = 0.1
 
 class RiskLevel(Enum):
     LOW = "low"
@@ -95,6 +103,8 @@ class RiskLimits:
     min_sharpe_ratio: Decimal = Decimal('0.5')
     max_var_95_percent: Decimal = Decimal('3.0')
     min_liquidity_score: Decimal = Decimal('0.6')
+    max_slippage_bps: Decimal = Decimal('25')
+    max_spread_bps: Decimal = Decimal('10')
     
     # Trading limits
     min_confidence_threshold: Decimal = Decimal('0.7')
@@ -134,6 +144,15 @@ class AdvancedRiskManager:
         self.volatility_cache: Dict[str, Decimal] = {}
         self.last_risk_calculation = datetime.min
         
+        # Historical volatility (TTL-cached, refreshed in one batch per assessment)
+        self.volatility_service = get_volatility_service()
+        
+        # Rolling covariance / VaR across held and candidate symbols
+        self.portfolio_risk = get_portfolio_risk_engine()
+        
+        # Streamed L2 books (filled by the Live Trading Engine's market-data stream)
+        self.order_books = get_order_book_cache()
+        
         # Database connection
         self.db_path = "databases/sqlite_dbs/risk_management.db"
         self.initialize_database()
@@ -163,7 +182,9 @@ class AdvancedRiskManager:
                 "var_confidence_levels": [0.95, 0.99],
                 "correlation_lookback_days": 30,
                 "volatility_lookback_days": 20,
-                "update_interval_seconds": 30
+                "update_interval_seconds": 30,
+                "concurrent_checks": True,
+                "check_timeout_seconds": 2.0
             },
             "alerts": {
                 "email_notifications": True,
@@ -248,8 +269,17 @@ class AdvancedRiskManager:
         
         self.logger.info("✅ Risk management database initialized")
     
-    async def assess_trading_signal_risk(self, signal: Dict[str, Any], current_positions: Dict[str, Any]) -> Dict[str, Any]:
-        """Comprehensive risk assessment for new trading signal"""
+    async def assess_trading_signal_risk(self, signal: Dict[str, Any], current_positions: Dict[str, Any],
+                                         concurrent: Optional[bool] = None,
+                                         cycle_state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Comprehensive risk assessment for new trading signal
+        
+        The independent sub-checks run concurrently unless ``concurrent`` is False
+        (default from config). Their blocking parts (volatility lookups, covariance
+        VaR) run in worker threads, so each check's timeout can fire; a check that
+        times out or raises blocks the trade (fail closed). ``cycle_state`` is the
+        shared state prepared by ``assess_signals``.
+        """
         
         assessment = {
             "approved": True,
@@ -260,39 +290,42 @@ class AdvancedRiskManager:
             "risk_adjustments": {}
         }
         
+        if concurrent is None:
+            concurrent = self.config["risk_calculation"].get("concurrent_checks", True)
+        
         try:
-            # 1. Position limit checks
-            position_risk = await self.check_position_limits(signal, current_positions)
-            assessment["risk_score"] += position_risk["risk_score"]
-            assessment["warnings"].extend(position_risk["warnings"])
-            assessment["blocking_issues"].extend(position_risk["blocking_issues"])
-            
-            # 2. Portfolio risk assessment
-            portfolio_risk = await self.assess_portfolio_risk(signal, current_positions)
-            assessment["risk_score"] += portfolio_risk["risk_score"]
-            assessment["warnings"].extend(portfolio_risk["warnings"])
-            
-            # 3. Correlation analysis
-            correlation_risk = await self.analyze_correlation_risk(signal, current_positions)
-            assessment["risk_score"] += correlation_risk["risk_score"]
-            assessment["warnings"].extend(correlation_risk["warnings"])
+            if cycle_state is None:
+                cycle_state = await self.prepare_cycle_state([signal], current_positions)
             
-            # 4. Volatility assessment
-            volatility_risk = await self.assess_volatility_risk(signal)
-            assessment["risk_score"] += volatility_risk["risk_score"]
-            assessment["warnings"].extend(volatility_risk["warnings"])
+            # 1-5. Position limits, portfolio, correlation, volatility and liquidity
+            checks = {
+                "position_limits": lambda: self.check_position_limits(signal, current_positions, cycle_state),
+                "portfolio": lambda: self.assess_portfolio_risk(signal, current_positions),
+                "correlation": lambda: self.analyze_correlation_risk(signal, current_positions, cycle_state),
+                "volatility": lambda: self.assess_volatility_risk(signal),
+                "liquidity": lambda: self.check_liquidity_risk(signal)
+            }
+            if concurrent:
+                results = await asyncio.gather(*(self.run_risk_check(name, check) for name, check in checks.items()))
+            else:
+                results = [await self.run_risk_check(name, check) for name, check in checks.items()]
             
-            # 5. Liquidity check
-            liquidity_risk = await self.check_liquidity_risk(signal)
-            assessment["risk_score"] += liquidity_risk["risk_score"]
-            assessment["warnings"].extend(liquidity_risk["warnings"])
+            for result in results:
+                assessment["risk_score"] += result.get("risk_score", 0.0)
+                assessment["warnings"].extend(result.get("warnings", []))
+                assessment["blocking_issues"].extend(result.get("blocking_issues", []))
+                if "portfolio_var" in result:
+                    assessment["portfolio_var"] = result["portfolio_var"]
             
-            # 6. Calculate recommended position size
+            # 6. Calculate recommended position size, capped at the notional the limits allow
+            sized_notional = dict(zip(checks, results))["position_limits"].get("sized_notional")
             assessment["recommended_position_size"] = await self.calculate_optimal_position_size(
-                signal, current_positions, assessment["risk_score"]
+                signal, current_positions, assessment["risk_score"], sized_notional=sized_notional
             )
             
             # 7. Final approval decision
+            if assessment["recommended_position_size"] == 0:
+                assessment["blocking_issues"].append("Liquidity or limits leave less than the minimum position size")
             if assessment["blocking_issues"]:
                 assessment["approved"] = False
             elif assessment["risk_score"] > 0.8:
@@ -312,8 +345,71 @@ class AdvancedRiskManager:
         
         return assessment
     
-    async def check_position_limits(self, signal: Dict[str, Any], current_positions: Dict[str, Any]) -> Dict[str, Any]:
-        """Check position-related risk limits"""
+    async def assess_signals(self, signals: List[Dict[str, Any]], current_positions: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Assess a whole cycle's signals against one shared snapshot of risk state
+        
+        Volatility, covariance and the priced portfolio are loaded once for every
+        symbol involved; the signals are then scored concurrently. Results are in
+        input order.
+        """
+        if not signals:
+            return []
+        
+        try:
+            cycle_state = await self.prepare_cycle_state(signals, current_positions)
+        except Exception as e:
+            self.logger.error(f"❌ Error loading risk cycle state: {e}")
+            return [{
+                "approved": False,
+                "risk_score": 0.0,
+                "warnings": [],
+                "blocking_issues": [f"Risk state unavailable: {str(e)}"],
+                "recommended_position_size": None,
+                "risk_adjustments": {}
+            } for _ in signals]
+        
+        return list(await asyncio.gather(*(
+            self.assess_trading_signal_risk(signal, current_positions, cycle_state=cycle_state)
+            for signal in signals
+        )))
+    
+    async def prepare_cycle_state(self, signals: List[Dict[str, Any]], current_positions: Dict[str, Any]) -> Dict[str, Any]:
+        """Load volatility and covariance for all symbols once and price the current portfolio"""
+        exposures: Dict[str, float] = {}
+        for key, position in current_positions.items():
+            symbol = position.get('symbol', key)
+            exposures[symbol] = exposures.get(symbol, 0.0) + position_exposure(position)
+        
+        symbols = list(dict.fromkeys([s.get('symbol', '') for s in signals] + list(exposures)))
+        
+        # Blocking loads run in worker threads, side by side
+        await asyncio.gather(
+            self.refresh_volatilities(symbols),
+            asyncio.to_thread(self.portfolio_risk.refresh, [s for s in symbols if s])
+        )
+        
+        return {
+            "exposures": exposures,
+            "portfolio_state": self.portfolio_risk.portfolio_state(exposures) if exposures else None,
+            "position_limits": (self.evaluate_orders(signals, current_positions),
+                                {id(signal): i for i, signal in enumerate(signals)})
+        }
+    
+    async def run_risk_check(self, name: str, check) -> Dict[str, Any]:
+        """Run one sub-check with a timeout; timeouts and errors block the trade"""
+        timeout = self.config["risk_calculation"].get("check_timeout_seconds", 2.0)
+        try:
+            return await asyncio.wait_for(check(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.logger.error(f"❌ Risk check '{name}' timed out after {timeout}s")
+            return {"risk_score": 0.0, "warnings": [], "blocking_issues": [f"Risk check '{name}' timed out"]}
+        except Exception as e:
+            self.logger.error(f"❌ Risk check '{name}' failed: {e}")
+            return {"risk_score": 0.0, "warnings": [], "blocking_issues": [f"Risk check '{name}' failed: {str(e)}"]}
+    
+    async def check_position_limits(self, signal: Dict[str, Any], current_positions: Dict[str, Any],
+                                    cycle_state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Check position-related risk limits (evaluated by the pre-trade risk kernel)"""
         
         result = {
             "risk_score": 0.0,
@@ -321,36 +417,62 @@ class AdvancedRiskManager:
             "blocking_issues": []
         }
         
-        # Count current positions
-        total_positions = len(current_positions)
-        strategy_positions = len([p for p in current_positions.values() 
-                                if p.get('strategy') == signal.get('strategy_name')])
-        symbol_positions = len([p for p in current_positions.values() 
-                              if p.get('symbol') == signal.get('symbol')])
+        kernel_rows = cycle_state.get("position_limits") if cycle_state else None
+        if kernel_rows is not None and id(signal) in kernel_rows[1]:
+            kernel_result, i = kernel_rows[0], kernel_rows[1][id(signal)]
+        else:
+            kernel_result, i = self.evaluate_orders([signal], current_positions), 0
         
-        # Check total position limit
-        if total_positions >= self.risk_limits.max_positions_total:
+        code = int(kernel_result.reject_codes[i])
+        if code & risk_kernel.MAX_POSITIONS:
             result["blocking_issues"].append(f"Maximum total positions ({self.risk_limits.max_positions_total}) reached")
-        elif total_positions >= self.risk_limits.max_positions_total * 0.8:
-            result["warnings"].append("Approaching maximum total positions")
-            result["risk_score"] += 0.2
-        
-        # Check strategy position limit
-        if strategy_positions >= self.risk_limits.max_positions_per_strategy:
+        if code & risk_kernel.MAX_STRATEGY_POSITIONS:
             result["blocking_issues"].append(f"Maximum strategy positions ({self.risk_limits.max_positions_per_strategy}) reached")
-        elif strategy_positions >= self.risk_limits.max_positions_per_strategy * 0.8:
-            result["warnings"].append("Approaching maximum strategy positions")
-            result["risk_score"] += 0.1
-        
-        # Check symbol position limit
-        if symbol_positions >= self.risk_limits.max_positions_per_symbol:
+        if code & risk_kernel.MAX_SYMBOL_POSITIONS:
             result["blocking_issues"].append(f"Maximum symbol positions ({self.risk_limits.max_positions_per_symbol}) reached")
-        elif symbol_positions >= self.risk_limits.max_positions_per_symbol * 0.8:
-            result["warnings"].append("Approaching maximum symbol positions")
-            result["risk_score"] += 0.1
+        if code & risk_kernel.CONCENTRATION:
+            result["blocking_issues"].append(f"Maximum single-asset exposure ({self.risk_limits.max_single_asset_percent}%) reached")
+        
+        result["warnings"].extend(kernel_result.warnings(i))
+        result["risk_score"] += float(kernel_result.risk_score[i])
+        result["sized_notional"] = float(kernel_result.sized_value[i])
         
         return result
     
+    def evaluate_orders(self, signals: List[Dict[str, Any]], current_positions: Dict[str, Any]) -> risk_kernel.KernelResult:
+        """Position count, size and concentration limits for a batch of signals in one kernel pass"""
+        account_value = self.account_value({})
+        max_position_value = float(self.risk_limits.max_position_size_usd)
+        if account_value > 0:
+            max_position_value = min(max_position_value,
+                                     account_value * float(self.risk_limits.max_position_size_percent) / 100)
+        
+        orders = []
+        for signal in signals:
+            price = float(signal.get('price') or signal.get('entry_price') or 1.0)
+            orders.append({
+                'symbol': signal.get('symbol', ''),
+                'side': self.signal_side(signal),
+                'qty': self.order_notional(signal) / price,
+                'price': price,
+                'strategy': signal.get('strategy_name')
+            })
+        
+        limits = risk_kernel.KernelLimits(
+            account_value=account_value,
+            max_position_value=max_position_value,
+            max_single_asset_pct=float(self.risk_limits.max_single_asset_percent) if account_value > 0 else math.inf,
+            max_open_positions=self.risk_limits.max_positions_total,
+            max_positions_per_strategy=self.risk_limits.max_positions_per_strategy,
+            max_positions_per_symbol=self.risk_limits.max_positions_per_symbol,
+            oversize_policy="clip"
+        )
+        return risk_kernel.evaluate(
+            risk_kernel.OrderBatch.from_records(orders),
+            risk_kernel.PositionSnapshot.from_records(list(current_positions.values()), position_exposure),
+            limits
+        )
+    
     async def assess_portfolio_risk(self, signal: Dict[str, Any], current_positions: Dict[str, Any]) -> Dict[str, Any]:
         """Assess portfolio-level risk metrics"""
         
@@ -384,7 +506,8 @@ class AdvancedRiskManager:
         
         return result
     
-    async def analyze_correlation_risk(self, signal: Dict[str, Any], current_positions: Dict[str, Any]) -> Dict[str, Any]:
+    async def analyze_correlation_risk(self, signal: Dict[str, Any], current_positions: Dict[str, Any],
+                                       cycle_state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Analyze correlation risk with existing positions"""
         
         result = {
@@ -412,6 +535,30 @@ class AdvancedRiskManager:
                     result["warnings"].append(f"High asset concentration: {concentration:.2f}")
                     result["risk_score"] += concentration * 0.3
             
+            # Covariance-based incremental risk of the new trade
+            if cycle_state is None:
+                cycle_state = await self.prepare_cycle_state([signal], current_positions)
+            exposures = cycle_state["exposures"]
+            if exposures:
+                notional = self.order_notional(signal)
+                if self.signal_side(signal) == 'Sell':
+                    notional = -notional
+                impact = await asyncio.to_thread(self.portfolio_risk.incremental_var, exposures, signal_symbol,
+                                                 notional, baseline=cycle_state["portfolio_state"])
+                result["portfolio_var"] = impact
+                
+                correlation = impact['correlation_to_portfolio']
+                if correlation > float(self.risk_limits.max_correlation_exposure):
+                    result["warnings"].append(f"High correlation with portfolio: {correlation:.2f}")
+                    result["risk_score"] += correlation * 0.2
+                
+                account_value = self.account_value(signal)
+                if account_value > 0:
+                    var_percent = impact['var_after'] / account_value * 100
+                    if var_percent > float(self.risk_limits.max_var_95_percent):
+                        result["warnings"].append(f"Portfolio VaR would reach {var_percent:.2f}% of equity")
+                        result["risk_score"] += 0.2
+            
         except Exception as e:
             self.logger.error(f"❌ Error in correlation analysis: {e}")
         
@@ -428,11 +575,7 @@ class AdvancedRiskManager:
         try:
             symbol = signal.get('symbol', '')
             
-            # Get cached volatility or calculate
-            volatility = self.volatility_cache.get(symbol)
-            if volatility is None:
-                volatility = await self.calculate_volatility(symbol)
-                self.volatility_cache[symbol] = volatility
+            volatility = await self.calculate_volatility(symbol)
             
             # Assess volatility level
             if volatility > Decimal('0.05'):  # 5% daily volatility
@@ -458,6 +601,11 @@ class AdvancedRiskManager:
         try:
             symbol = signal.get('symbol', '')
             
+            # Prefer measured depth when a fresh book is available
+            book = self.order_books.get(symbol)
+            if book is not None:
+                return self.check_book_liquidity(signal, book, result)
+            
             # Major pairs have lower liquidity risk
             major_pairs = ['BTC/USDT', 'ETH/USDT', 'BNB/USDT', 'ADA/USDT', 'SOL/USDT']
             
@@ -475,8 +623,69 @@ class AdvancedRiskManager:
         
         return result
     
-    async def calculate_optimal_position_size(self, signal: Dict[str, Any], current_positions: Dict[str, Any], risk_score: float) -> Decimal:
-        """Calculate optimal position size based on risk assessment"""
+    def signal_side(self, signal: Dict[str, Any]) -> str:
+        direction = signal.get('direction', signal.get('side', signal.get('action', 'buy')))
+        return 'Buy' if str(direction).lower() in ('buy', 'long') else 'Sell'
+    
+    def account_value(self, signal: Dict[str, Any]) -> float:
+        """Portfolio value from the latest metrics, else as supplied with the signal"""
+        if self.portfolio_metrics:
+            return float(self.portfolio_metrics.total_value)
+        return float(signal.get('portfolio_value', 0))
+    
+    def order_notional(self, signal: Dict[str, Any], mid: Optional[float] = None) -> float:
+        """Intended order notional in USD (signal value, quantity × mid, or the position cap)"""
+        if signal.get('position_value'):
+            return float(signal['position_value'])
+        quantity = signal.get('quantity') or signal.get('qty')
+        if quantity and mid:
+            return float(quantity) * mid
+        return float(self.risk_limits.max_position_size_usd)
+    
+    def check_book_liquidity(self, signal: Dict[str, Any], book: Any, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Spread, market impact and near-touch depth from the live L2 book"""
+        mid = book.mid
+        side = self.signal_side(signal)
+        notional = self.order_notional(signal, mid)
+        
+        spread_bps = book.spread_bps()
+        impact = book.estimate_slippage(side, notional=notional)
+        depth = book.depth_within_bps(10.0)
+        
+        if spread_bps is not None and spread_bps > float(self.risk_limits.max_spread_bps):
+            result["warnings"].append(f"Wide spread: {spread_bps:.1f}bps")
+            result["risk_score"] += 0.1
+        
+        if impact['slippage_bps'] > float(self.risk_limits.max_slippage_bps):
+            if impact['fully_filled']:
+                result["warnings"].append(f"High estimated slippage: {impact['slippage_bps']:.1f}bps for ${notional:,.0f}")
+            else:
+                fillable = impact['filled_qty'] * impact['vwap']
+                result["warnings"].append(f"Order exceeds visible book depth (${fillable:,.0f} fillable of ${notional:,.0f})")
+            result["risk_score"] += 0.2
+        
+        if depth['total'] < notional * 5:
+            result["warnings"].append(f"Thin book: ${depth['total']:,.0f} within 10bps of mid")
+            result["risk_score"] += 0.1
+        
+        result["liquidity"] = {
+            "source": "order_book",
+            "spread_bps": spread_bps,
+            "slippage_bps": impact['slippage_bps'],
+            "depth_10bps_usd": depth['total'],
+            "order_notional_usd": notional
+        }
+        return result
+    
+    async def calculate_optimal_position_size(self, signal: Dict[str, Any], current_positions: Dict[str, Any], risk_score: float,
+                                              sized_notional: Optional[float] = None) -> Decimal:
+        """Calculate optimal position size based on risk assessment
+        
+        ``sized_notional`` is the order notional the risk kernel clipped to the
+        position and concentration limits; the recommendation never exceeds it,
+        nor what the book can absorb. When those caps leave less than the minimum
+        viable position the result is 0 (do not trade).
+        """
         
         try:
             # Base position size from signal confidence
@@ -497,7 +706,25 @@ class AdvancedRiskManager:
                 adjusted_size_percent = min(adjusted_size_percent, concentration_limit * 100)
             
             # Ensure minimum viable position
-            final_size_percent = max(0.1, min(adjusted_size_percent, float(self.risk_limits.max_position_size_percent)))
+            final_size_percent = max(MIN_POSITION_SIZE_PERCENT,
+                                     min(adjusted_size_percent, float(self.risk_limits.max_position_size_percent)))
+            
+            # Hard caps: what the book can absorb within the slippage limit and the kernel-sized notional
+            cap_percent = math.inf
+            book = self.order_books.get(signal.get('symbol', ''))
+            account_value = self.account_value(signal)
+            if book is not None and account_value > 0:
+                side = self.signal_side(signal)
+                absorbable = book.max_notional_within_slippage(side, float(self.risk_limits.max_slippage_bps))
+                cap_percent = min(cap_percent, absorbable / account_value * 100)
+            if sized_notional is not None and account_value > 0:
+                cap_percent = min(cap_percent, sized_notional / account_value * 100)
+            
+            if cap_percent < MIN_POSITION_SIZE_PERCENT:
+                self.logger.warning(f"⚠️ Position size capped at {cap_percent:.3f}%, below the "
+                                    f"{MIN_POSITION_SIZE_PERCENT}% minimum - no trade")
+                return Decimal('0')
+            final_size_percent = min(final_size_percent, cap_percent)
             
             self.logger.info(f"💰 Optimal position size: {final_size_percent:.2f}% (risk-adjusted from {base_size_percent:.2f}%)")
             
@@ -535,16 +762,19 @@ class AdvancedRiskManager:
         
         return adjustments
     
+    async def refresh_volatilities(self, symbols: List[str]) -> Dict[str, Decimal]:
+        """Daily volatility for all symbols with one batched service call"""
+        estimates = await asyncio.to_thread(self.volatility_service.get_volatilities, [s for s in symbols if s])
+        for symbol, estimate in estimates.items():
+            self.volatility_cache[symbol] = Decimal(str(round(estimate.daily, 6)))
+        return {symbol: self.volatility_cache[symbol] for symbol in estimates}
+    
     async def calculate_volatility(self, symbol: str) -> Decimal:
-        """Calculate asset volatility"""
-        # This would use historical price data
-        # For now, return reasonable defaults based on asset type
-        if 'BTC' in symbol:
-            return Decimal('0.04')  # 4% daily volatility
-        elif 'ETH' in symbol:
-            return Decimal('0.05')  # 5% daily volatility
-        else:
-            return Decimal('0.06')  # 6% daily volatility for altcoins
+        """Daily volatility from stored price history (falls back to asset-class defaults)"""
+        estimate = await asyncio.to_thread(self.volatility_service.get_volatility, symbol)
+        volatility = Decimal(str(round(estimate.daily, 6)))
+        self.volatility_cache[symbol] = volatility
+        return volatility
     
     def get_risk_status(self) -> Dict[str, Any]:
         """Get comprehensive risk management status"""
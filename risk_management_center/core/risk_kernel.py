@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Pre-Trade Risk Kernel - ORION PHASE 4
+Columnar, vectorized pre-trade checks shared by both risk managers
+
+``evaluate`` takes a batch of candidate orders (parallel arrays) and a snapshot
+of current positions and returns, in one NumPy pass:
+
+- an approve / reject mask
+- sized quantities (oversized orders rejected or clipped, per policy)
+- reject and warning bit masks, decoded to text on demand
+
+Orders in the same batch see each other: position counts, per-symbol exposure
+and capital use accumulate in batch order, so a cycle cannot approve ten orders
+that each fit alone but break a limit together. Earlier orders count once they
+pass the static checks, which is conservative for orders that are later
+rejected.
+
+Orders are netted against the signed exposure of their symbol (existing
+positions plus earlier orders in the batch): the part of an order that reduces
+an opposite position is not new exposure. It is exempt from the size limit,
+needs no capital and cannot breach concentration, and an order that only
+reduces does not count as a new position.
+
+``OrionRiskManager`` (risk_framework_v2) and ``AdvancedRiskManager`` both
+delegate their position and size limits here.
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+# Reject reasons (bit flags)
+INVALID_ORDER = 1 << 0
+POSITION_SIZE = 1 << 1
+INSUFFICIENT_CAPITAL = 1 << 2
+MAX_POSITIONS = 1 << 3
+MAX_STRATEGY_POSITIONS = 1 << 4
+MAX_SYMBOL_POSITIONS = 1 << 5
+DAILY_LOSS = 1 << 6
+DRAWDOWN = 1 << 7
+LOW_CONFIDENCE = 1 << 8
+CONCENTRATION = 1 << 9
+EMERGENCY_STOP = 1 << 10
+
+# Warnings (bit flags)
+APPROACHING_POSITIONS = 1 << 0
+APPROACHING_STRATEGY_POSITIONS = 1 << 1
+APPROACHING_SYMBOL_POSITIONS = 1 << 2
+SIZE_CLIPPED = 1 << 3
+
+REJECT_REASONS = {
+    INVALID_ORDER: "Invalid quantity or price",
+    POSITION_SIZE: "Position size exceeds maximum",
+    INSUFFICIENT_CAPITAL: "Insufficient capital",
+    MAX_POSITIONS: "Maximum total positions reached",
+    MAX_STRATEGY_POSITIONS: "Maximum strategy positions reached",
+    MAX_SYMBOL_POSITIONS: "Maximum symbol positions reached",
+    DAILY_LOSS: "Daily loss limit reached",
+    DRAWDOWN: "Drawdown limit reached",
+    LOW_CONFIDENCE: "Signal confidence below threshold",
+    CONCENTRATION: "Single-asset concentration limit reached",
+    EMERGENCY_STOP: "Emergency stop active"
+}
+
+WARNINGS = {
+    APPROACHING_POSITIONS: "Approaching maximum total positions",
+    APPROACHING_STRATEGY_POSITIONS: "Approaching maximum strategy positions",
+    APPROACHING_SYMBOL_POSITIONS: "Approaching maximum symbol positions",
+    SIZE_CLIPPED: "Order size reduced to risk limits"
+}
+
+# Risk score contribution of each warning (AdvancedRiskManager weights)
+WARNING_SCORES = {
+    APPROACHING_POSITIONS: 0.2,
+    APPROACHING_STRATEGY_POSITIONS: 0.1,
+    APPROACHING_SYMBOL_POSITIONS: 0.1,
+    SIZE_CLIPPED: 0.0
+}
+
+
+@dataclass
+class KernelLimits:
+    """Limits and account state for one evaluation (unset limits are disabled)"""
+    account_value: float
+    available_capital: float = math.inf
+    max_position_value: float = math.inf
+    max_position_pct: float = math.inf        # Of available capital
+    max_single_asset_pct: float = math.inf    # Of account value, existing + new
+    max_open_positions: float = math.inf
+    max_positions_per_strategy: float = math.inf
+    max_positions_per_symbol: float = math.inf
+    min_confidence: float = 0.0
+    daily_pnl: float = 0.0
+    max_daily_loss: float = math.inf
+    drawdown_pct: float = 0.0
+    max_drawdown_pct: float = math.inf
+    emergency_stop: bool = False
+    oversize_policy: str = "reject"           # 'reject' or 'clip'
+    warning_fraction: float = 0.8
+
+
+@dataclass
+class OrderBatch:
+    """Candidate orders as parallel arrays"""
+    symbols: np.ndarray
+    sides: np.ndarray        # +1 buy, -1 sell
+    qty: np.ndarray
+    price: np.ndarray
+    strategies: np.ndarray
+    confidence: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.qty)
+
+    @classmethod
+    def from_records(cls, orders: Sequence[Dict[str, Any]]) -> "OrderBatch":
+        """Build from order dicts (symbol, side, quantity/qty, price, strategy, confidence)"""
+        return cls(
+            symbols=np.array([o.get('symbol', '') for o in orders], dtype=object),
+            sides=np.array([-1 if str(o.get('side', 'buy')).lower() in ('sell', 'short') else 1 for o in orders],
+                           dtype=np.int8),
+            qty=np.array([float(o.get('quantity', o.get('qty', 0)) or 0) for o in orders]),
+            price=np.array([float(o.get('price', 0) or 0) for o in orders]),
+            strategies=np.array([o.get('strategy', '') or '' for o in orders], dtype=object),
+            confidence=np.array([float(o.get('confidence', 1.0)) for o in orders])
+        )
+
+
+@dataclass
+class PositionSnapshot:
+    """Open positions as parallel arrays"""
+    symbols: np.ndarray
+    strategies: np.ndarray
+    exposure: np.ndarray     # Signed USD exposure (short < 0)
+
+    @classmethod
+    def from_records(cls, positions: Sequence[Dict[str, Any]], exposure_fn) -> "PositionSnapshot":
+        return cls(
+            symbols=np.array([p.get('symbol', '') for p in positions], dtype=object),
+            strategies=np.array([p.get('strategy', '') or '' for p in positions], dtype=object),
+            exposure=np.array([exposure_fn(p) for p in positions], dtype=float)
+        )
+
+    @classmethod
+    def empty(cls) -> "PositionSnapshot":
+        return cls(np.empty(0, dtype=object), np.empty(0, dtype=object), np.empty(0))
+
+
+@dataclass
+class KernelResult:
+    approved: np.ndarray
+    sized_qty: np.ndarray
+    value: np.ndarray              # Requested notional
+    sized_value: np.ndarray
+    position_pct: np.ndarray       # Requested notional, % of available capital
+    reject_codes: np.ndarray
+    warning_codes: np.ndarray
+    risk_score: np.ndarray
+    open_positions: np.ndarray     # Positions counted against each order (existing + earlier in batch)
+    strategy_positions: np.ndarray
+    symbol_positions: np.ndarray
+    elapsed_ms: float = 0.0
+
+    def reasons(self, i: int) -> List[str]:
+        code = int(self.reject_codes[i])
+        return [text for flag, text in REJECT_REASONS.items() if code & flag]
+
+    def warnings(self, i: int) -> List[str]:
+        code = int(self.warning_codes[i])
+        return [text for flag, text in WARNINGS.items() if code & flag]
+
+    def summary(self) -> Dict[str, Any]:
+        rejected = ~self.approved
+        by_reason = {text: int(np.count_nonzero(self.reject_codes & flag))
+                     for flag, text in REJECT_REASONS.items() if np.any(self.reject_codes & flag)}
+        return {
+            'orders': len(self.approved),
+            'approved': int(self.approved.sum()),
+            'rejected': int(rejected.sum()),
+            'rejections_by_reason': by_reason,
+            'elapsed_ms': self.elapsed_ms
+        }
+
+
+def _group_index(existing: np.ndarray, candidates: np.ndarray):
+    """Integer ids over the union of keys: (ids of existing, ids of candidates, key count)"""
+    keys, inverse = np.unique(np.concatenate((existing, candidates)).astype(str), return_inverse=True)
+    return inverse[:len(existing)], inverse[len(existing):], len(keys)
+
+
+def _prior_in_group(groups: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """For each row, the sum of ``weights`` over earlier rows in the same group"""
+    if len(groups) == 0:
+        return np.zeros(0)
+    order = np.argsort(groups, kind='stable')
+    sorted_groups = groups[order]
+    cumulative = np.cumsum(weights[order])
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    group_base = np.repeat(cumulative[starts] - weights[order][starts], np.diff(np.r_[starts, len(order)]))
+    prior = np.empty_like(cumulative)
+    prior[order] = cumulative - group_base - weights[order]
+    return prior
+
+
+def evaluate(orders: OrderBatch, positions: PositionSnapshot, limits: KernelLimits) -> KernelResult:
+    """Vectorized pre-trade checks for a batch of candidate orders"""
+    started = time.perf_counter()
+    n = len(orders)
+    reject = np.zeros(n, dtype=np.uint16)
+    warn = np.zeros(n, dtype=np.uint16)
+
+    qty, price = orders.qty, orders.price
+    valid = (qty > 0) & (price > 0) & np.isfinite(qty) & np.isfinite(price)
+    reject[~valid] |= INVALID_ORDER
+    value = np.where(valid, qty * price, 0.0)
+
+    # Account-wide conditions apply to every order
+    if limits.emergency_stop:
+        reject |= EMERGENCY_STOP
+    if limits.daily_pnl <= -limits.max_daily_loss:
+        reject |= DAILY_LOSS
+    if limits.drawdown_pct >= limits.max_drawdown_pct:
+        reject |= DRAWDOWN
+    reject[orders.confidence < limits.min_confidence] |= LOW_CONFIDENCE
+
+    # Net signed exposure of each order's symbol before it
+    sides = orders.sides.astype(float)
+    pos_symbol, order_symbol, n_symbols = _group_index(positions.symbols, orders.symbols)
+    pos_strategy, order_strategy, n_strategies = _group_index(positions.strategies, orders.strategies)
+    existing = np.bincount(pos_symbol, weights=positions.exposure, minlength=n_symbols)[order_symbol]
+    net = existing + _prior_in_group(order_symbol, np.where(reject == 0, sides * value, 0.0))
+    reducible = np.maximum(-sides * net, 0.0)
+
+    # Size limit on the new exposure: reject or clip
+    max_value = min(limits.max_position_value, limits.max_position_pct / 100 * limits.available_capital)
+    position_pct = value / limits.available_capital * 100 if limits.available_capital > 0 else np.full(n, np.inf)
+    oversize = value - np.minimum(value, reducible) > max_value
+    if limits.oversize_policy == "clip":
+        sized_value = np.minimum(value, reducible + max_value)
+        warn[oversize & valid] |= SIZE_CLIPPED
+    else:
+        sized_value = value.copy()
+        reject[oversize] |= POSITION_SIZE
+    reduces_only = valid & (sized_value <= reducible)
+
+    # Position counts: existing positions plus earlier candidates in this batch that open one
+    counted = ((reject == 0) & ~reduces_only).astype(float)
+
+    open_positions = len(positions.symbols) + np.cumsum(counted) - counted
+    symbol_positions = np.bincount(pos_symbol, minlength=n_symbols)[order_symbol] + _prior_in_group(order_symbol, counted)
+    strategy_positions = (np.bincount(pos_strategy, minlength=n_strategies)[order_strategy]
+                          + _prior_in_group(order_strategy, counted))
+
+    for counts, limit, reject_flag, warn_flag in (
+        (open_positions, limits.max_open_positions, MAX_POSITIONS, APPROACHING_POSITIONS),
+        (strategy_positions, limits.max_positions_per_strategy, MAX_STRATEGY_POSITIONS, APPROACHING_STRATEGY_POSITIONS),
+        (symbol_positions, limits.max_positions_per_symbol, MAX_SYMBOL_POSITIONS, APPROACHING_SYMBOL_POSITIONS)
+    ):
+        at_limit = (counts >= limit) & ~reduces_only
+        reject[at_limit] |= reject_flag
+        warn[~at_limit & ~reduces_only & (counts >= limit * limits.warning_fraction)] |= warn_flag
+
+    # Single-asset concentration of the net exposure, existing plus earlier orders in the batch
+    net = existing + _prior_in_group(order_symbol, np.where(reject == 0, sides * sized_value, 0.0))
+    if math.isfinite(limits.max_single_asset_pct):
+        cap = limits.max_single_asset_pct / 100 * limits.account_value
+        headroom = cap - sides * net
+        over = sized_value > headroom
+        if limits.oversize_policy == "clip":
+            sized_value = np.where(over, np.maximum(headroom, 0.0), sized_value)
+            warn[over & (sized_value > 0)] |= SIZE_CLIPPED
+            reject[over & (sized_value <= 0)] |= CONCENTRATION
+        else:
+            reject[over] |= CONCENTRATION
+
+    # Capital, consumed in batch order by the new exposure only
+    passing = np.where(reject == 0, sized_value - np.minimum(sized_value, np.maximum(-sides * net, 0.0)), 0.0)
+    reject[(np.cumsum(passing) > limits.available_capital) & (passing > 0)] |= INSUFFICIENT_CAPITAL
+
+    approved = reject == 0
+    sized_qty = np.where(approved & valid, sized_value / np.where(valid, price, 1.0), 0.0)
+    risk_score = np.zeros(n)
+    for flag, score in WARNING_SCORES.items():
+        risk_score += np.where(warn & flag, score, 0.0)
+
+    return KernelResult(
+        approved=approved,
+        sized_qty=sized_qty,
+        value=value,
+        sized_value=np.where(approved, sized_value, 0.0),
+        position_pct=position_pct,
+        reject_codes=reject,
+        warning_codes=warn,
+        risk_score=risk_score,
+        open_positions=open_positions,
+        strategy_positions=strategy_positions,
+        symbol_positions=symbol_positions,
+        elapsed_ms=(time.perf_counter() - started) * 1000
+    )
+
+
+def benchmark(orders: int = 10000, positions: int = 8, seed: int = 5) -> Dict[str, Any]:
+    """Throughput of the kernel against the equivalent per-order dict loop"""
+    rng = np.random.default_rng(seed)
+    symbols = np.array([f"SYM{i}/USDT" for i in range(200)], dtype=object)
+    batch = OrderBatch(
+        symbols=rng.choice(symbols, orders),
+        sides=rng.choice(np.array([1, -1], dtype=np.int8), orders),
+        qty=rng.uniform(0.01, 2.0, orders),
+        price=rng.uniform(10, 500, orders),
+        strategies=rng.choice(np.array(['momentum', 'mean_reversion', 'breakout'], dtype=object), orders),
+        confidence=rng.uniform(0.5, 1.0, orders)
+    )
+    snapshot = PositionSnapshot(
+        symbols=rng.choice(symbols, positions),
+        strategies=rng.choice(np.array(['momentum', 'breakout'], dtype=object), positions),
+        exposure=rng.uniform(100, 1000, positions)
+    )
+    limits = KernelLimits(account_value=1e7, available_capital=5e6, max_position_value=500.0,
+                          max_position_pct=2.0, max_single_asset_pct=20.0, max_open_positions=5000,
+                          max_positions_per_strategy=2000, max_positions_per_symbol=30,
+                          min_confidence=0.6, oversize_policy="clip")
+
+    evaluate(batch, snapshot, limits)  # Warm-up
+    runs = [evaluate(batch, snapshot, limits) for _ in range(20)]
+    best = min(r.elapsed_ms for r in runs)
+
+    # Reference: the same static checks, one dict per order
+    records = [{'symbol': s, 'quantity': q, 'price': p, 'confidence': c}
+               for s, q, p, c in zip(batch.symbols, batch.qty, batch.price, batch.confidence)]
+    started = time.perf_counter()
+    for record in records:
+        value = record['quantity'] * record['price']
+        _ = value > min(limits.max_position_value, limits.max_position_pct / 100 * limits.available_capital)
+        _ = record['confidence'] < limits.min_confidence
+        _ = sum(1 for s in snapshot.symbols if s == record['symbol']) >= limits.max_positions_per_symbol
+    loop_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        'orders': orders,
+        'kernel_ms': best,
+        'orders_per_second': orders / best * 1000,
+        'dict_loop_ms': loop_ms,
+        'summary': runs[-1].summary()
+    }
+
+
+if __name__ == "__main__":
+    print("🧮 Pre-Trade Risk Kernel Benchmark:")
+    stats = benchmark()
+    print(f"   {stats['orders']:,} orders in {stats['kernel_ms']:.2f}ms → {stats['orders_per_second']:,.0f} orders/s "
+          f"(per-order dict loop, fewer checks: {stats['dict_loop_ms']:.1f}ms)")
+    print(f"   {stats['summary']}")
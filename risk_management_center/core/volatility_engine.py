@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Volatility Engine - ORION PHASE 4
+Historical volatility estimates for risk management
+
+Builds OHLC bars from the stored ``crypto_price`` ticks and keeps, per symbol:
+
+- realized volatility (std of close-to-close log returns over a rolling window)
+- EWMA volatility (RiskMetrics recursion, lambda = 0.94)
+- Parkinson volatility (high/low range)
+- Garman-Klass volatility (high/low range plus open/close)
+
+All estimates are scaled to daily volatility. New ticks are folded in
+incrementally: only completed bars update the estimators, the bar in progress is
+kept aside until it closes. Results are cached with a TTL, and expired symbols
+are refreshed together with one database query per risk cycle.
+"""
+
+import json
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from technical_analysis_center.indicators.indicator_engine import sma, stdev
+
+# Fallbacks when no price history is stored (daily volatility)
+DEFAULT_DAILY_VOLATILITY = {'BTC': 0.04, 'ETH': 0.05}
+DEFAULT_ALTCOIN_VOLATILITY = 0.06
+
+# CoinGecko stores coin ids, Binance stores tickers
+COINGECKO_IDS = {
+    'BITCOIN': 'BTC', 'ETHEREUM': 'ETH', 'BINANCECOIN': 'BNB', 'CARDANO': 'ADA',
+    'SOLANA': 'SOL', 'POLKADOT': 'DOT', 'POLYGON': 'MATIC', 'CHAINLINK': 'LINK',
+    'AVALANCHE-2': 'AVAX', 'UNISWAP': 'UNI'
+}
+
+GK_CLOSE_WEIGHT = 2 * math.log(2) - 1
+
+
+def base_asset(symbol: str) -> str:
+    """'BTC/USDT', 'BTCUSDT', 'BTC' and 'BITCOIN' all map to 'BTC'"""
+    symbol = (symbol or '').upper().split('/')[0]
+    if symbol in COINGECKO_IDS:
+        return COINGECKO_IDS[symbol]
+    for quote in ('USDT', 'USDC', 'USD'):
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)]
+    return symbol
+
+
+def default_volatility(symbol: str) -> float:
+    return DEFAULT_DAILY_VOLATILITY.get(base_asset(symbol), DEFAULT_ALTCOIN_VOLATILITY)
+
+
+def ticks_to_bars(timestamps: np.ndarray, prices: np.ndarray, bar_seconds: int) -> pd.DataFrame:
+    """Aggregate ticks into OHLC bars indexed by bar start (epoch seconds)"""
+    frame = pd.DataFrame({'price': prices}, index=(timestamps // bar_seconds * bar_seconds).astype(np.int64))
+    grouped = frame.groupby(level=0, sort=True)['price']
+    return pd.DataFrame({
+        'open': grouped.first(),
+        'high': grouped.max(),
+        'low': grouped.min(),
+        'close': grouped.last()
+    })
+
+
+def rolling_volatility(bars: pd.DataFrame, window: int = 24, bars_per_day: float = 24.0) -> pd.DataFrame:
+    """Vectorized rolling realized / Parkinson / Garman-Klass daily volatility for one OHLC frame"""
+    log_hl = np.log(bars['high'] / bars['low'])
+    log_co = np.log(bars['close'] / bars['open'])
+    returns = np.log(bars['close']).diff()
+    scale = math.sqrt(bars_per_day)
+
+    return pd.DataFrame({
+        'realized': stdev(returns, window) * scale,
+        'parkinson': np.sqrt(sma(log_hl ** 2, window) / (4 * math.log(2))) * scale,
+        'garman_klass': np.sqrt(np.clip(sma(0.5 * log_hl ** 2 - GK_CLOSE_WEIGHT * log_co ** 2, window), 0, None)) * scale
+    }, index=bars.index)
+
+
+@dataclass
+class VolatilityEstimate:
+    """Daily volatility estimates for one symbol"""
+    __slots__ = ("symbol", "realized", "ewma", "parkinson", "garman_klass", "bars", "source", "updated_at")
+
+    symbol: str
+    realized: float
+    ewma: float
+    parkinson: float
+    garman_klass: float
+    bars: int
+    source: str  # 'history' or 'default'
+    updated_at: float
+
+    @property
+    def daily(self) -> float:
+        """Conservative headline figure: the largest of the estimators"""
+        return max(self.realized, self.ewma, self.parkinson, self.garman_klass)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(asdict(self), daily=self.daily)
+
+
+class SymbolVolatilityState:
+    """Completed-bar window plus EWMA variance for one symbol"""
+
+    __slots__ = ("window", "ewma_lambda", "returns", "range_terms", "gk_terms",
+                 "ewma_var", "last_close", "last_bar", "pending", "bar_count")
+
+    def __init__(self, window: int, ewma_lambda: float):
+        self.window = window
+        self.ewma_lambda = ewma_lambda
+        self.returns = np.empty(0)
+        self.range_terms = np.empty(0)   # ln(H/L)^2
+        self.gk_terms = np.empty(0)      # 0.5 ln(H/L)^2 - (2 ln 2 - 1) ln(C/O)^2
+        self.ewma_var: Optional[float] = None
+        self.last_close: Optional[float] = None
+        self.last_bar: Optional[int] = None
+        self.pending: Optional[List[float]] = None  # [bar, open, high, low, close] still forming
+        self.bar_count = 0
+
+    def add_ticks(self, bars: pd.DataFrame):
+        """Fold a batch of tick-derived bars in; the newest bar stays pending"""
+        if bars.empty:
+            return
+        starts = bars.index.to_numpy()
+        values = bars[['open', 'high', 'low', 'close']].to_numpy(dtype=float)
+
+        # Ticks older than the bar in progress are too late to count
+        floor = self.pending[0] if self.pending is not None else self.last_bar
+        if floor is not None:
+            keep = starts >= floor if self.pending is not None else starts > floor
+            starts, values = starts[keep], values[keep]
+        if len(starts) == 0:
+            return
+
+        if self.pending is not None:
+            if starts[0] == self.pending[0]:
+                # First bar of the batch continues the pending one
+                _, o, h, l, _ = self.pending
+                values[0] = (o, max(h, values[0, 1]), min(l, values[0, 2]), values[0, 3])
+            else:
+                starts = np.concatenate(([self.pending[0]], starts))
+                values = np.vstack((self.pending[1:], values))
+
+        self.pending = [starts[-1], *values[-1]]
+        self.add_bars(starts[:-1], values[:-1])
+
+    def add_bars(self, starts: np.ndarray, values: np.ndarray):
+        """Update estimators with completed bars (columns open, high, low, close)"""
+        if len(starts) == 0:
+            return
+        opens, highs, lows, closes = values.T
+        if self.last_close is None:
+            returns = np.log(closes[1:] / closes[:-1])
+        else:
+            returns = np.log(closes / np.concatenate(([self.last_close], closes[:-1])))
+
+        log_hl = np.log(highs / lows)
+        log_co = np.log(closes / opens)
+
+        self.returns = np.concatenate((self.returns, returns))[-self.window:]
+        self.range_terms = np.concatenate((self.range_terms, log_hl ** 2))[-self.window:]
+        self.gk_terms = np.concatenate((self.gk_terms, 0.5 * log_hl ** 2 - GK_CLOSE_WEIGHT * log_co ** 2))[-self.window:]
+
+        if len(returns):
+            # var_n = lambda^n var_0 + (1 - lambda) sum(lambda^(n-1-i) r_i^2), seeded with the first square
+            lam = self.ewma_lambda
+            n = len(returns)
+            weights = lam ** np.arange(n - 1, -1, -1)
+            start = self.ewma_var if self.ewma_var is not None else float(returns[0] ** 2)
+            self.ewma_var = lam ** n * start + (1 - lam) * float(np.dot(weights, returns ** 2))
+
+        self.last_close = float(closes[-1])
+        self.last_bar = int(starts[-1])
+        self.bar_count += len(starts)
+
+    def estimate(self, symbol: str, bars_per_day: float, min_bars: int) -> Optional[VolatilityEstimate]:
+        if len(self.returns) < min_bars:
+            return None
+        scale = math.sqrt(bars_per_day)
+        return VolatilityEstimate(
+            symbol=symbol,
+            realized=float(np.std(self.returns, ddof=1)) * scale,
+            ewma=math.sqrt(self.ewma_var or 0.0) * scale,
+            parkinson=math.sqrt(float(self.range_terms.mean()) / (4 * math.log(2))) * scale,
+            garman_klass=math.sqrt(max(float(self.gk_terms.mean()), 0.0)) * scale,
+            bars=len(self.returns),
+            source='history',
+            updated_at=time.time()
+        )
+
+
+class VolatilityService:
+    """
+    TTL-cached volatility estimates for every traded symbol
+
+    ``get_volatilities`` refreshes all expired symbols with a single query that
+    only reads ticks newer than what has already been folded in.
+    """
+
+    def __init__(self, db_path: str = "databases/sqlite_dbs/free_sources_data.db",
+                 bar_seconds: int = 3600, window: int = 168, ewma_lambda: float = 0.94,
+                 ttl: float = 300.0, history_days: float = 30.0, min_bars: int = 12):
+        self.db_path = db_path
+        self.bar_seconds = bar_seconds
+        self.bars_per_day = 86400 / bar_seconds
+        self.window = window
+        self.ewma_lambda = ewma_lambda
+        self.ttl = ttl
+        self.history_days = history_days
+        self.min_bars = min_bars
+
+        self.states: Dict[str, SymbolVolatilityState] = {}
+        self.cache: Dict[str, Tuple[VolatilityEstimate, float]] = {}  # asset → (estimate, expires_at)
+        self.last_loaded: Dict[str, float] = {}                       # asset → newest tick timestamp read
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'queries': 0, 'ticks': 0}
+
+    def state(self, asset: str) -> SymbolVolatilityState:
+        state = self.states.get(asset)
+        if state is None:
+            state = self.states[asset] = SymbolVolatilityState(self.window, self.ewma_lambda)
+        return state
+
+    # ------------------------------------------------------------------ updates
+
+    def update_ticks(self, symbol: str, timestamps: Iterable[float], prices: Iterable[float]):
+        """Fold new price ticks in and invalidate the cached estimate"""
+        asset = base_asset(symbol)
+        timestamps = np.asarray(timestamps, dtype=float)
+        prices = np.asarray(prices, dtype=float)
+        valid = prices > 0
+        if not valid.any():
+            return
+        with self._lock:
+            self.state(asset).add_ticks(ticks_to_bars(timestamps[valid], prices[valid], self.bar_seconds))
+            self.cache.pop(asset, None)
+            self.stats['ticks'] += int(valid.sum())
+
+    def update_bar(self, symbol: str, bar_start: float, open_: float, high: float, low: float, close: float):
+        """Fold one completed OHLC bar in (for callers that already build bars)"""
+        asset = base_asset(symbol)
+        with self._lock:
+            self.state(asset).add_bars(np.array([int(bar_start)]), np.array([[open_, high, low, close]], dtype=float))
+            self.cache.pop(asset, None)
+
+    def load_history(self, assets: List[str]):
+        """Read ticks newer than the last load for all ``assets`` in one query"""
+        if not assets or not Path(self.db_path).exists():
+            return
+        floor = time.time() - self.history_days * 86400
+        since = min(self.last_loaded.get(asset, floor) for asset in assets)
+        try:
+            conn = sqlite3.connect(self.db_path)
+            rows = conn.execute("""
+                SELECT timestamp, symbol, raw_data FROM free_data
+                WHERE data_type = 'crypto_price' AND timestamp > ?
+                ORDER BY timestamp
+            """, (since,)).fetchall()
+            conn.close()
+        except sqlite3.Error:
+            return
+        self.stats['queries'] += 1
+
+        wanted = set(assets)
+        ticks: Dict[str, Tuple[List[float], List[float]]] = {}
+        for timestamp, symbol, raw in rows:
+            asset = base_asset(symbol)
+            if asset not in wanted or timestamp <= self.last_loaded.get(asset, floor):
+                continue
+            try:
+                record = json.loads(raw)
+                price = float(record.get('price') or record.get('price_usd') or 0)
+            except (ValueError, TypeError, AttributeError):
+                continue
+            series = ticks.setdefault(asset, ([], []))
+            series[0].append(timestamp)
+            series[1].append(price)
+
+        for asset, (timestamps, prices) in ticks.items():
+            self.update_ticks(asset, timestamps, prices)
+            self.last_loaded[asset] = timestamps[-1]
+        for asset in assets:
+            self.last_loaded.setdefault(asset, floor)
+
+    # ------------------------------------------------------------------ queries
+
+    def get_volatilities(self, symbols: Iterable[str]) -> Dict[str, VolatilityEstimate]:
+        """Estimates for all ``symbols`` (keyed as given); expired ones refreshed in one batch"""
+        symbols = list(dict.fromkeys(symbols))
+        now = time.time()
+        expired = sorted({base_asset(s) for s in symbols
+                          if base_asset(s) not in self.cache or self.cache[base_asset(s)][1] <= now})
+        self.stats['hits'] += len(symbols) - len(expired)
+        self.stats['misses'] += len(expired)
+
+        if expired:
+            self.load_history(expired)
+            with self._lock:
+                for asset in expired:
+                    estimate = self.state(asset).estimate(asset, self.bars_per_day, self.min_bars)
+                    if estimate is None:
+                        vol = default_volatility(asset)
+                        estimate = VolatilityEstimate(asset, vol, vol, vol, vol, 0, 'default', now)
+                    self.cache[asset] = (estimate, now + self.ttl)
+
+        return {symbol: self.cache[base_asset(symbol)][0] for symbol in symbols}
+
+    def get_volatility(self, symbol: str) -> VolatilityEstimate:
+        return self.get_volatilities([symbol])[symbol]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, symbols=len(self.states), cached=len(self.cache))
+
+
+_volatility_service: Optional[VolatilityService] = None
+_volatility_service_lock = threading.Lock()
+
+
+def get_volatility_service() -> VolatilityService:
+    """Process-wide shared volatility service"""
+    global _volatility_service
+    with _volatility_service_lock:
+        if _volatility_service is None:
+            _volatility_service = VolatilityService()
+        return _volatility_service
+
+
+def main():
+    """Self-test on a synthetic random walk with known volatility"""
+    print("📈 Testing Volatility Engine...")
+    rng = np.random.default_rng(7)
+    daily_vol = 0.04
+    tick_seconds = 300
+    steps = 30 * 288
+    timestamps = time.time() - steps * tick_seconds + np.arange(steps) * tick_seconds
+    returns = rng.normal(0, daily_vol / math.sqrt(288), steps)
+    prices = 65000 * np.exp(np.cumsum(returns))
+
+    service = VolatilityService(db_path="/nonexistent.db", ttl=60)
+    start = time.perf_counter()
+    for chunk in range(0, steps, 288):
+        service.update_ticks('BTCUSDT', timestamps[chunk:chunk + 288], prices[chunk:chunk + 288])
+    elapsed = (time.perf_counter() - start) * 1000
+
+    estimate = service.get_volatility('BTC/USDT')
+    print(f"   True daily vol {daily_vol:.4f} | realized {estimate.realized:.4f} ewma {estimate.ewma:.4f} "
+          f"parkinson {estimate.parkinson:.4f} garman-klass {estimate.garman_klass:.4f}")
+    print(f"   {steps:,} ticks folded in {elapsed:.1f}ms | ETH fallback {service.get_volatility('ETH/USDT').source}")
+
+    bars = ticks_to_bars(timestamps, prices, 3600)
+    print(f"   Rolling frame: {len(rolling_volatility(bars).dropna())} bars")
+    print(f"   Stats: {service.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+"""
+Equity Tracker - ORION PHASE 4
+Streaming equity, drawdown and exposure tracking from fills and mark ticks
+
+Every fill and every mark-price tick updates the running totals in O(1): only
+the touched position's contribution is removed and re-added, so equity,
+high-water mark, current / max drawdown, daily P&L and gross / net / per-strategy
+exposure are always current without re-summing the book.
+
+Snapshots are written to SQLite on a fixed interval and handed to listeners
+(the risk manager threshold checks, the dashboard reads the latest row); the
+write and the listener calls run after the state lock is released, so a slow
+disk or listener never holds up the stream thread.
+
+Reducing a position through a snapshot (``set_position`` / ``reconcile``)
+books the closed part at the mark, exactly like a closing fill, so a
+profitable close is not reported as a drawdown.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+DAY_SECONDS = 86400
+
+
+@dataclass
+class TrackedPosition:
+    """Signed position of one strategy in one symbol"""
+    symbol: str
+    strategy: str
+    size: float = 0.0
+    entry_price: float = 0.0
+    mark_price: float = 0.0
+
+    @property
+    def unrealized(self) -> float:
+        return self.size * (self.mark_price - self.entry_price)
+
+    @property
+    def notional(self) -> float:
+        return self.size * self.mark_price
+
+    def apply_fill(self, signed_qty: float, price: float) -> float:
+        """Apply a signed fill, returning the realized P&L"""
+        realized = 0.0
+        if self.size == 0 or (self.size > 0) == (signed_qty > 0):
+            new_size = self.size + signed_qty
+            self.entry_price = (self.size * self.entry_price + signed_qty * price) / new_size
+            self.size = new_size
+            return realized
+
+        closed = min(abs(signed_qty), abs(self.size))
+        direction = 1.0 if self.size > 0 else -1.0
+        realized = closed * (price - self.entry_price) * direction
+        self.size += signed_qty
+        if abs(self.size) < 1e-12:
+            self.size = 0.0
+            self.entry_price = 0.0
+        elif (self.size > 0) != (direction > 0):
+            # Flipped through zero: the remainder opens at the fill price
+            self.entry_price = price
+        return realized
+
+
+class EquityTracker:
+    """Incremental equity / drawdown / exposure state fed by the trade stream"""
+
+    def __init__(self, starting_equity: float = 10000.0,
+                 db_path: str = "databases/sqlite_dbs/equity_tracker.db",
+                 snapshot_interval: float = 60.0, restore: bool = True):
+        self.db_path = db_path
+        self.snapshot_interval = snapshot_interval
+        self._lock = threading.RLock()
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+        self.positions: Dict[Tuple[str, str], TrackedPosition] = {}
+        self._by_symbol: Dict[str, List[TrackedPosition]] = {}
+
+        # Running totals
+        self.cash_equity = starting_equity      # starting equity + realized - fees
+        self.realized_pnl = 0.0
+        self.fees = 0.0
+        self.unrealized_pnl = 0.0
+        self.gross_exposure = 0.0
+        self.net_exposure = 0.0
+        self.strategy_exposure: Dict[str, float] = {}
+        self.strategy_realized: Dict[str, float] = {}
+
+        self.high_water_mark = starting_equity
+        self.drawdown_pct = 0.0
+        self.max_drawdown_pct = 0.0
+        self.day = int(time.time() // DAY_SECONDS)
+        self.day_start_equity = starting_equity
+
+        self.events = 0
+        self.last_event_time = 0.0
+        self.last_snapshot_time = time.time()
+        self.snapshots_written = 0
+        self.seeded = False  # starting equity came from a snapshot, a fill or the account
+
+        self._setup_database()
+        if restore:
+            self.load_latest()
+
+    # ------------------------------------------------------------------ stream
+
+    @property
+    def equity(self) -> float:
+        return self.cash_equity + self.unrealized_pnl
+
+    def on_fill(self, symbol: str, side: str, qty: float, price: float,
+                fee: float = 0.0, strategy: str = "Unknown",
+                timestamp: Optional[float] = None) -> float:
+        """Fold one execution into the book, returning its realized P&L"""
+        if qty <= 0 or price <= 0:
+            return 0.0
+        signed_qty = qty if side.lower() in ('buy', 'long') else -qty
+        with self._lock:
+            position = self._position(symbol, strategy)
+            if position.mark_price <= 0:
+                position.mark_price = price
+            self._remove(position)
+            realized = position.apply_fill(signed_qty, price)
+            self._add(position)
+
+            self.fees += fee
+            self._book(strategy, realized, fee)
+            self.seeded = True
+            due = self._after_event(timestamp)
+        if due is not None:
+            self.flush(due)
+        return realized
+
+    def on_mark_price(self, symbol: str, price: float, timestamp: Optional[float] = None):
+        """Re-mark every strategy's position in a symbol"""
+        if price <= 0:
+            return
+        with self._lock:
+            holders = self._by_symbol.get(symbol)
+            if not holders:
+                return
+            for position in holders:
+                self._remove(position)
+                position.mark_price = price
+                self._add(position)
+            due = self._after_event(timestamp)
+        if due is not None:
+            self.flush(due)
+
+    def set_position(self, symbol: str, size: float, entry_price: float,
+                     mark_price: Optional[float] = None, strategy: str = "Unknown") -> float:
+        """Reconcile a position from an exchange/position snapshot, returning the realized P&L"""
+        with self._lock:
+            realized = self._set_position(symbol, size, entry_price, mark_price, strategy)
+            due = self._after_event(None)
+        if due is not None:
+            self.flush(due)
+        return realized
+
+    def _set_position(self, symbol: str, size: float, entry_price: float,
+                      mark_price: Optional[float], strategy: str) -> float:
+        position = self._position(symbol, strategy)
+        self._remove(position)
+        mark = mark_price if mark_price else (position.mark_price or entry_price)
+
+        # Whatever the snapshot no longer holds was closed at the mark
+        realized = 0.0
+        if position.size and (size * position.size <= 0 or abs(size) < abs(position.size)):
+            closed = abs(position.size) if size * position.size <= 0 else abs(position.size) - abs(size)
+            direction = 1.0 if position.size > 0 else -1.0
+            realized = closed * (mark - position.entry_price) * direction
+            self._book(strategy, realized, 0.0)
+
+        position.size = size
+        position.entry_price = (entry_price or position.entry_price) if size else 0.0
+        position.mark_price = mark
+        self._add(position)
+        return realized
+
+    def reconcile(self, positions: List[Tuple[str, float, float, float]]):
+        """Match net sizes to the exchange's (symbol, signed size, entry, mark) rows
+
+        Strategy-attributed positions are kept; any difference to the exchange
+        net position is booked against the ``Unknown`` strategy.
+        """
+        exchange = {symbol: (size, entry, mark) for symbol, size, entry, mark in positions}
+        due = None
+        with self._lock:
+            for symbol in set(exchange) | set(self._by_symbol):
+                held = self._by_symbol.get(symbol, ())
+                current_mark = next((p.mark_price for p in held if p.mark_price > 0), 0.0)
+                size, entry, mark = exchange.get(symbol, (0.0, current_mark, current_mark))
+                attributed = sum(p.size for p in held if p.strategy != "Unknown")
+                residual = size - attributed
+                if abs(residual) < 1e-12:
+                    residual = 0.0
+                unknown = self.positions.get((symbol, "Unknown"))
+                if residual == 0.0 and (unknown is None or unknown.size == 0.0):
+                    continue
+                self._set_position(symbol, residual, entry, mark or None, "Unknown")
+                due = self._after_event(None)
+        if due is not None:
+            self.flush(due)
+
+    def seed_equity(self, account_equity: float) -> bool:
+        """Start from the account's equity (unrealized included) when nothing was tracked yet"""
+        if account_equity <= 0:
+            return False
+        with self._lock:
+            if self.seeded:
+                return False
+            self.cash_equity = account_equity - self.unrealized_pnl
+            self.high_water_mark = account_equity
+            self.day_start_equity = account_equity
+            self.drawdown_pct = 0.0
+            self.max_drawdown_pct = 0.0
+            self.seeded = True
+        return True
+
+    def _position(self, symbol: str, strategy: str) -> TrackedPosition:
+        key = (symbol, strategy)
+        position = self.positions.get(key)
+        if position is None:
+            position = TrackedPosition(symbol=symbol, strategy=strategy)
+            self.positions[key] = position
+            self._by_symbol.setdefault(symbol, []).append(position)
+        return position
+
+    def _book(self, strategy: str, realized: float, fee: float):
+        self.realized_pnl += realized
+        self.cash_equity += realized - fee
+        self.strategy_realized[strategy] = self.strategy_realized.get(strategy, 0.0) + realized - fee
+
+    def _remove(self, position: TrackedPosition):
+        notional = position.notional
+        self.unrealized_pnl -= position.unrealized
+        self.gross_exposure -= abs(notional)
+        self.net_exposure -= notional
+        self.strategy_exposure[position.strategy] = self.strategy_exposure.get(position.strategy, 0.0) - abs(notional)
+
+    def _add(self, position: TrackedPosition):
+        notional = position.notional
+        self.unrealized_pnl += position.unrealized
+        self.gross_exposure += abs(notional)
+        self.net_exposure += notional
+        self.strategy_exposure[position.strategy] = self.strategy_exposure.get(position.strategy, 0.0) + abs(notional)
+
+    def _after_event(self, timestamp: Optional[float]) -> Optional[float]:
+        """Update HWM / drawdown / day; returns the snapshot time when a flush is due"""
+        now = timestamp if timestamp is not None else time.time()
+        self.events += 1
+        self.last_event_time = now
+
+        equity = self.equity
+        day = int(now // DAY_SECONDS)
+        if day != self.day:
+            self.day = day
+            self.day_start_equity = equity
+
+        if equity > self.high_water_mark:
+            self.high_water_mark = equity
+            self.drawdown_pct = 0.0
+        elif self.high_water_mark > 0:
+            self.drawdown_pct = (self.high_water_mark - equity) / self.high_water_mark * 100
+            if self.drawdown_pct > self.max_drawdown_pct:
+                self.max_drawdown_pct = self.drawdown_pct
+
+        if now - self.last_snapshot_time >= self.snapshot_interval:
+            self.last_snapshot_time = now
+            return now
+        return None
+
+    # --------------------------------------------------------------- snapshots
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]):
+        """Register a callback receiving every persisted snapshot"""
+        self._listeners.append(callback)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state as a plain dict"""
+        with self._lock:
+            equity = self.equity
+            return {
+                'timestamp': self.last_event_time or time.time(),
+                'equity': equity,
+                'cash_equity': self.cash_equity,
+                'realized_pnl': self.realized_pnl,
+                'unrealized_pnl': self.unrealized_pnl,
+                'fees': self.fees,
+                'high_water_mark': self.high_water_mark,
+                'drawdown_pct': self.drawdown_pct,
+                'max_drawdown_pct': self.max_drawdown_pct,
+                'daily_pnl': equity - self.day_start_equity,
+                'gross_exposure': self.gross_exposure,
+                'net_exposure': self.net_exposure,
+                'strategy_exposure': {k: v for k, v in self.strategy_exposure.items() if abs(v) > 1e-9},
+                'strategy_realized': dict(self.strategy_realized),
+                'open_positions': sum(1 for p in self.positions.values() if p.size),
+            }
+
+    def flush(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Persist a snapshot now and notify listeners (outside the state lock)"""
+        with self._lock:
+            snapshot = self.snapshot()
+            day_start_equity = self.day_start_equity
+            self.last_snapshot_time = now if now is not None else time.time()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute("""
+                    INSERT INTO equity_snapshots
+                    (timestamp, equity, cash_equity, realized_pnl, unrealized_pnl, fees,
+                     high_water_mark, drawdown_pct, max_drawdown_pct, daily_pnl, day_start_equity,
+                     gross_exposure, net_exposure, strategy_exposure)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (snapshot['timestamp'], snapshot['equity'], snapshot['cash_equity'],
+                      snapshot['realized_pnl'], snapshot['unrealized_pnl'], snapshot['fees'],
+                      snapshot['high_water_mark'], snapshot['drawdown_pct'], snapshot['max_drawdown_pct'],
+                      snapshot['daily_pnl'], day_start_equity, snapshot['gross_exposure'],
+                      snapshot['net_exposure'], json.dumps(snapshot['strategy_exposure'])))
+            self.snapshots_written += 1
+        except sqlite3.Error as e:
+            print(f"⚠️ Equity snapshot failed: {e}")
+
+        for callback in list(self._listeners):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"⚠️ Equity listener error: {e}")
+        return snapshot
+
+    def _setup_database(self):
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS equity_snapshots (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp REAL NOT NULL,
+                    equity REAL NOT NULL,
+                    cash_equity REAL,
+                    realized_pnl REAL,
+                    unrealized_pnl REAL,
+                    fees REAL,
+                    high_water_mark REAL,
+                    drawdown_pct REAL,
+                    max_drawdown_pct REAL,
+                    daily_pnl REAL,
+                    day_start_equity REAL,
+                    gross_exposure REAL,
+                    net_exposure REAL,
+                    strategy_exposure TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_equity_snapshots_ts ON equity_snapshots(timestamp)")
+
+    def load_latest(self) -> bool:
+        """Resume HWM, drawdown and realized equity from the last snapshot
+
+        Open positions are not restored here; they come back through
+        ``set_position`` / fills, so unrealized P&L is never counted twice.
+        """
+        row = latest_snapshot(self.db_path)
+        if not row:
+            return False
+        with self._lock:
+            self.seeded = True
+            self.cash_equity = row['cash_equity']
+            self.realized_pnl = row['realized_pnl'] or 0.0
+            self.fees = row['fees'] or 0.0
+            self.high_water_mark = max(row['high_water_mark'] or 0.0, self.cash_equity)
+            self.max_drawdown_pct = row['max_drawdown_pct'] or 0.0
+            if int(row['timestamp'] // DAY_SECONDS) == self.day and row['day_start_equity']:
+                self.day_start_equity = row['day_start_equity']
+            else:
+                self.day_start_equity = self.cash_equity
+            if self.high_water_mark > 0:
+                self.drawdown_pct = (self.high_water_mark - self.cash_equity) / self.high_water_mark * 100
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'events': self.events,
+            'positions': len(self.positions),
+            'snapshots_written': self.snapshots_written,
+            'snapshot_interval': self.snapshot_interval,
+        }
+
+
+def latest_snapshot(db_path: str = "databases/sqlite_dbs/equity_tracker.db") -> Optional[Dict[str, Any]]:
+    """Most recent persisted snapshot, or None when nothing has been tracked yet"""
+    if not os.path.exists(db_path):
+        return None
+    try:
+        with sqlite3.connect(db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute(
+                "SELECT * FROM equity_snapshots ORDER BY timestamp DESC, id DESC LIMIT 1").fetchone()
+    except sqlite3.Error:
+        return None
+    if row is None:
+        return None
+    snapshot = dict(row)
+    snapshot['strategy_exposure'] = json.loads(snapshot['strategy_exposure'] or '{}')
+    return snapshot
+
+
+_equity_tracker: Optional[EquityTracker] = None
+_equity_tracker_lock = threading.Lock()
+
+
+def get_equity_tracker() -> EquityTracker:
+    """Process-wide shared equity tracker (``seed_equity`` it from the account balance)"""
+    global _equity_tracker
+    with _equity_tracker_lock:
+        if _equity_tracker is None:
+            _equity_tracker = EquityTracker()
+        return _equity_tracker
+
+
+def main():
+    """Replay a synthetic fill / tick stream and report drawdown"""
+    import random
+    import tempfile
+
+    print("📉 Testing Equity Tracker...")
+    db_path = os.path.join(tempfile.mkdtemp(), "equity_tracker.db")
+    tracker = EquityTracker(starting_equity=10000.0, db_path=db_path, snapshot_interval=300)
+    tracker.add_listener(lambda s: None)
+
+    rng = random.Random(3)
+    start = time.time() - 3600
+    price = 65000.0
+    tracker.on_fill('BTCUSDT', 'Buy', 0.05, price, fee=1.8, strategy='AI_Momentum_Breakout', timestamp=start)
+    tracker.on_fill('ETHUSDT', 'Sell', 1.0, 3500.0, fee=1.2, strategy='Mean_Reversion', timestamp=start)
+
+    ticks = 100000
+    begin = time.perf_counter()
+    for i in range(ticks):
+        price *= 1 + rng.gauss(0, 0.0005)
+        tracker.on_mark_price('BTCUSDT', price, timestamp=start + i * 0.036)
+    elapsed = (time.perf_counter() - begin) * 1e6 / ticks
+
+    tracker.on_fill('BTCUSDT', 'Sell', 0.05, price, fee=1.8, strategy='AI_Momentum_Breakout')
+    snapshot = tracker.flush()
+    print(f"   Equity ${snapshot['equity']:,.2f} | HWM ${snapshot['high_water_mark']:,.2f} "
+          f"| DD {snapshot['drawdown_pct']:.2f}% (max {snapshot['max_drawdown_pct']:.2f}%)")
+    print(f"   Gross ${snapshot['gross_exposure']:,.0f} | per strategy {snapshot['strategy_exposure']}")
+    print(f"   {ticks:,} mark ticks at {elapsed:.2f}µs each | {tracker.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
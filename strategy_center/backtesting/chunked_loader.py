@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Chunked Historical Loader - Backtesting
+Time-ordered OHLCV chunks from the bar store under a fixed memory budget
+
+``load_historical_data`` materializes the whole lookback as one frame, which is
+fine for a month of hourly bars and hopeless for years of minute bars. The
+loader pages the ``ohlcv_bars`` table of ``bar_builder`` by time window and
+yields wide frames (``<SYMBOL>_price`` close plus ``_open/_high/_low/_volume``,
+the layout ``BarData.from_frame`` reads) one chunk at a time:
+
+- the chunk size is derived from ``memory_budget_mb``, so peak memory depends
+  on the budget and the number of symbols, not on the length of the history
+- every chunk starts with ``warmup_rows`` rows repeated from the previous one,
+  enough for rolling indicators to be exact on the first new row
+- every chunk ends with ``lookahead_rows`` rows that belong to the next one,
+  so fill models that trade on later bars see them; those rows are yielded
+  again as the next chunk's body
+- prices are forward-filled across chunk boundaries from the last value seen
+
+Engines keep whatever else they need (positions, open orders, recursive
+indicator states) between chunks; ``HistoricalChunk.offset`` is the global
+row number of the chunk's first row.
+"""
+
+import sqlite3
+import sys
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from core_orchestration.data_pipeline.bar_builder import TIMEFRAMES, get_bar_builder
+
+SUFFIXES = ('open', 'high', 'low', 'price', 'volume')
+
+# Bytes a frame row costs per symbol column beyond the raw float64s
+# (SQLite tuples, the pivot arrays and pandas' block copies while concatenating)
+ROW_OVERHEAD = 4
+
+
+@dataclass
+class HistoricalChunk:
+    """One slice of history: warm-up rows, the rows it owns, look-ahead rows"""
+    frame: pd.DataFrame
+    offset: int       # global row number of frame row 0
+    warmup: int       # leading rows already owned by the previous chunk
+    body: int         # rows owned by this chunk
+    final: bool
+
+    @property
+    def body_start(self) -> int:
+        return self.warmup
+
+    @property
+    def body_end(self) -> int:
+        return self.warmup + self.body
+
+    @property
+    def lookahead(self) -> int:
+        return len(self.frame) - self.body_end
+
+
+class ChunkedBarLoader:
+    """Iterate stored bars of several symbols as bounded, time-ordered chunks"""
+
+    def __init__(self, symbols: Sequence[str], timeframe: str = '1h', start: Optional[float] = None,
+                 end: Optional[float] = None, memory_budget_mb: float = 64.0, warmup_rows: int = 0,
+                 lookahead_rows: int = 0, db_path: Optional[str] = None):
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"Unknown timeframe: {timeframe}")
+        self.symbols = list(symbols)
+        self.timeframe = timeframe
+        self.seconds = TIMEFRAMES[timeframe]
+        self.start = start
+        self.end = end
+        self.warmup_rows = warmup_rows
+        self.lookahead_rows = lookahead_rows
+        self.db_path = db_path or get_bar_builder().db_path
+
+        # Budget covers the buffer (context, unowned rows, one block in flight) and the yielded copy
+        row_bytes = len(SUFFIXES) * max(len(self.symbols), 1) * 8 * ROW_OVERHEAD
+        budget_rows = int(memory_budget_mb * 1024 * 1024 // row_bytes)
+        self.chunk_rows = (budget_rows - 2 * (warmup_rows + lookahead_rows)) // 3
+        if self.chunk_rows < 1:
+            raise ValueError(f"{memory_budget_mb}MB cannot hold {warmup_rows + lookahead_rows} context rows "
+                             f"for {len(self.symbols)} symbols")
+        self.stats = {'chunks': 0, 'rows': 0, 'queries': 0, 'peak_rows': 0, 'chunk_rows': self.chunk_rows}
+
+    def bounds(self) -> Optional[Tuple[int, int]]:
+        """[start, end) in epoch seconds, defaulting to everything stored"""
+        start, end = self.start, self.end
+        if start is None or end is None:
+            marks = ','.join('?' * len(self.symbols))
+            conn = sqlite3.connect(self.db_path)
+            low, high = conn.execute(
+                f"SELECT MIN(start), MAX(start) FROM ohlcv_bars WHERE timeframe = ? AND symbol IN ({marks})",
+                (self.timeframe, *self.symbols)).fetchone()
+            conn.close()
+            if low is None:
+                return None
+            start = low if start is None else start
+            end = high + self.seconds if end is None else end
+        return int(start), int(end)
+
+    def __iter__(self) -> Iterator[HistoricalChunk]:
+        buffer: Optional[pd.DataFrame] = None
+        offset = 0      # global row number of buffer row 0
+        owned = 0       # global rows already yielded as a chunk body
+
+        for block in self._blocks():
+            buffer = block if buffer is None else pd.concat((buffer, block))
+            self.stats['peak_rows'] = max(self.stats['peak_rows'], len(buffer))
+            while len(buffer) - (owned - offset) >= self.chunk_rows + self.lookahead_rows:
+                chunk = self._chunk(buffer, offset, owned, self.chunk_rows, final=False)
+                yield chunk
+                owned += chunk.body
+                keep_from = max(0, owned - self.warmup_rows - offset)
+                buffer, offset = buffer.iloc[keep_from:], offset + keep_from
+
+        if buffer is not None and offset + len(buffer) > owned:
+            yield self._chunk(buffer, offset, owned, offset + len(buffer) - owned, final=True)
+
+    def _chunk(self, buffer: pd.DataFrame, offset: int, owned: int, body: int, final: bool) -> HistoricalChunk:
+        warmup = owned - offset
+        stop = warmup + body + (0 if final else self.lookahead_rows)
+        self.stats['chunks'] += 1
+        self.stats['rows'] += body
+        return HistoricalChunk(frame=buffer.iloc[:stop].copy(), offset=offset, warmup=warmup,
+                               body=body, final=final)
+
+    def _blocks(self) -> Iterator[pd.DataFrame]:
+        """Time windows of at most ``chunk_rows`` bars, pivoted and forward-filled"""
+        bounds = self.bounds()
+        if bounds is None:
+            return
+        start, end = bounds
+        start = start // self.seconds * self.seconds
+        window = self.chunk_rows * self.seconds
+        carry: Optional[np.ndarray] = None
+
+        for lower in range(start, end, window):
+            upper = min(lower + window, end)
+            conn = sqlite3.connect(self.db_path)
+            per_symbol = []
+            for symbol in self.symbols:
+                rows = conn.execute("""
+                    SELECT start, open, high, low, close, volume FROM ohlcv_bars
+                    WHERE symbol = ? AND timeframe = ? AND start >= ? AND start < ?
+                """, (symbol, self.timeframe, lower, upper)).fetchall()
+                per_symbol.append(np.array(rows, dtype=float).reshape(-1, 1 + len(SUFFIXES)))
+            conn.close()
+            self.stats['queries'] += len(self.symbols)
+            if not any(len(data) for data in per_symbol):
+                continue
+
+            symbol_rows = np.repeat(np.arange(len(self.symbols)), [len(data) for data in per_symbol])
+            data = np.concatenate(per_symbol)
+            del per_symbol
+            times, slot = np.unique(data[:, 0].astype(np.int64), return_inverse=True)
+            values = np.full((len(times), len(self.symbols), len(SUFFIXES)), np.nan)
+            values[slot, symbol_rows] = data[:, 1:]
+
+            # Carry prices over gaps and chunk boundaries; missing volume is zero
+            prices = values[:, :, :4]
+            if carry is not None:
+                prices = np.concatenate((carry[np.newaxis], prices))
+            prices = pd.DataFrame(prices.reshape(len(prices), -1)).ffill().to_numpy().reshape(prices.shape)
+            if carry is not None:
+                prices = prices[1:]
+            values[:, :, :4] = prices
+            values[:, :, 4] = np.nan_to_num(values[:, :, 4])
+            carry = prices[-1].copy()
+
+            columns = [f"{symbol}_{suffix}" for symbol in self.symbols for suffix in SUFFIXES]
+            yield pd.DataFrame(values.reshape(len(times), -1), columns=columns,
+                               index=pd.to_datetime(times, unit='s'))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
+
+
+def main():
+    """Demo: stream 90 days of synthetic 1m bars for 4 symbols through a 4MB budget"""
+    import tempfile
+    import time
+    import tracemalloc
+    from core_orchestration.data_pipeline.bar_builder import FIELDS, BarBuilder
+
+    print("🧱 Chunked Historical Loader")
+    print("=" * 50)
+
+    rng = np.random.default_rng(4)
+    n = 90 * 1440
+    starts = 1_672_531_200 + np.arange(n, dtype=np.int64) * 60
+    with tempfile.TemporaryDirectory() as tmp:
+        builder = BarBuilder(db_path=os.path.join(tmp, "bars.db"), restore=False)
+        symbols = ['BTC', 'ETH', 'SOL', 'XRP']
+        for symbol in symbols:
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.0005, n)))
+            bars = np.column_stack((close, close, close, close, rng.exponential(5, n), np.ones(n)))
+            builder.store_bars(symbol, '1m', starts, bars[:, :len(FIELDS)])
+
+        loader = ChunkedBarLoader(symbols, '1m', memory_budget_mb=4, warmup_rows=20, db_path=builder.db_path)
+        tracemalloc.start()
+        started = time.perf_counter()
+        total = 0.0
+        for chunk in loader:
+            body = chunk.frame.iloc[chunk.body_start:chunk.body_end]
+            total += body['BTC_volume'].sum()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"   {loader.stats['rows']:,} rows in {loader.stats['chunks']} chunks, {elapsed:.1f}s")
+        print(f"   peak traced memory {peak / 1024 / 1024:.1f}MB (budget 4MB), {loader.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
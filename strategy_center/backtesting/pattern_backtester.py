@@ -12,10 +12,21 @@ from typing import Dict, List, Any, Tuple, Optional
 import sqlite3
 from pathlib import Path
 import json
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 import warnings
+import math
+import sys
+import os
 warnings.filterwarnings('ignore')
 
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from strategy_center.backtesting.fill_models import (BarCloseFill, BarData, FeeSchedule, FillModel, OrderBatch,
+                                                     VolumeQueue)
+from technical_analysis_center.indicators.indicator_cache import get_indicator_cache
+from core_orchestration.data_pipeline.bar_builder import get_bar_builder
+from strategy_center.backtesting.chunked_loader import ChunkedBarLoader, HistoricalChunk
+
 @dataclass
 class BacktestResult:
     pattern_id: str
@@ -41,6 +52,22 @@ class BacktestResult:
     volatility: float
     metadata: Dict[str, Any]
 
+@dataclass
+class ChunkedPatternRun:
+    """State of one pattern on one symbol carried from chunk to chunk"""
+    pattern: Dict[str, Any]
+    symbol: str
+    position: Optional[Dict[str, Any]] = None
+    entry_fills: Dict[int, Tuple[float, float, float, Any]] = field(default_factory=dict)
+    entry_queue: VolumeQueue = field(default_factory=VolumeQueue)  # volume taken by earlier chunks' entries
+    exit_queue: VolumeQueue = field(default_factory=VolumeQueue)
+    trades: List[Dict[str, Any]] = field(default_factory=list)
+    bars: int = 0
+    start_time: Optional[pd.Timestamp] = None
+    end_time: Optional[pd.Timestamp] = None
+    last_prices: Optional[pd.Series] = None
+    failed: bool = False
+
 @dataclass
 class PatternBacktestResult:
     pattern_type: str
@@ -70,6 +97,22 @@ class AdvancedPatternBacktester:
         self.commission_rate = 0.001  # 0.1% commission
         self.slippage_rate = 0.0005   # 0.05% slippage
         
+        # Execution simulation (swap for NextOpenFill, VolumeParticipationFill, L2ReplayFill...)
+        self.fill_model: FillModel = BarCloseFill(
+            slippage_bps=self.slippage_rate * 1e4,
+            fees=FeeSchedule.flat(self.commission_rate * 1e4)
+        )
+        
+        # Shared indicator cache; patterns on the same symbol reuse SMA/volatility
+        self.indicator_cache = get_indicator_cache()
+        
+        # OHLCV bar store (live-built and backfilled from exchange archives)
+        self.bar_builder = get_bar_builder()
+        
+        # Stored history is streamed in chunks that fit this budget
+        self.memory_budget_mb = 64.0
+        self.chunk_timeframe = '1h'
+        
         # Performance metrics
         self.risk_free_rate = 0.02    # 2% annual risk-free rate
         
@@ -141,19 +184,22 @@ class AdvancedPatternBacktester:
         # 1. Load patterns to test
         patterns = await self.load_patterns_for_testing()
         
-        # 2. Load historical market data
-        historical_data = await self.load_historical_data(lookback_days)
-        
-        # 3. Run backtests for each pattern
-        backtest_results = []
-        for pattern in patterns:
-            try:
-                result = await self.backtest_single_pattern(pattern, historical_data)
-                if result:
-                    backtest_results.append(result)
-            except Exception as e:
-                print(f"⚠️ Error backtesting pattern {pattern.get('pattern_id', 'unknown')}: {e}")
-                continue
+        # 2./3. Stream stored bars chunk by chunk; without a bar store, load in memory
+        loader = self.historical_chunks(lookback_days)
+        if loader is not None:
+            backtest_results = await self.backtest_patterns_chunked(patterns, loader)
+        else:
+            historical_data = await self.load_historical_data(lookback_days)
+            
+            backtest_results = []
+            for pattern in patterns:
+                try:
+                    result = await self.backtest_single_pattern(pattern, historical_data)
+                    if result:
+                        backtest_results.append(result)
+                except Exception as e:
+                    print(f"⚠️ Error backtesting pattern {pattern.get('pattern_id', 'unknown')}: {e}")
+                    continue
         
         # 4. Analyze results by pattern type
         pattern_analysis = await self.analyze_pattern_performance(backtest_results)
@@ -255,6 +301,12 @@ class AdvancedPatternBacktester:
     async def load_historical_data(self, lookback_days: int) -> pd.DataFrame:
         """Load historical market data for backtesting"""
         try:
+            # Most recent stored hourly bars
+            bars = self.bar_builder.get_frame(self.bar_builder.symbols(), '1h', limit=lookback_days * 24)
+            if len(bars) >= 48:
+                print(f"📼 Using {len(bars)} stored hourly bars for {len(bars.columns) // 5} symbols")
+                return bars
+            
             # Try to load from free sources database
             free_data_db = "databases/sqlite_dbs/free_sources_data.db"
             if Path(free_data_db).exists():
@@ -284,6 +336,26 @@ class AdvancedPatternBacktester:
             print(f"⚠️ Error loading historical data: {e}")
             return await self.generate_sample_historical_data(lookback_days)
     
+    def historical_chunks(self, lookback_days: int) -> Optional[ChunkedBarLoader]:
+        """Chunked loader over the most recent ``lookback_days`` of stored bars, if there are any"""
+        symbols = self.bar_builder.symbols()
+        if not symbols:
+            return None
+        loader = ChunkedBarLoader(symbols, self.chunk_timeframe, memory_budget_mb=self.memory_budget_mb,
+                                  warmup_rows=20, db_path=self.bar_builder.db_path)
+        bounds = loader.bounds()
+        if bounds is None or bounds[1] - bounds[0] < 48 * loader.seconds:
+            return None
+        loader.start = max(bounds[0], bounds[1] - lookback_days * 86400)
+        loader.lookahead_rows = self.fill_lookahead_bars(loader.seconds)
+        return loader
+    
+    def fill_lookahead_bars(self, bar_seconds: float) -> int:
+        """Bars after a decision the fill model may trade on"""
+        model = self.fill_model
+        latency = int(math.ceil(model.latency_ms / 1000.0 / bar_seconds))
+        return model.arrival_offset + latency + getattr(model, 'max_bars', 0)
+    
     def process_historical_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Process raw historical data into backtesting format"""
         df['datetime'] = pd.to_datetime(df['timestamp'], unit='s')
@@ -362,43 +434,17 @@ class AdvancedPatternBacktester:
                     continue
                 
                 # Run the backtest simulation
-                trades = await self.simulate_pattern_trades(pattern, price_data)
+                volume_column = f"{symbol}_volume"
+                volume_data = historical_data[volume_column] if volume_column in historical_data.columns else None
+                trades = await self.simulate_pattern_trades(pattern, price_data, volume_data)
                 
                 if not trades:
                     continue
                 
                 # Calculate performance metrics
                 performance = self.calculate_performance_metrics(trades, price_data)
-                
-                # Create backtest result
-                result = BacktestResult(
-                    pattern_id=pattern_id,
-                    symbol=symbol,
-                    start_date=price_data.index[0].to_pydatetime(),
-                    end_date=price_data.index[-1].to_pydatetime(),
-                    total_trades=performance['total_trades'],
-                    winning_trades=performance['winning_trades'],
-                    losing_trades=performance['losing_trades'],
-                    win_rate=performance['win_rate'],
-                    total_return=performance['total_return'],
-                    total_return_percentage=performance['total_return_percentage'],
-                    sharpe_ratio=performance['sharpe_ratio'],
-                    sortino_ratio=performance['sortino_ratio'],
-                    max_drawdown=performance['max_drawdown'],
-                    calmar_ratio=performance['calmar_ratio'],
-                    profit_factor=performance['profit_factor'],
-                    avg_win=performance['avg_win'],
-                    avg_loss=performance['avg_loss'],
-                    avg_trade_duration=performance['avg_trade_duration'],
-                    best_trade=performance['best_trade'],
-                    worst_trade=performance['worst_trade'],
-                    volatility=performance['volatility'],
-                    metadata={
-                        'pattern_type': pattern['pattern_type'],
-                        'pattern_confidence': pattern['confidence'],
-                        'trades_data': trades[:10]  # Store sample trades
-                    }
-                )
+                result = self.create_backtest_result(pattern, symbol, trades, performance,
+                                                     price_data.index[0], price_data.index[-1])
                 
                 return result
                 
@@ -408,22 +454,68 @@ class AdvancedPatternBacktester:
         
         return None
     
-    async def simulate_pattern_trades(self, pattern: Dict[str, Any], price_data: pd.Series) -> List[Dict[str, Any]]:
-        """Simulate trades based on pattern logic"""
-        trades = []
-        
-        # Simple pattern simulation
-        entry_conditions = pattern['entry_conditions']
-        exit_conditions = pattern['exit_conditions']
-        
+    def create_backtest_result(self, pattern: Dict[str, Any], symbol: str, trades: List[Dict[str, Any]],
+                               performance: Dict[str, float], start: pd.Timestamp, end: pd.Timestamp) -> BacktestResult:
+        """Backtest result of one pattern on one symbol"""
+        return BacktestResult(
+            pattern_id=pattern['pattern_id'],
+            symbol=symbol,
+            start_date=start.to_pydatetime(),
+            end_date=end.to_pydatetime(),
+            total_trades=performance['total_trades'],
+            winning_trades=performance['winning_trades'],
+            losing_trades=performance['losing_trades'],
+            win_rate=performance['win_rate'],
+            total_return=performance['total_return'],
+            total_return_percentage=performance['total_return_percentage'],
+            sharpe_ratio=performance['sharpe_ratio'],
+            sortino_ratio=performance['sortino_ratio'],
+            max_drawdown=performance['max_drawdown'],
+            calmar_ratio=performance['calmar_ratio'],
+            profit_factor=performance['profit_factor'],
+            avg_win=performance['avg_win'],
+            avg_loss=performance['avg_loss'],
+            avg_trade_duration=performance['avg_trade_duration'],
+            best_trade=performance['best_trade'],
+            worst_trade=performance['worst_trade'],
+            volatility=performance['volatility'],
+            metadata={
+                'pattern_type': pattern['pattern_type'],
+                'pattern_confidence': pattern['confidence'],
+                'trades_data': trades[:10]  # Store sample trades
+            }
+        )
+    
+    async def simulate_pattern_trades(self, pattern: Dict[str, Any], price_data: pd.Series,
+                                      volume_data: Optional[pd.Series] = None) -> List[Dict[str, Any]]:
+        """Simulate trades based on pattern logic, then fill them through the fill model"""
         # Calculate some basic indicators
         returns = price_data.pct_change()
-        sma_20 = price_data.rolling(window=20).mean()
-        volatility = returns.rolling(window=20).std()
+        symbol = str(price_data.name)
+        sma_20 = pd.Series(self.indicator_cache.compute("sma", price_data, symbol, "price", period=20),
+                           index=price_data.index)
+        volatility = pd.Series(self.indicator_cache.compute("stdev", returns, symbol, "returns", period=20),
+                               index=price_data.index)
+        
+        trades, _, _ = self.scan_pattern_bars(pattern, price_data, returns, sma_20, 20, len(price_data) - 1)
         
-        position = None
+        return self.apply_fill_model(trades, price_data, volume_data)
+    
+    def scan_pattern_bars(self, pattern: Dict[str, Any], price_data: pd.Series, returns: pd.Series,
+                          sma_20: pd.Series, start: int, stop: int, position: Optional[Dict[str, Any]] = None,
+                          offset: int = 0) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Pattern entry/exit decisions on bars ``start``..``stop - 1``
+        
+        Bar numbers in positions and trades are ``offset + i``, so a run split
+        into chunks keeps one numbering. Returns the closed trades, the position
+        still open and the positions opened on these bars.
+        """
+        exit_conditions = pattern['exit_conditions']
+        trades = []
+        opened = []
         
-        for i in range(20, len(price_data) - 1):  # Start after SMA calculation
+        for i in range(start, stop):
             current_price = price_data.iloc[i]
             current_return = returns.iloc[i]
             current_sma = sma_20.iloc[i]
@@ -446,12 +538,14 @@ class AdvancedPatternBacktester:
                 take_profit_ratio = exit_conditions.get('take_profit_ratio', 2.0)
                 
                 position = {
+                    'entry_bar': offset + i,
                     'entry_time': price_data.index[i],
                     'entry_price': current_price,
                     'stop_loss': current_price * (1 - stop_loss_pct),
                     'take_profit': current_price * (1 + stop_loss_pct * take_profit_ratio),
                     'position_size': self.initial_capital * pattern['risk_parameters'].get('max_position_size', 0.05) / current_price
                 }
+                opened.append(position)
                 continue
             
             # Exit logic
@@ -460,6 +554,8 @@ class AdvancedPatternBacktester:
                 if current_price <= position['stop_loss']:
                     pnl = (current_price - position['entry_price']) * position['position_size']
                     trades.append({
+                        'entry_bar': position['entry_bar'],
+                        'exit_bar': offset + i,
                         'entry_time': position['entry_time'],
                         'exit_time': price_data.index[i],
                         'entry_price': position['entry_price'],
@@ -474,6 +570,8 @@ class AdvancedPatternBacktester:
                 elif current_price >= position['take_profit']:
                     pnl = (current_price - position['entry_price']) * position['position_size']
                     trades.append({
+                        'entry_bar': position['entry_bar'],
+                        'exit_bar': offset + i,
                         'entry_time': position['entry_time'],
                         'exit_time': price_data.index[i],
                         'entry_price': position['entry_price'],
@@ -485,7 +583,145 @@ class AdvancedPatternBacktester:
                     })
                     position = None
         
-        return trades
+        return trades, position, opened
+    
+    def apply_fill_model(self, trades: List[Dict[str, Any]], price_data: pd.Series,
+                         volume_data: Optional[pd.Series] = None) -> List[Dict[str, Any]]:
+        """Re-price signal-level trades with realistic fills and fees, in two batched calls
+        
+        Entries may fill partially or not at all; exits always complete for the
+        quantity actually entered.
+        """
+        if not trades:
+            return trades
+        
+        bars = BarData.from_series(price_data, volume_data)
+        entries = self.fill_model.fill(
+            OrderBatch.create([t['entry_bar'] for t in trades], 1.0, [t['position_size'] for t in trades]),
+            bars
+        )
+        kept = np.flatnonzero(entries.filled)
+        exits = self.fill_model.fill(
+            OrderBatch.create([trades[k]['exit_bar'] for k in kept], -1.0, entries.qty[kept], complete=True),
+            bars
+        )
+        
+        return [self.filled_trade(trades[k], float(entries.qty[k]), float(entries.price[k]), float(exits.price[j]),
+                                  float(entries.fee[k] + exits.fee[j]), price_data.index[int(entries.bar[k])],
+                                  price_data.index[int(exits.bar[j])])
+                for j, k in enumerate(kept)]
+    
+    @staticmethod
+    def filled_trade(trade: Dict[str, Any], size: float, entry_price: float, exit_price: float, fees: float,
+                     entry_time: pd.Timestamp, exit_time: pd.Timestamp) -> Dict[str, Any]:
+        """Signal-level trade re-priced at its fills"""
+        pnl = (exit_price - entry_price) * size - fees
+        filled = dict(trade)
+        filled.update({
+            'signal_entry_price': float(trade['entry_price']),
+            'signal_exit_price': float(trade['exit_price']),
+            'entry_price': entry_price,
+            'exit_price': exit_price,
+            'entry_time': entry_time,
+            'exit_time': exit_time,
+            'position_size': size,
+            'fees': fees,
+            'pnl': pnl,
+            'pnl_percentage': pnl / (entry_price * size)
+        })
+        return filled
+    
+    async def backtest_patterns_chunked(self, patterns: List[Dict[str, Any]],
+                                        loader: ChunkedBarLoader) -> List[BacktestResult]:
+        """Backtest every pattern in one pass over the stored history, chunk by chunk
+        
+        Positions, filled entries and closed trades are carried across chunks;
+        SMA and returns are exact from the loader's warm-up rows. Orders are
+        filled per chunk against the look-ahead rows, so exits that must
+        complete finish at the latest on the chunk's last look-ahead bar.
+        """
+        runs = [ChunkedPatternRun(pattern, symbol) for pattern in patterns
+                for symbol in pattern['symbols'] if symbol in loader.symbols]
+        for chunk in loader:
+            for run in runs:
+                if run.failed:
+                    continue
+                try:
+                    self.advance_pattern_run(run, chunk)
+                except Exception as e:
+                    print(f"⚠️ Error backtesting pattern {run.pattern.get('pattern_id', 'unknown')}: {e}")
+                    run.failed = True
+        print(f"🧱 Streamed {loader.stats['rows']:,} bars in {loader.stats['chunks']} chunks "
+              f"(peak {loader.stats['peak_rows']:,} rows buffered)")
+        
+        results = []
+        for pattern in patterns:
+            for run in runs:
+                if run.pattern is not pattern or run.failed or run.bars < 50 or not run.trades:
+                    continue
+                performance = self.calculate_performance_metrics(run.trades, run.last_prices)
+                results.append(self.create_backtest_result(pattern, run.symbol, run.trades, performance,
+                                                           run.start_time, run.end_time))
+                break
+        return results
+    
+    def advance_pattern_run(self, run: ChunkedPatternRun, chunk: HistoricalChunk):
+        """Run one pattern/symbol through the bars a chunk owns, then fill what it decided"""
+        price_data = chunk.frame[f"{run.symbol}_price"]
+        valid = np.flatnonzero(price_data.notna().to_numpy())
+        if not len(valid):
+            return
+        # Prices are forward-filled, so only a symbol's first chunk can start with gaps
+        first = int(valid[0])
+        body_start = max(chunk.body_start - first, 0)
+        body_end = chunk.body_end - first
+        if body_end <= body_start:
+            return
+        price_data = price_data.iloc[first:]
+        volume_column = f"{run.symbol}_volume"
+        volume_data = chunk.frame[volume_column].iloc[first:] if volume_column in chunk.frame.columns else None
+        offset = run.bars - body_start
+        
+        returns = price_data.pct_change()
+        sma_20 = pd.Series(self.indicator_cache.compute("sma", price_data, run.symbol, "price", period=20),
+                           index=price_data.index)
+        stop = body_end - 1 if chunk.final else body_end
+        trades, run.position, opened = self.scan_pattern_bars(run.pattern, price_data, returns, sma_20,
+                                                              max(body_start, 20 - offset), stop,
+                                                              run.position, offset)
+        
+        bars = BarData.from_series(price_data, volume_data)
+        run.entry_queue.origin = run.exit_queue.origin = offset
+        if opened:
+            entries = self.fill_model.fill(
+                OrderBatch.create([p['entry_bar'] - offset for p in opened], 1.0,
+                                  [p['position_size'] for p in opened]),
+                bars, run.entry_queue
+            )
+            for k, p in enumerate(opened):
+                if entries.filled[k]:
+                    run.entry_fills[p['entry_bar']] = (float(entries.qty[k]), float(entries.price[k]),
+                                                       float(entries.fee[k]), price_data.index[int(entries.bar[k])])
+        
+        closed = [t for t in trades if t['entry_bar'] in run.entry_fills]
+        if closed:
+            entry_fills = [run.entry_fills.pop(t['entry_bar']) for t in closed]
+            exits = self.fill_model.fill(
+                OrderBatch.create([t['exit_bar'] - offset for t in closed], -1.0,
+                                  [fill[0] for fill in entry_fills], complete=True),
+                bars, run.exit_queue
+            )
+            for j, (trade, (size, entry_price, entry_fee, entry_time)) in enumerate(zip(closed, entry_fills)):
+                run.trades.append(self.filled_trade(trade, size, entry_price, float(exits.price[j]),
+                                                    entry_fee + float(exits.fee[j]), entry_time,
+                                                    price_data.index[int(exits.bar[j])]))
+        if run.position is None:
+            run.entry_fills.clear()
+        
+        run.bars += body_end - body_start
+        run.start_time = run.start_time if run.start_time is not None else price_data.index[body_start]
+        run.end_time = price_data.index[body_end - 1]
+        run.last_prices = price_data.iloc[body_start:body_end]
     
     def calculate_performance_metrics(self, trades: List[Dict[str, Any]], price_data: pd.Series) -> Dict[str, float]:
         """Calculate comprehensive performance metrics"""
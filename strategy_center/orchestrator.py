@@ -4,12 +4,14 @@ from datetime import datetime
 from src.llm_services.llm_orchestrator import LLMOrchestrator, TaskType
 from src.risk_management.position_manager import PositionManager
 from src.monitoring.performance_tracker import PerformanceTracker
+from research_center.analyzers.regime_detector import get_regime_detector
 
 class StrategyOrchestrator:
     def __init__(self):
         self.llm_orchestrator = LLMOrchestrator()
         self.position_manager = PositionManager()
         self.performance_tracker = PerformanceTracker()
+        self.regime_detector = get_regime_detector()  # Shared with signal generator / correlation engine
         
         # Strategy configuration
         self.max_position_size = 0.02  # 2% max position size
@@ -19,6 +21,10 @@ class StrategyOrchestrator:
         """
         Analyzes current market conditions using multiple AI models
         """
+        # Current regime is read from the streaming detector's state
+        market_regime = self.regime_detector.get_regime()
+        market_data = {**market_data, "market_regime": market_regime}
+        
         # Get market analysis from Gemini
         market_prompt = self.llm_orchestrator.create_task_prompt(
             TaskType.MARKET_ANALYSIS,
@@ -45,7 +51,8 @@ class StrategyOrchestrator:
         
         return {
             "market_analysis": market_analysis,
-            "risk_assessment": risk_assessment
+            "risk_assessment": risk_assessment,
+            "market_regime": market_regime
         }
         
     async def optimize_strategy(self, performance_data: Dict[str, Any]) -> Dict[str, Any]:
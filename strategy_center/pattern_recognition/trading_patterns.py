@@ -8,15 +8,24 @@ import asyncio
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, Sequence
 import sqlite3
 from pathlib import Path
 import json
 from dataclasses import dataclass, asdict
 from enum import Enum
 import warnings
+import sys
+import os
 warnings.filterwarnings('ignore')
 
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from technical_analysis_center.indicators.indicator_engine import rsi
+from technical_analysis_center.indicators.indicator_cache import get_indicator_cache
+from technical_analysis_center.patterns.chart_pattern_scanner import ChartPatternScanner, PatternEvent
+from core_orchestration.data_pipeline.bar_builder import get_bar_builder
+
 class PatternType(Enum):
     MOMENTUM_BREAKOUT = "momentum_breakout"
     MEAN_REVERSION = "mean_reversion"
@@ -51,6 +60,10 @@ class TradingPattern:
 
 @dataclass
 class TradingSignal:
+    __slots__ = ("signal_id", "timestamp", "symbol", "action", "quantity", "entry_price", "stop_loss",
+                 "take_profit", "confidence", "pattern_ids", "risk_score", "expected_return", "time_horizon",
+                 "metadata")
+
     signal_id: str
     timestamp: datetime
     symbol: str
@@ -66,16 +79,72 @@ class TradingSignal:
     time_horizon: int
     metadata: Dict[str, Any]
 
+DEFAULT_PRICES = {'BTC': 50000, 'ETH': 3000, 'ADA': 0.5, 'BNB': 300}  # testing fallbacks
+
+@dataclass
+class MarketSnapshot:
+    """Symbol -> column index and latest row of one market data frame
+
+    Columns belong to a symbol when its name appears in them (case-insensitive),
+    the same substring rule the per-pattern scans used; each symbol is resolved
+    once per frame instead of once per pattern.
+    """
+    frame: pd.DataFrame
+    columns: List[str]
+    latest: np.ndarray
+    symbol_columns: Dict[str, np.ndarray]
+    price_columns: Dict[str, int]  # -1 when the symbol has no price column
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, symbols: Sequence[str] = ()) -> "MarketSnapshot":
+        columns = [str(col) for col in frame.columns]
+        if frame.empty:
+            latest = np.full(len(columns), np.nan)
+        else:
+            latest = pd.to_numeric(frame.iloc[-1], errors='coerce').to_numpy(dtype=float)
+        snapshot = cls(frame, columns, latest, {}, {})
+        snapshot.resolve(symbols)
+        return snapshot
+
+    def resolve(self, symbols: Sequence[str]):
+        """Index the columns of any symbols not seen yet"""
+        lowered = None
+        for symbol in symbols:
+            if symbol in self.symbol_columns:
+                continue
+            if lowered is None:
+                lowered = [col.lower() for col in self.columns]
+            needle = symbol.lower()
+            matches = [k for k, col in enumerate(lowered) if needle in col]
+            self.symbol_columns[symbol] = np.array(matches, dtype=np.int64)
+            self.price_columns[symbol] = next((k for k in matches if 'price' in lowered[k]), -1)
+
+    def has_columns(self, symbols: Sequence[str]) -> np.ndarray:
+        self.resolve(symbols)
+        return np.array([len(self.symbol_columns[s]) > 0 for s in symbols], dtype=bool)
+
+    def prices(self, symbols: Sequence[str]) -> np.ndarray:
+        """Latest price per symbol, the testing default where the frame has none"""
+        self.resolve(symbols)
+        positions = np.array([self.price_columns[s] for s in symbols], dtype=np.int64)
+        prices = np.array([DEFAULT_PRICES.get(s, 100) for s in symbols], dtype=float)
+        found = (positions >= 0) & (not self.frame.empty)
+        prices[found] = self.latest[positions[found]]
+        return prices
+
 class AdvancedPatternRecognition:
     """
     Advanced pattern recognition that converts correlation analysis into trading strategies
     """
     
-    def __init__(self):
+    def __init__(self, event_bus=None):
         self.db_path = "databases/sqlite_dbs/trading_patterns.db"
         self.correlation_db = "databases/sqlite_dbs/correlation_analysis.db"
         self.setup_databases()
         
+        # Optional event bus; filtered trading signals are pushed to subscribers
+        self.event_bus = event_bus
+        
         # Pattern recognition parameters
         self.pattern_templates = self.initialize_pattern_templates()
         self.risk_management_rules = self.initialize_risk_rules()
@@ -84,6 +153,17 @@ class AdvancedPatternRecognition:
         self.active_patterns: List[TradingPattern] = []
         self.generated_signals: List[TradingSignal] = []
         
+        # Shared indicator cache; each cycle only computes the newly loaded bars
+        self.indicator_cache = get_indicator_cache()
+        
+        # Price-structure scanner (candlesticks, levels, breakouts, divergences)
+        self.chart_scanner = ChartPatternScanner()
+        self.bar_builder = get_bar_builder()
+        self.chart_timeframes = ['5m', '1h', '4h']
+        
+        # Column index of the loaded market data, rebuilt when a new frame arrives
+        self.market_snapshot: Optional[MarketSnapshot] = None
+        
     def setup_databases(self):
         """Initialize pattern recognition databases"""
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
@@ -220,9 +300,11 @@ class AdvancedPatternRecognition:
         
         # 2. Load current market data
         market_data = await self.load_current_market_data()
+        self.index_market_data(market_data)
         
-        # 3. Identify trading patterns
+        # 3. Identify trading patterns from correlations and from price structure
         discovered_patterns = await self.identify_trading_patterns(correlation_data, market_data)
+        discovered_patterns.extend(await self.identify_chart_patterns(market_data))
         
         # 4. Validate patterns against historical data
         validated_patterns = await self.validate_patterns(discovered_patterns, market_data)
@@ -251,6 +333,11 @@ class AdvancedPatternRecognition:
         # Store results
         await self.store_pattern_results(results)
         
+        # Push to event bus subscribers
+        if self.event_bus is not None:
+            for signal in filtered_signals:
+                await self.event_bus.publish(signal)
+        
         print(f"✅ Pattern recognition complete:")
         print(f"   🔍 Patterns discovered: {len(discovered_patterns)}")
         print(f"   ✅ Patterns validated: {len(validated_patterns)}")
@@ -296,6 +383,17 @@ class AdvancedPatternRecognition:
     async def load_current_market_data(self) -> pd.DataFrame:
         """Load current market data for pattern validation"""
         try:
+            # Latest 6 hours of stored 5m bars
+            bars = self.bar_builder.get_frame(self.bar_builder.symbols(), '5m', limit=72)
+            if len(bars) >= 30:
+                rsi_columns = []
+                for col in [c for c in bars.columns if c.endswith('_price')]:
+                    bars[f"{col}_rsi"] = self.calculate_rsi(bars[col])
+                    rsi_columns.append(f"{col}_rsi")
+                # Neutral RSI over the warm-up; price rows before a symbol's first bar stay NaN
+                bars[rsi_columns] = bars[rsi_columns].fillna(50)
+                return bars
+            
             # Try to load from free sources
             free_data_db = "databases/sqlite_dbs/free_sources_data.db"
             if Path(free_data_db).exists():
@@ -342,19 +440,27 @@ class AdvancedPatternRecognition:
         # Add technical indicators
         for col in pivot_df.columns:
             if 'price' in col.lower():
-                pivot_df[f"{col}_rsi"] = self.calculate_rsi(pivot_df[col])
-                pivot_df[f"{col}_volatility"] = pivot_df[col].rolling(window=20).std()
+                pivot_df[f"{col}_rsi"] = self.indicator_cache.compute("rsi", pivot_df[col], col,
+                                                                      period=14, smoothing="sma")
+                pivot_df[f"{col}_volatility"] = self.indicator_cache.compute("stdev", pivot_df[col], col, period=20)
                 
         return pivot_df.fillna(method='ffill').fillna(0)
     
     def calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
-        """Calculate RSI indicator"""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        """Calculate RSI indicator (simple-window smoothing, as the pattern thresholds assume)"""
+        return pd.Series(rsi(prices, period, smoothing="sma"), index=prices.index)
+    
+    def index_market_data(self, market_data: pd.DataFrame) -> MarketSnapshot:
+        """Build the symbol/column index and latest-row snapshot for a freshly loaded frame"""
+        self.market_snapshot = MarketSnapshot.from_frame(market_data, self.bar_builder.symbols())
+        return self.market_snapshot
+    
+    def snapshot_for(self, market_data: pd.DataFrame) -> MarketSnapshot:
+        """The current snapshot when it was built from this frame, otherwise a new one"""
+        snapshot = self.market_snapshot
+        if snapshot is None or snapshot.frame is not market_data or len(snapshot.columns) != market_data.shape[1]:
+            snapshot = self.index_market_data(market_data)
+        return snapshot
     
     async def identify_trading_patterns(self, correlation_data: Dict[str, Any], 
                                       market_data: pd.DataFrame) -> List[TradingPattern]:
@@ -418,6 +524,71 @@ class AdvancedPatternRecognition:
         print(f"✅ Identified {len(patterns)} trading patterns")
         return patterns
     
+    async def identify_chart_patterns(self, market_data: pd.DataFrame) -> List[TradingPattern]:
+        """Scan every tracked symbol's latest bar for chart patterns"""
+        # Completed bars from the shared bar builder; the snapshot frame when none are built yet
+        symbols = self.bar_builder.symbols()
+        universe = {}
+        for timeframe in self.chart_timeframes:
+            frame = self.bar_builder.get_frame(symbols, timeframe, limit=500)
+            if len(frame) >= self.chart_scanner.min_bars:
+                universe[timeframe] = frame
+        
+        if universe:
+            events = self.chart_scanner.scan(universe)
+        elif not market_data.empty:
+            events = self.chart_scanner.scan_frame(market_data)
+        else:
+            return []
+        
+        patterns = []
+        for event in events:
+            pattern_type = self.classify_chart_event(event)
+            if pattern_type and event.strength >= self.pattern_templates[pattern_type]['min_confidence']:
+                patterns.append(self.create_chart_pattern(event, pattern_type))
+        
+        stats = self.chart_scanner.last_scan_stats
+        print(f"🕯️ Chart scan: {stats.get('symbol_series', 0)} series, {len(events)} events, "
+              f"{len(patterns)} patterns ({stats.get('elapsed_ms', 0):.0f}ms)")
+        return patterns
+    
+    def classify_chart_event(self, event: PatternEvent) -> Optional[PatternType]:
+        """Map a chart-pattern event onto the strategy pattern types"""
+        if event.direction == 'neutral':
+            return None
+        if event.category == 'breakout' or event.pattern in ('three_white_soldiers', 'three_black_crows'):
+            return PatternType.MOMENTUM_BREAKOUT
+        return PatternType.MEAN_REVERSION
+    
+    def create_chart_pattern(self, event: PatternEvent, pattern_type: PatternType) -> TradingPattern:
+        """Build a trading pattern from a chart-pattern event"""
+        confidence = min(event.strength, 1.0)
+        now = datetime.now()
+        return TradingPattern(
+            pattern_id=f"chart_{event.pattern}_{event.symbol}_{event.timeframe}_{now.strftime('%Y%m%d_%H%M%S')}",
+            pattern_type=pattern_type,
+            symbols=[event.symbol],
+            confidence=confidence,
+            strength=self.determine_signal_strength(event.strength, confidence),
+            entry_conditions=self.create_entry_conditions(pattern_type, None),
+            exit_conditions=self.create_exit_conditions(pattern_type, None),
+            risk_parameters=self.create_risk_parameters(pattern_type, event.strength),
+            expected_duration=self.pattern_templates[pattern_type]['time_horizon_range'][0],
+            historical_success_rate=self.pattern_templates[pattern_type]['success_rate_threshold'],
+            discovered_at=now,
+            last_validated=now,
+            metadata={
+                'source': 'chart_pattern',
+                'chart_pattern': event.pattern,
+                'category': event.category,
+                'direction': event.direction,
+                'timeframe': event.timeframe,
+                'price': event.price,
+                'level': event.level,
+                'bar_timestamp': event.timestamp.isoformat() if event.timestamp else None
+            }
+        )
+    
     def classify_pattern_type(self, correlation_row: pd.Series, market_data: pd.DataFrame) -> Optional[PatternType]:
         """Classify the type of trading pattern based on correlation characteristics"""
         
@@ -557,100 +728,125 @@ class AdvancedPatternRecognition:
         """Validate patterns against current market conditions"""
         print(f"✅ Validating {len(patterns)} patterns...")
         
-        validated_patterns = []
+        if not patterns:
+            print("✅ Validated 0 patterns")
+            return []
         
-        for pattern in patterns:
-            try:
-                # Simple validation based on pattern confidence and market data availability
-                validation_score = pattern.confidence
-                
-                # Boost validation if we have market data for the symbols
-                for symbol in pattern.symbols:
-                    symbol_columns = [col for col in market_data.columns if symbol.lower() in col.lower()]
-                    if symbol_columns:
-                        validation_score += 0.1
-                
-                # Accept patterns with reasonable validation scores
-                if validation_score >= 0.5:
-                    validated_patterns.append(pattern)
-                    
-            except Exception as e:
-                print(f"⚠️ Error validating pattern {pattern.pattern_id}: {e}")
-                continue
+        # Malformed patterns drop out here, one at a time, before any batch work
+        patterns, inputs = self.screen_patterns(patterns, "validating")
+        
+        # Score = confidence + 0.1 per pattern symbol that has market data, all patterns at once
+        snapshot = self.snapshot_for(market_data)
+        owners, symbols = self.pattern_symbol_pairs(patterns)
+        covered = snapshot.has_columns(symbols).astype(float)
+        scores = inputs[:, 0] + 0.1 * np.bincount(owners, weights=covered, minlength=len(patterns))
+        
+        # Accept patterns with reasonable validation scores
+        validated_patterns = [patterns[k] for k in np.flatnonzero(scores >= 0.5)]
         
         print(f"✅ Validated {len(validated_patterns)} patterns")
         return validated_patterns
     
+    def pattern_symbol_pairs(self, patterns: List[TradingPattern]) -> Tuple[np.ndarray, List[str]]:
+        """Flatten patterns into (pattern index, symbol) pairs"""
+        owners = np.repeat(np.arange(len(patterns)), [len(p.symbols) for p in patterns])
+        symbols = [symbol for p in patterns for symbol in p.symbols]
+        return owners, symbols
+    
+    def pattern_inputs(self, pattern: TradingPattern) -> Tuple[float, float, float, float, float]:
+        """(confidence, strength, max_position_size, stop_loss_percentage, risk_reward_ratio) as floats"""
+        if isinstance(pattern.symbols, str) or not all(isinstance(s, str) for s in pattern.symbols):
+            raise TypeError(f"symbols must be a list of strings, got {pattern.symbols!r}")
+        risk = pattern.risk_parameters
+        return (float(pattern.confidence), float(pattern.strength.value),
+                float(risk.get('max_position_size', 0.05)),
+                float(risk.get('stop_loss_percentage', 0.02)),
+                float(risk.get('risk_reward_ratio', 2.0)))
+    
+    def screen_patterns(self, patterns: List[TradingPattern], stage: str) -> Tuple[List[TradingPattern], np.ndarray]:
+        """Patterns whose inputs parse, with one ``pattern_inputs`` row each; the rest are reported and skipped"""
+        kept, rows = [], []
+        for pattern in patterns:
+            try:
+                rows.append(self.pattern_inputs(pattern))
+                kept.append(pattern)
+            except Exception as e:
+                print(f"⚠️ Error {stage} pattern {getattr(pattern, 'pattern_id', '?')}: {e}")
+        return kept, np.array(rows, dtype=float).reshape(len(rows), 5)
+    
     async def generate_trading_signals(self, patterns: List[TradingPattern], market_data: pd.DataFrame) -> List[TradingSignal]:
         """Generate trading signals from validated patterns"""
         print(f"📈 Generating signals from {len(patterns)} patterns...")
         
         signals = []
         current_time = datetime.now()
+        stamp = current_time.strftime('%Y%m%d_%H%M%S')
         
-        for pattern in patterns:
+        # Actions depend on the pattern only; HOLD and malformed patterns drop out before any pricing
+        patterns, inputs = self.screen_patterns(patterns, "generating signal for")
+        actions, keep = [], []
+        for k, pattern in enumerate(patterns):
             try:
-                for symbol in pattern.symbols:
-                    # Get current price if available
-                    current_price = self.get_current_price(symbol, market_data)
-                    
-                    if current_price is None:
-                        continue
-                    
-                    # Determine signal action based on pattern type
-                    action = self.determine_signal_action(pattern, market_data)
-                    
-                    if action != 'HOLD':
-                        # Calculate position size
-                        position_size = self.calculate_position_size(pattern, current_price)
-                        
-                        # Calculate stop loss and take profit
-                        stop_loss, take_profit = self.calculate_exit_levels(pattern, current_price, action)
-                        
-                        signal = TradingSignal(
-                            signal_id=f"signal_{pattern.pattern_id}_{symbol}_{current_time.strftime('%Y%m%d_%H%M%S')}",
-                            timestamp=current_time,
-                            symbol=symbol,
-                            action=action,
-                            quantity=position_size,
-                            entry_price=current_price,
-                            stop_loss=stop_loss,
-                            take_profit=take_profit,
-                            confidence=pattern.confidence,
-                            pattern_ids=[pattern.pattern_id],
-                            risk_score=self.calculate_signal_risk(pattern, current_price),
-                            expected_return=self.calculate_expected_return(pattern),
-                            time_horizon=pattern.expected_duration,
-                            metadata={
-                                'pattern_type': pattern.pattern_type.value,
-                                'pattern_strength': pattern.strength.value,
-                                'entry_conditions': pattern.entry_conditions,
-                                'exit_conditions': pattern.exit_conditions
-                            }
-                        )
-                        
-                        signals.append(signal)
-                        
+                action = self.determine_signal_action(pattern, market_data)
             except Exception as e:
                 print(f"⚠️ Error generating signal for pattern {pattern.pattern_id}: {e}")
                 continue
+            if action != 'HOLD':
+                actions.append(action)
+                keep.append(k)
+        trading = [patterns[k] for k in keep]
+        owners, symbols = self.pattern_symbol_pairs(trading)
+        if not symbols:
+            print("✅ Generated 0 trading signals")
+            return signals
+        
+        # Prices, sizes and exit levels for every (pattern, symbol) pair in one pass
+        prices = self.snapshot_for(market_data).prices(symbols)
+        pair_actions = np.array(actions)[owners]
+        confidence, strength, max_size, stop_pct, reward = inputs[keep][owners].T
+        
+        quantities = self.calculate_position_size(max_size, prices)
+        stop_losses, take_profits = self.calculate_exit_levels(prices, pair_actions, stop_pct, reward)
+        risk_scores = self.calculate_signal_risk(confidence, strength)
+        expected_returns = self.calculate_expected_return(stop_pct, reward)
+        
+        for k, (owner, symbol) in enumerate(zip(owners.tolist(), symbols)):
+            pattern = trading[owner]
+            signals.append(TradingSignal(
+                signal_id=f"signal_{pattern.pattern_id}_{symbol}_{stamp}",
+                timestamp=current_time,
+                symbol=symbol,
+                action=actions[owner],
+                quantity=float(quantities[k]),
+                entry_price=float(prices[k]),
+                stop_loss=float(stop_losses[k]),
+                take_profit=float(take_profits[k]),
+                confidence=pattern.confidence,
+                pattern_ids=[pattern.pattern_id],
+                risk_score=float(risk_scores[k]),
+                expected_return=float(expected_returns[k]),
+                time_horizon=pattern.expected_duration,
+                metadata={
+                    'pattern_type': pattern.pattern_type.value,
+                    'pattern_strength': pattern.strength.value,
+                    'entry_conditions': pattern.entry_conditions,
+                    'exit_conditions': pattern.exit_conditions
+                }
+            ))
         
         print(f"✅ Generated {len(signals)} trading signals")
         return signals
     
     def get_current_price(self, symbol: str, market_data: pd.DataFrame) -> Optional[float]:
         """Get current price for symbol from market data"""
-        price_columns = [col for col in market_data.columns if symbol.lower() in col.lower() and 'price' in col.lower()]
-        
-        if price_columns and not market_data.empty:
-            return float(market_data[price_columns[0]].iloc[-1])
-        
-        # Default prices for testing
-        default_prices = {'BTC': 50000, 'ETH': 3000, 'ADA': 0.5, 'BNB': 300}
-        return default_prices.get(symbol, 100)
+        return float(self.snapshot_for(market_data).prices([symbol])[0])
     
     def determine_signal_action(self, pattern: TradingPattern, market_data: pd.DataFrame) -> str:
         """Determine trading action based on pattern"""
+        direction = pattern.metadata.get('direction')
+        if direction in ('bullish', 'bearish'):
+            return 'BUY' if direction == 'bullish' else 'SELL'
+        
         if pattern.pattern_type == PatternType.MOMENTUM_BREAKOUT:
             return 'BUY'
         elif pattern.pattern_type == PatternType.MEAN_REVERSION:
@@ -660,45 +856,36 @@ class AdvancedPatternRecognition:
         else:
             return 'HOLD'
     
-    def calculate_position_size(self, pattern: TradingPattern, current_price: float) -> float:
+    # The calculate_* helpers take scalars or aligned arrays (one entry per signal)
+    
+    def calculate_position_size(self, max_position_size, current_price):
         """Calculate position size based on risk parameters"""
-        max_position_size = pattern.risk_parameters.get('max_position_size', 0.05)
-        
         # Simplified position sizing - would normally consider portfolio size
         portfolio_value = 10000  # Default portfolio size
-        position_value = portfolio_value * max_position_size
+        position_value = portfolio_value * np.asarray(max_position_size, dtype=float)
         
         return position_value / current_price
     
-    def calculate_exit_levels(self, pattern: TradingPattern, entry_price: float, action: str) -> Tuple[Optional[float], Optional[float]]:
-        """Calculate stop loss and take profit levels"""
-        stop_loss_pct = pattern.risk_parameters.get('stop_loss_percentage', 0.02)
-        risk_reward_ratio = pattern.risk_parameters.get('risk_reward_ratio', 2.0)
-        
-        if action == 'BUY':
-            stop_loss = entry_price * (1 - stop_loss_pct)
-            take_profit = entry_price * (1 + stop_loss_pct * risk_reward_ratio)
-        else:  # SELL
-            stop_loss = entry_price * (1 + stop_loss_pct)
-            take_profit = entry_price * (1 - stop_loss_pct * risk_reward_ratio)
+    def calculate_exit_levels(self, entry_price, action, stop_loss_pct, risk_reward_ratio):
+        """Calculate stop loss and take profit levels (SELL mirrors BUY around the entry)"""
+        side = np.where(np.asarray(action) == 'BUY', 1.0, -1.0)
+        stop_loss = entry_price * (1 - side * stop_loss_pct)
+        take_profit = entry_price * (1 + side * stop_loss_pct * risk_reward_ratio)
         
         return stop_loss, take_profit
     
-    def calculate_signal_risk(self, pattern: TradingPattern, current_price: float) -> float:
+    def calculate_signal_risk(self, confidence, strength):
         """Calculate risk score for the signal"""
-        base_risk = 1 - pattern.confidence
+        base_risk = 1 - np.asarray(confidence, dtype=float)
         
         # Adjust risk based on pattern strength
-        strength_adjustment = (5 - pattern.strength.value) * 0.1
+        strength_adjustment = (5 - np.asarray(strength, dtype=float)) * 0.1
         
-        return min(base_risk + strength_adjustment, 1.0)
+        return np.minimum(base_risk + strength_adjustment, 1.0)
     
-    def calculate_expected_return(self, pattern: TradingPattern) -> float:
+    def calculate_expected_return(self, stop_loss_pct, risk_reward_ratio):
         """Calculate expected return for the pattern"""
-        risk_reward_ratio = pattern.risk_parameters.get('risk_reward_ratio', 2.0)
-        stop_loss_pct = pattern.risk_parameters.get('stop_loss_percentage', 0.02)
-        
-        return stop_loss_pct * risk_reward_ratio
+        return np.asarray(stop_loss_pct, dtype=float) * risk_reward_ratio
     
     async def apply_risk_filters(self, signals: List[TradingSignal]) -> List[TradingSignal]:
         """Apply risk management filters to signals"""
@@ -802,18 +989,18 @@ class AdvancedPatternRecognition:
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 pattern_dict['pattern_id'],
-                pattern_dict['pattern_type'],
+                pattern_dict['pattern_type'].value,
                 json.dumps(pattern_dict['symbols']),
                 pattern_dict['confidence'],
-                pattern_dict['strength'],
+                pattern_dict['strength'].value,
                 json.dumps(pattern_dict['entry_conditions']),
                 json.dumps(pattern_dict['exit_conditions']),
                 json.dumps(pattern_dict['risk_parameters']),
                 pattern_dict['expected_duration'],
                 pattern_dict['historical_success_rate'],
-                pattern_dict['discovered_at'],
-                pattern_dict['last_validated'],
-                json.dumps(pattern_dict['metadata'])
+                pattern_dict['discovered_at'].isoformat(),
+                pattern_dict['last_validated'].isoformat(),
+                json.dumps(pattern_dict['metadata'], default=str)
             ))
         
         # Store signals
@@ -14,6 +14,14 @@ import sqlite3
 from dataclasses import dataclass, asdict
 from pathlib import Path
 import uuid
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from strategy_center.sandbox.event_backtester import EventBacktester, TradeRecord
+from strategy_center.sandbox.portfolio_backtester import PortfolioBacktester
+from strategy_center.backtesting.fill_models import FillModel
 
 @dataclass
 class Position:
@@ -59,8 +67,9 @@ class Portfolio:
 class SandboxTradingEnvironment:
     """Comprehensive sandbox for testing crypto trading strategies"""
     
-    def __init__(self, initial_capital: float = 10000.0):
+    def __init__(self, initial_capital: float = 10000.0, fill_model: Optional[FillModel] = None):
         self.initial_capital = initial_capital
+        self.fill_model = fill_model  # None = instant fills at the bar price
         self.current_capital = initial_capital
         self.db_path = "data/sandbox_trading.db"
         self.setup_database()
@@ -318,121 +327,107 @@ class SandboxTradingEnvironment:
     
     async def backtest_strategy(self, strategy_func, historical_data: pd.DataFrame, 
                          strategy_name: str = "backtest") -> Dict[str, Any]:
-        """Backtest a trading strategy on historical data"""
+        """Backtest a trading strategy on historical data
+        
+        Runs on the event-driven engine: prices come from the ``<SYMBOL>_price``
+        columns, the strategy receives a row-like ``BarView`` and a lightweight
+        ``PortfolioView``, and all trades are written to the database in one batch.
+        """
         print(f"🔄 Backtesting strategy: {strategy_name}")
         
         # Reset environment
         self._reset_environment()
         
-        backtest_results = {
-            "strategy_name": strategy_name,
-            "start_date": historical_data.index[0] if not historical_data.empty else datetime.now(),
-            "end_date": historical_data.index[-1] if not historical_data.empty else datetime.now(),
-            "total_trades": 0,
-            "winning_trades": 0,
-            "losing_trades": 0,
-            "total_return": 0.0,
-            "max_drawdown": 0.0,
-            "sharpe_ratio": 0.0,
-            "win_rate": 0.0,
-            "daily_returns": [],
-            "equity_curve": []
-        }
+        engine = EventBacktester(self.initial_capital, self.max_position_size, self.max_total_exposure,
+                                 fill_model=self.fill_model)
+        backtest_results = engine.run(strategy_func, historical_data, strategy_name)
         
-        # Track equity curve
-        equity_values = [self.initial_capital]
-        peak_value = self.initial_capital
-        max_drawdown = 0.0
-        
-        # Iterate through historical data
-        for i, (timestamp, row) in enumerate(historical_data.iterrows()):
-            current_prices = {
-                'BTC': row.get('BTC_price', 50000),
-                'ETH': row.get('ETH_price', 3000),
-                'ADA': row.get('ADA_price', 1.0)
-            }
-            
-            # Update existing positions
-            total_value, _ = self.update_positions(current_prices)
-            
-            # Call strategy function
-            try:
-                signals = strategy_func(row, self.get_portfolio_summary())
-                
-                # Execute signals
-                for signal in signals:
-                    symbol = signal.get('symbol', 'BTC')
-                    action = signal.get('action', 'hold')
-                    size = signal.get('size', 0.1)
-                    confidence = signal.get('confidence', 0.5)
-                    
-                    if action == 'buy' and symbol in current_prices:
-                        trade_id = await self.execute_trade(
-                            symbol, 'long', size, current_prices[symbol], 
-                            strategy_name, confidence
-                        )
-                    elif action == 'sell' and symbol in current_prices:
-                        # Close any long positions
-                        positions_to_close = [
-                            pos_id for pos_id, pos in self.positions.items() 
-                            if pos.symbol == symbol and pos.side == 'long'
-                        ]
-                        for pos_id in positions_to_close:
-                            pnl = await self.close_trade(pos_id, current_prices[symbol], "strategy_signal")
-                            
-            except Exception as e:
-                print(f"⚠️ Strategy error at {timestamp}: {e}")
-                continue
-            
-            # Track equity curve
-            total_value, _ = self.update_positions(current_prices)
-            equity_values.append(total_value)
-            
-            # Calculate drawdown
-            if total_value > peak_value:
-                peak_value = total_value
-            current_drawdown = (peak_value - total_value) / peak_value * 100
-            max_drawdown = max(max_drawdown, current_drawdown)
-            
-            # Store daily returns
-            if len(equity_values) > 1:
-                daily_return = (equity_values[-1] - equity_values[-2]) / equity_values[-2] * 100
-                backtest_results["daily_returns"].append(daily_return)
+        self._load_backtest_trades(backtest_results.pop("trades"), backtest_results)
+        self._store_trades_batch(self.trade_history)
         
-        # Calculate final metrics
-        final_value = equity_values[-1]
-        total_return = (final_value - self.initial_capital) / self.initial_capital * 100
+        print(f"✅ Backtest complete:")
+        print(f"   Total Return: {backtest_results['total_return']:.2f}%")
+        print(f"   Win Rate: {backtest_results['win_rate']:.1f}%")
+        print(f"   Max Drawdown: {backtest_results['max_drawdown']:.2f}%")
+        print(f"   Sharpe Ratio: {backtest_results['sharpe_ratio']:.2f}")
+        print(f"   Total Trades: {backtest_results['total_trades']}")
+        if backtest_results["rejected_signals"]:
+            print(f"   Rejected Signals: {backtest_results['rejected_signals']} (risk limits)")
         
-        closed_trades = [t for t in self.trade_history if t.closed_at is not None]
-        winning_trades = len([t for t in closed_trades if t.pnl and t.pnl > 0])
-        losing_trades = len([t for t in closed_trades if t.pnl and t.pnl <= 0])
+        return backtest_results
+    
+    async def backtest_portfolio(self, strategies: Dict[str, Any], historical_data: pd.DataFrame,
+                                 allocations: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Backtest several strategies at once on shared capital
         
-        win_rate = (winning_trades / len(closed_trades)) * 100 if closed_trades else 0
+        Every strategy trades every ``<SYMBOL>_price`` column; orders are netted
+        across strategies before execution and P&L is attributed per strategy.
+        """
+        print(f"🔄 Portfolio backtest: {len(strategies)} strategies")
         
-        # Sharpe ratio
-        returns = backtest_results["daily_returns"]
-        sharpe_ratio = (np.mean(returns) / np.std(returns)) * np.sqrt(252) if len(returns) > 1 and np.std(returns) > 0 else 0
-        
-        backtest_results.update({
-            "total_trades": len(closed_trades),
-            "winning_trades": winning_trades,
-            "losing_trades": losing_trades,
-            "total_return": total_return,
-            "max_drawdown": max_drawdown,
-            "sharpe_ratio": sharpe_ratio,
-            "win_rate": win_rate,
-            "equity_curve": equity_values,
-            "final_value": final_value
-        })
+        self._reset_environment()
         
-        print(f"✅ Backtest complete:")
-        print(f"   Total Return: {total_return:.2f}%")
-        print(f"   Win Rate: {win_rate:.1f}%")
-        print(f"   Max Drawdown: {max_drawdown:.2f}%")
-        print(f"   Sharpe Ratio: {sharpe_ratio:.2f}")
-        print(f"   Total Trades: {len(closed_trades)}")
+        engine = PortfolioBacktester(self.initial_capital, self.max_position_size, self.max_total_exposure,
+                                     fill_model=self.fill_model)
+        results = engine.run(strategies, historical_data, allocations)
         
-        return backtest_results
+        self.current_capital = results["cash"]
+        self.performance_metrics["max_drawdown"] = results["max_drawdown"]
+        self._store_strategy_performance(results["strategies"])
+        
+        print(f"✅ Portfolio backtest complete:")
+        print(f"   Total Return: {results['total_return']:.2f}%")
+        print(f"   Max Drawdown: {results['max_drawdown']:.2f}%")
+        print(f"   Sharpe Ratio: {results['sharpe_ratio']:.2f}")
+        print(f"   Netted: {results['netting']['netted_pct']:.1f}% of strategy order flow")
+        for name, stats in results["strategies"].items():
+            print(f"   {name}: P&L ${stats['pnl']:.2f} ({stats['total_return']:.2f}%), "
+                  f"{stats['total_trades']} round trips")
+        
+        return results
+    
+    def _load_backtest_trades(self, records: List[TradeRecord], results: Dict[str, Any]):
+        """Adopt an engine run's trades, open lots and cash as the sandbox state"""
+        last_prices = results["last_prices"]
+        for record in records:
+            trade = Trade(
+                trade_id=record.trade_id,
+                symbol=record.symbol,
+                side=record.side,
+                size=record.size,
+                entry_price=record.entry_price,
+                exit_price=record.exit_price,
+                pnl=record.pnl,
+                pnl_percentage=record.pnl_percentage,
+                opened_at=record.opened_at,
+                closed_at=record.closed_at,
+                strategy=record.strategy,
+                confidence=record.confidence,
+                metadata={"fees": record.fees} if record.fees else {}
+            )
+            self.trade_history.append(trade)
+            
+            if record.closed_at is not None:
+                self._update_performance_metrics(record.pnl, record.pnl_percentage)
+                continue
+            
+            current_price = last_prices.get(record.symbol, record.entry_price)
+            pnl = (current_price - record.entry_price) * record.size
+            self.positions[record.trade_id] = Position(
+                position_id=record.trade_id,
+                symbol=record.symbol,
+                side=record.side,
+                size=record.size,
+                entry_price=record.entry_price,
+                current_price=current_price,
+                pnl=pnl,
+                pnl_percentage=(pnl / (record.entry_price * record.size)) * 100,
+                opened_at=record.opened_at,
+                metadata={"strategy": record.strategy, "confidence": record.confidence}
+            )
+        
+        self.current_capital = results["cash"]
+        self.performance_metrics["max_drawdown"] = results["max_drawdown"]
     
     def _validate_trade(self, symbol: str, side: str, size: float, price: float) -> bool:
         """Validate trade against risk management rules"""
@@ -495,6 +490,56 @@ class SandboxTradingEnvironment:
         conn.commit()
         conn.close()
     
+    def _store_trades_batch(self, trades: List[Trade]):
+        """Store many trades (open or closed) in one transaction"""
+        if not trades:
+            return
+        
+        def epoch(value):
+            if value is None:
+                return None
+            # numpy datetime64 values from the engine have no .timestamp(), and float() of one is nanoseconds
+            return value.timestamp() if isinstance(value, datetime) else pd.Timestamp(value).timestamp()
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.executemany("""
+            INSERT OR REPLACE INTO sandbox_trades 
+            (trade_id, symbol, side, size, entry_price, exit_price, pnl, pnl_percentage,
+             opened_at, closed_at, strategy, confidence, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(
+            trade.trade_id, trade.symbol, trade.side, trade.size, trade.entry_price,
+            trade.exit_price, trade.pnl, trade.pnl_percentage,
+            epoch(trade.opened_at), epoch(trade.closed_at), trade.strategy, trade.confidence,
+            json.dumps(trade.metadata or {})
+        ) for trade in trades])
+        
+        conn.commit()
+        conn.close()
+    
+    def _store_strategy_performance(self, strategies: Dict[str, Dict[str, Any]]):
+        """Store per-strategy attribution from a portfolio backtest"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        now = datetime.now().timestamp()
+        cursor.executemany("""
+            INSERT INTO strategy_performance 
+            (strategy_name, total_trades, winning_trades, losing_trades, total_pnl,
+             max_drawdown, sharpe_ratio, win_rate, avg_return, last_updated)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(
+            name, stats["total_trades"], stats["winning_trades"],
+            stats["total_trades"] - stats["winning_trades"], stats["pnl"],
+            stats["max_drawdown"], stats["sharpe_ratio"], stats["win_rate"],
+            stats["pnl"] / stats["total_trades"] if stats["total_trades"] else 0.0, now
+        ) for name, stats in strategies.items()])
+        
+        conn.commit()
+        conn.close()
+    
     def _update_trade_in_db(self, trade_id: str, exit_price: float, pnl: float, pnl_percentage: float):
         """Update trade in database when closed"""
         conn = sqlite3.connect(self.db_path)
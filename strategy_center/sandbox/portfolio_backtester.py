@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Portfolio Sandbox Backtester
+N strategies over M symbols on shared capital, with netting and attribution
+
+Prices live in one symbols x time matrix. Every strategy keeps a virtual book
+(a row of the strategies x symbols position matrix); the portfolio only trades
+the net change across all books, so opposing orders from different strategies
+cross internally instead of paying the spread twice. Attribution is
+mark-to-market: books only change on signal bars, so between two of them every
+strategy's P&L is its book times the price move, settled in one matrix-vector
+product per segment.
+
+Two kinds of strategy share the loop:
+
+- bar callables ``(bar, portfolio_view) -> signals``, as in the single
+  strategy sandbox (``buy`` / ``sell`` / ``target`` actions)
+- ``VectorStrategy`` objects that compute their whole target-size path once
+  from the price matrix; they cost no Python call per bar, so adding them
+  barely moves wall time
+
+Bars on which no book changes skip netting entirely; with only vector
+strategies the loop visits just the bars where some target moves. Equity curves
+(portfolio and per strategy) are rebuilt afterwards segment by segment.
+
+With a ``fill_model`` the net fills are re-executed in one batch and the
+slippage and fees are charged against the equity curve, split across
+strategies by their share of gross order flow.
+"""
+
+import math
+import os
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from strategy_center.backtesting.fill_models import BarData, FillModel, OrderBatch
+from strategy_center.sandbox.event_backtester import BarView, PortfolioView, price_matrix
+from technical_analysis_center.indicators.indicator_engine import sma
+
+
+class VectorStrategy:
+    """Strategy evaluated once over the whole price matrix
+
+    Subclasses implement ``targets`` returning a symbols x time array of target
+    position sizes; NaN means "leave the position unchanged" on that bar.
+    """
+
+    name = "vector"
+
+    def targets(self, prices: np.ndarray, symbols: List[str], capital: float) -> np.ndarray:
+        raise NotImplementedError
+
+
+@dataclass
+class Fill:
+    """Net portfolio execution for one symbol on one bar"""
+    __slots__ = ("bar", "timestamp", "symbol", "size", "price")
+
+    bar: int
+    timestamp: Any
+    symbol: str
+    size: float
+    price: float
+
+
+def symbol_price_matrix(historical_data: pd.DataFrame) -> Tuple[List[str], np.ndarray]:
+    """Symbols and a symbols x time price matrix
+
+    Uses ``<SYMBOL>_price`` columns when present, otherwise every numeric
+    column is taken as a symbol (e.g. a wide close-price frame).
+    """
+    symbols, prices = price_matrix(historical_data)
+    if not symbols:
+        numeric = historical_data.select_dtypes(include=[np.number])
+        symbols = [str(c) for c in numeric.columns]
+        prices = numeric.astype(float).ffill().to_numpy()
+    return symbols, np.ascontiguousarray(prices.T)
+
+
+class PortfolioBacktester:
+    """Shared-capital multi-strategy simulation with cross-strategy netting"""
+
+    def __init__(self, initial_capital: float = 10000.0, max_position_size: float = 0.1,
+                 max_total_exposure: float = 0.8, fill_model: Optional[FillModel] = None):
+        self.initial_capital = initial_capital
+        self.max_position_size = max_position_size
+        self.max_total_exposure = max_total_exposure
+        self.fill_model = fill_model
+
+    def run(self, strategies: Dict[str, Union[Callable, VectorStrategy]], historical_data: pd.DataFrame,
+            allocations: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Run every strategy over every symbol and return portfolio + per-strategy results"""
+        names = list(strategies)
+        n_strats = len(names)
+        symbols, prices = symbol_price_matrix(historical_data)
+        n_syms, n_bars = prices.shape
+        timestamps = historical_data.index
+
+        weights = np.array([(allocations or {}).get(name, 1.0) for name in names], dtype=float)
+        budgets = self.initial_capital * weights / weights.sum() if n_strats else weights
+
+        # Vector strategies: whole target paths up front, stacked strategies x symbols x time
+        vector_rows = [s for s, name in enumerate(names) if isinstance(strategies[name], VectorStrategy)]
+        callables = [(s, strategies[names[s]]) for s in range(n_strats) if s not in vector_rows]
+        targets = np.stack([
+            np.asarray(strategies[names[s]].targets(prices, symbols, budgets[s]), dtype=float)
+            for s in vector_rows
+        ]) if vector_rows else np.empty((0, n_syms, n_bars))
+        if vector_rows:
+            known = ~np.isnan(targets)
+            previous = np.concatenate((np.full((len(vector_rows), n_syms, 1), np.nan), targets[:, :, :-1]), axis=2)
+            vector_change = (known & (targets != previous)).any(axis=(0, 1))
+        else:
+            vector_change = np.zeros(n_bars, dtype=bool)
+        vector_rows_arr = np.array(vector_rows, dtype=int)
+
+        bar = BarView({str(c): historical_data[c].tolist() for c in historical_data.columns}, timestamps)
+        views = {s: PortfolioView(total_value=budgets[s], cash=budgets[s]) for s, _ in callables}
+        symbol_index = {symbol: m for m, symbol in enumerate(symbols)}
+        price_rows = prices.T.tolist()
+
+        books = np.zeros((n_strats, n_syms))        # per-strategy virtual positions
+        held = np.zeros(n_syms)                     # net portfolio position
+        cash = self.initial_capital
+        # Books only change on signal bars; between them P&L is linear in price,
+        # so attribution is settled per segment rather than per bar.
+        segment_price = prices[:, 0].copy() if n_bars else np.zeros(n_syms)
+        segment_pnl = np.zeros(n_strats)
+        episode_pnl = np.zeros((n_strats, n_syms))  # P&L of the open round trip per book
+        segments: List[Tuple[int, float, np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+
+        closed = np.zeros(n_strats, dtype=int)
+        wins = np.zeros(n_strats, dtype=int)
+        orders = np.zeros(n_strats, dtype=int)
+        gross_traded = np.zeros(n_strats)
+        net_traded = 0.0
+        scaled_bars = rejected = errors = 0
+        fill_rows: List[Tuple[int, int, float, float]] = []
+        has_position = [False] * n_strats
+
+        # Without bar callables only the bars where a vector target moves are visited
+        bars = range(n_bars) if callables else np.flatnonzero(vector_change).tolist()
+
+        for t in bars:
+            price = prices[:, t]
+            before = None
+
+            if callables:
+                row = price_rows[t]
+                bar.bar_index = t
+                move = price - segment_price if any(has_position) else None
+                for s, strategy in callables:
+                    view = views[s]
+                    book = books[s]
+                    if has_position[s]:
+                        exposure = float(np.abs(book) @ price)
+                        view.total_value = budgets[s] + segment_pnl[s] + float(book @ move)
+                    else:
+                        exposure = 0.0
+                        view.total_value = budgets[s] + segment_pnl[s]
+                    view.positions_value = exposure
+                    view.cash = view.total_value - exposure
+                    view.total_pnl = view.total_value - budgets[s]
+                    view.total_pnl_percentage = view.total_pnl / budgets[s] * 100
+
+                    try:
+                        signals = strategy(bar, view)
+                    except Exception as e:
+                        errors += 1
+                        if errors <= 5:
+                            print(f"⚠️ Strategy {names[s]} error at {timestamps[t]}: {e}")
+                        continue
+
+                    for signal in signals or ():
+                        m = symbol_index.get(signal.get('symbol', 'BTC'))
+                        action = signal.get('action', 'hold')
+                        if m is None or action == 'hold' or not row[m] > 0:
+                            continue
+                        if action == 'buy':
+                            size = signal.get('size', 0.1)
+                            value = size * row[m]
+                            if value > view.cash or value > view.total_value * self.max_position_size:
+                                rejected += 1
+                                continue
+                        elif action == 'sell':
+                            if book[m] <= 0:
+                                continue
+                        elif action != 'target':
+                            continue
+                        if before is None:
+                            before = books.copy()
+                        if action == 'buy':
+                            book[m] += size
+                            view.cash -= value
+                        elif action == 'sell':
+                            view.cash += book[m] * row[m]
+                            book[m] = 0.0
+                        else:
+                            book[m] = float(signal.get('size', 0.0))
+
+            if vector_change[t]:
+                if before is None:
+                    before = books.copy()
+                step = targets[:, :, t]
+                books[vector_rows_arr] = np.where(np.isnan(step), books[vector_rows_arr], step)
+
+            if before is None:
+                continue
+
+            # Settle the segment that ends here at this bar's prices
+            move = price - segment_price
+            segment_pnl += before @ move
+            episode_pnl += before * move
+            segment_price = price.copy()
+            total_value = cash + held @ price
+
+            delta = books - before
+            net = delta.sum(axis=0)
+            # Shared-capital exposure cap: exits and reductions (book moves toward flat)
+            # always fill; only the parts that add exposure are scaled back to the limit
+            cap = self.max_total_exposure * total_value
+            if np.abs(held + net) @ price > cap:
+                reduce = np.where(before * delta < 0, np.clip(delta, -np.abs(before), np.abs(before)), 0.0)
+                increase = delta - reduce
+                base = held + reduce.sum(axis=0)
+                gross_base = np.abs(base) @ price
+                gross_full = np.abs(base + increase.sum(axis=0)) @ price
+                if gross_full > gross_base:
+                    # Gross is convex in the fraction, so the secant keeps it under the cap
+                    fraction = max(0.0, (cap - gross_base) / (gross_full - gross_base))
+                    delta = reduce + increase * fraction
+                    books[:] = before + delta
+                    net = delta.sum(axis=0)
+                    scaled_bars += 1
+
+            gross_traded += np.abs(delta) @ price
+            orders += np.count_nonzero(delta, axis=1)
+
+            # Round trips closed this bar
+            flat = (books == 0) & (before != 0)
+            if flat.any():
+                closed += flat.sum(axis=1)
+                wins += (flat & (episode_pnl > 0)).sum(axis=1)
+                episode_pnl[flat] = 0.0
+                for s, _ in callables:
+                    views[s].win_rate = wins[s] / closed[s] * 100 if closed[s] else 0.0
+
+            for m in np.flatnonzero(np.abs(net) > 1e-12):
+                fill_rows.append((t, m, float(net[m]), float(price[m])))
+            net_traded += float(np.abs(net) @ price)
+            cash -= float(net @ price)
+            held = books.sum(axis=0)
+            has_position = books.any(axis=1).tolist()
+            segments.append((t, cash, held, books.copy(), segment_pnl.copy(), segment_price))
+
+            for s, _ in callables:
+                view = views[s]
+                view.positions = {symbols[m]: float(books[s, m]) for m in np.flatnonzero(books[s])}
+                view.open_trades = len(view.positions)
+
+        equity, strategy_equity = self._curves(prices, segments, budgets)
+        fills = [Fill(t, timestamps[t], symbols[m], size, fill_price) for t, m, size, fill_price in fill_rows]
+        execution_cost = 0.0
+        if self.fill_model is not None and fill_rows:
+            execution_cost = self._charge_execution(fill_rows, historical_data, symbols, equity,
+                                                    strategy_equity, gross_traded)
+            cash -= execution_cost
+        results = self._results(names, symbols, historical_data, equity, strategy_equity, budgets,
+                                closed, wins, orders, gross_traded, net_traded, fills, held, cash,
+                                scaled_bars, rejected, errors)
+        results["execution_cost"] = execution_cost
+        return results
+
+    def _charge_execution(self, fill_rows: List[Tuple[int, int, float, float]], historical_data: pd.DataFrame,
+                          symbols: List[str], equity: np.ndarray, strategy_equity: np.ndarray,
+                          gross_traded: np.ndarray) -> float:
+        """Slippage + fees of the net fills versus bar prices, deducted in place from the curves"""
+        rows = np.array(fill_rows)
+        bar, symbol, size, signal_price = rows[:, 0].astype(np.int64), rows[:, 1].astype(np.int64), rows[:, 2], rows[:, 3]
+        side = np.sign(size)
+        executed = self.fill_model.fill(
+            OrderBatch.create(bar, side, np.abs(size), symbol, complete=True),
+            BarData.from_frame(historical_data, symbols)
+        )
+        cost = side * np.abs(size) * (executed.price - signal_price) + executed.fee
+        per_bar = np.zeros(len(equity) - 1)
+        np.add.at(per_bar, bar, cost)
+        charged = np.concatenate(([0.0], np.cumsum(per_bar)))
+        equity -= charged
+        share = gross_traded / gross_traded.sum() if gross_traded.sum() > 0 else np.zeros_like(gross_traded)
+        strategy_equity -= charged[:, None] * share[None, :]
+        return float(charged[-1])
+
+    def _curves(self, prices: np.ndarray, segments: List[Tuple], budgets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Portfolio and per-strategy equity after every bar, rebuilt segment by segment"""
+        n_bars = prices.shape[1]
+        equity = np.full(n_bars + 1, float(self.initial_capital))
+        strategy_equity = np.tile(budgets, (n_bars + 1, 1))
+        for k, (start, cash, held, books, pnl, start_price) in enumerate(segments):
+            end = segments[k + 1][0] if k + 1 < len(segments) else n_bars
+            window = prices[:, start:end]
+            equity[start + 1:end + 1] = cash + held @ window
+            strategy_equity[start + 1:end + 1] = (budgets + pnl) + (books @ (window - start_price[:, None])).T
+        return equity, strategy_equity
+
+    def _results(self, names: List[str], symbols: List[str], historical_data: pd.DataFrame,
+                 equity: np.ndarray, strategy_equity: np.ndarray, budgets: np.ndarray,
+                 closed: np.ndarray, wins: np.ndarray, orders: np.ndarray, gross_traded: np.ndarray,
+                 net_traded: float, fills: List[Fill], held: np.ndarray, cash: float,
+                 scaled_bars: int, rejected: int, errors: int) -> Dict[str, Any]:
+        summary = curve_metrics(equity)
+        per_strategy = {}
+        for s, name in enumerate(names):
+            metrics = curve_metrics(strategy_equity[:, s])
+            per_strategy[name] = {
+                "allocated_capital": float(budgets[s]),
+                "pnl": float(strategy_equity[-1, s] - budgets[s]),
+                "total_return": metrics["total_return"],
+                "max_drawdown": metrics["max_drawdown"],
+                "sharpe_ratio": metrics["sharpe_ratio"],
+                "orders": int(orders[s]),
+                "total_trades": int(closed[s]),
+                "winning_trades": int(wins[s]),
+                "win_rate": float(wins[s] / closed[s] * 100) if closed[s] else 0.0,
+                "gross_traded": float(gross_traded[s]),
+            }
+
+        gross_total = float(gross_traded.sum())
+        empty = historical_data.empty
+        return {
+            "strategy_name": "+".join(names),
+            "start_date": historical_data.index[0] if not empty else datetime.now(),
+            "end_date": historical_data.index[-1] if not empty else datetime.now(),
+            **summary,
+            "final_value": float(equity[-1]),
+            "cash": cash,
+            "equity_curve": equity.tolist(),
+            "symbols": symbols,
+            "open_positions": {symbols[m]: float(held[m]) for m in np.flatnonzero(held)},
+            "strategies": per_strategy,
+            "netting": {
+                "gross_traded": gross_total,
+                "net_traded": net_traded,
+                "netted_pct": (1 - net_traded / gross_total) * 100 if gross_total else 0.0,
+            },
+            "exposure_scaled_bars": scaled_bars,
+            "rejected_signals": rejected,
+            "strategy_errors": errors,
+            "fills": fills,
+        }
+
+
+def curve_metrics(equity: np.ndarray) -> Dict[str, float]:
+    """Return, max drawdown and annualized (252) Sharpe of an equity curve"""
+    start = equity[0]
+    peaks = np.maximum.accumulate(equity)
+    drawdowns = np.where(peaks > 0, (peaks - equity) / np.where(peaks > 0, peaks, 1) * 100, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.diff(equity) / equity[:-1] * 100
+    returns = returns[np.isfinite(returns)]
+    std = returns.std() if len(returns) > 1 else 0.0
+    return {
+        "total_return": float((equity[-1] - start) / start * 100) if start else 0.0,
+        "max_drawdown": float(drawdowns.max()) if len(drawdowns) else 0.0,
+        "sharpe_ratio": float(returns.mean() / std * math.sqrt(252)) if std > 0 else 0.0,
+    }
+
+
+class MovingAverageCross(VectorStrategy):
+    """Long a fixed fraction of capital while the fast SMA is above the slow SMA"""
+
+    def __init__(self, fast: int = 60, slow: int = 240, fraction: float = 0.05, name: str = "ma_cross"):
+        self.fast = fast
+        self.slow = slow
+        self.fraction = fraction
+        self.name = name
+
+    def targets(self, prices: np.ndarray, symbols: List[str], capital: float) -> np.ndarray:
+        fast = np.vstack([sma(row, self.fast) for row in prices])
+        slow = np.vstack([sma(row, self.slow) for row in prices])
+        size = capital * self.fraction / prices
+        out = np.where(fast > slow, size, 0.0)
+        # Hold the entry size for the whole run instead of re-sizing every bar
+        entry = (out > 0) & ~np.concatenate((np.zeros((len(symbols), 1), dtype=bool), out[:, :-1] > 0), axis=1)
+        sized = np.where(entry, size, np.nan)
+        sized = pd.DataFrame(sized.T).ffill().to_numpy().T
+        return np.where(out > 0, sized, np.where(np.isnan(fast), np.nan, 0.0))
+
+
+def main():
+    """Scaling check: 1 vs 8 strategies on a month of minute bars for 4 symbols"""
+    import time
+
+    print("🧮 Testing Portfolio Backtester...")
+    bars = 30 * 24 * 60
+    rng = np.random.default_rng(5)
+    index = pd.date_range("2024-01-01", periods=bars, freq="min")
+    data = pd.DataFrame({
+        f'{symbol}_price': start * np.exp(np.cumsum(rng.normal(0, 0.001, bars)))
+        for symbol, start in (('BTC', 50000), ('ETH', 3000), ('SOL', 150), ('ADA', 0.5))
+    }, index=index)
+
+    def contrarian(row, portfolio):
+        if row.bar_index % 120:
+            return []
+        if portfolio.positions.get('ETH'):
+            return [{'symbol': 'ETH', 'action': 'sell'}]
+        return [{'symbol': 'ETH', 'action': 'buy', 'size': 0.1}]
+
+    engine = PortfolioBacktester(initial_capital=100000)
+    for count in (1, 8):
+        strategies = {f"ma_{k}": MovingAverageCross(30 + 15 * k, 240 + 60 * k) for k in range(count)}
+        strategies["contrarian"] = contrarian
+        start = time.perf_counter()
+        results = engine.run(strategies, data)
+        elapsed = time.perf_counter() - start
+        print(f"   {count + 1} strategies x {len(results['symbols'])} symbols x {bars:,} bars: {elapsed:.2f}s "
+              f"| return {results['total_return']:.2f}% | netted {results['netting']['netted_pct']:.1f}%")
+    best = max(results["strategies"].items(), key=lambda item: item[1]["pnl"])
+    print(f"   Best strategy: {best[0]} P&L ${best[1]['pnl']:.2f} over {best[1]['total_trades']} round trips")
+
+
+if __name__ == "__main__":
+    main()
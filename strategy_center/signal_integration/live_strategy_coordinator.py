@@ -34,7 +34,7 @@ class LiveStrategyCoordinator:
     - CEO approval pipeline for high-risk strategies
     """
     
-    def __init__(self):
+    def __init__(self, event_bus=None):
         self.setup_logging()
         self.setup_database()
         
@@ -79,6 +79,17 @@ class LiveStrategyCoordinator:
             }
         }
         
+        # Pattern types routed to live strategies when signals arrive via the event bus
+        self.pattern_strategy_map = {
+            'momentum_breakout': 'momentum_breakout',
+            'mean_reversion': 'mean_reversion',
+            'volatility_expansion': 'lightning_breakout'
+        }
+        
+        self.event_bus = None
+        if event_bus is not None:
+            self.attach_event_bus(event_bus)
+        
     def setup_logging(self):
         """Setup strategy coordinator logging"""
         log_dir = Path("logs/strategy_coordination")
@@ -198,6 +209,38 @@ class LiveStrategyCoordinator:
             
         return True, "Signal validation passed"
         
+    def build_trade_order(self, strategy_name: str, signal_data: Dict) -> TradeOrder:
+        """Create the trade order for a validated signal"""
+        return TradeOrder(
+            symbol=signal_data['symbol'],
+            side=signal_data['direction'],
+            order_type=signal_data.get('order_type', 'Market'),
+            qty=signal_data['position_size'],
+            price=signal_data.get('entry_price'),
+            stop_loss=signal_data.get('stop_loss'),
+            take_profit=signal_data.get('take_profit'),
+            strategy=strategy_name,
+            risk_percent=2.0  # 2% risk per trade
+        )
+        
+    def handle_execution_result(self, strategy_name: str, signal_data: Dict,
+                                signal_id: int, execution_result: Dict) -> Dict:
+        """Record execution outcome for a processed signal"""
+        if execution_result['success']:
+            # Update signal record with execution details
+            self.update_signal_execution(signal_id, execution_result)
+            
+            self.logger.info(f"✅ Strategy signal executed: {strategy_name} - {signal_data['symbol']} {signal_data['direction']}")
+            return {
+                'success': True,
+                'signal_id': signal_id,
+                'order_id': execution_result['order_id'],
+                'strategy': strategy_name
+            }
+        else:
+            self.logger.error(f"❌ Trade execution failed: {execution_result['error']}")
+            return {'success': False, 'error': execution_result['error']}
+            
     def process_strategy_signal(self, strategy_name: str, signal_data: Dict) -> Dict:
         """Process strategy signal and execute if validated"""
         
@@ -212,40 +255,69 @@ class LiveStrategyCoordinator:
             signal_id = self.record_strategy_signal(strategy_name, signal_data)
             
             # Create trade order
-            trade_order = TradeOrder(
-                symbol=signal_data['symbol'],
-                side=signal_data['direction'],
-                order_type=signal_data.get('order_type', 'Market'),
-                qty=signal_data['position_size'],
-                price=signal_data.get('entry_price'),
-                stop_loss=signal_data.get('stop_loss'),
-                take_profit=signal_data.get('take_profit'),
-                strategy=strategy_name,
-                risk_percent=2.0  # 2% risk per trade
-            )
+            trade_order = self.build_trade_order(strategy_name, signal_data)
             
             # Execute trade through live trading engine
             execution_result = self.trading_engine.place_order(trade_order)
             
-            if execution_result['success']:
-                # Update signal record with execution details
-                self.update_signal_execution(signal_id, execution_result)
+            return self.handle_execution_result(strategy_name, signal_data, signal_id, execution_result)
                 
-                self.logger.info(f"✅ Strategy signal executed: {strategy_name} - {signal_data['symbol']} {signal_data['direction']}")
-                return {
-                    'success': True,
-                    'signal_id': signal_id,
-                    'order_id': execution_result['order_id'],
-                    'strategy': strategy_name
-                }
-            else:
-                self.logger.error(f"❌ Trade execution failed: {execution_result['error']}")
-                return {'success': False, 'error': execution_result['error']}
+        except Exception as e:
+            self.logger.error(f"❌ Error processing strategy signal: {e}")
+            return {'success': False, 'error': str(e)}
+            
+    async def process_strategy_signal_async(self, strategy_name: str, signal_data: Dict) -> Dict:
+        """Process strategy signal through the async order router without blocking the loop"""
+        
+        try:
+            # Validate signal
+            valid, validation_message = self.validate_strategy_signal(strategy_name, signal_data)
+            if not valid:
+                self.logger.warning(f"⚠️ Signal validation failed: {validation_message}")
+                return {'success': False, 'error': validation_message}
+                
+            # Record signal in database
+            signal_id = self.record_strategy_signal(strategy_name, signal_data)
+            
+            # Create trade order; the signal id makes the client order ID idempotent
+            trade_order = self.build_trade_order(strategy_name, signal_data)
+            intent_key = signal_data.get('signal_id') or f"{strategy_name}:{signal_id}"
+            execution_result = await self.trading_engine.place_order_async(trade_order, intent_key=intent_key)
+            
+            return self.handle_execution_result(strategy_name, signal_data, signal_id, execution_result)
                 
         except Exception as e:
             self.logger.error(f"❌ Error processing strategy signal: {e}")
             return {'success': False, 'error': str(e)}
             
+    def attach_event_bus(self, event_bus):
+        """Execute pattern trading signals as soon as they are published"""
+        self.event_bus = event_bus
+        event_bus.subscribe("TradingSignal", self.on_trading_signal, name="LiveStrategyCoordinator")
+        self.logger.info("📡 Strategy coordinator subscribed to TradingSignal events")
+        
+    async def on_trading_signal(self, trading_signal) -> Optional[Dict]:
+        """Route a pushed TradingSignal to its live strategy and execute it"""
+        pattern_type = trading_signal.metadata.get('pattern_type')
+        strategy_name = self.pattern_strategy_map.get(pattern_type)
+        if strategy_name is None or trading_signal.action not in ('BUY', 'SELL'):
+            return None
+            
+        signal_data = {
+            'signal_id': trading_signal.signal_id,
+            'symbol': f"{trading_signal.symbol}USDT" if not trading_signal.symbol.endswith('USDT') else trading_signal.symbol,
+            'direction': 'Buy' if trading_signal.action == 'BUY' else 'Sell',
+            'confidence': trading_signal.confidence,
+            'position_size': trading_signal.quantity,
+            'signal_type': pattern_type,
+            'entry_price': trading_signal.entry_price,
+            'stop_loss': trading_signal.stop_loss,
+            'take_profit': trading_signal.take_profit
+        }
+        
+        # Async router: concurrent signals are placed in parallel / batched, idempotently
+        return await self.process_strategy_signal_async(strategy_name, signal_data)
+            
     def record_strategy_signal(self, strategy_name: str, signal_data: Dict) -> int:
         """Record strategy signal in database"""
         try:
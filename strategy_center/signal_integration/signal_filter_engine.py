@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Columnar Signal Filter Engine - Week 2 Enhancement
+Vectorized backtest validation and multi-layer filtering for UnifiedSignalGenerator
+
+Candidate signals are loaded once into a CandidateSignalFrame. Backtest results are
+indexed by symbol and pattern_id so each distinct (symbol, pattern_id) pair is
+scored once instead of scanning every result for every signal, and the six filter
+layers plus the filter_score formula are evaluated as NumPy masks over the whole
+batch. Results match the original per-signal loops.
+"""
+
+import sys
+import os
+from typing import Dict, List, Any, Tuple, Optional
+
+import numpy as np
+
+# Add parent directories to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from core_orchestration.signal_frame import CandidateSignalFrame, ACTION_CODES
+
+
+class BacktestIndex:
+    """Symbol / pattern_id index over backtest result rows"""
+
+    def __init__(self, results: List[Dict[str, Any]]):
+        self.results = results
+        self.by_symbol: Dict[Any, List[int]] = {}
+        self.by_pattern: Dict[Any, List[int]] = {}
+
+        for row, result in enumerate(results):
+            self.by_symbol.setdefault(result.get('symbol'), []).append(row)
+            self.by_pattern.setdefault(result.get('pattern_id'), []).append(row)
+
+        self.win_rate = np.array([r.get('win_rate', 0.5) for r in results], dtype=float)
+        self.sharpe_ratio = np.array([r.get('sharpe_ratio', 0) for r in results], dtype=float)
+        self.total_return = np.array([r.get('total_return_percentage', 0) for r in results], dtype=float)
+
+        self._cache: Dict[Tuple[Any, Any], Optional[Dict[str, float]]] = {}
+
+    def lookup(self, symbol: Any, pattern_id: Any) -> Optional[Dict[str, float]]:
+        """Aggregate performance of results matching the symbol or the pattern_id"""
+        key = (symbol, pattern_id)
+        if key in self._cache:
+            return self._cache[key]
+
+        rows = sorted(set(self.by_symbol.get(symbol, [])) | set(self.by_pattern.get(pattern_id, [])))
+        if not rows:
+            self._cache[key] = None
+            return None
+
+        avg_win_rate = float(np.mean(self.win_rate[rows]))
+        avg_sharpe = float(np.mean(self.sharpe_ratio[rows]))
+        avg_return = float(np.mean(self.total_return[rows]))
+
+        # Boost confidence based on backtest performance
+        performance_boost = 0
+        if avg_win_rate > 0.6:
+            performance_boost += 0.1
+        if avg_sharpe > 1.0:
+            performance_boost += 0.1
+        if avg_return > 0.05:
+            performance_boost += 0.1
+
+        stats = {
+            'avg_win_rate': avg_win_rate,
+            'avg_sharpe_ratio': avg_sharpe,
+            'avg_return': avg_return,
+            'validation_boost': performance_boost
+        }
+        self._cache[key] = stats
+        return stats
+
+
+class ColumnarSignalFilter:
+    """
+    Vectorized replacement for the per-signal validation and filtering loops
+
+    Thresholds default to the values used by UnifiedSignalGenerator.
+    """
+
+    def __init__(self, min_confidence: float = 0.5, min_risk_reward: float = 1.5,
+                 min_time_horizon: float = 15, max_position_size: float = 0.1):
+        self.min_confidence = min_confidence
+        self.min_risk_reward = min_risk_reward
+        self.min_time_horizon = min_time_horizon
+        self.max_position_size = max_position_size
+
+    def validate_with_backtest(self, signals: List[Dict[str, Any]],
+                               backtest_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Attach backtest validation to every signal and boost confidence in place"""
+        index = BacktestIndex(backtest_results)
+
+        for signal in signals:
+            stats = index.lookup(signal.get('symbol', 'BTC'), signal.get('pattern_id'))
+            if stats is None:
+                # No backtest data available, keep original confidence but mark as unvalidated
+                signal['backtest_validation'] = {'status': 'no_data_available'}
+                continue
+
+            signal['confidence'] = min(signal.get('confidence', 0.5) + stats['validation_boost'], 1.0)
+            signal['backtest_validation'] = dict(stats)
+
+        return signals
+
+    def filter_mask(self, frame: CandidateSignalFrame, market_regime: Dict[str, Any]) -> np.ndarray:
+        """Boolean mask of candidates passing all six filter layers"""
+        confidence = frame.column("confidence")
+        signal_type = frame.column("signal_type")
+        risk_reward = frame.column("risk_reward_ratio")
+        time_horizon = frame.column("time_horizon")
+        position_size = frame.column("position_size")
+
+        # Layer 1: Confidence threshold
+        mask = confidence >= self.min_confidence
+
+        # Layer 2: Market regime compatibility
+        regime_type = market_regime.get('regime_type', 'unknown')
+        if regime_type == 'trending_volatile':
+            mask &= signal_type != ACTION_CODES['HOLD']
+        elif regime_type == 'range_bound':
+            mask &= (signal_type != ACTION_CODES['STRONG_BUY']) & (signal_type != ACTION_CODES['STRONG_SELL'])
+
+        # Layer 3: Risk-reward ratio
+        mask &= risk_reward >= self.min_risk_reward
+
+        # Layer 4: Validation score - signals without validation are kept
+
+        # Layer 5: Time horizon compatibility
+        mask &= time_horizon >= self.min_time_horizon
+
+        # Layer 6: Position size reasonableness
+        mask &= (position_size > 0) & (position_size <= self.max_position_size)
+
+        return mask
+
+    def filter_scores(self, frame: CandidateSignalFrame) -> np.ndarray:
+        """filter_score for every candidate, whether or not it passes"""
+        return (
+            frame.column("confidence") * 0.4 +
+            np.minimum(frame.column("risk_reward_ratio") / 3.0, 1.0) * 0.3 +
+            np.minimum(frame.column("position_size") * 10, 1.0) * 0.2 +
+            (frame.column("validation_boost") + 0.1) * 0.1  # Small boost for validation
+        )
+
+    def apply(self, signals: List[Dict[str, Any]], market_regime: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Filter signals and set filter_score on the survivors, preserving order"""
+        if not signals:
+            return signals
+
+        frame = CandidateSignalFrame.from_signals(signals)
+        mask = self.filter_mask(frame, market_regime)
+        scores = self.filter_scores(frame)
+
+        filtered_signals = []
+        for row in np.flatnonzero(mask):
+            signal = signals[row]
+            signal['filter_score'] = float(scores[row])
+            filtered_signals.append(signal)
+
+        return filtered_signals
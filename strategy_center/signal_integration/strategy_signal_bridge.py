@@ -4,6 +4,7 @@ Strategy Signal Bridge - ORION PHASE 2
 Connects unified signals to trading strategies for intelligent execution
 """
 
+import asyncio
 import sqlite3
 import json
 import time
@@ -21,6 +22,9 @@ from core_orchestration.signal_aggregator import SignalAggregator, MarketSignal,
 
 @dataclass
 class StrategySignal:
+    __slots__ = ("strategy_id", "symbol", "action", "quantity", "confidence", "entry_price", "stop_loss",
+                 "take_profit", "reasoning", "source_signals", "timestamp", "risk_score", "expected_return")
+
     strategy_id: str
     symbol: str
     action: str  # "BUY", "SELL", "HOLD", "CLOSE"
@@ -53,7 +57,7 @@ class StrategySignalBridge:
     Translates market signals into actionable trading decisions
     """
     
-    def __init__(self):
+    def __init__(self, event_bus=None):
         self.db_path = "databases/sqlite_dbs/strategy_signals.db"
         self.logger = self.setup_logging()
         self.setup_database()
@@ -91,7 +95,12 @@ class StrategySignalBridge:
         }
         
         # Signal aggregator
-        self.signal_aggregator = SignalAggregator()
+        self.signal_aggregator = SignalAggregator(event_bus=event_bus)
+        
+        # Event bus (optional) - market signals are handled as they are published
+        self.event_bus = None
+        if event_bus is not None:
+            self.attach_event_bus(event_bus)
         
         self.logger.info("🌉 Strategy Signal Bridge initialized - Phase 2 Enhanced Intelligence")
     
@@ -178,7 +187,13 @@ class StrategySignalBridge:
         
         # 1. Get latest market signals from aggregator
         signal_summary = self.signal_aggregator.collect_all_signals()
-        market_signals = self.get_recent_market_signals()
+        if self.event_bus is not None and (signal_summary.get("market_signals_published", 0)
+                                           or not signal_summary.get("market_signals", 0)):
+            # Market signals were pushed to on_market_signal as they were published
+            market_signals = []
+        else:
+            # No bus, or nothing delivered (e.g. no running event loop): read them back
+            market_signals = self.get_recent_market_signals()
         
         # 2. Process signals for each strategy
         all_strategy_signals = []
@@ -220,6 +235,28 @@ class StrategySignalBridge:
         
         return summary
     
+    def attach_event_bus(self, event_bus):
+        """Subscribe to market signals so strategies react without polling enhanced_signals.db"""
+        self.event_bus = event_bus
+        self.signal_aggregator.event_bus = event_bus
+        event_bus.subscribe(MarketSignal, self.on_market_signal, name="StrategySignalBridge")
+    
+    async def on_market_signal(self, market_signal: MarketSignal) -> List[StrategySignal]:
+        """Handle a pushed market signal; position reads and stores run off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.handle_market_signal, market_signal)
+    
+    def handle_market_signal(self, market_signal: MarketSignal) -> List[StrategySignal]:
+        """Generate and store strategy signals for a single market signal"""
+        strategy_signals = []
+        
+        for strategy_id, config in self.strategy_configs.items():
+            for signal in self.generate_strategy_signals(strategy_id, [market_signal], config):
+                self.store_strategy_signal(signal)
+                strategy_signals.append(signal)
+        
+        return strategy_signals
+    
     def generate_strategy_signals(self, strategy_id: str, market_signals: List[MarketSignal], config: Dict[str, Any]) -> List[StrategySignal]:
         """Generate trading signals for a specific strategy"""
         strategy_signals = []
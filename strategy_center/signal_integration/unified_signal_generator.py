@@ -14,9 +14,18 @@ from pathlib import Path
 import json
 from dataclasses import dataclass, asdict
 from enum import Enum
+import sys
+import os
 import warnings
 warnings.filterwarnings('ignore')
 
+# Add parent directories to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from strategy_center.signal_integration.signal_filter_engine import ColumnarSignalFilter
+from research_center.analyzers.regime_detector import get_regime_detector, price_columns
+from technical_analysis_center.indicators.indicator_engine import stdev
+from core_orchestration.data_pipeline.bar_builder import get_bar_builder
+
 class SignalType(Enum):
     BUY = "BUY"
     SELL = "SELL"
@@ -33,6 +42,14 @@ class ConfidenceLevel(Enum):
 
 @dataclass
 class UnifiedSignal:
+    EVENT_TOPIC = "generator.UnifiedSignal"  # Event bus topic (name clashes with aggregator signals)
+    
+    __slots__ = ("signal_id", "timestamp", "symbol", "signal_type", "confidence_level", "confidence_score",
+                 "entry_price", "target_price", "stop_loss", "position_size", "time_horizon",
+                 "risk_reward_ratio", "supporting_evidence", "validation_score", "market_regime_factor",
+                 "correlation_strength", "pattern_reliability", "backtest_performance", "execution_priority",
+                 "metadata")
+
     signal_id: str
     timestamp: datetime
     symbol: str
@@ -72,18 +89,30 @@ class UnifiedSignalGenerator:
     Unified signal generation system that combines multiple analysis layers
     """
     
-    def __init__(self):
+    def __init__(self, event_bus=None):
         self.db_path = "databases/sqlite_dbs/unified_signals.db"
         self.correlation_db = "databases/sqlite_dbs/correlation_analysis.db"
         self.patterns_db = "databases/sqlite_dbs/trading_patterns.db"
         self.backtest_db = "databases/sqlite_dbs/backtest_results.db"
         self.setup_databases()
         
+        # Optional event bus; final signals are pushed to subscribers
+        self.event_bus = event_bus
+        
         # Signal generation parameters
         self.min_confidence_threshold = 0.6
         self.max_signals_per_hour = 10
         self.position_sizing_model = "kelly_criterion"
         
+        # Vectorized validation / filtering engine
+        self.signal_filter = ColumnarSignalFilter()
+        
+        # Shared streaming market regime detector
+        self.regime_detector = get_regime_detector()
+        
+        # OHLCV bar store (live-built and backfilled from exchange archives)
+        self.bar_builder = get_bar_builder()
+        
         # Risk management
         self.max_portfolio_risk = 0.02  # 2% max risk per signal
         self.max_correlation_exposure = 0.15  # 15% in correlated positions
@@ -224,6 +253,11 @@ class UnifiedSignalGenerator:
         # Store results
         await self.store_unified_signals(risk_adjusted_signals)
         
+        # Push to event bus subscribers
+        if self.event_bus is not None:
+            for signal in risk_adjusted_signals:
+                await self.event_bus.publish(signal)
+        
         print(f"✅ Unified signal generation complete:")
         print(f"   🔍 Candidate signals: {len(correlation_signals + pattern_signals)}")
         print(f"   ✅ Final signals: {len(risk_adjusted_signals)}")
@@ -342,6 +376,11 @@ class UnifiedSignalGenerator:
     async def load_current_market_data(self) -> pd.DataFrame:
         """Load current market data for signal validation"""
         try:
+            # Latest 2 hours of stored 5m bars
+            bars = self.bar_builder.get_frame(self.bar_builder.symbols(), '5m', limit=24)
+            if len(bars) >= 12:
+                return bars
+            
             # Try to load from free sources
             free_data_db = "databases/sqlite_dbs/free_sources_data.db"
             if Path(free_data_db).exists():
@@ -394,17 +433,20 @@ class UnifiedSignalGenerator:
                 pivot_df[f"{col}_momentum_15"] = pivot_df[col].pct_change(15)
                 
                 # Add volatility
-                pivot_df[f"{col}_volatility"] = pivot_df[col].rolling(window=20).std()
+                pivot_df[f"{col}_volatility"] = stdev(pivot_df[col], 20)
                 
-                # Add trend strength
-                pivot_df[f"{col}_trend"] = pivot_df[col].rolling(window=10).apply(
-                    lambda x: 1 if x.iloc[-1] > x.iloc[0] else -1
-                )
+                # Add trend strength: direction of the move across a 10-bar window
+                change = pivot_df[col].diff(9).to_numpy()
+                pivot_df[f"{col}_trend"] = np.where(np.isnan(change), np.nan, np.where(change > 0, 1.0, -1.0))
         
         return pivot_df.fillna(method='ffill').fillna(0)
     
     async def analyze_current_market_regime(self, market_data: pd.DataFrame) -> Dict[str, Any]:
-        """Analyze current market regime for signal context"""
+        """Analyze current market regime for signal context
+        
+        New rows are folded into the shared streaming regime detector; the regime
+        itself is read from its O(1) state rather than recomputed from the frame.
+        """
         if market_data.empty:
             return {
                 'regime_type': 'unknown',
@@ -414,7 +456,7 @@ class UnifiedSignalGenerator:
             }
         
         # Analyze price columns
-        price_cols = [col for col in market_data.columns if 'price' in col.lower()]
+        price_cols = price_columns(market_data)
         
         if not price_cols:
             return {
@@ -424,65 +466,21 @@ class UnifiedSignalGenerator:
                 'confidence': 0.0
             }
         
-        # Calculate regime metrics
-        volatilities = []
-        trends = []
-        
-        for col in price_cols:
-            if len(market_data[col]) > 20:
-                # Volatility
-                vol = market_data[col].pct_change().rolling(window=20).std().iloc[-1]
-                volatilities.append(vol)
-                
-                # Trend
-                recent_trend = (market_data[col].iloc[-1] - market_data[col].iloc[-20]) / market_data[col].iloc[-20]
-                trends.append(recent_trend)
-        
-        if not volatilities:
-            return {
-                'regime_type': 'insufficient_data',
-                'volatility_level': 'unknown',
-                'trend_direction': 'neutral',
-                'confidence': 0.0
-            }
-        
-        avg_volatility = np.mean(volatilities)
-        avg_trend = np.mean(trends)
-        
-        # Classify regime
-        if avg_volatility > 0.05:
-            volatility_level = 'high'
-        elif avg_volatility > 0.02:
-            volatility_level = 'medium'
-        else:
-            volatility_level = 'low'
+        self.regime_detector.update_frame(market_data, price_cols)
+        self.regime_detector.save()
         
-        if avg_trend > 0.02:
-            trend_direction = 'bullish'
-        elif avg_trend < -0.02:
-            trend_direction = 'bearish'
-        else:
-            trend_direction = 'neutral'
-        
-        # Determine regime type
-        if volatility_level == 'high':
-            if trend_direction != 'neutral':
-                regime_type = 'trending_volatile'
-            else:
-                regime_type = 'chaotic'
-        else:
-            if trend_direction != 'neutral':
-                regime_type = 'trending_stable'
-            else:
-                regime_type = 'range_bound'
+        regime = self.regime_detector.get_regime(price_cols)
+        if regime['regime_type'] == 'insufficient_data':
+            return regime
         
         return {
-            'regime_type': regime_type,
-            'volatility_level': volatility_level,
-            'trend_direction': trend_direction,
+            'regime_type': regime['regime_type'],
+            'volatility_level': regime['volatility_level'],
+            'trend_direction': regime['trend_direction'],
             'confidence': min(len(price_cols) / 3.0, 1.0),
-            'avg_volatility': avg_volatility,
-            'avg_trend': avg_trend
+            'avg_volatility': regime['avg_volatility'],
+            'avg_trend': regime['avg_trend'],
+            'persistence': regime['persistence']
         }
     
     async def extract_correlation_signals(self, correlation_data: Dict[str, Any], 
@@ -1086,117 +1084,33 @@ class UnifiedSignalGenerator:
     
     async def apply_multi_layer_filtering(self, signals: List[Dict[str, Any]], 
                                          market_regime: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Apply multi-layer filtering to remove low-quality signals"""
+        """Apply multi-layer filtering to remove low-quality signals
+        
+        Layers: confidence, market regime compatibility, risk-reward ratio,
+        validation score, time horizon and position size. Evaluated as vectorized
+        masks by ColumnarSignalFilter.
+        """
         if not signals:
             return signals
         
-        filtered_signals = []
-        
-        for signal in signals:
-            # Layer 1: Confidence threshold
-            confidence = signal.get('confidence', 0.0)
-            if confidence < 0.5:
-                continue
-            
-            # Layer 2: Market regime compatibility
-            signal_type = signal.get('signal_type', 'BUY')
-            regime_type = market_regime.get('regime_type', 'unknown')
-            
-            # Filter based on market regime
-            if regime_type == 'trending_volatile' and signal_type in ['HOLD']:
-                continue
-            elif regime_type == 'range_bound' and signal_type in ['STRONG_BUY', 'STRONG_SELL']:
-                continue
-            
-            # Layer 3: Risk-reward ratio
-            risk_reward = signal.get('risk_reward_ratio', 0.0)
-            if risk_reward < 1.5:  # Minimum 1.5:1 risk-reward
-                continue
-            
-            # Layer 4: Validation score
-            validation = signal.get('backtest_validation', {})
-            validation_score = validation.get('validation_boost', 0.0)
-            if validation_score < 0.0:  # Allow signals without validation
-                pass  # Keep signal but note lack of validation
-            
-            # Layer 5: Time horizon compatibility
-            time_horizon = signal.get('time_horizon', 0)
-            if time_horizon < 15:  # Minimum 15 minutes
-                continue
-            
-            # Layer 6: Position size reasonableness
-            position_size = signal.get('position_size', 0.0)
-            if position_size <= 0 or position_size > 0.1:  # Max 10% position
-                continue
-            
-            # Signal passed all filters
-            signal['filter_score'] = (
-                confidence * 0.4 +
-                min(risk_reward / 3.0, 1.0) * 0.3 +
-                min(position_size * 10, 1.0) * 0.2 +
-                (validation_score + 0.1) * 0.1  # Small boost for validation
-            )
-            
-            filtered_signals.append(signal)
+        filtered_signals = self.signal_filter.apply(signals, market_regime)
         
         print(f"✅ Multi-layer filtering: {len(filtered_signals)}/{len(signals)} signals passed all filters")
         return filtered_signals
 
     async def validate_signals_with_backtest(self, signals: List[Dict[str, Any]], 
                                            backtest_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Validate signals using backtest performance data"""
-        validated_signals = []
+        """Validate signals using backtest performance data
         
-        for signal in signals:
-            try:
-                # Find relevant backtest results for this signal
-                symbol = signal.get('symbol', 'BTC')
-                pattern_id = signal.get('pattern_id')
-                
-                # Look for backtest results
-                relevant_results = []
-                for result in backtest_data.get('backtest_results', []):
-                    if (result.get('symbol') == symbol or 
-                        result.get('pattern_id') == pattern_id):
-                        relevant_results.append(result)
-                
-                if relevant_results:
-                    # Calculate validation score based on backtest performance
-                    avg_win_rate = np.mean([r.get('win_rate', 0.5) for r in relevant_results])
-                    avg_sharpe = np.mean([r.get('sharpe_ratio', 0) for r in relevant_results])
-                    avg_return = np.mean([r.get('total_return_percentage', 0) for r in relevant_results])
-                    
-                    # Boost confidence based on backtest performance
-                    performance_boost = 0
-                    if avg_win_rate > 0.6:
-                        performance_boost += 0.1
-                    if avg_sharpe > 1.0:
-                        performance_boost += 0.1
-                    if avg_return > 0.05:
-                        performance_boost += 0.1
-                    
-                    # Update signal confidence
-                    original_confidence = signal.get('confidence', 0.5)
-                    validated_confidence = min(original_confidence + performance_boost, 1.0)
-                    
-                    signal['confidence'] = validated_confidence
-                    signal['backtest_validation'] = {
-                        'avg_win_rate': avg_win_rate,
-                        'avg_sharpe_ratio': avg_sharpe,
-                        'avg_return': avg_return,
-                        'validation_boost': performance_boost
-                    }
-                    
-                    validated_signals.append(signal)
-                else:
-                    # No backtest data available, keep original confidence but mark as unvalidated
-                    signal['backtest_validation'] = {'status': 'no_data_available'}
-                    validated_signals.append(signal)
-                    
-            except Exception as e:
-                print(f"⚠️ Error validating signal: {e}")
-                validated_signals.append(signal)  # Keep signal but unvalidated
-                continue
+        Backtest results are indexed by symbol and pattern_id once per call.
+        """
+        try:
+            validated_signals = self.signal_filter.validate_with_backtest(
+                signals, backtest_data.get('backtest_results', [])
+            )
+        except Exception as e:
+            print(f"⚠️ Error validating signals: {e}")
+            validated_signals = signals  # Keep signals but unvalidated
         
         print(f"✅ Validated {len(validated_signals)} signals with backtest data")
         return validated_signals
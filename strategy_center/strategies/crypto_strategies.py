@@ -7,6 +7,7 @@ Advanced trading strategies with AI integration for autonomous execution
 import requests
 import json
 import os
+import sys
 import time
 import asyncio
 from datetime import datetime, timedelta
@@ -14,6 +15,10 @@ import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Tuple
 
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from technical_analysis_center.indicators.indicator_engine import bollinger, rsi, sma
+
 def load_notion_token():
     """Load Notion token from env file"""
     token = ''
@@ -132,13 +137,13 @@ class MomentumStrategy(TradingStrategy):
         
         # Calculate momentum indicators
         current_price = market_data['price'].iloc[-1]
-        sma_20 = market_data['price'].rolling(window=20).mean().iloc[-1]
+        sma_20 = sma(market_data['price'], 20)[-1]
         
         # Price momentum
         price_change = (current_price - market_data['price'].iloc[-20]) / market_data['price'].iloc[-20]
         
         # Volume momentum  
-        avg_volume = market_data['volume'].rolling(window=10).mean().iloc[-1]
+        avg_volume = sma(market_data['volume'], 10)[-1]
         current_volume = market_data['volume'].iloc[-1]
         volume_ratio = current_volume / avg_volume
         
@@ -184,27 +189,15 @@ class MeanReversionStrategy(TradingStrategy):
         if len(market_data) < self.lookback_period:
             return {"signal": "hold", "confidence": 0, "reason": "insufficient_data"}
         
-        # Calculate RSI-like indicator
-        price_changes = market_data['price'].diff()
-        gains = price_changes.where(price_changes > 0, 0)
-        losses = -price_changes.where(price_changes < 0, 0)
-        
-        avg_gains = gains.rolling(window=self.lookback_period).mean()
-        avg_losses = losses.rolling(window=self.lookback_period).mean()
-        
-        rs = avg_gains / avg_losses
-        rsi = 1 - (1 / (1 + rs))
-        current_rsi = rsi.iloc[-1]
+        # Calculate RSI-like indicator (0-1 scale)
+        current_rsi = rsi(market_data['price'], self.lookback_period, smoothing="sma")[-1] / 100
         
         # Calculate Bollinger Bands
-        sma = market_data['price'].rolling(window=20).mean()
-        std = market_data['price'].rolling(window=20).std()
-        upper_band = sma + (2 * std)
-        lower_band = sma - (2 * std)
+        _, upper_band, lower_band = bollinger(market_data['price'], 20, 2.0, ddof=1)
         
         current_price = market_data['price'].iloc[-1]
-        current_upper = upper_band.iloc[-1]
-        current_lower = lower_band.iloc[-1]
+        current_upper = upper_band[-1]
+        current_lower = lower_band[-1]
         
         # Generate signal
         signal = "hold"
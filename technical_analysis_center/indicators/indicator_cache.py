@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Indicator Result Cache - Technical Analysis Center
+Memoized indicator outputs keyed by series fingerprint
+
+The correlation engine, the pattern recognizer and the pattern backtester
+recompute the same rolling features over the same price columns every cycle,
+usually on a frame that differs from the last one only by a few appended bars
+(and, for the 7-day window, a few dropped ones). The cache keeps one entry per
+(symbol, field, indicator, params) holding the timestamps, inputs and outputs
+it was computed on, so a lookup resolves against the stored last timestamp:
+
+- same timestamps and inputs: the stored output is returned
+- the new series overlaps the stored one (bars appended, the head trimmed or
+  the latest bar revised): outputs are reused up to the first changed input
+  and only the rest is computed. Rolling-window indicators recompute the new
+  bars from a ``period``-sized lookback; EMA continues from its last value.
+- anything else is recomputed in full
+
+Results match calling the batch functions directly. Entries are
+evicted least-recently-used once the cache exceeds its memory budget.
+``get_indicator_cache()`` returns the process-wide shared instance.
+"""
+
+import sys
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from technical_analysis_center.indicators.indicator_engine import bollinger, ema, macd, rsi, sma, stdev
+
+
+@dataclass(frozen=True)
+class CachedIndicator:
+    """How to compute an indicator and how far back a new output can see"""
+    compute: Callable[..., Any]
+    lookback: Callable[[Dict[str, Any]], Optional[int]]
+
+
+# Single-input indicators the cache understands. ``lookback`` is the number of
+# inputs an output depends on (None for recursive indicators).
+INDICATORS: Dict[str, CachedIndicator] = {
+    "sma": CachedIndicator(sma, lambda p: p["period"]),
+    "stdev": CachedIndicator(stdev, lambda p: p["period"]),
+    "bollinger": CachedIndicator(bollinger, lambda p: p.get("period", 20)),
+    "rsi": CachedIndicator(rsi, lambda p: p.get("period", 14) + 1
+                           if p.get("smoothing", "wilder") == "sma" else None),
+    "ema": CachedIndicator(ema, lambda p: None),
+    "macd": CachedIndicator(macd, lambda p: None)
+}
+
+
+class _Entry:
+    __slots__ = ("index", "inputs", "outputs", "multi", "nbytes")
+
+    def __init__(self, index: np.ndarray, inputs: np.ndarray, outputs: np.ndarray, multi: bool):
+        self.index = index
+        self.inputs = inputs
+        self.outputs = outputs
+        self.multi = multi
+        self.nbytes = index.nbytes + inputs.nbytes + outputs.nbytes
+
+
+def _index_values(index: pd.Index) -> Optional[np.ndarray]:
+    """Monotonic index as a sortable array, or None if it cannot be searched"""
+    if not index.is_monotonic_increasing:
+        return None
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.copy()
+    values = np.asarray(index)
+    return values.copy() if values.dtype.kind in "iuf" else None
+
+
+def _as_outputs(result) -> Tuple[np.ndarray, bool]:
+    if isinstance(result, tuple):
+        return np.vstack(result), True
+    return np.asarray(result, dtype=float)[np.newaxis, :], False
+
+
+class IndicatorCache:
+    """LRU memoization of indicator outputs under a memory budget"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[Tuple, _Entry]" = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "extensions": 0, "misses": 0, "evictions": 0, "bars_computed": 0}
+
+    def compute(self, indicator: str, series: pd.Series, symbol: str, field: str = "value",
+                **params) -> Union[np.ndarray, Tuple[np.ndarray, ...]]:
+        """
+        Indicator output aligned with ``series``, reusing cached work
+
+        Returns what the batch function returns: one array, or a tuple of
+        arrays for multi-output indicators (Bollinger, MACD).
+        """
+        spec = INDICATORS.get(indicator)
+        if spec is None:
+            raise ValueError(f"Indicator {indicator} is not cacheable")
+
+        inputs = series.to_numpy(dtype=float)
+        index = _index_values(series.index)
+        if index is None:
+            return spec.compute(inputs, **params)
+
+        key = (symbol, field, indicator, tuple(sorted(params.items())))
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+
+        outputs, multi = self._resolve(spec, params, entry, index, inputs)
+
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old.nbytes
+            new_entry = _Entry(index, inputs.copy(), outputs, multi)
+            if new_entry.nbytes <= self.max_bytes:
+                self.entries[key] = new_entry
+                self.total_bytes += new_entry.nbytes
+            self._evict()
+
+        return tuple(row.copy() for row in outputs) if multi else outputs[0].copy()
+
+    def _resolve(self, spec: CachedIndicator, params: Dict[str, Any], entry: Optional[_Entry],
+                 index: np.ndarray, inputs: np.ndarray) -> Tuple[np.ndarray, bool]:
+        n = len(inputs)
+        reuse = 0
+        start = 0
+        if entry is not None and n and len(entry.index):
+            start = int(np.searchsorted(entry.index, index[0]))
+            if start < len(entry.index) and entry.index[start] == index[0]:
+                overlap = min(len(entry.index) - start, n)
+                same_time = entry.index[start:start + overlap] == index[:overlap]
+                same_input = ((entry.inputs[start:start + overlap] == inputs[:overlap])
+                              | (np.isnan(entry.inputs[start:start + overlap]) & np.isnan(inputs[:overlap])))
+                changed = np.flatnonzero(~(same_time & same_input))
+                reuse = int(changed[0]) if len(changed) else overlap
+
+        if entry is not None and reuse == n and start == 0 and len(entry.index) == n:
+            self.stats["hits"] += 1
+            return entry.outputs, entry.multi
+
+        lookback = spec.lookback(params)
+        if reuse == 0 or (lookback is None and not self._can_resume(spec, start, entry, reuse)):
+            self.stats["misses"] += 1
+            self.stats["bars_computed"] += n
+            return _as_outputs(spec.compute(inputs, **params))
+
+        self.stats["extensions"] += 1
+        outputs = np.empty((entry.outputs.shape[0], n))
+        outputs[:, :reuse] = entry.outputs[:, start:start + reuse]
+
+        if lookback is None:
+            # EMA: continue the recursion from the last reused value
+            alpha = 2.0 / (params.get("period", 20) + 1)
+            tail = np.concatenate(([outputs[0, reuse - 1]], inputs[reuse:]))
+            outputs[0, reuse:] = pd.Series(tail).ewm(alpha=alpha, adjust=False,
+                                                     ignore_na=True).mean().to_numpy()[1:]
+            self.stats["bars_computed"] += n - reuse
+            return outputs, entry.multi
+
+        if start > 0:
+            # The head was trimmed: the first outputs are warm-up again
+            head = min(lookback - 1, reuse)
+            if head:
+                outputs[:, :head] = _as_outputs(spec.compute(inputs[:head], **params))[0]
+                self.stats["bars_computed"] += head
+        if reuse < n:
+            lo = max(0, reuse - lookback + 1)
+            outputs[:, reuse:] = _as_outputs(spec.compute(inputs[lo:], **params))[0][:, reuse - lo:]
+            self.stats["bars_computed"] += n - reuse
+        return outputs, entry.multi
+
+    @staticmethod
+    def _can_resume(spec: CachedIndicator, start: int, entry: _Entry, reuse: int) -> bool:
+        return (spec.compute is ema and start == 0
+                and np.isfinite(entry.outputs[0, reuse - 1]))
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self.entries:
+            _, entry = self.entries.popitem(last=False)
+            self.total_bytes -= entry.nbytes
+            self.stats["evictions"] += 1
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """Drop every entry, or only those of one symbol"""
+        with self.lock:
+            for key in [k for k in self.entries if symbol is None or k[0] == symbol]:
+                self.total_bytes -= self.entries.pop(key).nbytes
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {**self.stats, "entries": len(self.entries),
+                    "bytes": self.total_bytes, "max_bytes": self.max_bytes}
+
+
+_shared_cache: Optional[IndicatorCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_indicator_cache() -> IndicatorCache:
+    """Return the process-wide indicator cache"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = IndicatorCache()
+        return _shared_cache
+
+
+def main():
+    """Demo: a sliding 7-day frame re-read every cycle hits the cache"""
+    import time
+
+    print("🗄️ Indicator Result Cache")
+    print("=" * 50)
+
+    rng = np.random.default_rng(11)
+    n = 7 * 24 * 60
+    prices = pd.Series(50000 * np.exp(np.cumsum(rng.normal(0, 0.001, n + 600))),
+                       index=pd.date_range("2024-01-01", periods=n + 600, freq="min"))
+    cache = IndicatorCache()
+
+    started = time.perf_counter()
+    for cycle in range(60):
+        window = prices.iloc[cycle * 10: n + cycle * 10]
+        cached = cache.compute("stdev", window, "BTC", "price", period=20)
+    cached_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for cycle in range(60):
+        direct = stdev(prices.iloc[cycle * 10: n + cycle * 10], 20)
+    direct_time = time.perf_counter() - started
+
+    print(f"   direct: {direct_time * 1000:.1f}ms | cached: {cached_time * 1000:.1f}ms")
+    print(f"   identical: {np.allclose(cached, direct, equal_nan=True)}")
+    print(f"   stats: {cache.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,721 @@
+#!/usr/bin/env python3
+"""
+Technical Indicator Engine - Technical Analysis Center
+Batch and streaming SMA, EMA, RSI, MACD, Bollinger, ATR, VWAP, OBV and ADX
+
+RSI, SMA and rolling volatility used to be re-implemented in the pattern
+recognizer, the correlation engine, the signal generator, the backtester and
+the strategies, some of them with pure-Python loops. Every indicator now has
+two modes that produce the same numbers:
+
+- batch: a function over whole arrays (or pandas Series), vectorized with
+  cumulative sums and pandas' compiled rolling/EWM kernels. Output has the
+  input's length with NaN during warm-up.
+- streaming: a small ``__slots__`` state object whose ``update`` folds one new
+  bar in O(1) and returns the current value. States serialize with
+  ``to_dict``/``from_dict`` so a restart resumes without replaying history.
+
+Recursive indicators (EMA, Wilder RSI, ATR, ADX) are seeded with the simple
+mean of their first ``period`` inputs, as in Wilder's original definitions.
+Non-finite inputs are treated as missing bars: rolling windows that contain one
+are NaN in batch mode, recursive indicators skip them, and streaming updates
+ignore them and return the current value.
+"""
+
+import json
+import math
+from collections import deque
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+NAN = float("nan")
+
+
+def _as_array(values) -> np.ndarray:
+    return np.asarray(values, dtype=float)
+
+
+def _check_period(period: int):
+    if int(period) != period or period < 1:
+        raise ValueError(f"period must be a positive integer, got {period}")
+
+
+def _finite(value) -> bool:
+    return value is not None and math.isfinite(value)
+
+
+# ---------------------------------------------------------------------------
+# Batch mode
+# ---------------------------------------------------------------------------
+
+def _seeded_mean(values: np.ndarray, period: int, alpha: float) -> np.ndarray:
+    """Exponential recursion seeded with the mean of the first ``period`` finite inputs"""
+    out = np.full(len(values), np.nan)
+    finite = np.flatnonzero(np.isfinite(values))
+    if len(finite) < period:
+        return out
+
+    start = finite[period - 1]
+    seed = values[finite[:period]].mean()
+    tail = np.concatenate(([seed], values[start + 1:]))
+    out[start:] = pd.Series(tail).ewm(alpha=alpha, adjust=False, ignore_na=True).mean().to_numpy()
+    return out
+
+
+def sma(values, period: int) -> np.ndarray:
+    """Simple moving average"""
+    _check_period(period)
+    x = _as_array(values)
+    out = np.full(len(x), np.nan)
+    if len(x) < period:
+        return out
+
+    missing = ~np.isfinite(x)
+    total = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, x))))
+    gaps = np.concatenate(([0], np.cumsum(missing)))
+    window_sum = total[period:] - total[:-period]
+    window_gaps = gaps[period:] - gaps[:-period]
+    out[period - 1:] = np.where(window_gaps == 0, window_sum / period, np.nan)
+    return out
+
+
+def stdev(values, period: int, ddof: int = 1) -> np.ndarray:
+    """Rolling standard deviation (``ddof=1`` matches pandas' ``rolling().std()``)"""
+    _check_period(period)
+    return pd.Series(_as_array(values)).rolling(window=period).std(ddof=ddof).to_numpy()
+
+
+def ema(values, period: int) -> np.ndarray:
+    """Exponential moving average with alpha = 2 / (period + 1), seeded with the SMA"""
+    _check_period(period)
+    return _seeded_mean(_as_array(values), period, 2.0 / (period + 1))
+
+
+def _rsi_from_averages(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    rsi = np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), rsi)
+    return np.where(np.isnan(avg_gain) | np.isnan(avg_loss), np.nan, rsi)
+
+
+def rsi(values, period: int = 14, smoothing: str = "wilder") -> np.ndarray:
+    """
+    Relative strength index on a 0-100 scale
+
+    ``smoothing="wilder"`` is the standard definition; ``"sma"`` averages gains
+    and losses over a plain rolling window (Cutler's RSI), which is what the
+    pattern recognizer and strategies historically computed.
+    """
+    _check_period(period)
+    x = _as_array(values)
+    delta = np.diff(x, prepend=np.nan)
+    gains = np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0))
+    losses = np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0))
+
+    if smoothing == "wilder":
+        return _rsi_from_averages(_seeded_mean(gains, period, 1.0 / period),
+                                  _seeded_mean(losses, period, 1.0 / period))
+    if smoothing == "sma":
+        return _rsi_from_averages(sma(gains, period), sma(losses, period))
+    raise ValueError(f"Unknown RSI smoothing: {smoothing}")
+
+
+def macd(values, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line, signal line and histogram"""
+    x = _as_array(values)
+    line = ema(x, fast) - ema(x, slow)
+    signal_line = ema(line, signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger(values, period: int = 20, num_std: float = 2.0,
+              ddof: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Middle, upper and lower Bollinger band"""
+    x = _as_array(values)
+    middle = sma(x, period)
+    width = num_std * stdev(x, period, ddof=ddof)
+    return middle, middle + width, middle - width
+
+
+def true_range(high, low, close) -> np.ndarray:
+    """True range; the first bar has no previous close and uses high - low"""
+    h, l, c = _as_array(high), _as_array(low), _as_array(close)
+    prev_close = np.concatenate(([np.nan], c[:-1]))
+    with np.errstate(invalid='ignore'):
+        tr = np.fmax(h - l, np.fmax(np.abs(h - prev_close), np.abs(l - prev_close)))
+    return np.where(np.isfinite(h) & np.isfinite(l), tr, np.nan)
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    """Average true range with Wilder smoothing"""
+    _check_period(period)
+    return _seeded_mean(true_range(high, low, close), period, 1.0 / period)
+
+
+def vwap(high, low, close, volume, session=None) -> np.ndarray:
+    """
+    Volume-weighted average of the typical price
+
+    Cumulative from the first bar, or restarted whenever ``session`` (an
+    array of session keys such as dates) changes value.
+    """
+    typical = (_as_array(high) + _as_array(low) + _as_array(close)) / 3.0
+    v = _as_array(volume)
+    valid = np.isfinite(typical) & np.isfinite(v)
+    pv = np.where(valid, typical * v, 0.0)
+    v = np.where(valid, v, 0.0)
+
+    cum_pv = np.cumsum(pv)
+    cum_v = np.cumsum(v)
+    if session is not None and len(v):
+        keys = np.asarray(session)
+        starts = np.concatenate(([True], keys[1:] != keys[:-1]))
+        segment = np.cumsum(starts) - 1
+        cum_pv = cum_pv - (cum_pv - pv)[starts][segment]
+        cum_v = cum_v - (cum_v - v)[starts][segment]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(cum_v > 0, cum_pv / cum_v, np.nan)
+
+
+def obv(close, volume) -> np.ndarray:
+    """On-balance volume, starting from zero"""
+    c, v = _as_array(close), _as_array(volume)
+    direction = np.sign(np.diff(c, prepend=np.nan))
+    flow = np.where(np.isfinite(direction) & np.isfinite(v), direction * v, 0.0)
+    return np.cumsum(flow)
+
+
+def adx(high, low, close, period: int = 14) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Average directional index, +DI and -DI (Wilder)"""
+    _check_period(period)
+    h, l = _as_array(high), _as_array(low)
+    up = np.diff(h, prepend=np.nan)
+    down = -np.diff(l, prepend=np.nan)
+    with np.errstate(invalid='ignore'):
+        plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+        minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+    missing = np.isnan(up) | np.isnan(down)
+    plus_dm[missing] = np.nan
+    minus_dm[missing] = np.nan
+
+    tr = true_range(h, l, close)
+    tr[0] = np.nan  # directional movement starts on the second bar
+
+    alpha = 1.0 / period
+    smoothed_tr = _seeded_mean(tr, period, alpha)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = 100.0 * _seeded_mean(plus_dm, period, alpha) / smoothed_tr
+        minus_di = 100.0 * _seeded_mean(minus_dm, period, alpha) / smoothed_tr
+        di_sum = plus_di + minus_di
+        dx = np.where(di_sum > 0, 100.0 * np.abs(plus_di - minus_di) / di_sum, 0.0)
+    dx[np.isnan(di_sum)] = np.nan
+    return _seeded_mean(dx, period, alpha), plus_di, minus_di
+
+
+# ---------------------------------------------------------------------------
+# Streaming mode
+# ---------------------------------------------------------------------------
+
+class IndicatorState:
+    """Base for O(1) streaming indicator state"""
+
+    __slots__ = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"type": type(self).__name__}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                value = getattr(self, name)
+                if isinstance(value, IndicatorState):
+                    value = value.to_dict()
+                elif isinstance(value, deque):
+                    value = list(value)
+                data[name] = value
+        return data
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "IndicatorState":
+        state_cls = STATE_TYPES[data["type"]]
+        state = state_cls.__new__(state_cls)
+        for name, value in data.items():
+            if name == "type":
+                continue
+            if isinstance(value, dict) and "type" in value:
+                value = IndicatorState.from_dict(value)
+            elif isinstance(value, list):
+                value = deque(value, maxlen=data["period"])
+            setattr(state, name, value)
+        return state
+
+
+class SMAState(IndicatorState):
+    """Rolling mean over the last ``period`` values"""
+
+    __slots__ = ("period", "window", "total", "count")
+
+    def __init__(self, period: int = 20):
+        _check_period(period)
+        self.period = period
+        self.window: deque = deque(maxlen=period)
+        self.total = 0.0
+        self.count = 0
+
+    def update(self, value: float) -> float:
+        if _finite(value):
+            if len(self.window) == self.period:
+                self.total -= self.window[0]
+            self.window.append(value)
+            self.total += value
+            self.count += 1
+            if self.count % (64 * self.period) == 0:
+                self.total = math.fsum(self.window)  # bound floating-point drift
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.total / self.period if len(self.window) == self.period else NAN
+
+
+class StdevState(IndicatorState):
+    """Rolling standard deviation from running sums around an anchor value"""
+
+    __slots__ = ("period", "ddof", "window", "anchor", "total", "total_sq", "count")
+
+    def __init__(self, period: int = 20, ddof: int = 1):
+        _check_period(period)
+        self.period = period
+        self.ddof = ddof
+        self.window: deque = deque(maxlen=period)
+        self.anchor: Optional[float] = None
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.count = 0
+
+    def _resum(self):
+        self.anchor = math.fsum(self.window) / len(self.window)
+        self.total = math.fsum(v - self.anchor for v in self.window)
+        self.total_sq = math.fsum((v - self.anchor) ** 2 for v in self.window)
+
+    def update(self, value: float) -> float:
+        if _finite(value):
+            if self.anchor is None:
+                self.anchor = value
+            if len(self.window) == self.period:
+                old = self.window[0] - self.anchor
+                self.total -= old
+                self.total_sq -= old * old
+            self.window.append(value)
+            d = value - self.anchor
+            self.total += d
+            self.total_sq += d * d
+            self.count += 1
+            if self.count % (64 * self.period) == 0:
+                self._resum()
+        return self.value
+
+    @property
+    def value(self) -> float:
+        n = len(self.window)
+        if n < self.period or n <= self.ddof:
+            return NAN
+        variance = (self.total_sq - self.total * self.total / n) / (n - self.ddof)
+        return math.sqrt(max(variance, 0.0))
+
+
+class SeededMeanState(IndicatorState):
+    """Exponential recursion seeded with the mean of the first ``period`` inputs"""
+
+    __slots__ = ("period", "alpha", "seen", "seed_total", "value")
+
+    def __init__(self, period: int, alpha: float):
+        _check_period(period)
+        self.period = period
+        self.alpha = alpha
+        self.seen = 0
+        self.seed_total = 0.0
+        self.value = NAN
+
+    def update(self, value: float) -> float:
+        if not _finite(value):
+            return self.value
+        if self.seen < self.period:
+            self.seen += 1
+            self.seed_total += value
+            if self.seen == self.period:
+                self.value = self.seed_total / self.period
+        else:
+            self.value += self.alpha * (value - self.value)
+        return self.value
+
+    @property
+    def ready(self) -> bool:
+        return self.seen >= self.period
+
+
+class EMAState(SeededMeanState):
+    """Exponential moving average, alpha = 2 / (period + 1)"""
+
+    __slots__ = ()
+
+    def __init__(self, period: int = 20):
+        super().__init__(period, 2.0 / (period + 1))
+
+
+class WilderState(SeededMeanState):
+    """Wilder smoothing, alpha = 1 / period"""
+
+    __slots__ = ()
+
+    def __init__(self, period: int = 14):
+        super().__init__(period, 1.0 / period)
+
+
+def _rsi_value(avg_gain: float, avg_loss: float) -> float:
+    if math.isnan(avg_gain) or math.isnan(avg_loss):
+        return NAN
+    if avg_loss == 0:
+        return 50.0 if avg_gain == 0 else 100.0
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+class RSIState(IndicatorState):
+    """Streaming RSI with Wilder (default) or simple-window smoothing"""
+
+    __slots__ = ("period", "smoothing", "last", "gain", "loss", "value")
+
+    def __init__(self, period: int = 14, smoothing: str = "wilder"):
+        if smoothing not in ("wilder", "sma"):
+            raise ValueError(f"Unknown RSI smoothing: {smoothing}")
+        self.period = period
+        self.smoothing = smoothing
+        self.last: Optional[float] = None
+        self.gain = WilderState(period) if smoothing == "wilder" else SMAState(period)
+        self.loss = WilderState(period) if smoothing == "wilder" else SMAState(period)
+        self.value = NAN
+
+    def update(self, value: float) -> float:
+        if not _finite(value):
+            return self.value
+        if self.last is not None:
+            delta = value - self.last
+            self.value = _rsi_value(self.gain.update(max(delta, 0.0)),
+                                    self.loss.update(max(-delta, 0.0)))
+        self.last = value
+        return self.value
+
+
+class MACDState(IndicatorState):
+    """Streaming MACD line, signal line and histogram"""
+
+    __slots__ = ("fast", "slow", "signal")
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMAState(fast)
+        self.slow = EMAState(slow)
+        self.signal = EMAState(signal)
+
+    def update(self, value: float) -> Tuple[float, float, float]:
+        if _finite(value):
+            self.fast.update(value)
+            self.slow.update(value)
+            if self.slow.ready:
+                self.signal.update(self.fast.value - self.slow.value)
+        return self.value
+
+    @property
+    def value(self) -> Tuple[float, float, float]:
+        line = self.fast.value - self.slow.value
+        return line, self.signal.value, line - self.signal.value
+
+
+class BollingerState(IndicatorState):
+    """Streaming middle, upper and lower Bollinger band"""
+
+    __slots__ = ("num_std", "mean", "std")
+
+    def __init__(self, period: int = 20, num_std: float = 2.0, ddof: int = 0):
+        self.num_std = num_std
+        self.mean = SMAState(period)
+        self.std = StdevState(period, ddof)
+
+    def update(self, value: float) -> Tuple[float, float, float]:
+        self.mean.update(value)
+        self.std.update(value)
+        return self.value
+
+    @property
+    def value(self) -> Tuple[float, float, float]:
+        middle = self.mean.value
+        width = self.num_std * self.std.value
+        return middle, middle + width, middle - width
+
+
+class ATRState(IndicatorState):
+    """Streaming average true range"""
+
+    __slots__ = ("prev_close", "average")
+
+    def __init__(self, period: int = 14):
+        self.prev_close: Optional[float] = None
+        self.average = WilderState(period)
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if not (_finite(high) and _finite(low)):
+            return self.average.value
+        tr = high - low
+        if self.prev_close is not None:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        if _finite(close):
+            self.prev_close = close
+        return self.average.update(tr)
+
+    @property
+    def value(self) -> float:
+        return self.average.value
+
+
+class VWAPState(IndicatorState):
+    """Streaming VWAP, optionally restarted when the session key changes"""
+
+    __slots__ = ("session", "cum_pv", "cum_volume")
+
+    def __init__(self):
+        self.session: Any = None
+        self.cum_pv = 0.0
+        self.cum_volume = 0.0
+
+    def update(self, high: float, low: float, close: float, volume: float,
+               session: Any = None) -> float:
+        if session is not None and session != self.session:
+            self.session = session
+            self.cum_pv = 0.0
+            self.cum_volume = 0.0
+        typical = (high + low + close) / 3.0
+        if _finite(typical) and _finite(volume):
+            self.cum_pv += typical * volume
+            self.cum_volume += volume
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.cum_pv / self.cum_volume if self.cum_volume > 0 else NAN
+
+
+class OBVState(IndicatorState):
+    """Streaming on-balance volume"""
+
+    __slots__ = ("prev_close", "value")
+
+    def __init__(self):
+        self.prev_close: Optional[float] = None
+        self.value = 0.0
+
+    def update(self, close: float, volume: float) -> float:
+        if not _finite(close):
+            return self.value
+        if self.prev_close is not None and _finite(volume):
+            if close > self.prev_close:
+                self.value += volume
+            elif close < self.prev_close:
+                self.value -= volume
+        self.prev_close = close
+        return self.value
+
+
+class ADXState(IndicatorState):
+    """Streaming ADX, +DI and -DI"""
+
+    __slots__ = ("prev_high", "prev_low", "prev_close", "tr", "plus_dm", "minus_dm", "dx")
+
+    def __init__(self, period: int = 14):
+        self.prev_high: Optional[float] = None
+        self.prev_low: Optional[float] = None
+        self.prev_close: Optional[float] = None
+        self.tr = WilderState(period)
+        self.plus_dm = WilderState(period)
+        self.minus_dm = WilderState(period)
+        self.dx = WilderState(period)
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, float, float]:
+        if not (_finite(high) and _finite(low)):
+            return self.value
+        if self.prev_high is not None:
+            up = high - self.prev_high
+            down = self.prev_low - low
+            tr = high - low
+            if self.prev_close is not None:
+                tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+            self.tr.update(tr)
+            self.plus_dm.update(up if up > down and up > 0 else 0.0)
+            self.minus_dm.update(down if down > up and down > 0 else 0.0)
+
+            _, plus_di, minus_di = self.value
+            if not math.isnan(plus_di) and not math.isnan(minus_di):
+                di_sum = plus_di + minus_di
+                self.dx.update(100.0 * abs(plus_di - minus_di) / di_sum if di_sum > 0 else 0.0)
+
+        self.prev_high = high
+        self.prev_low = low
+        if _finite(close):
+            self.prev_close = close
+        return self.value
+
+    @property
+    def value(self) -> Tuple[float, float, float]:
+        smoothed_tr = self.tr.value
+        if math.isnan(smoothed_tr) or smoothed_tr == 0:
+            return self.dx.value, NAN, NAN
+        return (self.dx.value,
+                100.0 * self.plus_dm.value / smoothed_tr,
+                100.0 * self.minus_dm.value / smoothed_tr)
+
+
+STATE_TYPES = {cls.__name__: cls for cls in (
+    SMAState, StdevState, SeededMeanState, EMAState, WilderState, RSIState, MACDState,
+    BollingerState, ATRState, VWAPState, OBVState, ADXState
+)}
+
+
+class IndicatorStream:
+    """
+    The full indicator set for one instrument, updated bar by bar
+
+    ``update`` takes one OHLCV bar and returns every indicator's current value
+    under the same column names ``indicator_frame`` produces in batch mode.
+    """
+
+    def __init__(self, sma_period: int = 20, ema_period: int = 20, rsi_period: int = 14,
+                 bollinger_period: int = 20, atr_period: int = 14, adx_period: int = 14):
+        self.states: Dict[str, IndicatorState] = {
+            "sma": SMAState(sma_period),
+            "ema": EMAState(ema_period),
+            "rsi": RSIState(rsi_period),
+            "macd": MACDState(),
+            "bollinger": BollingerState(bollinger_period),
+            "atr": ATRState(atr_period),
+            "vwap": VWAPState(),
+            "obv": OBVState(),
+            "adx": ADXState(adx_period)
+        }
+        self.bars = 0
+
+    def update(self, close: float, high: Optional[float] = None, low: Optional[float] = None,
+               volume: Optional[float] = None, session: Any = None) -> Dict[str, float]:
+        """Fold one bar into every indicator; high/low default to the close"""
+        high = close if high is None else high
+        low = close if low is None else low
+        volume = 0.0 if volume is None else volume
+        s = self.states
+
+        macd_line, macd_signal, macd_hist = s["macd"].update(close)
+        bb_middle, bb_upper, bb_lower = s["bollinger"].update(close)
+        adx_value, plus_di, minus_di = s["adx"].update(high, low, close)
+        self.bars += 1
+        return {
+            "sma": s["sma"].update(close),
+            "ema": s["ema"].update(close),
+            "rsi": s["rsi"].update(close),
+            "macd": macd_line,
+            "macd_signal": macd_signal,
+            "macd_hist": macd_hist,
+            "bb_middle": bb_middle,
+            "bb_upper": bb_upper,
+            "bb_lower": bb_lower,
+            "atr": s["atr"].update(high, low, close),
+            "vwap": s["vwap"].update(high, low, close, volume, session),
+            "obv": s["obv"].update(close, volume),
+            "adx": adx_value,
+            "plus_di": plus_di,
+            "minus_di": minus_di
+        }
+
+    def warm_up(self, frame: pd.DataFrame) -> Optional[Dict[str, float]]:
+        """Replay an OHLCV frame (``close`` required) and return the last values"""
+        last = None
+        close = frame["close"].to_numpy(dtype=float)
+        high = frame["high"].to_numpy(dtype=float) if "high" in frame else close
+        low = frame["low"].to_numpy(dtype=float) if "low" in frame else close
+        volume = frame["volume"].to_numpy(dtype=float) if "volume" in frame else np.zeros(len(close))
+        for c, h, l, v in zip(close.tolist(), high.tolist(), low.tolist(), volume.tolist()):
+            last = self.update(c, h, l, v)
+        return last
+
+    def to_json(self) -> str:
+        return json.dumps({"bars": self.bars,
+                           "states": {name: state.to_dict() for name, state in self.states.items()}})
+
+    @classmethod
+    def from_json(cls, payload: str) -> "IndicatorStream":
+        data = json.loads(payload)
+        stream = cls.__new__(cls)
+        stream.bars = data["bars"]
+        stream.states = {name: IndicatorState.from_dict(state) for name, state in data["states"].items()}
+        return stream
+
+
+def indicator_frame(frame: pd.DataFrame, sma_period: int = 20, ema_period: int = 20,
+                    rsi_period: int = 14, bollinger_period: int = 20, atr_period: int = 14,
+                    adx_period: int = 14, session: Optional[Iterable] = None) -> pd.DataFrame:
+    """Batch counterpart of ``IndicatorStream``: every indicator over an OHLCV frame"""
+    close = frame["close"].to_numpy(dtype=float)
+    high = frame["high"].to_numpy(dtype=float) if "high" in frame else close
+    low = frame["low"].to_numpy(dtype=float) if "low" in frame else close
+    volume = frame["volume"].to_numpy(dtype=float) if "volume" in frame else np.zeros(len(close))
+
+    macd_line, macd_signal, macd_hist = macd(close)
+    bb_middle, bb_upper, bb_lower = bollinger(close, bollinger_period)
+    adx_value, plus_di, minus_di = adx(high, low, close, adx_period)
+    return pd.DataFrame({
+        "sma": sma(close, sma_period),
+        "ema": ema(close, ema_period),
+        "rsi": rsi(close, rsi_period),
+        "macd": macd_line,
+        "macd_signal": macd_signal,
+        "macd_hist": macd_hist,
+        "bb_middle": bb_middle,
+        "bb_upper": bb_upper,
+        "bb_lower": bb_lower,
+        "atr": atr(high, low, close, atr_period),
+        "vwap": vwap(high, low, close, volume, session),
+        "obv": obv(close, volume),
+        "adx": adx_value,
+        "plus_di": plus_di,
+        "minus_di": minus_di
+    }, index=frame.index)
+
+
+def main():
+    """Demo: batch and streaming modes agree on a synthetic OHLCV series"""
+    print("📈 Technical Indicator Engine")
+    print("=" * 50)
+
+    rng = np.random.default_rng(7)
+    n = 2000
+    close = 50000 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    spread = close * np.abs(rng.normal(0, 0.001, n))
+    frame = pd.DataFrame({
+        "close": close,
+        "high": close + spread,
+        "low": close - spread,
+        "volume": rng.uniform(1, 10, n)
+    }, index=pd.date_range("2024-01-01", periods=n, freq="min"))
+
+    batch = indicator_frame(frame)
+    stream = IndicatorStream()
+    stream.warm_up(frame.iloc[:-1])
+    stream = IndicatorStream.from_json(stream.to_json())
+    last = frame.iloc[-1]
+    latest = stream.update(last["close"], last["high"], last["low"], last["volume"])
+
+    for name, value in latest.items():
+        print(f"   {name:>12}: stream {value:14.4f} | batch {batch[name].iloc[-1]:14.4f}")
+
+    worst = max(abs(value - batch[name].iloc[-1]) / max(abs(value), 1.0) for name, value in latest.items())
+    print(f"\n✅ Largest relative difference: {worst:.2e}")
+
+
+if __name__ == "__main__":
+    main()
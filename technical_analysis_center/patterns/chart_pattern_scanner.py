@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Chart Pattern Scanner - Technical Analysis Center
+Candlestick patterns, support/resistance, breakouts and divergences over a whole universe
+
+``AdvancedPatternRecognition`` only classified correlation-derived patterns and
+never looked at price structure. This scanner evaluates every pattern kernel
+on symbols x time OHLCV matrices (``BarData``), so one call covers every
+tracked symbol of a timeframe and ``scan`` covers every timeframe:
+
+- candlesticks: doji, hammer, shooting star, engulfing, morning/evening star,
+  three white soldiers/black crows
+- levels: support and resistance from confirmed swing lows/highs
+  (fractals of ``swing_window`` bars each side), with bounces and rejections
+- breakouts: closes crossing the latest level, volume-confirmed when volume
+  is available
+- divergences: a new swing low/high in price not confirmed by RSI
+
+Every kernel is a rolling-window array expression over the full matrix, so
+the cost is a fixed number of vectorized passes regardless of how many
+symbols are tracked. Levels and swings only use bars up to the one being
+evaluated, so there is no lookahead and the masks can be backtested as-is.
+Results are ``PatternEvent`` records that the pattern recognizer turns into
+``TradingPattern`` objects.
+"""
+
+import sys
+import os
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from strategy_center.backtesting.fill_models import BarData, infer_bar_seconds
+from technical_analysis_center.indicators.indicator_engine import rsi
+
+
+@dataclass
+class PatternEvent:
+    symbol: str
+    timeframe: str
+    pattern: str
+    category: str            # candlestick, level, breakout, divergence
+    direction: str           # bullish, bearish, neutral
+    bar_index: int
+    timestamp: Optional[datetime]
+    price: float
+    strength: float          # 0-1
+    level: Optional[float] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['timestamp'] = self.timestamp.isoformat() if self.timestamp is not None else None
+        return data
+
+
+# pattern -> (category, direction)
+PATTERNS: Dict[str, Tuple[str, str]] = {
+    'doji': ('candlestick', 'neutral'),
+    'hammer': ('candlestick', 'bullish'),
+    'shooting_star': ('candlestick', 'bearish'),
+    'bullish_engulfing': ('candlestick', 'bullish'),
+    'bearish_engulfing': ('candlestick', 'bearish'),
+    'morning_star': ('candlestick', 'bullish'),
+    'evening_star': ('candlestick', 'bearish'),
+    'three_white_soldiers': ('candlestick', 'bullish'),
+    'three_black_crows': ('candlestick', 'bearish'),
+    'support_bounce': ('level', 'bullish'),
+    'resistance_rejection': ('level', 'bearish'),
+    'breakout_up': ('breakout', 'bullish'),
+    'breakdown': ('breakout', 'bearish'),
+    'bullish_divergence': ('divergence', 'bullish'),
+    'bearish_divergence': ('divergence', 'bearish'),
+}
+
+
+def timeframe_label(bar_seconds: float) -> str:
+    """Human-readable timeframe for a bar length, e.g. 300 -> '5m'"""
+    for unit, seconds in (('d', 86400), ('h', 3600), ('m', 60)):
+        if bar_seconds >= seconds and bar_seconds % seconds == 0:
+            return f"{int(bar_seconds // seconds)}{unit}"
+    return f"{int(bar_seconds)}s"
+
+
+def _rolling(matrix: np.ndarray, window: int, how: str) -> np.ndarray:
+    """Trailing rolling statistic along time for every symbol row"""
+    return getattr(pd.DataFrame(matrix.T).rolling(window), how)().to_numpy().T
+
+
+def _shift(matrix: np.ndarray, periods: int) -> np.ndarray:
+    """Shift along time, filling the first ``periods`` bars with NaN"""
+    out = np.full_like(matrix, np.nan)
+    if periods < matrix.shape[1]:
+        out[:, periods:] = matrix[:, :matrix.shape[1] - periods]
+    return out
+
+
+def _ffill(matrix: np.ndarray) -> np.ndarray:
+    return pd.DataFrame(matrix.T).ffill().to_numpy().T
+
+
+def _unit(values: np.ndarray) -> np.ndarray:
+    return np.clip(np.nan_to_num(values), 0.0, 1.0)
+
+
+class ChartPatternScanner:
+    """Vectorized chart-pattern kernels over symbols x time matrices"""
+
+    def __init__(self, swing_window: int = 3, level_tolerance: float = 0.002,
+                 average_window: int = 20, volume_confirmation: float = 1.5,
+                 rsi_period: int = 14, trend_bars: int = 5, min_bars: int = 30):
+        self.swing_window = swing_window
+        self.level_tolerance = level_tolerance
+        self.average_window = average_window
+        self.volume_confirmation = volume_confirmation
+        self.rsi_period = rsi_period
+        self.trend_bars = trend_bars
+        self.min_bars = min_bars
+        self.last_scan_stats: Dict[str, Any] = {}
+
+    def kernels(self, bars: BarData) -> Dict[str, Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]]:
+        """
+        Evaluate every pattern on every bar of every symbol
+
+        Returns ``{pattern: (mask, strength, level)}`` with symbols x time
+        arrays; ``level`` is None for patterns without a price level.
+        """
+        o, h, l, c = bars.open, bars.high, bars.low, bars.close
+        k = self.swing_window
+        with np.errstate(invalid='ignore', divide='ignore'):
+            body = c - o
+            abs_body = np.abs(body)
+            candle_range = h - l
+            upper = h - np.maximum(o, c)
+            lower = np.minimum(o, c) - l
+            avg_range = _shift(_rolling(candle_range, self.average_window, 'mean'), 1)
+            body_score = _unit(abs_body / avg_range)
+
+            if bars.volume is not None:
+                volume_ratio = bars.volume / _shift(_rolling(bars.volume, self.average_window, 'mean'), 1)
+                volume_ok = volume_ratio >= self.volume_confirmation
+            else:
+                volume_ratio = np.full_like(c, np.nan)
+                volume_ok = np.ones_like(c, dtype=bool)
+            volume_bonus = 0.2 * _unit(volume_ratio - 1.0)
+
+            prior_decline = _shift(c, 1) < _shift(c, 1 + self.trend_bars)
+            prior_rise = _shift(c, 1) > _shift(c, 1 + self.trend_bars)
+            candle_strength = 0.3 + 0.5 * body_score + volume_bonus
+
+            o1, c1, body1 = _shift(o, 1), _shift(c, 1), _shift(body, 1)
+            o2, c2, body2 = _shift(o, 2), _shift(c, 2), _shift(body, 2)
+
+            kernels: Dict[str, Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]] = {}
+            kernels['doji'] = ((candle_range > 0) & (abs_body <= 0.1 * candle_range),
+                               np.full_like(c, 0.3), None)
+            kernels['hammer'] = ((candle_range > 0) & (lower >= 2 * abs_body) & (upper <= 0.25 * candle_range)
+                                 & prior_decline, candle_strength, None)
+            kernels['shooting_star'] = ((candle_range > 0) & (upper >= 2 * abs_body) & (lower <= 0.25 * candle_range)
+                                        & prior_rise, candle_strength, None)
+            kernels['bullish_engulfing'] = ((body1 < 0) & (body > 0) & (o <= c1) & (c >= o1)
+                                            & (abs_body > np.abs(body1)), candle_strength, None)
+            kernels['bearish_engulfing'] = ((body1 > 0) & (body < 0) & (o >= c1) & (c <= o1)
+                                            & (abs_body > np.abs(body1)), candle_strength, None)
+
+            large_first = np.abs(body2) >= 0.6 * _shift(avg_range, 2)
+            small_middle = np.abs(body1) <= 0.3 * np.abs(body2)
+            kernels['morning_star'] = ((body2 < 0) & large_first & small_middle & (body > 0)
+                                       & (c > (o2 + c2) / 2), candle_strength, None)
+            kernels['evening_star'] = ((body2 > 0) & large_first & small_middle & (body < 0)
+                                       & (c < (o2 + c2) / 2), candle_strength, None)
+
+            kernels['three_white_soldiers'] = ((body > 0) & (body1 > 0) & (body2 > 0) & (c > c1) & (c1 > c2)
+                                               & (o > o1) & (o <= c1) & (o1 > o2) & (o1 <= c2),
+                                               candle_strength, None)
+            kernels['three_black_crows'] = ((body < 0) & (body1 < 0) & (body2 < 0) & (c < c1) & (c1 < c2)
+                                            & (o < o1) & (o >= c1) & (o1 < o2) & (o1 >= c2),
+                                            candle_strength, None)
+
+            # Swing points are confirmed k bars after the extreme
+            swing_high = (_shift(h, k) == _rolling(h, 2 * k + 1, 'max'))
+            swing_low = (_shift(l, k) == _rolling(l, 2 * k + 1, 'min'))
+            resistance = _ffill(np.where(swing_high, _shift(h, k), np.nan))
+            support = _ffill(np.where(swing_low, _shift(l, k), np.nan))
+            prev_resistance = _shift(resistance, 1)
+            prev_support = _shift(support, 1)
+            tol = self.level_tolerance
+
+            breakout_up = (c > prev_resistance) & (_shift(c, 1) <= prev_resistance) & volume_ok
+            breakdown = (c < prev_support) & (_shift(c, 1) >= prev_support) & volume_ok
+            kernels['breakout_up'] = (breakout_up, 0.4 + 0.3 * _unit((c - prev_resistance) / avg_range)
+                                      + 1.5 * volume_bonus, prev_resistance)
+            kernels['breakdown'] = (breakdown, 0.4 + 0.3 * _unit((prev_support - c) / avg_range)
+                                    + 1.5 * volume_bonus, prev_support)
+
+            level_strength = 0.35 + 0.35 * body_score + 1.5 * volume_bonus
+            kernels['support_bounce'] = ((l <= prev_support * (1 + tol)) & (c > prev_support) & (body > 0),
+                                         level_strength, prev_support)
+            kernels['resistance_rejection'] = ((h >= prev_resistance * (1 - tol)) & (c < prev_resistance)
+                                               & (body < 0), level_strength, prev_resistance)
+
+            # Divergence between consecutive swing points of price and RSI: a lower
+            # low with a higher RSI (bullish) or a higher high with a lower RSI
+            momentum = np.vstack([rsi(row, self.rsi_period) for row in c]) if len(c) else np.empty_like(c)
+            for name, mask, price, sign in (('bullish_divergence', swing_low, l, 1.0),
+                                            ('bearish_divergence', swing_high, h, -1.0)):
+                swing_price = np.where(mask, _shift(price, k), np.nan)
+                swing_rsi = np.where(mask, _shift(momentum, k), np.nan)
+                previous_price = _shift(_ffill(swing_price), 1)
+                previous_rsi = _shift(_ffill(swing_rsi), 1)
+                found = (mask & (sign * (swing_price - previous_price) < 0)
+                         & (sign * (swing_rsi - previous_rsi) > 0))
+                kernels[name] = (found, 0.5 + 0.5 * _unit(np.abs(swing_rsi - previous_rsi) / 20.0),
+                                 previous_price)
+
+        return {name: (np.nan_to_num(mask, nan=0).astype(bool), np.clip(strength, 0.0, 1.0), level)
+                for name, (mask, strength, level) in kernels.items()}
+
+    def scan_bars(self, bars: BarData, timeframe: str, index: Optional[pd.Index] = None,
+                  recent_bars: int = 1) -> List[PatternEvent]:
+        """Events on the last ``recent_bars`` bars of every symbol of one timeframe"""
+        n = bars.n_bars
+        if n < self.min_bars:
+            return []
+
+        first = max(n - recent_bars, 0)
+        events = []
+        for name, (mask, strength, level) in self.kernels(bars).items():
+            category, direction = PATTERNS[name]
+            rows, cols = np.nonzero(mask[:, first:])
+            for row, col in zip(rows.tolist(), (cols + first).tolist()):
+                timestamp = index[col].to_pydatetime() if isinstance(index, pd.DatetimeIndex) else None
+                events.append(PatternEvent(
+                    symbol=bars.symbols[row],
+                    timeframe=timeframe,
+                    pattern=name,
+                    category=category,
+                    direction=direction,
+                    bar_index=col,
+                    timestamp=timestamp,
+                    price=float(bars.close[row, col]),
+                    strength=float(strength[row, col]),
+                    level=float(level[row, col]) if level is not None else None
+                ))
+        return events
+
+    def scan(self, universe: Dict[str, pd.DataFrame], recent_bars: int = 1) -> List[PatternEvent]:
+        """
+        Scan every timeframe of the tracked universe
+
+        ``universe`` maps a timeframe label to a frame with ``<SYMBOL>_price``
+        (close) and optional ``_open/_high/_low/_volume`` columns.
+        """
+        started = time.perf_counter()
+        events: List[PatternEvent] = []
+        symbols = 0
+        for timeframe, frame in universe.items():
+            if frame.empty:
+                continue
+            bars = BarData.from_frame(frame)
+            symbols += len(bars.symbols)
+            events.extend(self.scan_bars(bars, timeframe, frame.index, recent_bars))
+
+        self.last_scan_stats = {
+            'timeframes': len(universe),
+            'symbol_series': symbols,
+            'events': len(events),
+            'elapsed_ms': (time.perf_counter() - started) * 1000
+        }
+        return sorted(events, key=lambda e: e.strength, reverse=True)
+
+    def scan_frame(self, frame: pd.DataFrame, recent_bars: int = 1) -> List[PatternEvent]:
+        """Scan a single frame, labelling it with its inferred timeframe"""
+        return self.scan({timeframe_label(infer_bar_seconds(frame.index)): frame}, recent_bars)
+
+
+def main():
+    """Demo: scan a synthetic universe of 200 symbols on two timeframes"""
+    print("🕯️ Chart Pattern Scanner")
+    print("=" * 50)
+
+    rng = np.random.default_rng(21)
+    n_symbols, n_bars = 200, 2000
+    index = pd.date_range("2024-01-01", periods=n_bars, freq="5min")
+    columns = {}
+    for s in range(n_symbols):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, n_bars)))
+        open_ = np.concatenate(([close[0]], close[:-1])) * (1 + rng.normal(0, 0.0005, n_bars))
+        wick = close * np.abs(rng.normal(0, 0.002, n_bars))
+        columns[f"S{s}_open"] = open_
+        columns[f"S{s}_high"] = np.maximum(open_, close) + wick
+        columns[f"S{s}_low"] = np.minimum(open_, close) - wick
+        columns[f"S{s}_price"] = close
+        columns[f"S{s}_volume"] = rng.lognormal(3, 0.5, n_bars)
+    frame = pd.DataFrame(columns, index=index)
+    hourly = frame.resample("1h").agg({c: ("first" if c.endswith("_open") else "max" if c.endswith("_high")
+                                           else "min" if c.endswith("_low") else "sum" if c.endswith("_volume")
+                                           else "last") for c in frame.columns})
+
+    scanner = ChartPatternScanner()
+    events = scanner.scan({"5m": frame, "1h": hourly}, recent_bars=3)
+    print(f"   {scanner.last_scan_stats}")
+
+    counts: Dict[str, int] = {}
+    for event in events:
+        counts[event.pattern] = counts.get(event.pattern, 0) + 1
+    for name, count in sorted(counts.items(), key=lambda item: -item[1]):
+        print(f"   {name:>22}: {count}")
+
+    if events:
+        top = events[0]
+        print(f"\n✅ Strongest: {top.symbol} {top.timeframe} {top.pattern} ({top.direction}, {top.strength:.2f})")
+
+
+if __name__ == "__main__":
+    main()
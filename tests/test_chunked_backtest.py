@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Chunked backtest tests
+Streaming stored history chunk by chunk gives the in-memory results for every fill model
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from core_orchestration.data_pipeline.bar_builder import FIELDS, BarBuilder
+from strategy_center.backtesting.fill_models import (BarCloseFill, FeeSchedule, NextOpenFill,
+                                                     VolumeParticipationFill)
+from strategy_center.backtesting.pattern_backtester import AdvancedPatternBacktester
+
+N_BARS = 3000
+
+
+def store_history(builder: BarBuilder):
+    """Two hourly random walks; thin volume keeps participation orders working across chunk edges"""
+    rng = np.random.default_rng(11)
+    starts = 1_700_000_000 + np.arange(N_BARS, dtype=np.int64) * 3600
+    for symbol, drift in (('BTC', 0.0004), ('ETH', -0.0002)):
+        close = 100 * np.exp(np.cumsum(rng.normal(drift, 0.012, N_BARS)))
+        bars = np.column_stack((close, close, close, close, rng.exponential(3.0, N_BARS), np.ones(N_BARS)))
+        builder.store_bars(symbol, '1h', starts, bars[:, :len(FIELDS)])
+
+
+def compare(fill_model) -> None:
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            builder = BarBuilder(db_path=os.path.join(tmp, "bars.db"), restore=False)
+            store_history(builder)
+            backtester = AdvancedPatternBacktester()
+            backtester.bar_builder = builder
+            backtester.fill_model = fill_model
+            backtester.memory_budget_mb = 0.4
+            patterns = asyncio.run(backtester.create_sample_patterns())
+
+            frame = builder.get_frame(['BTC', 'ETH'], '1h')
+            in_memory = [asyncio.run(backtester.backtest_single_pattern(p, frame)) for p in patterns]
+            loader = backtester.historical_chunks(lookback_days=N_BARS // 24 + 1)
+            chunked = asyncio.run(backtester.backtest_patterns_chunked(patterns, loader))
+            assert loader.stats['chunks'] > 3
+        finally:
+            os.chdir(cwd)
+
+    assert [r.symbol for r in chunked] == [r.symbol for r in in_memory]
+    for full, streamed in zip(in_memory, chunked):
+        assert full.total_trades == streamed.total_trades > 0
+        assert np.isclose(full.total_return, streamed.total_return, rtol=1e-9, atol=1e-9), \
+            (full.symbol, full.total_return, streamed.total_return)
+        assert np.isclose(full.max_drawdown, streamed.max_drawdown, rtol=1e-9, atol=1e-9)
+
+
+def test_chunked_matches_in_memory_bar_close():
+    compare(BarCloseFill(slippage_bps=5, fees=FeeSchedule.flat(10)))
+
+
+def test_chunked_matches_in_memory_next_open():
+    compare(NextOpenFill(latency_ms=250, slippage_bps=5, fees=FeeSchedule.flat(10)))
+
+
+def test_chunked_matches_in_memory_volume_participation():
+    compare(VolumeParticipationFill(0.1, max_bars=10, fees=FeeSchedule.flat(10)))
+
+
+if __name__ == "__main__":
+    test_chunked_matches_in_memory_bar_close()
+    test_chunked_matches_in_memory_next_open()
+    test_chunked_matches_in_memory_volume_participation()
+    print("✅ Chunked backtest tests passed")
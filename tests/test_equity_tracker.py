@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Equity tracker tests
+Fills, marks, snapshot-driven partial / full closes and exchange reconciliation
+"""
+
+import os
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from risk_management_center.monitoring.equity_tracker import EquityTracker
+
+
+def make_tracker(**kwargs) -> EquityTracker:
+    db_path = os.path.join(tempfile.mkdtemp(), "equity_tracker.db")
+    return EquityTracker(db_path=db_path, snapshot_interval=3600, **kwargs)
+
+
+def test_fill_mark_partial_and_full_close():
+    tracker = make_tracker(starting_equity=10000.0)
+    tracker.on_fill('BTC', 'Buy', 2.0, 100.0, strategy='S')
+    tracker.on_mark_price('BTC', 150.0)
+    assert tracker.equity == 10100.0
+
+    # Snapshot halves the position: the closed half is realized at the mark
+    assert tracker.set_position('BTC', 1.0, 100.0, 150.0, strategy='S') == 50.0
+    assert tracker.realized_pnl == 50.0
+    assert tracker.equity == 10100.0
+
+    # Closing the rest (no mark passed) books it at the last mark
+    assert tracker.set_position('BTC', 0.0, 0.0, strategy='S') == 50.0
+    snapshot = tracker.snapshot()
+    assert snapshot['realized_pnl'] == 100.0
+    assert snapshot['equity'] == 10100.0
+    assert snapshot['unrealized_pnl'] == 0.0
+    assert snapshot['drawdown_pct'] == 0.0
+    assert snapshot['gross_exposure'] == 0.0
+
+
+def test_profitable_snapshot_close_is_not_a_drawdown():
+    tracker = make_tracker(starting_equity=10000.0)
+    tracker.set_position('BTC', 1.0, 100.0, 150.0)
+    assert tracker.equity == 10050.0
+    tracker.set_position('BTC', 0.0, 0.0, 0.0)
+    assert tracker.equity == 10050.0
+    assert tracker.realized_pnl == 50.0
+    assert tracker.drawdown_pct == 0.0
+
+
+def test_reconcile_closes_and_flips_unattributed_positions():
+    tracker = make_tracker(starting_equity=10000.0)
+    tracker.on_fill('ETH', 'Sell', 1.0, 200.0, strategy='S')
+    tracker.on_mark_price('ETH', 180.0)
+    tracker.reconcile([('ETH', -1.0, 200.0, 180.0), ('SOL', 3.0, 10.0, 12.0)])
+    assert tracker.positions[('SOL', 'Unknown')].size == 3.0
+    assert tracker.unrealized_pnl == 20.0 + 6.0
+
+    # SOL gone from the exchange: closed at its mark; ETH flips long beyond the strategy's short
+    tracker.reconcile([('ETH', 1.0, 180.0, 180.0)])
+    assert tracker.positions[('SOL', 'Unknown')].size == 0.0
+    assert tracker.positions[('ETH', 'Unknown')].size == 2.0
+    assert tracker.realized_pnl == 6.0
+    assert tracker.equity == 10000.0 + 20.0 + 6.0
+
+
+def test_seed_equity_only_before_history():
+    tracker = make_tracker(starting_equity=10000.0, restore=False)
+    tracker.set_position('BTC', 1.0, 100.0, 110.0)
+    assert tracker.seed_equity(25010.0)
+    assert tracker.equity == 25010.0
+    assert tracker.high_water_mark == 25010.0
+    assert not tracker.seed_equity(30000.0)
+
+
+def test_flush_notifies_listeners_with_the_latest_state():
+    tracker = make_tracker(starting_equity=10000.0)
+    seen = []
+    tracker.add_listener(seen.append)
+    tracker.on_fill('BTC', 'Buy', 1.0, 100.0, timestamp=tracker.last_snapshot_time + 3601)
+    assert len(seen) == 1 and seen[0]['gross_exposure'] == 100.0
+    assert tracker.snapshots_written == 1
+
+
+if __name__ == "__main__":
+    test_fill_mark_partial_and_full_close()
+    test_profitable_snapshot_close_is_not_a_drawdown()
+    test_reconcile_closes_and_flips_unattributed_positions()
+    test_seed_equity_only_before_history()
+    test_flush_notifies_listeners_with_the_latest_state()
+    print("✅ Equity tracker tests passed")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Event bus delivery tests
+Synchronous publishing after subscriptions made outside the event loop
+"""
+
+import asyncio
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from core_orchestration.event_bus import EventBus
+
+
+def test_publish_nowait_after_subscribe_outside_loop():
+    """Subscriptions made in __init__ (no running loop) still receive sync publishes"""
+    bus = EventBus()
+    received = []
+    bus.subscribe("signal", received.append)
+
+    async def run():
+        accepted = bus.publish_nowait({"symbol": "BTC"}, topic="signal")
+        await bus.join(timeout=1.0)
+        await bus.close()
+        return accepted
+
+    assert asyncio.run(run()) == 1
+    assert received == [{"symbol": "BTC"}]
+
+
+def test_publish_nowait_rebinds_to_a_new_loop():
+    """A bus reused by a later event loop restarts its consumers there"""
+    bus = EventBus()
+    received = []
+    bus.subscribe("signal", received.append)
+
+    async def run(value):
+        bus.publish_nowait(value, topic="signal")
+        await bus.join(timeout=1.0)
+
+    asyncio.run(run(1))
+    asyncio.run(run(2))
+    assert received == [1, 2]
+
+
+def test_publish_nowait_without_loop_is_counted_as_dropped():
+    """Sync publishes with no running loop are lost; the bus counts them"""
+    bus = EventBus()
+    bus.subscribe("signal", lambda event: None)
+    assert bus.publish_nowait({"symbol": "BTC"}, topic="signal") == 0
+    assert bus.get_stats()["dropped_no_loop"] == 1
+
+
+if __name__ == "__main__":
+    test_publish_nowait_after_subscribe_outside_loop()
+    test_publish_nowait_rebinds_to_a_new_loop()
+    test_publish_nowait_without_loop_is_counted_as_dropped()
+    print("✅ Event bus tests passed")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Pre-trade risk kernel tests
+Size clipping, batch accumulation and netting against open positions
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from risk_management_center.core import risk_kernel
+from risk_management_center.core.risk_kernel import KernelLimits, OrderBatch, PositionSnapshot
+
+
+def long_btc(value: float) -> PositionSnapshot:
+    return PositionSnapshot(np.array(['BTC'], dtype=object), np.array(['momentum'], dtype=object),
+                            np.array([value]))
+
+
+def orders(*rows) -> OrderBatch:
+    """Rows of (symbol, side, notional); price 1 so quantity is the notional"""
+    return OrderBatch.from_records([{'symbol': symbol, 'side': side, 'qty': value, 'price': 1.0,
+                                     'strategy': 'momentum'} for symbol, side, value in rows])
+
+
+def test_clip_sizes_order_to_the_position_limit():
+    result = risk_kernel.evaluate(orders(('BTC', 'buy', 5000.0)), PositionSnapshot.empty(),
+                                  KernelLimits(account_value=100000, max_position_value=2000, oversize_policy="clip"))
+    assert result.approved[0]
+    assert result.sized_value[0] == 2000
+    assert "Order size reduced to risk limits" in result.warnings(0)
+
+
+def test_batch_orders_share_the_concentration_limit():
+    limits = KernelLimits(account_value=10000, max_single_asset_pct=20.0, oversize_policy="reject")
+    result = risk_kernel.evaluate(orders(('ETH', 'buy', 1500.0), ('ETH', 'buy', 1500.0)), PositionSnapshot.empty(), limits)
+    assert result.approved.tolist() == [True, False]
+    assert result.reject_codes[1] & risk_kernel.CONCENTRATION
+
+
+def test_reducing_sell_is_not_new_exposure():
+    """Selling down a long at the concentration cap passes every limit"""
+    limits = KernelLimits(account_value=10000, available_capital=0.0, max_position_value=500,
+                          max_single_asset_pct=20.0, max_positions_per_symbol=1, oversize_policy="reject")
+    result = risk_kernel.evaluate(orders(('BTC', 'sell', 1500.0)), long_btc(2000.0), limits)
+    assert result.approved[0], result.reasons(0)
+    assert result.sized_value[0] == 1500
+
+    # The same order on the buy side adds exposure and breaks the limits
+    result = risk_kernel.evaluate(orders(('BTC', 'buy', 1500.0)), long_btc(2000.0), limits)
+    assert not result.approved[0]
+    assert result.reject_codes[0] & risk_kernel.CONCENTRATION
+
+
+def test_flip_clips_only_the_new_exposure():
+    """A sell through a long is clipped to close the long plus the allowed short"""
+    limits = KernelLimits(account_value=10000, max_position_value=500, max_single_asset_pct=20.0, oversize_policy="clip")
+    result = risk_kernel.evaluate(orders(('BTC', 'sell', 5000.0)), long_btc(1000.0), limits)
+    assert result.approved[0]
+    assert result.sized_value[0] == 1500
+
+
+def test_batch_netting_uses_earlier_orders():
+    """A sell later in the batch reduces the exposure an earlier buy added"""
+    limits = KernelLimits(account_value=10000, max_single_asset_pct=20.0, oversize_policy="reject")
+    result = risk_kernel.evaluate(orders(('SOL', 'buy', 2000.0), ('SOL', 'sell', 1000.0), ('SOL', 'buy', 1000.0)),
+                                  PositionSnapshot.empty(), limits)
+    assert result.approved.tolist() == [True, True, True]
+
+
+if __name__ == "__main__":
+    test_clip_sizes_order_to_the_position_limit()
+    test_batch_orders_share_the_concentration_limit()
+    test_reducing_sell_is_not_new_exposure()
+    test_flip_clips_only_the_new_exposure()
+    test_batch_netting_uses_earlier_orders()
+    print("✅ Risk kernel tests passed")
@@ -0,0 +1,629 @@
+#!/usr/bin/env python3
+"""
+📡 BYBIT STREAM CLIENT
+Persistent WebSocket market-data and private-stream subsystem for the Live Trading Engine
+
+The engine used to poll REST for a mark price on every risk check and for the
+position list on every check. This client keeps two Bybit v5 WebSocket
+connections open instead:
+
+- public  (``tickers.<symbol>``)                  → mark prices
+          (``orderbook.<depth>.<symbol>``, optional) → L2 order book cache
+- private (``order``, ``execution``, ``position``) → order state, fills, positions
+
+Both run on a background thread with their own asyncio loop. Decoded updates are
+written into a ``StreamSnapshot`` by that single writer thread; values are
+immutable tuples / dataclasses stored with one dict assignment, so risk checks on
+any thread read them without taking a lock.
+
+Connections reconnect with exponential backoff and resubscribe every topic. Gaps
+are detected when a ticker delta arrives without a snapshot for its symbol, when
+a ticker sequence (``cs``) goes backwards, or when a private connection drops
+(updates during the outage are lost); the affected topic is resubscribed for a
+fresh snapshot (deltas that arrive before it are dropped), and private gaps trigger the ``on_resync`` callback so the owner
+can reseed positions over REST.
+
+``LocalStreamServer`` is a stand-in for the Bybit stream endpoints used by the
+self-test at the bottom of this module.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import aiohttp
+
+PUBLIC_URLS = {
+    True: "wss://stream-testnet.bybit.com/v5/public/linear",
+    False: "wss://stream.bybit.com/v5/public/linear"
+}
+PRIVATE_URLS = {
+    True: "wss://stream-testnet.bybit.com/v5/private",
+    False: "wss://stream.bybit.com/v5/private"
+}
+
+PRIVATE_TOPICS = ("order", "execution", "position")
+MAX_ARGS_PER_SUBSCRIBE = 10  # Bybit public stream limit per request
+
+
+@dataclass(frozen=True)
+class MarkPrice:
+    __slots__ = ("symbol", "mark_price", "last_price", "sequence", "exchange_ts", "received_at")
+
+    symbol: str
+    mark_price: float
+    last_price: float
+    sequence: int
+    exchange_ts: float
+    received_at: float
+
+
+@dataclass(frozen=True)
+class StreamPosition:
+    __slots__ = ("symbol", "side", "size", "entry_price", "mark_price", "unrealized_pnl", "updated_at")
+
+    symbol: str
+    side: str
+    size: float
+    entry_price: float
+    mark_price: float
+    unrealized_pnl: float
+    updated_at: float
+
+
+class StreamSnapshot:
+    """
+    Latest stream state, written by the stream thread only
+
+    Each entry is replaced wholesale with an immutable value, so readers never see
+    a half-applied update and need no lock.
+    """
+
+    __slots__ = ("mark_prices", "positions", "orders", "positions_synced_at", "tickers")
+
+    def __init__(self):
+        self.mark_prices: Dict[str, MarkPrice] = {}
+        self.positions: Dict[str, StreamPosition] = {}
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        self.positions_synced_at: Optional[float] = None
+        self.tickers: Dict[str, Dict[str, Any]] = {}  # Merged raw ticker fields (writer only)
+
+    def mark_price(self, symbol: str, max_age: Optional[float] = None) -> Optional[float]:
+        """Streamed mark price, or None when missing or older than max_age seconds"""
+        entry = self.mark_prices.get(symbol)
+        if entry is None or entry.mark_price <= 0:
+            return None
+        if max_age is not None and time.time() - entry.received_at > max_age:
+            return None
+        return entry.mark_price
+
+    def open_positions(self) -> List[StreamPosition]:
+        return [position for position in list(self.positions.values()) if position.size > 0]
+
+    def seed_positions(self, positions: Iterable[Any]):
+        """Replace the position table, e.g. from a REST resync"""
+        now = time.time()
+        self.positions = {
+            p.symbol: StreamPosition(p.symbol, p.side, float(p.size), float(p.entry_price),
+                                     float(p.mark_price), float(p.unrealized_pnl), now)
+            for p in positions
+        }
+        self.positions_synced_at = now
+
+
+class BybitStreamClient:
+    """
+    Bybit v5 WebSocket client with reconnect, resubscribe and gap detection
+
+    ``start()`` runs both connections on a daemon thread; ``stop()`` closes them.
+    Callbacks run on the stream thread and must not block for long.
+    """
+
+    def __init__(self, symbols: Iterable[str], testnet: bool = True,
+                 api_key: Optional[str] = None, api_secret: Optional[str] = None,
+                 public_url: Optional[str] = None, private_url: Optional[str] = None,
+                 ping_interval: float = 20.0, stale_after: float = 30.0,
+                 max_backoff: float = 30.0,
+                 on_order: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 on_execution: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 on_resync: Optional[Callable[[], None]] = None,
+                 on_mark_price: Optional[Callable[[str, float], None]] = None,
+                 order_book_depth: int = 0, order_books: Optional[Any] = None):
+        self.symbols = list(dict.fromkeys(symbols))
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.public_url = public_url or PUBLIC_URLS[testnet]
+        self.private_url = private_url or PRIVATE_URLS[testnet]
+        self.ping_interval = ping_interval
+        self.stale_after = stale_after
+        self.max_backoff = max_backoff
+
+        self.on_order = on_order
+        self.on_execution = on_execution
+        self.on_resync = on_resync
+        self.on_mark_price = on_mark_price
+
+        self.snapshot = StreamSnapshot()
+
+        # Optional L2 books (OrderBookCache) fed from orderbook.<depth>.<symbol>
+        self.order_book_depth = order_book_depth
+        self.order_books = order_books
+
+        self.logger = logging.getLogger(__name__)
+
+        self.stats = {
+            'messages': 0,
+            'reconnects': 0,
+            'gaps': 0,
+            'resubscribes': 0,
+            'public_connected': False,
+            'private_connected': False,
+            'last_message_at': None
+        }
+
+        self._seen_executions: deque = deque(maxlen=2048)
+        self._seen_execution_ids: set = set()
+        self._private_sessions = 0
+        self._awaiting_snapshot: set = set()
+
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._ready = threading.Event()
+        self._sockets: Dict[str, Any] = {}
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def start(self):
+        """Start the stream thread (idempotent)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._thread_main, name="bybit-stream", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5)
+
+    def stop(self, timeout: float = 5.0):
+        """Close both connections and join the stream thread"""
+        if self._loop and self._stopping:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+            for ws in list(self._sockets.values()):
+                asyncio.run_coroutine_threadsafe(ws.close(), self._loop)
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def has_private(self) -> bool:
+        return bool(self.api_key and self.api_secret)
+
+    def is_connected(self) -> bool:
+        public_ok = self.stats['public_connected'] or not self.symbols
+        private_ok = self.stats['private_connected'] or not self.has_private
+        return public_ok and private_ok
+
+    def wait_until_connected(self, timeout: float = 10.0) -> bool:
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.is_connected():
+                return True
+            time.sleep(0.05)
+        return self.is_connected()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, symbols=len(self.symbols), mark_prices=len(self.snapshot.mark_prices),
+                    positions=len(self.snapshot.positions))
+
+    def add_symbols(self, symbols: Iterable[str]):
+        """Subscribe to additional ticker symbols on the live connection"""
+        new = [s for s in symbols if s not in self.symbols]
+        if not new:
+            return
+        self.symbols.extend(new)
+        ws = self._sockets.get('public')
+        if ws is not None and self._loop:
+            asyncio.run_coroutine_threadsafe(self._subscribe(ws, self._public_topics(new)), self._loop)
+
+    def _thread_main(self):
+        asyncio.run(self._run())
+
+    async def _run(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._ready.set()
+
+        async with aiohttp.ClientSession() as session:
+            tasks = []
+            if self.symbols:
+                tasks.append(self._connection_loop(session, 'public'))
+            if self.has_private:
+                tasks.append(self._connection_loop(session, 'private'))
+            await asyncio.gather(*tasks)
+
+    # ------------------------------------------------------------------ connections
+
+    async def _connection_loop(self, session: aiohttp.ClientSession, kind: str):
+        backoff = 1.0
+        first = True
+        url = self.public_url if kind == 'public' else self.private_url
+
+        while not self._stopping.is_set():
+            try:
+                async with session.ws_connect(url, heartbeat=None, autoping=True) as ws:
+                    self._sockets[kind] = ws
+                    if kind == 'private':
+                        await self._authenticate(ws)
+                        await self._subscribe(ws, list(PRIVATE_TOPICS))
+                    else:
+                        self.snapshot.tickers.clear()
+                        self._awaiting_snapshot.clear()
+                        await self._subscribe(ws, self._public_topics(self.symbols))
+
+                    self.stats[f'{kind}_connected'] = True
+                    if not first:
+                        self.stats['reconnects'] += 1
+                        self.logger.info(f"🔄 {kind} stream reconnected and resubscribed")
+                    if kind == 'private':
+                        self._private_sessions += 1
+                        if self._private_sessions > 1:
+                            # Private updates during the outage were lost
+                            self._record_gap("private stream reconnect")
+                            self._resync()
+                    first = False
+                    backoff = 1.0
+
+                    await self._read_loop(ws, kind)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not self._stopping.is_set():
+                    self.logger.warning(f"⚠️ {kind} stream error: {e}")
+            finally:
+                self._sockets.pop(kind, None)
+                self.stats[f'{kind}_connected'] = False
+
+            if self._stopping.is_set():
+                break
+            first = False
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def _authenticate(self, ws):
+        expires = int((time.time() + 10) * 1000)
+        signature = hmac.new(
+            bytes(self.api_secret, "utf-8"),
+            f"GET/realtime{expires}".encode("utf-8"),
+            hashlib.sha256
+        ).hexdigest()
+        await ws.send_json({"op": "auth", "args": [self.api_key, expires, signature]})
+
+        reply = await ws.receive_json(timeout=self.stale_after)
+        if not reply.get("success"):
+            raise ConnectionError(f"Stream authentication failed: {reply.get('ret_msg', reply)}")
+
+    async def _subscribe(self, ws, topics: List[str]):
+        for i in range(0, len(topics), MAX_ARGS_PER_SUBSCRIBE):
+            await ws.send_json({"op": "subscribe", "args": topics[i:i + MAX_ARGS_PER_SUBSCRIBE]})
+
+    async def _read_loop(self, ws, kind: str):
+        last_ping = last_received = time.time()
+        while not self._stopping.is_set():
+            timeout = max(min(self.ping_interval - (time.time() - last_ping), self.stale_after), 0.01)
+            try:
+                msg = await ws.receive(timeout=timeout)
+            except asyncio.TimeoutError:
+                msg = None
+
+            if time.time() - last_ping >= self.ping_interval:
+                await ws.send_json({"op": "ping"})
+                last_ping = time.time()
+
+            if msg is None:
+                if time.time() - last_received > self.stale_after:
+                    raise ConnectionError(f"{kind} stream stale for {self.stale_after}s")
+                continue
+
+            if msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED,
+                            aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.ERROR):
+                raise ConnectionError(f"{kind} stream closed")
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                continue
+
+            last_received = time.time()
+            self.stats['messages'] += 1
+            self.stats['last_message_at'] = last_received
+            try:
+                await self._dispatch(ws, json.loads(msg.data))
+            except Exception as e:
+                self.logger.error(f"❌ Error handling stream message: {e}")
+
+    # ------------------------------------------------------------------ message handling
+
+    def _public_topics(self, symbols: Iterable[str]) -> List[str]:
+        topics = [f"tickers.{s}" for s in symbols]
+        if self.order_book_depth and self.order_books is not None:
+            topics += [f"orderbook.{self.order_book_depth}.{s}" for s in symbols]
+        return topics
+
+    async def _dispatch(self, ws, message: Dict[str, Any]):
+        topic = message.get("topic")
+        if not topic:
+            if message.get("op") == "subscribe" and message.get("success") is False:
+                self.logger.error(f"❌ Subscription rejected: {message.get('ret_msg')}")
+            return
+
+        if topic.startswith("tickers."):
+            await self._handle_ticker(ws, topic, message)
+        elif topic.startswith("orderbook.") and self.order_books is not None:
+            if not self.order_books.apply_message(message):
+                # Update-id gap or delta before snapshot: fetch a fresh snapshot
+                self._record_gap(f"{topic} update id gap")
+                await self._resubscribe(ws, topic)
+        elif topic == "position":
+            self._handle_positions(message.get("data", []))
+        elif topic == "order":
+            self._handle_orders(message.get("data", []))
+        elif topic == "execution":
+            self._handle_executions(message.get("data", []))
+
+    async def _handle_ticker(self, ws, topic: str, message: Dict[str, Any]):
+        data = message.get("data", {})
+        symbol = data.get("symbol") or topic.split(".", 1)[1]
+        sequence = int(message.get("cs", 0) or 0)
+        tickers = self.snapshot.tickers
+
+        if message.get("type") == "snapshot":
+            self._awaiting_snapshot.discard(topic)
+            merged = dict(data)
+        else:
+            current = tickers.get(symbol)
+            if current is None:
+                if topic in self._awaiting_snapshot:
+                    return  # Resubscribed already; the snapshot is on its way
+                # Delta without a base snapshot: resubscribe for a fresh one
+                self._record_gap(f"{symbol} delta without snapshot")
+                await self._resubscribe(ws, topic)
+                return
+            if sequence and sequence < current.get("_cs", 0):
+                # Sequence went backwards: the base can't be trusted, start over from a snapshot
+                tickers.pop(symbol, None)
+                self._record_gap(f"{symbol} ticker sequence went backwards")
+                await self._resubscribe(ws, topic)
+                return
+            merged = dict(current)
+            merged.update(data)
+
+        merged["_cs"] = sequence
+        tickers[symbol] = merged
+
+        now = time.time()
+        mark = MarkPrice(
+            symbol=symbol,
+            mark_price=float(merged.get("markPrice") or 0),
+            last_price=float(merged.get("lastPrice") or 0),
+            sequence=sequence,
+            exchange_ts=float(message.get("ts", 0)) / 1000,
+            received_at=now
+        )
+        self.snapshot.mark_prices[symbol] = mark
+        if self.on_mark_price and mark.mark_price > 0:
+            self._callback(self.on_mark_price, symbol, mark.mark_price)
+
+    async def _resubscribe(self, ws, topic: str):
+        self.stats['resubscribes'] += 1
+        if topic.startswith("tickers."):
+            self._awaiting_snapshot.add(topic)
+        await ws.send_json({"op": "unsubscribe", "args": [topic]})
+        await ws.send_json({"op": "subscribe", "args": [topic]})
+
+    def _handle_positions(self, rows: List[Dict[str, Any]]):
+        now = time.time()
+        positions = self.snapshot.positions
+        for row in rows:
+            symbol = row.get("symbol")
+            size = float(row.get("size") or 0)
+            if size <= 0:
+                positions.pop(symbol, None)
+                continue
+            positions[symbol] = StreamPosition(
+                symbol=symbol,
+                side=row.get("side", ""),
+                size=size,
+                entry_price=float(row.get("entryPrice") or row.get("avgPrice") or 0),
+                mark_price=float(row.get("markPrice") or 0),
+                unrealized_pnl=float(row.get("unrealisedPnl") or 0),
+                updated_at=now
+            )
+        self.snapshot.positions_synced_at = now
+
+    def _handle_orders(self, rows: List[Dict[str, Any]]):
+        for row in rows:
+            order_id = row.get("orderId")
+            if not order_id:
+                continue
+            self.snapshot.orders[order_id] = dict(row)
+            if self.on_order:
+                self._callback(self.on_order, row)
+
+    def _handle_executions(self, rows: List[Dict[str, Any]]):
+        for row in rows:
+            exec_id = row.get("execId")
+            if exec_id in self._seen_execution_ids:
+                continue
+            if exec_id:
+                if len(self._seen_executions) == self._seen_executions.maxlen:
+                    self._seen_execution_ids.discard(self._seen_executions[0])
+                self._seen_executions.append(exec_id)
+                self._seen_execution_ids.add(exec_id)
+            if self.on_execution:
+                self._callback(self.on_execution, row)
+
+    def _record_gap(self, reason: str):
+        self.stats['gaps'] += 1
+        self.logger.warning(f"⚠️ Stream gap detected: {reason}")
+
+    def _resync(self):
+        if self.on_resync:
+            self._callback(self.on_resync)
+
+    def _callback(self, callback: Callable, *args):
+        try:
+            callback(*args)
+        except Exception as e:
+            self.logger.error(f"❌ Stream callback failed: {e}")
+
+
+class LocalStreamServer:
+    """
+    Local stand-in for the Bybit v5 stream endpoints
+
+    Serves ``/v5/public/linear`` and ``/v5/private`` on 127.0.0.1, accepts any auth,
+    records subscriptions and lets a test push ticker / private messages or drop
+    every connection to exercise reconnects.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.subscriptions: List[List[str]] = []
+        self.connections = {'public': 0, 'private': 0}
+        self._clients: Dict[str, List[Any]] = {'public': [], 'private': []}
+        self._runner = None
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._sequence = 0
+
+    @property
+    def public_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/v5/public/linear"
+
+    @property
+    def private_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/v5/private"
+
+    async def start(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/v5/public/linear", lambda request: self._serve(request, 'public'))
+        app.router.add_get("/v5/private", lambda request: self._serve(request, 'private'))
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        await self.drop_connections()
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _serve(self, request, kind: str):
+        from aiohttp import web
+
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections[kind] += 1
+        self._clients[kind].append(ws)
+        try:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                request_data = json.loads(msg.data)
+                op = request_data.get("op")
+                if op == "auth":
+                    await ws.send_json({"success": True, "op": "auth", "ret_msg": ""})
+                elif op == "ping":
+                    await ws.send_json({"success": True, "op": "pong"})
+                elif op == "subscribe":
+                    self.subscriptions.append(request_data["args"])
+                    await ws.send_json({"success": True, "op": "subscribe"})
+                    for topic in request_data["args"]:
+                        if topic in self._snapshots:
+                            await ws.send_json(self._snapshots[topic])
+        finally:
+            if ws in self._clients[kind]:
+                self._clients[kind].remove(ws)
+        return ws
+
+    async def push_ticker(self, symbol: str, mark_price: float, snapshot: bool = False):
+        self._sequence += 1
+        topic = f"tickers.{symbol}"
+        message = {
+            "topic": topic,
+            "type": "snapshot" if snapshot else "delta",
+            "cs": self._sequence,
+            "ts": int(time.time() * 1000),
+            "data": {"symbol": symbol, "markPrice": str(mark_price), "lastPrice": str(mark_price)}
+        }
+        if snapshot:
+            self._snapshots[topic] = message
+        else:
+            base = self._snapshots.setdefault(topic, {**message, "type": "snapshot"})
+            base["data"] = {**base["data"], **message["data"]}
+            base["cs"] = self._sequence
+        await self._broadcast('public', message)
+
+    async def push_private(self, topic: str, rows: List[Dict[str, Any]]):
+        await self._broadcast('private', {"topic": topic, "creationTime": int(time.time() * 1000), "data": rows})
+
+    async def drop_connections(self):
+        for kind in self._clients:
+            for ws in list(self._clients[kind]):
+                await ws.close()
+
+    async def _broadcast(self, kind: str, message: Dict[str, Any]):
+        for ws in list(self._clients[kind]):
+            await ws.send_json(message)
+
+
+# Self-test against the local stand-in
+async def main():
+    """Exercise subscribe, delta merge, private updates and reconnect locally"""
+    server = LocalStreamServer()
+    await server.start()
+
+    resyncs = []
+    client = BybitStreamClient(
+        ["BTCUSDT", "ETHUSDT"], api_key="key", api_secret="secret",
+        public_url=server.public_url, private_url=server.private_url,
+        on_resync=lambda: resyncs.append(time.time())
+    )
+    client.start()
+    await asyncio.to_thread(client.wait_until_connected)
+
+    await server.push_ticker("BTCUSDT", 65000.0, snapshot=True)
+    await server.push_ticker("BTCUSDT", 65010.5)
+    await server.push_ticker("ETHUSDT", 3200.0)  # Delta without snapshot → gap + resubscribe
+    await server.push_private("position", [{"symbol": "BTCUSDT", "side": "Buy", "size": "0.002",
+                                            "entryPrice": "64900", "markPrice": "65010.5",
+                                            "unrealisedPnl": "0.22"}])
+    await asyncio.sleep(0.3)
+
+    print("📡 Bybit Stream Self-Test:")
+    print(f"   BTC mark price: {client.snapshot.mark_price('BTCUSDT')}")
+    print(f"   ETH mark price: {client.snapshot.mark_price('ETHUSDT')}")
+    print(f"   Open positions: {[p.symbol for p in client.snapshot.open_positions()]}")
+
+    await server.drop_connections()
+    await asyncio.sleep(1.5)
+    await asyncio.to_thread(client.wait_until_connected)
+
+    print(f"   Stats after reconnect: {client.get_stats()}")
+    print(f"   Private resyncs: {len(resyncs)}")
+
+    client.stop()
+    await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
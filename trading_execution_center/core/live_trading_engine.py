@@ -7,7 +7,9 @@ This engine connects sandbox-tested strategies to live trading APIs
 with institutional-level risk controls and monitoring.
 """
 
+import asyncio
 import os
+import sys
 import time
 import hmac
 import hashlib
@@ -21,6 +23,16 @@ from dataclasses import dataclass
 import json
 from decimal import Decimal, ROUND_HALF_UP
 
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from trading_execution_center.core.bybit_stream import BybitStreamClient
+from trading_execution_center.core.risk_state_cache import RiskStateCache
+from trading_execution_center.core.order_router import AsyncOrderRouter, make_order_link_id
+from trading_execution_center.core.order_book import get_order_book_cache
+from risk_management_center.monitoring.equity_tracker import get_equity_tracker
+from risk_management_center.core.volatility_engine import base_asset
+from core_orchestration.data_pipeline.bar_builder import get_bar_builder
+
 @dataclass
 class TradeOrder:
     symbol: str
@@ -56,7 +68,7 @@ class LiveTradingEngine:
     - Emergency shutdown protocols
     """
     
-    def __init__(self, testnet: bool = True):
+    def __init__(self, testnet: bool = True, mark_price_max_age: float = 10.0):
         self.testnet = testnet
         self.setup_logging()
         self.setup_database()
@@ -70,13 +82,33 @@ class LiveTradingEngine:
             'portfolio_value': 10000.0,        # Starting $10K portfolio
             'max_single_trade': 200.0,         # $200 maximum per trade
             'max_daily_loss': 250.0,           # $250 maximum daily loss
-            'emergency_stop_loss': 500.0       # $500 total loss triggers emergency stop
+            'emergency_stop_loss': 500.0,      # $500 total loss triggers emergency stop
+            'max_slippage_bps': 50.0           # Reject market orders with > 0.5% estimated impact
         }
         
         # Trading parameters
         self.base_url = "https://api-testnet.bybit.com" if testnet else "https://api.bybit.com"
         self.session = requests.Session()
         
+        # WebSocket stream (mark prices, positions, order updates); REST is the fallback
+        self.stream: Optional[BybitStreamClient] = None
+        self.mark_price_max_age = mark_price_max_age
+        self.order_books = get_order_book_cache()
+        
+        # In-memory pre-trade risk state, live once the stream is started
+        self.risk_state = RiskStateCache(self.risk_controls, mark_price_source=self.get_streamed_mark_price)
+        self._filled_orders = set()
+        
+        # Streaming equity / drawdown / per-strategy exposure, fed by fills and mark ticks
+        self.equity_tracker = get_equity_tracker()
+        
+        # 1m..1d OHLCV bars built from streamed mark prices
+        self.bar_builder = get_bar_builder()
+        self._order_strategies: Dict[str, str] = {}
+        
+        # Pooled async order gateway, created on first async order
+        self.order_router: Optional[AsyncOrderRouter] = None
+        
         # Strategy mappings to approved sandbox strategies
         self.strategies = {
             'momentum_breakout': {
@@ -261,8 +293,25 @@ class LiveTradingEngine:
             self.logger.error(f"❌ Error getting account balance: {e}")
             return {}
             
-    def get_positions(self) -> List[Position]:
-        """Get current open positions"""
+    def get_positions(self) -> Optional[List[Position]]:
+        """Get current open positions (stream snapshot when live, REST otherwise; None if unavailable)"""
+        if self.stream_is_live() and self.stream.snapshot.positions_synced_at is not None:
+            return [
+                Position(
+                    symbol=pos.symbol,
+                    side=pos.side,
+                    size=pos.size,
+                    entry_price=pos.entry_price,
+                    mark_price=self.stream.snapshot.mark_price(pos.symbol) or pos.mark_price,
+                    unrealized_pnl=pos.unrealized_pnl,
+                    percentage=pos.unrealized_pnl / self.risk_controls['portfolio_value'] * 100
+                )
+                for pos in self.stream.snapshot.open_positions()
+            ]
+        return self.fetch_positions_rest()
+        
+    def fetch_positions_rest(self) -> Optional[List[Position]]:
+        """Get current open positions over REST; None when the request fails (never an empty book)"""
         try:
             response = self.make_request("/v5/position/list", params={"category": "linear"})
             
@@ -281,16 +330,24 @@ class LiveTradingEngine:
                             unrealized_pnl=float(pos.get('unrealisedPnl', 0)),
                             percentage=float(pos.get('unrealisedPnl', 0)) / self.risk_controls['portfolio_value'] * 100
                         ))
-                        
-            return positions
+                return positions
+                
+            self.logger.error(f"❌ Failed to get positions: {response}")
+            return None
             
         except Exception as e:
             self.logger.error(f"❌ Error getting positions: {e}")
-            return []
+            return None
             
     def check_risk_limits(self, trade_order: TradeOrder) -> Tuple[bool, str]:
         """Check if trade order passes all risk controls"""
         
+        # Fast path: pure in-memory check against the cached risk state
+        if self.stream_is_live() and self.risk_state.synced:
+            if trade_order.price or self.risk_state.mark_price(trade_order.symbol) is not None:
+                passed, message = self.risk_state.check(trade_order.symbol, trade_order.qty, trade_order.price)
+                return self.check_slippage(trade_order) if passed else (passed, message)
+                
         # Calculate trade value
         if trade_order.price:
             trade_value = trade_order.qty * trade_order.price
@@ -308,7 +365,10 @@ class LiveTradingEngine:
             return False, f"Position size {position_percent:.2f}% exceeds maximum {self.risk_controls['max_position_size_percent']}%"
             
         # Check maximum number of positions
-        current_positions = len(self.get_positions())
+        positions = self.get_positions()
+        if positions is None:
+            return False, "Position data unavailable"
+        current_positions = len(positions)
         if current_positions >= self.risk_controls['max_total_positions']:
             return False, f"Maximum positions ({self.risk_controls['max_total_positions']}) already reached"
             
@@ -317,10 +377,40 @@ class LiveTradingEngine:
         if daily_pnl < -self.risk_controls['max_daily_loss']:
             return False, f"Daily loss limit (${self.risk_controls['max_daily_loss']}) exceeded"
             
+        return self.check_slippage(trade_order)
+        
+    def check_slippage(self, trade_order: TradeOrder) -> Tuple[bool, str]:
+        """Market-impact check against the streamed L2 book (skipped without a fresh book)"""
+        if trade_order.order_type != 'Market':
+            return True, "Risk checks passed"
+            
+        book = self.order_books.get(trade_order.symbol)
+        if book is None:
+            return True, "Risk checks passed"
+            
+        impact = book.estimate_slippage(trade_order.side, qty=trade_order.qty)
+        if impact['slippage_bps'] > self.risk_controls['max_slippage_bps']:
+            if not impact['fully_filled']:
+                return False, f"Order size {trade_order.qty} exceeds visible book depth for {trade_order.symbol}"
+            return False, f"Estimated slippage {impact['slippage_bps']:.1f}bps exceeds maximum {self.risk_controls['max_slippage_bps']}bps"
+            
         return True, "Risk checks passed"
         
+    def get_streamed_mark_price(self, symbol: str) -> Optional[float]:
+        """Fresh streamed mark price, or None"""
+        if self.stream is None:
+            return None
+        return self.stream.snapshot.mark_price(symbol, max_age=self.mark_price_max_age)
+        
     def get_mark_price(self, symbol: str) -> float:
-        """Get current mark price for symbol"""
+        """Get current mark price for symbol (streamed when fresh, REST otherwise)"""
+        if self.stream is not None:
+            streamed = self.stream.snapshot.mark_price(symbol, max_age=self.mark_price_max_age)
+            if streamed is not None:
+                return streamed
+            # Stream this symbol from now on
+            self.stream.add_symbols([symbol])
+            
         try:
             response = self.make_request("/v5/market/tickers", params={"category": "linear", "symbol": symbol})
             
@@ -335,6 +425,140 @@ class LiveTradingEngine:
             self.logger.error(f"❌ Error getting mark price for {symbol}: {e}")
             return 0
             
+    def start_stream(self, symbols: List[str], public_url: Optional[str] = None,
+                     private_url: Optional[str] = None) -> BybitStreamClient:
+        """Open the WebSocket subsystem for mark prices, orders, executions and positions"""
+        if self.stream is not None:
+            self.stream.add_symbols(symbols)
+            return self.stream
+            
+        self.stream = BybitStreamClient(
+            symbols,
+            testnet=self.testnet,
+            api_key=self.api_key,
+            api_secret=self.api_secret,
+            public_url=public_url,
+            private_url=private_url,
+            on_order=self.on_stream_order,
+            on_execution=self.on_stream_execution,
+            on_resync=self.resync_positions,
+            on_mark_price=self.on_stream_mark_price,
+            order_book_depth=50,
+            order_books=self.order_books
+        )
+        self.stream.start()
+        self.resync_positions()
+        try:
+            account_equity = float(self.get_account_balance().get('totalEquity') or 0)
+            if self.equity_tracker.seed_equity(account_equity):
+                self.logger.info(f"📉 Equity tracker seeded from account: ${account_equity:,.2f}")
+        except Exception as e:
+            self.logger.error(f"❌ Error seeding equity tracker: {e}")
+        try:
+            self.risk_state.seed_daily_pnl(self.db_path)
+        except Exception as e:
+            self.logger.error(f"❌ Error seeding daily PnL: {e}")
+        self.logger.info(f"📡 Stream started for {len(symbols)} symbols")
+        return self.stream
+        
+    def stop_stream(self):
+        """Close the WebSocket subsystem; reads fall back to REST"""
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream = None
+            self.logger.info("📡 Stream stopped")
+            
+    def stream_is_live(self) -> bool:
+        return self.stream is not None and self.stream.is_connected()
+        
+    def resync_positions(self):
+        """Reseed the streamed position table from REST after start or a private-stream gap"""
+        if self.stream is None:
+            return
+        try:
+            positions = self.fetch_positions_rest()
+            if positions is None:
+                # Unknown book: drop back to the REST-checked slow path instead of seeding it flat
+                self.stream.snapshot.positions_synced_at = None
+                self.risk_state.synced = False
+                self.logger.warning("⚠️ Position resync skipped: REST positions unavailable")
+                return
+            self.stream.snapshot.seed_positions(positions)
+            self.risk_state.seed_positions(positions)
+            self.equity_tracker.reconcile([
+                (p.symbol, p.size if p.side == 'Buy' else -p.size, p.entry_price, p.mark_price)
+                for p in positions
+            ])
+        except Exception as e:
+            self.logger.error(f"❌ Error resyncing positions: {e}")
+            
+    def on_stream_order(self, order: Dict):
+        """Apply a streamed order update to the trade record and running daily PnL"""
+        try:
+            order_id = order.get('orderId')
+            status = order.get('orderStatus', 'Unknown')
+            avg_price = float(order.get('avgPrice') or 0)
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE live_trades SET status = ?, filled_price = COALESCE(?, filled_price)
+                WHERE order_id = ?
+            """, (status, avg_price or None, order_id))
+            
+            if status == 'Filled' and order_id not in self._filled_orders:
+                self._filled_orders.add(order_id)
+                realized_pnl = float(order.get('closedPnl') or 0)
+                cursor.execute("UPDATE live_trades SET pnl = ? WHERE order_id = ?", (realized_pnl, order_id))
+                self.risk_state.record_fill_pnl(realized_pnl)
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            self.logger.error(f"❌ Error applying order update: {e}")
+            
+    def on_stream_mark_price(self, symbol: str, price: float, timestamp: Optional[float] = None):
+        """Re-mark open positions and fold the price into the shared OHLCV bars"""
+        self.equity_tracker.on_mark_price(symbol, price, timestamp)
+        try:
+            self.bar_builder.add_tick(base_asset(symbol), timestamp or time.time(), price, source='mark_price')
+        except Exception as e:
+            self.logger.error(f"❌ Error updating bars for {symbol}: {e}")
+            
+    def on_stream_execution(self, execution: Dict):
+        """Apply a streamed execution to cached positions and the trade record's fees"""
+        if execution.get('execType', 'Trade') == 'Trade':
+            self.risk_state.apply_execution(
+                execution.get('symbol'),
+                execution.get('side'),
+                float(execution.get('execQty') or 0),
+                float(execution.get('execPrice') or 0)
+            )
+            self.equity_tracker.on_fill(
+                execution.get('symbol'),
+                execution.get('side', 'Buy'),
+                float(execution.get('execQty') or 0),
+                float(execution.get('execPrice') or 0),
+                fee=float(execution.get('execFee') or 0),
+                strategy=self._order_strategies.get(execution.get('orderId'), 'Unknown')
+            )
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE live_trades SET commission = commission + ?
+                WHERE order_id = ?
+            """, (float(execution.get('execFee') or 0), execution.get('orderId')))
+            conn.commit()
+            conn.close()
+        except Exception as e:
+            self.logger.error(f"❌ Error applying execution: {e}")
+            
+    def get_order_status(self, order_id: str) -> Optional[str]:
+        """Latest streamed status for an order, if seen"""
+        if self.stream is None:
+            return None
+        order = self.stream.snapshot.orders.get(order_id)
+        return order.get('orderStatus') if order else None
+        
     def get_daily_pnl(self) -> float:
         """Get today's PnL from database"""
         try:
@@ -357,39 +581,54 @@ class LiveTradingEngine:
             self.logger.error(f"❌ Error getting daily PnL: {e}")
             return 0.0
             
-    def place_order(self, trade_order: TradeOrder) -> Dict:
-        """Place trade order with full risk validation"""
+    def pre_trade_checks(self, trade_order: TradeOrder) -> Tuple[bool, str]:
+        """Risk limits and strategy enablement"""
         
         # Pre-trade risk validation
         risk_passed, risk_message = self.check_risk_limits(trade_order)
         if not risk_passed:
             self.logger.error(f"🛡️ RISK CHECK FAILED: {risk_message}")
-            return {'success': False, 'error': risk_message}
+            return False, risk_message
             
         # Validate strategy is enabled
         if trade_order.strategy not in self.strategies or not self.strategies[trade_order.strategy]['enabled']:
-            return {'success': False, 'error': f'Strategy {trade_order.strategy} not enabled'}
+            return False, f'Strategy {trade_order.strategy} not enabled'
+            
+        return True, "OK"
+        
+    def build_order_params(self, trade_order: TradeOrder) -> Dict:
+        """Bybit v5 order parameters for a trade order"""
+        order_params = {
+            "category": "linear",
+            "symbol": trade_order.symbol,
+            "side": trade_order.side,
+            "orderType": trade_order.order_type,
+            "qty": str(trade_order.qty),
+            "timeInForce": "GTC"  # Good Till Cancelled
+        }
+        
+        if trade_order.price:
+            order_params["price"] = str(trade_order.price)
+            
+        if trade_order.stop_loss:
+            order_params["stopLoss"] = str(trade_order.stop_loss)
+            
+        if trade_order.take_profit:
+            order_params["takeProfit"] = str(trade_order.take_profit)
+            
+        return order_params
+        
+    def place_order(self, trade_order: TradeOrder) -> Dict:
+        """Place trade order with full risk validation"""
+        
+        passed, message = self.pre_trade_checks(trade_order)
+        if not passed:
+            return {'success': False, 'error': message}
             
         try:
             # Prepare order parameters
-            order_params = {
-                "category": "linear",
-                "symbol": trade_order.symbol,
-                "side": trade_order.side,
-                "orderType": trade_order.order_type,
-                "qty": str(trade_order.qty),
-                "timeInForce": "GTC"  # Good Till Cancelled
-            }
+            order_params = self.build_order_params(trade_order)
             
-            if trade_order.price:
-                order_params["price"] = str(trade_order.price)
-                
-            if trade_order.stop_loss:
-                order_params["stopLoss"] = str(trade_order.stop_loss)
-                
-            if trade_order.take_profit:
-                order_params["takeProfit"] = str(trade_order.take_profit)
-                
             # Place order
             response = self.make_request("/v5/order/create", method="POST", params=order_params)
             
@@ -410,8 +649,47 @@ class LiveTradingEngine:
             self.logger.error(f"❌ Exception placing order: {e}")
             return {'success': False, 'error': str(e)}
             
+    def get_order_router(self) -> AsyncOrderRouter:
+        """Lazily create the pooled async order router"""
+        if self.order_router is None:
+            self.order_router = AsyncOrderRouter(self.api_key, self.api_secret, self.base_url)
+        return self.order_router
+        
+    async def place_order_async(self, trade_order: TradeOrder, intent_key: Optional[str] = None) -> Dict:
+        """Place trade order through the async router
+        
+        ``intent_key`` identifies the originating signal; resubmitting the same
+        intent reuses its client order ID and never creates a second order.
+        """
+        # Balance lookup and SQLite reads block; keep them off the event loop
+        passed, message = await asyncio.to_thread(self.pre_trade_checks, trade_order)
+        if not passed:
+            return {'success': False, 'error': message}
+            
+        try:
+            order_params = self.build_order_params(trade_order)
+            order_params["orderLinkId"] = make_order_link_id(
+                trade_order.strategy, trade_order.symbol, trade_order.side, trade_order.qty, intent_key
+            )
+            
+            result = await self.get_order_router().place_order(order_params)
+            
+            if result['success']:
+                if not result.get('duplicate'):
+                    self.record_trade(trade_order, result['order_id'], 'Submitted')
+                self.logger.info(f"✅ Order placed successfully: {result['order_id']} ({result['latency_ms']:.1f}ms)")
+            else:
+                self.logger.error(f"❌ Order placement failed: {result['error']}")
+            return result
+            
+        except Exception as e:
+            self.logger.error(f"❌ Exception placing order: {e}")
+            return {'success': False, 'error': str(e)}
+            
     def record_trade(self, trade_order: TradeOrder, order_id: str, status: str):
         """Record trade in database"""
+        if order_id:
+            self._order_strategies[order_id] = trade_order.strategy
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
@@ -444,7 +722,7 @@ class LiveTradingEngine:
         """Get comprehensive trading status"""
         try:
             balance = self.get_account_balance()
-            positions = self.get_positions()
+            positions = self.get_positions() or []
             daily_pnl = self.get_daily_pnl()
             
             # Calculate portfolio metrics
@@ -459,6 +737,8 @@ class LiveTradingEngine:
                 'total_pnl': total_pnl,
                 'portfolio_value': total_equity,
                 'risk_controls': self.risk_controls,
+                'risk_state': self.risk_state.get_stats(),
+                'equity_tracker': self.equity_tracker.snapshot(),
                 'available_strategies': {k: v for k, v in self.strategies.items() if v['enabled']},
                 'last_update': datetime.now().isoformat()
             }
@@ -496,5 +776,4 @@ async def main():
     print(f"   Message: {risk_message}")
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+📚 L2 ORDER BOOK CACHE
+Incrementally maintained L2 books for liquidity-aware risk and sizing
+
+Each side of a book is one (n, 2) NumPy array of [price, size] levels kept sorted
+from best to worst, so snapshots load with one sort and deltas are a binary search
+plus an array insert / delete. Cumulative size and notional arrays are rebuilt
+lazily after a change, which makes the liquidity queries a ``searchsorted`` away:
+
+- spread and mid
+- depth (notional) within X bps of mid
+- estimated VWAP / market-impact slippage for a given size
+- largest notional that can be taken within a slippage budget
+
+``OrderBookCache.apply_message`` understands Bybit v5 ``orderbook.<depth>.<symbol>``
+messages (snapshot / delta with ``u`` update ids) and reports update-id gaps so
+the stream client can resubscribe. ``get_order_book_cache()`` returns the
+process-wide instance shared by the trading engine and the risk managers.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+
+def normalize_symbol(symbol: str) -> str:
+    """'BTC/USDT' and 'BTCUSDT' map to the same book"""
+    return symbol.replace("/", "").upper()
+
+
+class BookSide:
+    """One side of an L2 book in array-backed, best-first order
+
+    Levels live in a single (n, 2) float array that is replaced, never mutated,
+    on update; cumulative arrays are cached alongside it. Readers on other threads
+    therefore always see a matching set of prices, sizes and sums.
+    """
+
+    __slots__ = ("is_bid", "_state")
+
+    _EMPTY = np.empty((0, 2), dtype=np.float64)
+
+    def __init__(self, is_bid: bool):
+        self.is_bid = is_bid
+        self._state = (self._EMPTY, None)
+
+    def __len__(self) -> int:
+        return len(self._state[0])
+
+    @property
+    def levels(self) -> np.ndarray:
+        return self._state[0]
+
+    @property
+    def prices(self) -> np.ndarray:
+        return self._state[0][:, 0]
+
+    @property
+    def sizes(self) -> np.ndarray:
+        return self._state[0][:, 1]
+
+    def _key(self, prices: np.ndarray) -> np.ndarray:
+        # Bids are stored descending; search on negated prices keeps keys ascending
+        return -prices if self.is_bid else prices
+
+    def load(self, levels: Sequence[Sequence[Any]]):
+        """Replace the side with a snapshot of [price, size] levels"""
+        if len(levels):
+            data = np.asarray(levels, dtype=np.float64).reshape(-1, 2)
+            data = data[data[:, 1] > 0]
+            data = np.ascontiguousarray(data[np.argsort(self._key(data[:, 0]), kind="stable")])
+        else:
+            data = self._EMPTY
+        self._state = (data, None)
+
+    def update(self, levels: Iterable[Sequence[Any]]):
+        """Apply [price, size] deltas; size 0 removes the level"""
+        data = self._state[0]
+        copied = False
+        for price, size in levels:
+            price = float(price)
+            size = float(size)
+            key = -price if self.is_bid else price
+            i = int(np.searchsorted(self._key(data[:, 0]), key))
+            exists = i < len(data) and data[i, 0] == price
+
+            if size <= 0:
+                if exists:
+                    data = np.delete(data, i, axis=0)
+                    copied = True
+            elif exists:
+                if not copied:
+                    data = data.copy()
+                    copied = True
+                data[i, 1] = size
+            else:
+                data = np.insert(data, i, (price, size), axis=0)
+                copied = True
+        if copied:
+            self._state = (data, None)
+
+    def _cumulative(self):
+        data, cumulative = self._state
+        if cumulative is None:
+            cumulative = (np.cumsum(data[:, 1]), np.cumsum(data[:, 0] * data[:, 1]))
+            self._state = (data, cumulative)
+        return data, cumulative
+
+    @property
+    def cum_size(self) -> np.ndarray:
+        return self._cumulative()[1][0]
+
+    @property
+    def cum_notional(self) -> np.ndarray:
+        return self._cumulative()[1][1]
+
+    @property
+    def best(self) -> Optional[float]:
+        data = self._state[0]
+        return float(data[0, 0]) if len(data) else None
+
+    def notional_within(self, limit_price: float) -> float:
+        """Notional of levels at or better than limit_price"""
+        data, (_, cum_notional) = self._cumulative()
+        key = -limit_price if self.is_bid else limit_price
+        n = int(np.searchsorted(self._key(data[:, 0]), key, side="right"))
+        return float(cum_notional[n - 1]) if n else 0.0
+
+    def sweep(self, qty: float) -> Dict[str, float]:
+        """VWAP and size actually available when taking qty from this side"""
+        data, (cum_size, cum_notional) = self._cumulative()
+        if not len(data) or qty <= 0:
+            return {"filled_qty": 0.0, "notional": 0.0, "vwap": 0.0, "levels": 0, "worst_price": 0.0}
+
+        n = int(np.searchsorted(cum_size, qty, side="left"))
+        if n >= len(cum_size):
+            filled = float(cum_size[-1])
+            notional = float(cum_notional[-1])
+            levels = len(cum_size)
+        else:
+            before_size = float(cum_size[n - 1]) if n else 0.0
+            before_notional = float(cum_notional[n - 1]) if n else 0.0
+            filled = qty
+            notional = before_notional + (qty - before_size) * float(data[n, 0])
+            levels = n + 1
+
+        return {
+            "filled_qty": filled,
+            "notional": notional,
+            "vwap": notional / filled if filled else 0.0,
+            "levels": levels,
+            "worst_price": float(data[levels - 1, 0])
+        }
+
+    def max_notional_within(self, mid: float, max_slippage_bps: float) -> float:
+        """Largest notional whose VWAP stays within max_slippage_bps of mid"""
+        data, (cum_size, cum_notional) = self._cumulative()
+        if not len(data):
+            return 0.0
+
+        # VWAP after fully consuming each level; it worsens monotonically
+        slippage = np.abs(cum_notional / cum_size - mid) / mid * 10000
+        n = int(np.searchsorted(slippage, max_slippage_bps, side="right"))
+        if n == 0:
+            return 0.0
+        if n == len(slippage):
+            return float(cum_notional[-1])
+
+        # Partially into level n: solve (N + q*p) / (S + q) = target for q
+        direction = -1 if self.is_bid else 1
+        target = mid * (1 + direction * max_slippage_bps / 10000)
+        price = float(data[n, 0])
+        q = (target * float(cum_size[n - 1]) - float(cum_notional[n - 1])) / (price - target) if price != target else 0.0
+        return float(cum_notional[n - 1]) + max(q, 0.0) * price
+
+
+class L2Book:
+    """Bid / ask sides plus update bookkeeping for one symbol"""
+
+    __slots__ = ("symbol", "bids", "asks", "update_id", "sequence", "updated_at", "exchange_ts")
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids = BookSide(is_bid=True)
+        self.asks = BookSide(is_bid=False)
+        self.update_id = 0
+        self.sequence = 0
+        self.updated_at = 0.0
+        self.exchange_ts = 0.0
+
+    def load_snapshot(self, bids: Sequence, asks: Sequence, update_id: int = 0):
+        self.bids.load(bids)
+        self.asks.load(asks)
+        self.update_id = update_id
+        self.updated_at = time.time()
+
+    def apply_delta(self, bids: Iterable, asks: Iterable, update_id: int = 0):
+        self.bids.update(bids)
+        self.asks.update(asks)
+        if update_id:
+            self.update_id = update_id
+        self.updated_at = time.time()
+
+    # ------------------------------------------------------------------ queries
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        return self.bids.best
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        return self.asks.best
+
+    @property
+    def mid(self) -> Optional[float]:
+        if self.best_bid is None or self.best_ask is None:
+            return None
+        return (self.best_bid + self.best_ask) / 2
+
+    def spread_bps(self) -> Optional[float]:
+        mid = self.mid
+        if not mid:
+            return None
+        return (self.best_ask - self.best_bid) / mid * 10000
+
+    def depth_within_bps(self, bps: float) -> Dict[str, float]:
+        """Bid / ask notional within ``bps`` of mid"""
+        mid = self.mid
+        if not mid:
+            return {"bid": 0.0, "ask": 0.0, "total": 0.0}
+        bid = self.bids.notional_within(mid * (1 - bps / 10000))
+        ask = self.asks.notional_within(mid * (1 + bps / 10000))
+        return {"bid": bid, "ask": ask, "total": bid + ask}
+
+    def estimate_slippage(self, side: str, qty: Optional[float] = None,
+                          notional: Optional[float] = None) -> Dict[str, Any]:
+        """Market-impact estimate for a taker order
+
+        ``side`` is the order side ('Buy' takes asks, 'Sell' takes bids); give the
+        size either as base quantity or as quote notional.
+        """
+        mid = self.mid
+        if not mid:
+            return {"available": False}
+        if qty is None:
+            qty = (notional or 0.0) / mid
+
+        book_side = self.asks if side in ("Buy", "BUY", "buy", "LONG", "long") else self.bids
+        sweep = book_side.sweep(qty)
+        fully_filled = sweep["filled_qty"] >= qty - 1e-12
+        vwap = sweep["vwap"] or mid
+        slippage_bps = abs(vwap - mid) / mid * 10000
+
+        return {
+            "available": True,
+            "mid": mid,
+            "vwap": vwap,
+            "slippage_bps": slippage_bps if fully_filled else float("inf"),
+            "partial_slippage_bps": slippage_bps,
+            "filled_qty": sweep["filled_qty"],
+            "requested_qty": qty,
+            "levels_consumed": sweep["levels"],
+            "fully_filled": fully_filled
+        }
+
+    def max_notional_within_slippage(self, side: str, max_slippage_bps: float) -> float:
+        """Largest quote notional whose VWAP stays within max_slippage_bps of mid"""
+        mid = self.mid
+        if not mid:
+            return 0.0
+        book_side = self.asks if side in ("Buy", "BUY", "buy", "LONG", "long") else self.bids
+        return book_side.max_notional_within(mid, max_slippage_bps)
+
+    def top(self, levels: int = 5) -> Dict[str, List[List[float]]]:
+        return {
+            "bids": np.column_stack([self.bids.prices[:levels], self.bids.sizes[:levels]]).tolist(),
+            "asks": np.column_stack([self.asks.prices[:levels], self.asks.sizes[:levels]]).tolist()
+        }
+
+
+class OrderBookCache:
+    """
+    L2 books for many symbols
+
+    Written by one feed (the stream thread); readers query without locking. A
+    delta whose update id does not follow the previous one marks the book stale
+    and ``apply_message`` returns False so the feed can resubscribe.
+    """
+
+    def __init__(self, max_age: float = 5.0):
+        self.max_age = max_age
+        self.books: Dict[str, L2Book] = {}
+        self.stale: set = set()
+        self.stats = {"snapshots": 0, "deltas": 0, "gaps": 0}
+
+    def book(self, symbol: str) -> L2Book:
+        key = normalize_symbol(symbol)
+        book = self.books.get(key)
+        if book is None:
+            book = self.books[key] = L2Book(key)
+        return book
+
+    def get(self, symbol: str, max_age: Optional[float] = None) -> Optional[L2Book]:
+        """Fresh, consistent book for symbol, or None"""
+        key = normalize_symbol(symbol)
+        book = self.books.get(key)
+        if book is None or key in self.stale or book.mid is None:
+            return None
+        max_age = self.max_age if max_age is None else max_age
+        if max_age and time.time() - book.updated_at > max_age:
+            return None
+        return book
+
+    def apply_snapshot(self, symbol: str, bids: Sequence, asks: Sequence, update_id: int = 0):
+        self.book(symbol).load_snapshot(bids, asks, update_id)
+        self.stale.discard(normalize_symbol(symbol))
+        self.stats["snapshots"] += 1
+
+    def apply_delta(self, symbol: str, bids: Iterable, asks: Iterable, update_id: int = 0) -> bool:
+        key = normalize_symbol(symbol)
+        book = self.books.get(key)
+        if book is None or key in self.stale:
+            return False
+        if update_id and book.update_id and update_id != book.update_id + 1:
+            self.stale.add(key)
+            self.stats["gaps"] += 1
+            return False
+        book.apply_delta(bids, asks, update_id)
+        self.stats["deltas"] += 1
+        return True
+
+    def apply_message(self, message: Dict[str, Any]) -> bool:
+        """Apply a Bybit v5 orderbook message; False means a gap (resubscribe)"""
+        data = message.get("data", {})
+        symbol = data.get("s") or message.get("topic", "").rsplit(".", 1)[-1]
+        update_id = int(data.get("u", 0) or 0)
+
+        # Bybit sends u == 1 after a service restart: treat as a snapshot
+        if message.get("type") == "snapshot" or update_id == 1:
+            self.apply_snapshot(symbol, data.get("b", []), data.get("a", []), update_id)
+            book = self.book(symbol)
+        else:
+            if not self.apply_delta(symbol, data.get("b", []), data.get("a", []), update_id):
+                return False
+            book = self.books[normalize_symbol(symbol)]
+
+        book.sequence = int(data.get("seq", 0) or 0)
+        book.exchange_ts = float(message.get("ts", 0)) / 1000
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, books=len(self.books), stale=sorted(self.stale))
+
+
+_shared_cache: Optional[OrderBookCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_order_book_cache() -> OrderBookCache:
+    """Return the process-wide order book cache"""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                _shared_cache = OrderBookCache()
+    return _shared_cache
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+⚡ ASYNC ORDER ROUTER
+Pooled, concurrent order gateway for the Live Trading Engine
+
+``LiveTradingEngine.make_request`` is synchronous, rebuilds headers and the HMAC
+key schedule on every call and sends orders one at a time. The router instead:
+
+- keeps one pooled keep-alive session per process (connection reuse, no per-order
+  TLS handshake). aiohttp speaks HTTP/1.1 only, so concurrent requests use a pool
+  of keep-alive connections instead of HTTP/2 streams on one connection
+- reuses a pre-keyed HMAC object and static header template, so each request only
+  copies the key state and stamps timestamp + signature
+- bounds concurrent in-flight requests with a semaphore and a token bucket sized
+  to the exchange order rate limit
+- derives idempotent client order IDs (``orderLinkId``) from the order intent, so
+  retries and duplicate submissions never open a second position
+- retries only transport errors, timeouts, 5xx and 429 responses; other HTTP
+  errors (bad request, auth) fail at once
+- coalesces orders that arrive within a short window into
+  ``/v5/order/create-batch`` calls
+- records per-order submit→ack latency and reports percentiles
+"""
+
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+DUPLICATE_LINK_ID_CODES = {110072}  # OrderLinkedID is duplicate
+RETRY_STATUSES = {429}  # Retried along with every 5xx
+
+# Orders without an intent key get a unique per-process nonce; the process token
+# keeps a restarted process from reusing IDs the exchange has already seen
+_PROCESS_TOKEN = f"{os.getpid()}:{time.time_ns()}"
+_LINK_NONCES = itertools.count()
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Transport failures, timeouts, rate limiting and server errors are worth a retry"""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500 or error.status in RETRY_STATUSES
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+def make_order_link_id(strategy: str, symbol: str, side: str, qty: Any,
+                       intent_key: Optional[Any] = None) -> str:
+    """Deterministic client order ID for one order intent (max 36 chars on Bybit)
+
+    The same strategy / symbol / side / size / intent key always maps to the same
+    ID; ``intent_key`` should identify the originating signal. Without one every
+    call is a distinct order: only retries that reuse the returned ID are deduplicated.
+    """
+    if intent_key is None:
+        intent_key = f"{_PROCESS_TOKEN}:{next(_LINK_NONCES)}"
+    digest = hashlib.sha1(f"{strategy}|{symbol}|{side}|{qty}|{intent_key}".encode("utf-8")).hexdigest()
+    return f"orion-{digest[:30]}"
+
+
+class TokenBucket:
+    """Simple async token bucket"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self, tokens: float = 1.0):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return
+            await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+class AsyncOrderRouter:
+    """
+    Async Bybit v5 order gateway
+
+    ``place_order`` returns once the order is acknowledged; concurrent callers are
+    batched transparently. Call ``close()`` when done.
+    """
+
+    def __init__(self, api_key: str, api_secret: str, base_url: str,
+                 recv_window: int = 5000, max_in_flight: int = 8,
+                 orders_per_second: float = 10.0, batch_size: int = 10,
+                 batch_window: float = 0.005, request_timeout: float = 10.0,
+                 max_retries: int = 2, category: str = "linear"):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.recv_window = str(recv_window)
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.request_timeout = request_timeout
+        self.max_retries = max_retries
+        self.category = category
+
+        # Signing reuse: key schedule computed once, copied per request
+        self._hmac = hmac.new(bytes(api_secret, "utf-8"), digestmod=hashlib.sha256)
+        self._sign_prefix = self.api_key + self.recv_window
+        self._headers = {
+            "X-BAPI-API-KEY": api_key,
+            "X-BAPI-SIGN-TYPE": "2",
+            "X-BAPI-RECV-WINDOW": self.recv_window,
+            "Content-Type": "application/json"
+        }
+
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._rate = TokenBucket(orders_per_second)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._max_connections = max_in_flight
+
+        self._pending: List[tuple] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._acks: Dict[str, Dict[str, Any]] = {}
+        self._inflight_ids: Dict[str, asyncio.Future] = {}
+        self._tasks: set = set()
+        self.max_remembered_acks = 10000
+
+        self.latencies_ms: deque = deque(maxlen=10000)
+        self.stats = {'orders': 0, 'batches': 0, 'requests': 0, 'retries': 0, 'duplicates': 0, 'errors': 0}
+        self.logger = logging.getLogger(__name__)
+
+    # ------------------------------------------------------------------ transport
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self._max_connections, keepalive_timeout=60,
+                                             ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+                json_serialize=json.dumps
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    def sign(self, payload: str, timestamp: str) -> str:
+        mac = self._hmac.copy()
+        mac.update((timestamp + self._sign_prefix + payload).encode("utf-8"))
+        return mac.hexdigest()
+
+    async def post(self, endpoint: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Signed POST with bounded concurrency and rate limiting"""
+        payload = json.dumps(body)
+        session = await self._get_session()
+
+        async with self._in_flight:
+            await self._rate.acquire()
+            timestamp = str(int(time.time() * 1000))
+            headers = dict(self._headers)
+            headers["X-BAPI-TIMESTAMP"] = timestamp
+            headers["X-BAPI-SIGN"] = self.sign(payload, timestamp)
+
+            self.stats['requests'] += 1
+            async with session.post(f"{self.base_url}{endpoint}", data=payload, headers=headers) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+
+    # ------------------------------------------------------------------ orders
+
+    async def place_order(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Submit one order; identical ``orderLinkId`` submissions are deduplicated"""
+        params = dict(params)
+        params.setdefault("category", self.category)
+        link_id = params.setdefault(
+            "orderLinkId",
+            make_order_link_id("router", params.get("symbol"), params.get("side"), params.get("qty"))
+        )
+
+        if link_id in self._acks:
+            self.stats['duplicates'] += 1
+            return dict(self._acks[link_id], duplicate=True)
+        if link_id in self._inflight_ids:
+            self.stats['duplicates'] += 1
+            return dict(await asyncio.shield(self._inflight_ids[link_id]), duplicate=True)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight_ids[link_id] = future
+        self._pending.append((params, future, time.perf_counter()))
+        self.stats['orders'] += 1
+
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._flush)
+
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self._inflight_ids.pop(link_id, None)
+
+    async def place_orders(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Submit many orders concurrently (batched where possible)"""
+        return list(await asyncio.gather(*(self.place_order(order) for order in orders)))
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        while self._pending:
+            batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+            task = asyncio.ensure_future(self._send_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send_batch(self, batch: List[tuple]):
+        # Batch endpoint requires a single category
+        by_category: Dict[str, List[tuple]] = {}
+        for item in batch:
+            by_category.setdefault(item[0]["category"], []).append(item)
+
+        for category, items in by_category.items():
+            try:
+                if len(items) == 1:
+                    results = [await self._create_single(items[0][0])]
+                else:
+                    results = await self._create_batch(category, [item[0] for item in items])
+            except Exception as e:
+                self.stats['errors'] += 1
+                results = [{'success': False, 'error': str(e)} for _ in items]
+
+            for (params, future, started), result in zip(items, results):
+                latency_ms = (time.perf_counter() - started) * 1000
+                result = dict(result, order_link_id=params["orderLinkId"], latency_ms=latency_ms)
+                if result.get('success'):
+                    self.latencies_ms.append(latency_ms)
+                    self._acks[params["orderLinkId"]] = result
+                    if len(self._acks) > self.max_remembered_acks:
+                        self._acks.pop(next(iter(self._acks)))
+                if not future.done():
+                    future.set_result(result)
+
+    async def _with_retries(self, endpoint: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        # Retries reuse the same orderLinkId, so a request that reached the exchange
+        # before timing out cannot create a second order
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self.post(endpoint, body)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                self.stats['retries'] += 1
+                self.logger.warning(f"⚠️ Order request retry {attempt + 1}: {e}")
+                await asyncio.sleep(0.05 * 2 ** attempt)
+
+    async def _create_single(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        response = await self._with_retries("/v5/order/create", params)
+        return self._ack(response.get('retCode'), response.get('retMsg'),
+                         response.get('result', {}), response)
+
+    async def _create_batch(self, category: str, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        self.stats['batches'] += 1
+        request = [{k: v for k, v in order.items() if k != "category"} for order in orders]
+        response = await self._with_retries("/v5/order/create-batch", {"category": category, "request": request})
+
+        if response.get('retCode') != 0:
+            error = response.get('retMsg', 'Unknown error')
+            return [{'success': False, 'error': error, 'response': response} for _ in orders]
+
+        results = response.get('result', {}).get('list', [])
+        codes = response.get('retExtInfo', {}).get('list', [])
+        acks = []
+        for i in range(len(orders)):
+            result = results[i] if i < len(results) else {}
+            code = codes[i] if i < len(codes) else {'code': 0, 'msg': 'OK'}
+            acks.append(self._ack(code.get('code'), code.get('msg'), result, response))
+        return acks
+
+    def _ack(self, code: Any, message: Optional[str], result: Dict[str, Any],
+             response: Dict[str, Any]) -> Dict[str, Any]:
+        if code == 0:
+            return {'success': True, 'order_id': result.get('orderId'), 'response': response}
+        if code in DUPLICATE_LINK_ID_CODES:
+            # Exchange already holds this client order ID: the original was placed
+            self.stats['duplicates'] += 1
+            return {'success': True, 'order_id': result.get('orderId'), 'duplicate': True, 'response': response}
+        return {'success': False, 'error': message or 'Unknown error', 'response': response}
+
+    # ------------------------------------------------------------------ metrics
+
+    def latency_percentiles(self) -> Dict[str, float]:
+        """Submit→ack latency percentiles in milliseconds"""
+        if not self.latencies_ms:
+            return {'count': 0}
+        samples = sorted(self.latencies_ms)
+
+        def pick(q: float) -> float:
+            return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+        return {
+            'count': len(samples),
+            'p50_ms': pick(0.50),
+            'p90_ms': pick(0.90),
+            'p99_ms': pick(0.99),
+            'max_ms': samples[-1]
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, latency=self.latency_percentiles())
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+🛡️ RISK STATE CACHE
+In-memory pre-trade risk state for the Live Trading Engine
+
+``check_risk_limits`` used to make up to three blocking calls per order: a REST
+mark-price fetch, a REST positions fetch and a SQLite ``SUM(pnl)`` query. The
+cache keeps that state in memory instead:
+
+- daily realized PnL, seeded once per day from the database and incremented on
+  every fill
+- net position size and notional exposure per symbol, updated from execution events
+- mark prices, read from the stream snapshot
+
+``check`` then evaluates the same rules, in the same order and with the same
+messages as the engine, as a pure in-memory computation.
+"""
+
+import sqlite3
+import statistics
+import time
+from datetime import datetime, date
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+class RiskStateCache:
+    """Running risk state updated by fills and executions"""
+
+    def __init__(self, risk_controls: Dict[str, float],
+                 mark_price_source: Optional[Callable[[str], Optional[float]]] = None):
+        self.risk_controls = risk_controls
+        self.mark_price_source = mark_price_source
+
+        self.day: date = datetime.now().date()
+        self.daily_pnl = 0.0
+        self.positions: Dict[str, float] = {}      # symbol → signed net size
+        self.entry_prices: Dict[str, float] = {}   # symbol → last fill price
+        self.synced = False
+
+    # ------------------------------------------------------------------ seeding
+
+    def seed_daily_pnl(self, db_path: str):
+        """Load today's realized PnL once; later fills are applied incrementally"""
+        self.day = datetime.now().date()
+        today_start = datetime.combine(self.day, datetime.min.time())
+
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT SUM(pnl) FROM live_trades
+            WHERE timestamp >= ? AND status = 'Filled'
+        """, (today_start.timestamp(),))
+        result = cursor.fetchone()
+        conn.close()
+
+        self.daily_pnl = result[0] if result[0] else 0.0
+
+    def seed_positions(self, positions: Iterable[Any]):
+        """Replace net positions, e.g. after a REST resync"""
+        self.positions = {
+            p.symbol: float(p.size) if p.side == 'Buy' else -float(p.size)
+            for p in positions if float(p.size) > 0
+        }
+        self.entry_prices = {p.symbol: float(p.entry_price) for p in positions if float(p.size) > 0}
+        self.synced = True
+
+    # ------------------------------------------------------------------ events
+
+    def _roll_day(self):
+        today = datetime.now().date()
+        if today != self.day:
+            self.day = today
+            self.daily_pnl = 0.0
+
+    def record_fill_pnl(self, pnl: float):
+        """Add realized PnL of a filled order to today's running total"""
+        self._roll_day()
+        self.daily_pnl += pnl
+
+    def apply_execution(self, symbol: str, side: str, qty: float, price: float):
+        """Update net size for one execution"""
+        signed = qty if side == 'Buy' else -qty
+        size = self.positions.get(symbol, 0.0) + signed
+        if abs(size) < 1e-12:
+            self.positions.pop(symbol, None)
+            self.entry_prices.pop(symbol, None)
+        else:
+            self.positions[symbol] = size
+            self.entry_prices[symbol] = price
+
+    # ------------------------------------------------------------------ reads
+
+    @property
+    def position_count(self) -> int:
+        return len(self.positions)
+
+    def mark_price(self, symbol: str) -> Optional[float]:
+        if self.mark_price_source is not None:
+            price = self.mark_price_source(symbol)
+            if price:
+                return price
+        return self.entry_prices.get(symbol)
+
+    def exposure(self) -> Dict[str, float]:
+        """Notional exposure per symbol at current mark prices"""
+        return {symbol: abs(size) * (self.mark_price(symbol) or 0.0)
+                for symbol, size in self.positions.items()}
+
+    def get_daily_pnl(self) -> float:
+        self._roll_day()
+        return self.daily_pnl
+
+    def check(self, symbol: str, qty: float, price: Optional[float]) -> Tuple[bool, str]:
+        """Pre-trade risk check without I/O
+
+        ``price`` is the limit price; market orders use the cached mark price.
+        """
+        controls = self.risk_controls
+
+        # Calculate trade value
+        if price:
+            trade_value = qty * price
+        else:
+            mark = self.mark_price(symbol)
+            if mark is None:
+                return False, f"No cached mark price for {symbol}"
+            trade_value = qty * mark
+
+        # Check maximum single trade limit
+        if trade_value > controls['max_single_trade']:
+            return False, f"Trade value ${trade_value:.2f} exceeds maximum ${controls['max_single_trade']}"
+
+        # Check position size percentage
+        position_percent = (trade_value / controls['portfolio_value']) * 100
+        if position_percent > controls['max_position_size_percent']:
+            return False, f"Position size {position_percent:.2f}% exceeds maximum {controls['max_position_size_percent']}%"
+
+        # Check maximum number of positions
+        if len(self.positions) >= controls['max_total_positions']:
+            return False, f"Maximum positions ({controls['max_total_positions']}) already reached"
+
+        # Check daily loss limit
+        if self.get_daily_pnl() < -controls['max_daily_loss']:
+            return False, f"Daily loss limit (${controls['max_daily_loss']}) exceeded"
+
+        return True, "Risk checks passed"
+
+    def get_stats(self) -> Dict[str, Any]:
+        exposure = self.exposure()
+        return {
+            'synced': self.synced,
+            'daily_pnl': self.get_daily_pnl(),
+            'position_count': len(self.positions),
+            'exposure': exposure,
+            'total_exposure': sum(exposure.values())
+        }
+
+
+def benchmark_risk_check(iterations: int = 100000) -> Dict[str, float]:
+    """Latency distribution of the cached pre-trade check, in microseconds"""
+    controls = {
+        'max_position_size_percent': 2.0,
+        'max_total_positions': 5,
+        'portfolio_value': 10000.0,
+        'max_single_trade': 200.0,
+        'max_daily_loss': 250.0
+    }
+    marks = {'BTCUSDT': 65000.0, 'ETHUSDT': 3200.0}
+    cache = RiskStateCache(controls, mark_price_source=marks.get)
+    cache.apply_execution('ETHUSDT', 'Buy', 0.05, 3200.0)
+    cache.record_fill_pnl(-12.5)
+
+    samples = []
+    clock = time.perf_counter_ns
+    for i in range(iterations):
+        start = clock()
+        cache.check('BTCUSDT', 0.001, None if i % 2 else 64000.0)
+        samples.append(clock() - start)
+
+    samples.sort()
+    quantiles = statistics.quantiles(samples, n=100)
+    return {
+        'iterations': iterations,
+        'p50_us': quantiles[49] / 1000,
+        'p99_us': quantiles[98] / 1000,
+        'max_us': samples[-1] / 1000
+    }
+
+
+if __name__ == "__main__":
+    results = benchmark_risk_check()
+    print("🛡️ Cached Pre-Trade Risk Check Benchmark:")
+    print(f"   Iterations: {results['iterations']:,}")
+    print(f"   p50: {results['p50_us']:.2f}µs")
+    print(f"   p99: {results['p99_us']:.2f}µs")
+    print(f"   max: {results['max_us']:.2f}µs")
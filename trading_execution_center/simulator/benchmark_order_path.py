@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+🏁 ORDER PATH BENCHMARK
+End-to-end latency / throughput of the order path against the mock Bybit exchange
+
+Stages measured:
+1. AsyncOrderRouter alone (signing, batching, HTTP round trip, matching)
+2. LiveTradingEngine pre-trade risk check served from the streamed risk state
+3. LiveStrategyCoordinator → LiveTradingEngine → router → exchange, with fills
+   streamed back over the private WebSocket
+
+Runs in a temporary working directory so the simulated trades never touch the
+real trading databases.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add project root to path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(PROJECT_ROOT)
+
+from trading_execution_center.simulator.mock_exchange import MockBybitExchange
+from trading_execution_center.core.order_router import AsyncOrderRouter
+from trading_execution_center.core.live_trading_engine import TradeOrder
+
+SYMBOL = "BTCUSDT"
+API_KEY = "sim-key"
+API_SECRET = "sim-secret"
+
+
+def summarize(label: str, count: int, elapsed: float, latencies_ms):
+    latencies = sorted(latencies_ms)
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    print(f"   {label}: {count:,} in {elapsed:.2f}s → {count / elapsed:,.0f}/s | "
+          f"p50 {quantiles[49]:.2f}ms p99 {quantiles[98]:.2f}ms")
+
+
+async def bench_router(exchange: MockBybitExchange, orders: int, concurrency: int):
+    router = AsyncOrderRouter(API_KEY, API_SECRET, exchange.rest_url,
+                              max_in_flight=concurrency, orders_per_second=1e9)
+    requests = [{
+        "symbol": SYMBOL,
+        "side": "Buy" if i % 2 == 0 else "Sell",
+        "orderType": "Market",
+        "qty": "0.001",
+        "orderLinkId": f"bench-router-{i}"
+    } for i in range(orders)]
+
+    start = time.perf_counter()
+    results = await router.place_orders(requests)
+    elapsed = time.perf_counter() - start
+
+    accepted = sum(1 for r in results if r.get('success'))
+    summarize("Router", accepted, elapsed, [r['latency_ms'] for r in results if r.get('success')])
+    await router.close()
+
+
+async def bench_end_to_end(exchange: MockBybitExchange, signals: int, concurrency: int, risk_checks: int):
+    from strategy_center.signal_integration.live_strategy_coordinator import LiveStrategyCoordinator
+
+    coordinator = LiveStrategyCoordinator()
+    engine = coordinator.trading_engine
+    engine.base_url = exchange.rest_url
+    engine.order_router = AsyncOrderRouter(API_KEY, API_SECRET, exchange.rest_url,
+                                           max_in_flight=concurrency, orders_per_second=1e9)
+
+    # start_stream makes a blocking REST resync; keep it off the exchange's loop
+    await asyncio.to_thread(engine.start_stream, [SYMBOL], exchange.public_url, exchange.private_url)
+    await asyncio.to_thread(engine.stream.wait_until_connected)
+    await exchange.set_price(SYMBOL, exchange.engine.mark_price(SYMBOL))
+    await asyncio.sleep(0.2)
+
+    # Stage 2: cached pre-trade risk check
+    order = TradeOrder(symbol=SYMBOL, side="Buy", order_type="Market", qty=0.001, strategy="momentum_breakout")
+    samples = []
+    for _ in range(risk_checks):
+        t0 = time.perf_counter_ns()
+        engine.check_risk_limits(order)
+        samples.append((time.perf_counter_ns() - t0) / 1e6)
+    summarize("Risk check", risk_checks, sum(samples) / 1000, samples)
+
+    # Stage 3: full coordinator path
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        signal = {
+            'signal_id': f"bench-signal-{i}",
+            'symbol': SYMBOL,
+            'direction': 'Buy' if i % 2 == 0 else 'Sell',
+            'confidence': 0.8,
+            'position_size': 0.001,
+            'signal_type': 'momentum_breakout'
+        }
+        async with semaphore:
+            t0 = time.perf_counter()
+            result = await coordinator.process_strategy_signal_async('momentum_breakout', signal)
+            return result, (time.perf_counter() - t0) * 1000
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(one(i) for i in range(signals)))
+    elapsed = time.perf_counter() - start
+
+    executed = [latency for result, latency in outcomes if result.get('success')]
+    summarize("Coordinator → exchange", len(executed), elapsed, executed)
+    if len(executed) < signals:
+        errors = {result.get('error') for result, _ in outcomes if not result.get('success')}
+        print(f"   ⚠️ {signals - len(executed)} signals not executed: {sorted(map(str, errors))[:3]}")
+
+    await asyncio.sleep(0.5)
+    print(f"   Stream: {engine.stream.get_stats()['messages']:,} messages, "
+          f"risk state {engine.risk_state.get_stats()['position_count']} open positions")
+    await asyncio.to_thread(engine.stop_stream)
+    await engine.order_router.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the order path against the mock exchange")
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--signals", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--risk-checks", type=int, default=100000)
+    parser.add_argument("--latency-ms", type=float, nargs=2, default=(0.0, 0.0))
+    parser.add_argument("--reject-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("BYBIT_API_KEY", API_KEY)
+    os.environ.setdefault("BYBIT_API_SECRET", API_SECRET)
+    os.chdir(tempfile.mkdtemp(prefix="orion_bench_"))
+
+    import logging
+    logging.disable(logging.INFO)
+
+    exchange = MockBybitExchange(latency_ms=tuple(args.latency_ms), reject_rate=args.reject_rate, seed=1)
+    await exchange.start()
+    await exchange.set_price(SYMBOL, 65000.0)
+
+    print("🏁 Order Path Benchmark:")
+    await bench_router(exchange, args.orders, args.concurrency)
+    await bench_end_to_end(exchange, args.signals, args.concurrency, args.risk_checks)
+    print(f"   Exchange: {exchange.stats}")
+
+    await exchange.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+⚖️ MATCHING ENGINE
+Price-time priority limit order book for the local exchange simulator
+
+Each symbol has bid and ask ladders (price → FIFO queue of resting orders, best
+price found with a lazily-cleaned heap). Incoming orders match against the best
+opposite price first and, within a price, against the oldest resting order.
+Market orders take liquidity until filled or the book is exhausted (the rest is
+cancelled, as on Bybit for IOC market orders).
+
+A synthetic market maker quotes a few levels around the reference price, so the
+book always has liquidity while historical prices are replayed. Requoting on a
+price move is just another incoming order, so resting user orders that the new
+price crosses are filled by the normal matching rules.
+"""
+
+import heapq
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+MAKER_ACCOUNT = "market_maker"
+
+
+@dataclass
+class SimOrder:
+    order_id: str
+    order_link_id: str
+    account: str
+    symbol: str
+    side: str  # 'Buy' or 'Sell'
+    order_type: str  # 'Market' or 'Limit'
+    qty: float
+    price: Optional[float] = None
+    filled_qty: float = 0.0
+    avg_price: float = 0.0
+    status: str = "New"
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = 0.0
+    closed_pnl: float = 0.0
+    cum_fee: float = 0.0
+    sequence: int = 0
+
+    @property
+    def remaining(self) -> float:
+        return self.qty - self.filled_qty
+
+    def to_bybit(self) -> Dict:
+        """Order record in Bybit v5 field names"""
+        return {
+            "orderId": self.order_id,
+            "orderLinkId": self.order_link_id,
+            "symbol": self.symbol,
+            "side": self.side,
+            "orderType": self.order_type,
+            "qty": str(self.qty),
+            "price": str(self.price or 0),
+            "avgPrice": str(self.avg_price) if self.filled_qty else "",
+            "cumExecQty": str(self.filled_qty),
+            "leavesQty": str(max(self.remaining, 0.0)) if self.status in ("New", "PartiallyFilled") else "0",
+            "cumExecFee": str(self.cum_fee),
+            "orderStatus": self.status,
+            "closedPnl": str(self.closed_pnl),
+            "createdTime": str(int(self.created_at * 1000)),
+            "updatedTime": str(int((self.updated_at or self.created_at) * 1000))
+        }
+
+
+@dataclass
+class Fill:
+    __slots__ = ("exec_id", "order_id", "order_link_id", "account", "symbol", "side", "price", "qty", "fee",
+                 "is_maker", "timestamp")
+
+    exec_id: str
+    order_id: str
+    order_link_id: str
+    account: str
+    symbol: str
+    side: str
+    price: float
+    qty: float
+    fee: float
+    is_maker: bool
+    timestamp: float
+
+    def to_bybit(self) -> Dict:
+        return {
+            "execId": self.exec_id,
+            "orderId": self.order_id,
+            "orderLinkId": self.order_link_id,
+            "symbol": self.symbol,
+            "side": self.side,
+            "execPrice": str(self.price),
+            "execQty": str(self.qty),
+            "execFee": str(self.fee),
+            "execType": "Trade",
+            "isMaker": self.is_maker,
+            "execTime": str(int(self.timestamp * 1000))
+        }
+
+
+@dataclass
+class SimPosition:
+    symbol: str
+    size: float = 0.0  # Signed net size
+    entry_price: float = 0.0
+    realized_pnl: float = 0.0
+
+    def apply(self, side: str, qty: float, price: float) -> float:
+        """Apply a fill, returning the realized PnL it closed"""
+        signed = qty if side == 'Buy' else -qty
+        realized = 0.0
+
+        if self.size == 0 or (self.size > 0) == (signed > 0):
+            # Opening / adding: weighted entry
+            total = abs(self.size) + qty
+            self.entry_price = (abs(self.size) * self.entry_price + qty * price) / total
+            self.size += signed
+        else:
+            closing = min(qty, abs(self.size))
+            direction = 1 if self.size > 0 else -1
+            realized = closing * (price - self.entry_price) * direction
+            self.size += signed
+            if abs(self.size) < 1e-12:
+                self.size = 0.0
+                self.entry_price = 0.0
+            elif (self.size > 0) != (direction > 0):
+                # Flipped through zero: remainder opens at the fill price
+                self.entry_price = price
+
+        self.realized_pnl += realized
+        return realized
+
+    def to_bybit(self, mark_price: float) -> Dict:
+        unrealized = self.size * (mark_price - self.entry_price) if self.size else 0.0
+        return {
+            "symbol": self.symbol,
+            "side": "Buy" if self.size > 0 else "Sell" if self.size < 0 else "",
+            "size": str(abs(self.size)),
+            "avgPrice": str(self.entry_price),
+            "entryPrice": str(self.entry_price),
+            "markPrice": str(mark_price),
+            "unrealisedPnl": str(unrealized),
+            "cumRealisedPnl": str(self.realized_pnl)
+        }
+
+
+class PriceLevelBook:
+    """One side of a book: price → FIFO queue, with a heap over active prices"""
+
+    def __init__(self, is_bid: bool):
+        self.is_bid = is_bid
+        self.levels: Dict[float, deque] = {}
+        self._heap: List[float] = []
+
+    def add(self, order: SimOrder):
+        queue = self.levels.get(order.price)
+        if queue is None:
+            queue = self.levels[order.price] = deque()
+            heapq.heappush(self._heap, -order.price if self.is_bid else order.price)
+        queue.append(order)
+
+    def best_price(self) -> Optional[float]:
+        while self._heap:
+            key = self._heap[0]
+            price = -key if self.is_bid else key
+            queue = self.levels.get(price)
+            while queue and queue[0].status not in ("New", "PartiallyFilled"):
+                queue.popleft()  # Drop cancelled / filled orders lazily
+            if queue:
+                return price
+            self.levels.pop(price, None)
+            heapq.heappop(self._heap)
+        return None
+
+    def depth(self, levels: int = 5) -> List[Tuple[float, float]]:
+        prices = sorted((p for p, q in self.levels.items() if q), reverse=self.is_bid)
+        ladder = []
+        for price in prices:
+            qty = sum(o.remaining for o in self.levels[price] if o.status in ("New", "PartiallyFilled"))
+            if qty > 0:
+                ladder.append((price, qty))
+            if len(ladder) == levels:
+                break
+        return ladder
+
+
+class OrderBook:
+    """Price-time priority book for one symbol"""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids = PriceLevelBook(is_bid=True)
+        self.asks = PriceLevelBook(is_bid=False)
+
+    def side_for(self, side: str) -> PriceLevelBook:
+        return self.bids if side == 'Buy' else self.asks
+
+    def opposite(self, side: str) -> PriceLevelBook:
+        return self.asks if side == 'Buy' else self.bids
+
+
+class MatchingEngine:
+    """
+    Multi-symbol matching engine with positions and synthetic liquidity
+
+    ``submit`` returns the order and the fills it produced (taker and maker sides).
+    """
+
+    def __init__(self, taker_fee: float = 0.00055, maker_fee: float = 0.0002,
+                 mm_levels: int = 5, mm_spread_bps: float = 1.0, mm_step_bps: float = 1.0,
+                 mm_level_notional: float = 250000.0):
+        self.taker_fee = taker_fee
+        self.maker_fee = maker_fee
+        self.mm_levels = mm_levels
+        self.mm_spread_bps = mm_spread_bps
+        self.mm_step_bps = mm_step_bps
+        self.mm_level_notional = mm_level_notional
+
+        self.books: Dict[str, OrderBook] = {}
+        self.orders: Dict[str, SimOrder] = {}
+        self.positions: Dict[Tuple[str, str], SimPosition] = {}
+        self.reference_prices: Dict[str, float] = {}
+        self.last_trade_prices: Dict[str, float] = {}
+        self._mm_orders: Dict[str, List[SimOrder]] = {}
+
+        self._order_ids = itertools.count(1)
+        self._exec_ids = itertools.count(1)
+        self._sequence = itertools.count(1)
+
+    def book(self, symbol: str) -> OrderBook:
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook(symbol)
+        return book
+
+    def position(self, account: str, symbol: str) -> SimPosition:
+        key = (account, symbol)
+        position = self.positions.get(key)
+        if position is None:
+            position = self.positions[key] = SimPosition(symbol)
+        return position
+
+    def mark_price(self, symbol: str) -> float:
+        return self.reference_prices.get(symbol) or self.last_trade_prices.get(symbol, 0.0)
+
+    # ------------------------------------------------------------------ orders
+
+    def new_order(self, account: str, symbol: str, side: str, order_type: str, qty: float,
+                  price: Optional[float] = None, order_link_id: str = "") -> SimOrder:
+        order_id = f"sim-{next(self._order_ids):012d}"
+        return SimOrder(order_id=order_id, order_link_id=order_link_id, account=account,
+                        symbol=symbol, side=side, order_type=order_type, qty=qty,
+                        price=price if order_type == 'Limit' else None)
+
+    def submit(self, order: SimOrder) -> Tuple[SimOrder, List[Fill]]:
+        """Match an incoming order; the unfilled rest of a limit order rests on the book"""
+        order.sequence = next(self._sequence)
+        self.orders[order.order_id] = order
+        book = self.book(order.symbol)
+        opposite = book.opposite(order.side)
+        fills: List[Fill] = []
+        now = time.time()
+
+        while order.remaining > 1e-12:
+            best = opposite.best_price()
+            if best is None:
+                break
+            if order.order_type == 'Limit':
+                crosses = best <= order.price if order.side == 'Buy' else best >= order.price
+                if not crosses:
+                    break
+
+            queue = opposite.levels[best]
+            resting = queue[0]
+            qty = min(order.remaining, resting.remaining)
+            fills.append(self._fill(order, qty, best, is_maker=False, now=now))
+            fills.append(self._fill(resting, qty, best, is_maker=True, now=now))
+            if resting.remaining <= 1e-12:
+                resting.status = "Filled"
+                queue.popleft()
+            else:
+                resting.status = "PartiallyFilled"
+            self.last_trade_prices[order.symbol] = best
+
+        if order.remaining <= 1e-12:
+            order.status = "Filled"
+        elif order.order_type == 'Market':
+            order.status = "PartiallyFilledCanceled" if order.filled_qty else "Cancelled"
+        else:
+            order.status = "PartiallyFilled" if order.filled_qty else "New"
+            book.side_for(order.side).add(order)
+
+        order.updated_at = now
+        return order, fills
+
+    def cancel(self, order_id: str) -> Optional[SimOrder]:
+        order = self.orders.get(order_id)
+        if order is None or order.status not in ("New", "PartiallyFilled"):
+            return None
+        order.status = "Cancelled"
+        order.updated_at = time.time()
+        return order
+
+    def _fill(self, order: SimOrder, qty: float, price: float, is_maker: bool, now: float) -> Fill:
+        total = order.filled_qty + qty
+        order.avg_price = (order.avg_price * order.filled_qty + price * qty) / total
+        order.filled_qty = total
+        order.updated_at = now
+
+        fee = qty * price * (self.maker_fee if is_maker else self.taker_fee)
+        order.cum_fee += fee
+        order.closed_pnl += self.position(order.account, order.symbol).apply(order.side, qty, price)
+
+        return Fill(
+            exec_id=f"exec-{next(self._exec_ids):012d}",
+            order_id=order.order_id,
+            order_link_id=order.order_link_id,
+            account=order.account,
+            symbol=order.symbol,
+            side=order.side,
+            price=price,
+            qty=qty,
+            fee=fee,
+            is_maker=is_maker,
+            timestamp=now
+        )
+
+    # ------------------------------------------------------------------ synthetic liquidity
+
+    def set_reference_price(self, symbol: str, price: float) -> List[Fill]:
+        """Move the reference price and requote the synthetic market maker
+
+        Returns fills of resting orders crossed by the new quotes.
+        """
+        self.reference_prices[symbol] = price
+        for order in self._mm_orders.pop(symbol, []):
+            if order.status in ("New", "PartiallyFilled"):
+                order.status = "Cancelled"
+            self.orders.pop(order.order_id, None)
+
+        fills: List[Fill] = []
+        quotes: List[SimOrder] = []
+        for level in range(self.mm_levels):
+            offset = (self.mm_spread_bps / 2 + level * self.mm_step_bps) / 10000
+            qty = round(self.mm_level_notional / price, 6) if price > 0 else 0.0
+            if qty <= 0:
+                break
+            for side, level_price in (('Sell', price * (1 + offset)), ('Buy', price * (1 - offset))):
+                quote = self.new_order(MAKER_ACCOUNT, symbol, side, 'Limit', qty, round(level_price, 8))
+                _, quote_fills = self.submit(quote)
+                fills.extend(quote_fills)
+                quotes.append(quote)
+
+        self._mm_orders[symbol] = quotes
+        return fills
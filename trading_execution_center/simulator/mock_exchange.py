@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+🧪 MOCK BYBIT EXCHANGE
+Local Bybit-v5-compatible exchange simulator for offline latency and throughput tests
+
+Serves the subset of the Bybit v5 REST and WebSocket API used by the Live Trading
+Engine on 127.0.0.1:
+
+REST       /v5/order/create, /v5/order/create-batch, /v5/order/cancel,
+           /v5/order/realtime, /v5/market/tickers, /v5/position/list,
+           /v5/account/wallet-balance
+WebSocket  /v5/public/linear (tickers.<symbol>, orderbook.<depth>.<symbol>),
+           /v5/private (order, execution, position)
+
+Orders are matched by the price-time priority ``MatchingEngine``. Per-request
+latency and rejections can be injected, and reference prices are replayed from
+the free sources data store (``crypto_price`` rows) or, when that is empty, from a
+seeded random walk.
+"""
+
+import asyncio
+import json
+import random
+import sqlite3
+import time
+import sys
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+from aiohttp import web
+
+# Add project root to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from trading_execution_center.simulator.matching_engine import MatchingEngine, MAKER_ACCOUNT, Fill, SimOrder
+
+REJECT_MESSAGES = {
+    10006: "Too many visits. Exceeded the API Rate Limit.",
+    110007: "ab not enough for new order",
+    10016: "Server error"
+}
+
+
+class PriceReplay:
+    """Historical (or synthetic) reference price ticks"""
+
+    def __init__(self, db_path: str = "databases/sqlite_dbs/free_sources_data.db",
+                 symbols: Optional[List[str]] = None, hours: float = 24 * 7):
+        self.db_path = db_path
+        self.symbols = symbols
+        self.hours = hours
+        self.ticks: List[Tuple[float, str, float]] = []
+
+    def load(self) -> int:
+        """Load ``crypto_price`` rows as (timestamp, symbol, price); returns tick count"""
+        self.ticks = []
+        if Path(self.db_path).exists():
+            try:
+                conn = sqlite3.connect(self.db_path)
+                rows = conn.execute("""
+                    SELECT timestamp, symbol, raw_data FROM free_data
+                    WHERE data_type = 'crypto_price' AND timestamp >= ?
+                    ORDER BY timestamp
+                """, (time.time() - self.hours * 3600,)).fetchall()
+                conn.close()
+            except Exception as e:
+                print(f"⚠️ Could not load price history: {e}")
+                rows = []
+
+            for timestamp, symbol, raw in rows:
+                try:
+                    price = float(json.loads(raw).get("price", 0))
+                except (ValueError, TypeError, AttributeError):
+                    continue
+                pair = symbol if symbol.endswith("USDT") else f"{symbol}USDT"
+                if price > 0 and (self.symbols is None or pair in self.symbols):
+                    self.ticks.append((timestamp, pair, price))
+
+        return len(self.ticks)
+
+    def synthetic(self, start_prices: Dict[str, float], steps: int = 10000,
+                  volatility: float = 0.0005, seed: int = 42) -> int:
+        """Seeded random-walk ticks, one per symbol per step"""
+        rng = random.Random(seed)
+        prices = dict(start_prices)
+        now = time.time()
+        self.ticks = []
+        for step in range(steps):
+            for symbol in prices:
+                prices[symbol] *= 1 + rng.gauss(0, volatility)
+                self.ticks.append((now + step, symbol, prices[symbol]))
+        return len(self.ticks)
+
+
+class MockBybitExchange:
+    """
+    Bybit v5 stand-in backed by a matching engine
+
+    ``latency_ms`` is a (min, max) range added to every REST request;
+    ``reject_rate`` rejects that fraction of order requests with ``reject_code``.
+    Every API key is its own account.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 latency_ms: Tuple[float, float] = (0.0, 0.0),
+                 reject_rate: float = 0.0, reject_code: int = 10006,
+                 initial_equity: float = 10000.0, seed: Optional[int] = None,
+                 engine: Optional[MatchingEngine] = None):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.reject_rate = reject_rate
+        self.reject_code = reject_code
+        self.initial_equity = initial_equity
+        self.rng = random.Random(seed)
+        self.engine = engine or MatchingEngine()
+
+        self.link_ids: Dict[Tuple[str, str], str] = {}   # (account, orderLinkId) → orderId
+        self.public_clients: Dict[Any, set] = {}         # ws → subscribed topics
+        self.private_clients: Dict[Any, Tuple[str, set]] = {}  # ws → (account, topics)
+        self.ticker_sequence = 0
+        self.book_update_ids: Dict[str, int] = {}
+
+        self.stats = {'requests': 0, 'orders': 0, 'fills': 0, 'rejects': 0, 'duplicates': 0, 'ticks': 0}
+        self._runner: Optional[web.AppRunner] = None
+        self._replay_task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------ lifecycle
+
+    @property
+    def rest_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def public_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/v5/public/linear"
+
+    @property
+    def private_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/v5/private"
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/v5/order/create", self.handle_create)
+        app.router.add_post("/v5/order/create-batch", self.handle_create_batch)
+        app.router.add_post("/v5/order/cancel", self.handle_cancel)
+        app.router.add_get("/v5/order/realtime", self.handle_order_realtime)
+        app.router.add_get("/v5/market/tickers", self.handle_tickers)
+        app.router.add_get("/v5/position/list", self.handle_positions)
+        app.router.add_get("/v5/account/wallet-balance", self.handle_wallet)
+        app.router.add_get("/v5/public/linear", self.handle_public_ws)
+        app.router.add_get("/v5/private", self.handle_private_ws)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        print(f"🧪 Mock Bybit exchange listening on {self.rest_url}")
+
+    async def stop(self):
+        if self._replay_task:
+            self._replay_task.cancel()
+        for ws in list(self.public_clients) + list(self.private_clients):
+            await ws.close()
+        if self._runner:
+            await self._runner.cleanup()
+
+    # ------------------------------------------------------------------ prices
+
+    async def set_price(self, symbol: str, price: float):
+        """Move the reference price, requote liquidity and publish the tick"""
+        fills = self.engine.set_reference_price(symbol, price)
+        self.stats['ticks'] += 1
+        await self._publish_fills(fills)
+        await self._publish_ticker(symbol)
+
+    def start_replay(self, replay: PriceReplay, interval: float = 0.0, loop: bool = False):
+        """Replay ticks in the background, ``interval`` seconds apart"""
+        async def run():
+            while True:
+                for _, symbol, price in replay.ticks:
+                    await self.set_price(symbol, price)
+                    await asyncio.sleep(interval)
+                if not loop:
+                    break
+
+        self._replay_task = asyncio.ensure_future(run())
+        return self._replay_task
+
+    def ticker(self, symbol: str) -> Dict[str, Any]:
+        book = self.engine.book(symbol)
+        mark = self.engine.mark_price(symbol)
+        return {
+            "symbol": symbol,
+            "markPrice": str(mark),
+            "lastPrice": str(self.engine.last_trade_prices.get(symbol, mark)),
+            "bid1Price": str(book.bids.best_price() or 0),
+            "ask1Price": str(book.asks.best_price() or 0)
+        }
+
+    # ------------------------------------------------------------------ REST
+
+    async def _enter(self, request: web.Request) -> Optional[str]:
+        """Common request handling: latency injection and account lookup"""
+        self.stats['requests'] += 1
+        low, high = self.latency_ms
+        if high > 0:
+            await asyncio.sleep(self.rng.uniform(low, high) / 1000)
+        return request.headers.get("X-BAPI-API-KEY")
+
+    @staticmethod
+    def _reply(result: Any, code: int = 0, message: str = "OK", ext: Any = None) -> web.Response:
+        return web.json_response({
+            "retCode": code,
+            "retMsg": message,
+            "result": result,
+            "retExtInfo": ext or {},
+            "time": int(time.time() * 1000)
+        })
+
+    def _rejected(self) -> bool:
+        return self.reject_rate > 0 and self.rng.random() < self.reject_rate
+
+    def _place(self, account: str, params: Dict[str, Any]) -> Tuple[int, str, Dict[str, Any], List[Fill]]:
+        """Validate and match one order: (code, message, result, fills)"""
+        link_id = params.get("orderLinkId") or ""
+        if link_id and (account, link_id) in self.link_ids:
+            self.stats['duplicates'] += 1
+            return 110072, "OrderLinkedID is duplicate", {"orderId": self.link_ids[(account, link_id)],
+                                                        "orderLinkId": link_id}, []
+        if self._rejected():
+            self.stats['rejects'] += 1
+            return self.reject_code, REJECT_MESSAGES.get(self.reject_code, "Rejected"), {}, []
+
+        try:
+            qty = float(params["qty"])
+            order_type = params.get("orderType", "Market")
+            price = float(params["price"]) if order_type == "Limit" else None
+            side = params["side"]
+            symbol = params["symbol"]
+        except (KeyError, ValueError) as e:
+            return 10001, f"params error: {e}", {}, []
+        if qty <= 0 or side not in ("Buy", "Sell") or (order_type == "Limit" and not price):
+            return 10001, "params error", {}, []
+
+        order = self.engine.new_order(account, symbol, side, order_type, qty, price, link_id)
+        order, fills = self.engine.submit(order)
+        if link_id:
+            self.link_ids[(account, link_id)] = order.order_id
+        self.stats['orders'] += 1
+        return 0, "OK", {"orderId": order.order_id, "orderLinkId": link_id}, fills
+
+    async def handle_create(self, request: web.Request) -> web.Response:
+        account = await self._enter(request)
+        params = await request.json()
+        code, message, result, fills = self._place(account, params)
+        await self._publish_fills(fills)
+        if fills:
+            await self._publish_book(params.get("symbol"))
+        return self._reply(result, code, message)
+
+    async def handle_create_batch(self, request: web.Request) -> web.Response:
+        account = await self._enter(request)
+        body = await request.json()
+        category = body.get("category", "linear")
+        results, codes, fills = [], [], []
+        for params in body.get("request", [])[:10]:
+            code, message, result, order_fills = self._place(account, dict(params, category=category))
+            results.append(dict(result, category=category, symbol=params.get("symbol")))
+            codes.append({"code": code, "msg": message})
+            fills.extend(order_fills)
+        await self._publish_fills(fills)
+        for symbol in {fill.symbol for fill in fills}:
+            await self._publish_book(symbol)
+        return self._reply({"list": results}, ext={"list": codes})
+
+    async def handle_cancel(self, request: web.Request) -> web.Response:
+        account = await self._enter(request)
+        params = await request.json()
+        order_id = params.get("orderId") or self.link_ids.get((account, params.get("orderLinkId", "")))
+        order = self.engine.orders.get(order_id)
+        if order is None or order.account != account or self.engine.cancel(order_id) is None:
+            return self._reply({}, 110001, "Order does not exist")
+        await self._publish_private(account, "order", [order.to_bybit()])
+        return self._reply({"orderId": order.order_id, "orderLinkId": order.order_link_id})
+
+    async def handle_order_realtime(self, request: web.Request) -> web.Response:
+        account = await self._enter(request)
+        order_id = request.query.get("orderId")
+        link_id = request.query.get("orderLinkId")
+        orders = [o for o in self.engine.orders.values() if o.account == account]
+        if order_id:
+            orders = [o for o in orders if o.order_id == order_id]
+        elif link_id:
+            orders = [o for o in orders if o.order_link_id == link_id]
+        else:
+            orders = [o for o in orders if o.status in ("New", "PartiallyFilled")]
+        return self._reply({"category": "linear", "list": [o.to_bybit() for o in orders]})
+
+    async def handle_tickers(self, request: web.Request) -> web.Response:
+        await self._enter(request)
+        symbol = request.query.get("symbol")
+        symbols = [symbol] if symbol else list(self.engine.reference_prices)
+        return self._reply({"category": "linear", "list": [self.ticker(s) for s in symbols]})
+
+    def _positions(self, account: str) -> List[Dict[str, Any]]:
+        return [position.to_bybit(self.engine.mark_price(symbol))
+                for (owner, symbol), position in self.engine.positions.items()
+                if owner == account and position.size != 0]
+
+    async def handle_positions(self, request: web.Request) -> web.Response:
+        account = await self._enter(request)
+        return self._reply({"category": "linear", "list": self._positions(account)})
+
+    async def handle_wallet(self, request: web.Request) -> web.Response:
+        account = await self._enter(request)
+        realized = sum(p.realized_pnl for (owner, _), p in self.engine.positions.items() if owner == account)
+        fees = sum(o.cum_fee for o in self.engine.orders.values() if o.account == account)
+        unrealized = sum(float(p["unrealisedPnl"]) for p in self._positions(account))
+        equity = self.initial_equity + realized - fees + unrealized
+        return self._reply({"list": [{
+            "accountType": "UNIFIED",
+            "totalEquity": str(equity),
+            "totalWalletBalance": str(equity - unrealized),
+            "totalPerpUPL": str(unrealized)
+        }]})
+
+    # ------------------------------------------------------------------ WebSocket
+
+    async def handle_public_ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.public_clients[ws] = set()
+        try:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                data = json.loads(msg.data)
+                op = data.get("op")
+                if op == "ping":
+                    await ws.send_json({"success": True, "op": "pong"})
+                elif op in ("subscribe", "unsubscribe"):
+                    topics = self.public_clients[ws]
+                    for topic in data.get("args", []):
+                        if op == "subscribe":
+                            topics.add(topic)
+                        else:
+                            topics.discard(topic)
+                    await ws.send_json({"success": True, "op": op})
+                    if op == "subscribe":
+                        for topic in data.get("args", []):
+                            symbol = topic.rsplit(".", 1)[1]
+                            if symbol not in self.engine.reference_prices:
+                                continue
+                            if topic.startswith("orderbook."):
+                                await ws.send_json(self._book_message(topic, symbol))
+                            else:
+                                await ws.send_json(self._ticker_message(symbol, "snapshot"))
+        finally:
+            self.public_clients.pop(ws, None)
+        return ws
+
+    async def handle_private_ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        account = None
+        try:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                data = json.loads(msg.data)
+                op = data.get("op")
+                if op == "auth":
+                    account = data.get("args", [None])[0]
+                    self.private_clients[ws] = (account, set())
+                    await ws.send_json({"success": True, "op": "auth", "ret_msg": ""})
+                elif op == "ping":
+                    await ws.send_json({"success": True, "op": "pong"})
+                elif op == "subscribe":
+                    if ws not in self.private_clients:
+                        await ws.send_json({"success": False, "op": "subscribe", "ret_msg": "Request not authorized"})
+                        continue
+                    self.private_clients[ws][1].update(data.get("args", []))
+                    await ws.send_json({"success": True, "op": "subscribe"})
+        finally:
+            self.private_clients.pop(ws, None)
+        return ws
+
+    def _ticker_message(self, symbol: str, message_type: str) -> Dict[str, Any]:
+        self.ticker_sequence += 1
+        return {
+            "topic": f"tickers.{symbol}",
+            "type": message_type,
+            "cs": self.ticker_sequence,
+            "ts": int(time.time() * 1000),
+            "data": self.ticker(symbol)
+        }
+
+    def _book_message(self, topic: str, symbol: str) -> Dict[str, Any]:
+        """Full-depth snapshot of the simulated book (every message is a snapshot)"""
+        depth = int(topic.split(".")[1])
+        book = self.engine.book(symbol)
+        self.book_update_ids[symbol] = self.book_update_ids.get(symbol, 0) + 1
+        return {
+            "topic": topic,
+            "type": "snapshot",
+            "ts": int(time.time() * 1000),
+            "data": {
+                "s": symbol,
+                "b": [[str(p), str(q)] for p, q in book.bids.depth(depth)],
+                "a": [[str(p), str(q)] for p, q in book.asks.depth(depth)],
+                "u": self.book_update_ids[symbol],
+                "seq": self.ticker_sequence
+            }
+        }
+
+    async def _publish_ticker(self, symbol: str):
+        topic = f"tickers.{symbol}"
+        subscribers = [ws for ws, topics in self.public_clients.items() if topic in topics]
+        if subscribers:
+            message = self._ticker_message(symbol, "delta")
+            for ws in subscribers:
+                await self._send(ws, message)
+        await self._publish_book(symbol)
+
+    async def _publish_book(self, symbol: str):
+        messages: Dict[str, Dict[str, Any]] = {}
+        for ws, topics in list(self.public_clients.items()):
+            for topic in topics:
+                if topic.startswith("orderbook.") and topic.endswith(f".{symbol}"):
+                    if topic not in messages:
+                        messages[topic] = self._book_message(topic, symbol)
+                    await self._send(ws, messages[topic])
+
+    async def _publish_private(self, account: str, topic: str, rows: List[Dict[str, Any]]):
+        if not rows:
+            return
+        message = {"topic": topic, "creationTime": int(time.time() * 1000), "data": rows}
+        for ws, (owner, topics) in list(self.private_clients.items()):
+            if owner == account and topic in topics:
+                await self._send(ws, message)
+
+    async def _publish_fills(self, fills: List[Fill]):
+        """Push order / execution / position updates for every non-maker account"""
+        by_account: Dict[str, List[Fill]] = {}
+        for fill in fills:
+            if fill.account != MAKER_ACCOUNT:
+                by_account.setdefault(fill.account, []).append(fill)
+        self.stats['fills'] += sum(len(f) for f in by_account.values())
+
+        for account, account_fills in by_account.items():
+            orders: Dict[str, SimOrder] = {}
+            symbols = set()
+            for fill in account_fills:
+                orders[fill.order_id] = self.engine.orders[fill.order_id]
+                symbols.add(fill.symbol)
+            await self._publish_private(account, "execution", [fill.to_bybit() for fill in account_fills])
+            await self._publish_private(account, "order", [order.to_bybit() for order in orders.values()])
+            await self._publish_private(account, "position", [
+                self.engine.position(account, symbol).to_bybit(self.engine.mark_price(symbol))
+                for symbol in symbols
+            ])
+
+    @staticmethod
+    async def _send(ws, message: Dict[str, Any]):
+        try:
+            await ws.send_json(message)
+        except (ConnectionResetError, RuntimeError):
+            pass
+
+
+async def main():
+    """Run the simulator with replayed (or synthetic) prices until interrupted"""
+    exchange = MockBybitExchange(port=8765, latency_ms=(1.0, 3.0), reject_rate=0.01, seed=7)
+    await exchange.start()
+
+    replay = PriceReplay(symbols=["BTCUSDT", "ETHUSDT"])
+    if replay.load() == 0:
+        print("⚠️ No price history found, replaying synthetic prices...")
+        replay.synthetic({"BTCUSDT": 65000.0, "ETHUSDT": 3200.0})
+    exchange.start_replay(replay, interval=0.1, loop=True)
+
+    print(f"📈 Replaying {len(replay.ticks)} ticks")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(f"📊 {exchange.stats}")
+    finally:
+        await exchange.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\n👋 Mock exchange stopped")